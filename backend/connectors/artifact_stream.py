@@ -0,0 +1,98 @@
+"""
+Streaming artifact transfer over HTTP.
+
+Connectors that serve artifacts from a URL describe where they are with an
+ArtifactLocation. Artifacts are then read as a stream of chunks rather than
+loaded into memory, any byte range can be requested so interrupted
+downloads resume where they stopped, and large artifacts can be fetched as
+several ranges in parallel.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Dict, Optional
+
+# Bytes read from the response per chunk
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class RangeNotSupportedError(RuntimeError):
+    """The server ignored a Range request and sent the whole artifact"""
+
+
+@dataclass
+class ArtifactLocation:
+    """Where an artifact can be downloaded from"""
+    url: str
+    session: Any  # Session of the connector serving the artifact
+    params: Optional[Dict[str, str]] = None
+    size: Optional[int] = None  # Bytes, if known
+    accepts_ranges: Optional[bool] = None  # None until probed
+
+
+async def probe_artifact(location: ArtifactLocation) -> ArtifactLocation:
+    """
+    Learn an artifact's size and whether its server accepts Range requests.
+
+    Args:
+        location: Artifact location
+
+    Returns:
+        Location with size and accepts_ranges filled in where the server
+        reports them (unchanged if the probe fails)
+    """
+    if location.size is not None and location.accepts_ranges is not None:
+        return location
+    try:
+        async with location.session.head(
+            location.url, params=location.params, allow_redirects=True
+        ) as response:
+            if response.status != 200:
+                return location
+            length = response.headers.get("Content-Length")
+            return replace(
+                location,
+                size=int(length) if length is not None else location.size,
+                accepts_ranges=response.headers.get("Accept-Ranges", "").lower() == "bytes"
+            )
+    except Exception:
+        return location
+
+
+async def iter_artifact_range(
+    location: ArtifactLocation,
+    start: int = 0,
+    end: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Stream bytes [start, end) of an artifact.
+
+    Args:
+        location: Artifact location
+        start: First byte to read
+        end: Byte to stop before (None for the end of the artifact)
+        chunk_size: Bytes per yielded chunk
+
+    Yields:
+        Chunks of the artifact, in order
+
+    Raises:
+        FileNotFoundError: If the artifact doesn't exist
+        RangeNotSupportedError: If a range was requested but the server
+            sent the whole artifact
+        RuntimeError: If the download fails
+    """
+    headers = {}
+    if start > 0 or end not in (None, location.size):
+        headers["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+    async with location.session.get(location.url, params=location.params, headers=headers) as response:
+        if response.status == 404:
+            raise FileNotFoundError(f"Artifact not found: {location.url}")
+        if response.status == 416:
+            return  # Nothing left past start
+        if response.status == 200 and headers:
+            raise RangeNotSupportedError(f"Server ignored range request for {location.url}")
+        if response.status not in (200, 206):
+            raise RuntimeError(f"Failed to download artifact: {response.status}")
+        async for chunk in response.content.iter_chunked(chunk_size):
+            yield chunk
@@ -0,0 +1,350 @@
+"""
+Chunked artifact uploads shared by platform connectors.
+
+Files are uploaded in fixed-size parts over a small multipart protocol
+(create, upload parts, complete). Parts are sent with bounded
+parallelism, read from disk only while being sent, so memory use does not
+grow with the artifact size.
+
+A local upload manifest records, per destination, the content hashes that
+have been uploaded and the progress of multipart uploads still in flight:
+
+- Files whose content is already present at the destination are skipped
+  without touching the network
+- An upload that failed part-way resumes with the parts still missing
+- File hashes are cached by size and modification time, so unchanged
+  files are not re-read to be hashed
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+import aiohttp
+
+from .http_pool import retry_delay
+
+logger = logging.getLogger(__name__)
+
+# Bytes per uploaded part
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+# Parts in flight at once, across all files of an uploader
+DEFAULT_MAX_PARALLEL = 4
+
+# Attempts per part before the upload fails (it can still be resumed)
+MAX_ATTEMPTS = 5
+
+# Bytes read at a time when hashing files
+_HASH_BLOCK = 1024 * 1024
+
+# HTTP statuses worth retrying
+_TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class TransientUploadError(RuntimeError):
+    """The server failed a request in a way worth retrying"""
+
+
+class UploadSessionExpiredError(RuntimeError):
+    """The server no longer knows a multipart upload; it must start over"""
+
+
+@dataclass
+class UploadResult:
+    """Outcome of uploading one file"""
+    name: str
+    sha256: str
+    size_bytes: int
+    url: str
+    skipped: bool = False  # Content was already present at the destination
+    parts: int = 0
+    resumed_parts: int = 0  # Parts already uploaded by an earlier attempt
+
+
+def _sha256_file(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class UploadManifest:
+    """
+    Local record of uploaded content and unfinished multipart uploads.
+
+    Stored as one JSON file. All methods are called from the event loop;
+    save() rewrites the file atomically.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: Manifest file (defaults to upload_manifest.json in the
+                cache directory)
+        """
+        if path is None:
+            from runtime_paths import get_cache_dir
+
+            path = get_cache_dir() / "upload_manifest.json"
+        self.path = Path(path)
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        for key in ("hashes", "uploaded", "pending"):
+            data.setdefault(key, {})
+        return data
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_suffix(".tmp")
+        temp.write_text(json.dumps(self._data))
+        os.replace(temp, self.path)
+
+    async def file_hash(self, path: Path) -> str:
+        """
+        SHA-256 of a file, reusing the cached hash while the file's size
+        and modification time are unchanged.
+
+        Args:
+            path: File to hash
+
+        Returns:
+            Hex digest
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = str(path)
+        cached = self._data["hashes"].get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+        sha256 = await asyncio.to_thread(_sha256_file, path)
+        self._data["hashes"][key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+    def uploaded(self, destination: str, sha256: str) -> Optional[str]:
+        """URL of content already uploaded to a destination, if any"""
+        return self._data["uploaded"].get(destination, {}).get(sha256)
+
+    def record_uploaded(self, destination: str, sha256: str, url: str) -> None:
+        self._data["uploaded"].setdefault(destination, {})[sha256] = url
+        self.clear_pending(destination, sha256)
+
+    def pending(self, destination: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """Unfinished multipart upload of some content: upload_id, part_size and parts done"""
+        return self._data["pending"].get(destination, {}).get(sha256)
+
+    def start_pending(self, destination: str, sha256: str, upload_id: str, part_size: int) -> Dict[str, Any]:
+        entry = {"upload_id": upload_id, "part_size": part_size, "parts": {}}
+        self._data["pending"].setdefault(destination, {})[sha256] = entry
+        return entry
+
+    def clear_pending(self, destination: str, sha256: str) -> None:
+        pending = self._data["pending"].get(destination, {})
+        pending.pop(sha256, None)
+        if not pending:
+            self._data["pending"].pop(destination, None)
+
+
+class MultipartUploadTarget:
+    """
+    Destination speaking the multipart upload protocol over HTTP:
+
+    - ``POST {base_url}/multipart`` with name, size, sha256, part_size and
+      metadata returns ``{"upload_id": ...}``
+    - ``PUT {base_url}/multipart/{upload_id}/parts/{index}`` with the part's
+      bytes returns ``{"etag": ...}``
+    - ``POST {base_url}/multipart/{upload_id}/complete`` with the etags of
+      all parts returns ``{"url": ...}``
+    """
+
+    def __init__(self, session: Any, base_url: str, destination: Optional[str] = None):
+        """
+        Args:
+            session: HTTP session of the connector
+            base_url: URL the multipart endpoints live under
+            destination: Key identifying the remote store in the upload
+                manifest (defaults to base_url)
+        """
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.destination = destination or self.base_url
+
+    @staticmethod
+    async def _check(response, in_upload: bool = True) -> Dict[str, Any]:
+        if response.status == 404 and in_upload:
+            raise UploadSessionExpiredError("Upload not found on the server")
+        if response.status in _TRANSIENT_STATUSES:
+            raise TransientUploadError(f"Upload request failed: {response.status}")
+        if response.status not in (200, 201):
+            raise RuntimeError(f"Upload failed: {response.status}")
+        return await response.json()
+
+    async def create(self, name: str, size: int, sha256: str, part_size: int, metadata: Dict) -> str:
+        payload = {"name": name, "size": size, "sha256": sha256, "part_size": part_size, "metadata": metadata}
+        async with self.session.post(f"{self.base_url}/multipart", json=payload) as response:
+            return (await self._check(response, in_upload=False))["upload_id"]
+
+    async def upload_part(self, upload_id: str, index: int, data: bytes, sha256: str) -> str:
+        async with self.session.put(
+            f"{self.base_url}/multipart/{upload_id}/parts/{index}",
+            data=data,
+            headers={"X-Content-SHA256": sha256}
+        ) as response:
+            return (await self._check(response)).get("etag", sha256)
+
+    async def complete(self, upload_id: str, etags: List[str]) -> str:
+        async with self.session.post(
+            f"{self.base_url}/multipart/{upload_id}/complete", json={"parts": etags}
+        ) as response:
+            return (await self._check(response)).get("url", "")
+
+
+def _read_part(path: Path, offset: int, size: int) -> Tuple[bytes, str]:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(size)
+    return data, hashlib.sha256(data).hexdigest()
+
+
+class ChunkedUploader:
+    """Uploads files to one target in parallel parts, skipping and resuming via the manifest"""
+
+    def __init__(
+        self,
+        target: MultipartUploadTarget,
+        manifest: Optional[UploadManifest] = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_parallel: int = DEFAULT_MAX_PARALLEL
+    ):
+        """
+        Args:
+            target: Destination of the uploads
+            manifest: Upload manifest (defaults to the shared one)
+            part_size: Bytes per part
+            max_parallel: Parts in flight at once
+        """
+        self.target = target
+        self.manifest = manifest if manifest is not None else get_upload_manifest()
+        self.part_size = part_size
+        self._slots = asyncio.Semaphore(max_parallel)
+
+    async def upload_file(self, path: Path, name: Optional[str] = None, metadata: Optional[Dict] = None) -> UploadResult:
+        """
+        Upload one file, unless its content is already at the destination.
+
+        Args:
+            path: Local file
+            name: Remote file name (defaults to the file's name)
+            metadata: Metadata sent when the upload is created
+
+        Returns:
+            UploadResult with the remote URL
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            RuntimeError: If the upload fails; progress is kept in the
+                manifest and the next call resumes it
+        """
+        path = Path(path)
+        if not path.is_file():
+            raise FileNotFoundError(f"File not found: {path}")
+        name = name or path.name
+        size = path.stat().st_size
+        sha256 = await self.manifest.file_hash(path)
+        destination = self.target.destination
+
+        url = self.manifest.uploaded(destination, sha256)
+        if url is not None:
+            logger.info(f"Skipping upload of {name}: already uploaded to {destination}")
+            return UploadResult(name, sha256, size, url, skipped=True)
+
+        try:
+            return await self._upload(path, name, size, sha256, metadata or {})
+        except UploadSessionExpiredError:
+            # The server dropped the unfinished upload; start it over once
+            logger.warning(f"Upload of {name} expired on the server; starting over")
+            self.manifest.clear_pending(destination, sha256)
+            return await self._upload(path, name, size, sha256, metadata or {})
+        finally:
+            self.manifest.save()
+
+    async def upload_files(self, files: Dict[str, Path], metadata: Optional[Dict] = None) -> List[UploadResult]:
+        """
+        Upload several files, sharing the uploader's parallelism.
+
+        Args:
+            files: Remote name to local path
+            metadata: Metadata sent with each file
+
+        Returns:
+            UploadResult per file, in the order given
+        """
+        return list(await asyncio.gather(*(
+            self.upload_file(path, name, metadata) for name, path in files.items()
+        )))
+
+    async def _upload(self, path: Path, name: str, size: int, sha256: str, metadata: Dict) -> UploadResult:
+        destination = self.target.destination
+        pending = self.manifest.pending(destination, sha256)
+        if pending is None or pending["part_size"] != self.part_size:
+            upload_id = await self.target.create(name, size, sha256, self.part_size, metadata)
+            pending = self.manifest.start_pending(destination, sha256, upload_id, self.part_size)
+            self.manifest.save()
+        done: Dict[str, str] = pending["parts"]
+        resumed = len(done)
+        if resumed:
+            logger.info(f"Resuming upload of {name} with {resumed} parts already uploaded")
+
+        count = max(1, -(-size // self.part_size))
+        missing = [index for index in range(count) if str(index) not in done]
+        tasks = [asyncio.ensure_future(self._send_part(path, pending, index)) for index in missing]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # One part failing stops the others; finished parts stay recorded
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        url = await self.target.complete(pending["upload_id"], [done[str(index)] for index in range(count)])
+        self.manifest.record_uploaded(destination, sha256, url)
+        return UploadResult(name, sha256, size, url, parts=count, resumed_parts=resumed)
+
+    async def _send_part(self, path: Path, pending: Dict[str, Any], index: int) -> None:
+        attempt = 0
+        async with self._slots:
+            data, part_sha256 = await asyncio.to_thread(_read_part, path, index * self.part_size, self.part_size)
+            while True:
+                try:
+                    etag = await self.target.upload_part(pending["upload_id"], index, data, part_sha256)
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError, TransientUploadError) as e:
+                    attempt += 1
+                    if attempt >= MAX_ATTEMPTS:
+                        raise RuntimeError(f"Failed to upload part {index}: {e}")
+                    logger.warning(f"Upload of part {index} failed ({e}); retrying")
+                    await asyncio.sleep(retry_delay(attempt))
+        pending["parts"][str(index)] = etag
+        self.manifest.save()
+
+
+_upload_manifest: Optional[UploadManifest] = None
+
+
+def get_upload_manifest() -> UploadManifest:
+    """Get the shared upload manifest"""
+    global _upload_manifest
+    if _upload_manifest is None:
+        _upload_manifest = UploadManifest()
+    return _upload_manifest
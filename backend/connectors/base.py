@@ -10,6 +10,8 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, AsyncIterator
 from enum import Enum
 
+from .artifact_stream import ArtifactLocation, DEFAULT_CHUNK_SIZE, iter_artifact_range
+
 
 class ResourceType(Enum):
     """Types of compute resources."""
@@ -225,7 +227,56 @@ class PlatformConnector(ABC):
             RuntimeError: If download fails
         """
         pass
-    
+
+    async def artifact_location(self, job_id: str) -> Optional[ArtifactLocation]:
+        """
+        Locate the trained adapter artifact for streamed, ranged downloads.
+
+        Connectors that serve artifacts over HTTP override this; the default
+        means the artifact can only be fetched whole with fetch_artifact.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            ArtifactLocation, or None if streaming is not supported
+
+        Raises:
+            FileNotFoundError: If artifact doesn't exist
+            RuntimeError: If the artifact cannot be located
+        """
+        return None
+
+    async def stream_artifact(
+        self,
+        job_id: str,
+        offset: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the trained adapter artifact in chunks.
+
+        Args:
+            job_id: Job identifier
+            offset: Byte to start from, to resume an interrupted download
+            chunk_size: Bytes per chunk
+
+        Yields:
+            Chunks of the artifact, in order
+
+        Raises:
+            FileNotFoundError: If artifact doesn't exist
+            RuntimeError: If download fails
+        """
+        location = await self.artifact_location(job_id)
+        if location is None:
+            data = memoryview(await self.fetch_artifact(job_id))
+            for start in range(offset, len(data), chunk_size):
+                yield bytes(data[start:start + chunk_size])
+            return
+        async for chunk in iter_artifact_range(location, offset, chunk_size=chunk_size):
+            yield chunk
+
     @abstractmethod
     async def upload_artifact(self, path: str, metadata: Dict) -> str:
         """
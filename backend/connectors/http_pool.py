@@ -0,0 +1,431 @@
+"""
+Shared HTTP client pool for platform connectors.
+
+Every connector sends its requests over one aiohttp TCPConnector, so
+connections (and their TLS sessions) are reused across connectors that talk
+to the same host, DNS lookups are cached, and keep-alive connections are
+bounded per host. Each connector gets a lightweight session on top of the
+shared connector that carries its own headers.
+
+Sessions retry transient failures with exponential backoff and jitter, and
+record per-connector latency histograms and error counts, reported by
+get_stats() and served under /api/performance.
+"""
+
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import logging
+import random
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Responses that are retried: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that are safe to repeat after the server may have processed them
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+DEFAULT_RETRIES = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 10.0
+
+
+def retry_delay(attempt: int, base: float = RETRY_BASE_SECONDS, cap: float = RETRY_MAX_SECONDS) -> float:
+    """
+    Backoff before a retry: exponential, with jitter so connectors that
+    failed together do not retry together.
+
+    Args:
+        attempt: Retry number, starting at 1
+
+    Returns:
+        Delay in seconds, between half and all of the exponential delay
+    """
+    delay = min(base * 2 ** (attempt - 1), cap)
+    return delay * (0.5 + random.random() / 2)
+
+
+class LatencyHistogram:
+    """Request latency histogram and error counts for one connector"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, elapsed_ms: float, status: Optional[int] = None, error: bool = False) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        if error:
+            self.errors += 1
+        key = f"{status // 100}xx" if isinstance(status, int) else "exception"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket containing the q-quantile"""
+        if not self.requests:
+            return None
+        rank = q * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0,
+            "retries": self.retries,
+            "avg_ms": self.total_ms / self.requests if self.requests else 0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "histogram": dict(zip(buckets, self.counts)),
+            "statuses": dict(self.statuses),
+        }
+
+
+class PooledRequest:
+    """
+    One request sent through a PooledSession, with retries.
+
+    Usable like aiohttp's request context: ``async with session.get(url) as
+    response`` or ``response = await session.get(url)``.
+    """
+
+    def __init__(self, session: "PooledSession", method: str, send: Callable[[], Any]):
+        self._session = session
+        self._method = method
+        self._send = send
+        self._context = None
+
+    async def _perform(self, enter: bool):
+        session = self._session
+        idempotent = self._method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            context = self._send()
+            started = time.perf_counter()
+            try:
+                response = await (context.__aenter__() if enter else context)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                session.stats.record((time.perf_counter() - started) * 1000, error=True)
+                # Nothing reached the server if the connection could not be made
+                retryable = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+                if not retryable or attempt >= session.retries:
+                    raise
+                attempt += 1
+                session.stats.retries += 1
+                await asyncio.sleep(retry_delay(attempt))
+                continue
+
+            status = getattr(response, "status", None)
+            status = status if isinstance(status, int) else None
+            session.stats.record(
+                (time.perf_counter() - started) * 1000,
+                status,
+                error=status is not None and (status >= 500 or status == 429)
+            )
+            # A 429 was rejected before processing, so any method may retry it
+            retryable = status in RETRY_STATUSES and (idempotent or status == 429)
+            if not retryable or attempt >= session.retries:
+                self._context = context if enter else None
+                return response
+
+            attempt += 1
+            session.stats.retries += 1
+            delay = _retry_after(response)
+            if enter:
+                await context.__aexit__(None, None, None)
+            else:
+                response.release()
+            await asyncio.sleep(delay if delay is not None else retry_delay(attempt))
+
+    def __await__(self):
+        return self._perform(enter=False).__await__()
+
+    async def __aenter__(self):
+        return await self._perform(enter=True)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        context, self._context = self._context, None
+        if context is not None:
+            return await context.__aexit__(exc_type, exc, tb)
+        return None
+
+
+def _retry_after(response) -> Optional[float]:
+    try:
+        value = float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return min(max(value, 0.0), RETRY_MAX_SECONDS)
+
+
+class PooledSession:
+    """
+    A connector's session on the shared connection pool.
+
+    Exposes the request methods connectors use on aiohttp.ClientSession.
+    Closing it closes only this session; pooled connections stay open for
+    the other connectors.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        name: str,
+        stats: LatencyHistogram,
+        retries: int,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self._session = session
+        self.name = name
+        self.stats = stats
+        self.retries = retries
+        self._headers = dict(headers or {})
+
+    @property
+    def closed(self) -> bool:
+        return self._session.closed
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return self._headers
+
+    def _with_headers(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        # Headers go on each request: aiohttp keys pooled connections by the
+        # session's default headers, which would stop sharing across connectors
+        if self._headers:
+            kwargs["headers"] = {**self._headers, **(kwargs.get("headers") or {})}
+        return kwargs
+
+    def _call(self, method: str, send: Callable[..., Any], url: str, kwargs: Dict[str, Any]) -> PooledRequest:
+        kwargs = self._with_headers(kwargs)
+        return PooledRequest(self, method, lambda: send(url, **kwargs))
+
+    def request(self, method: str, url: str, **kwargs) -> PooledRequest:
+        kwargs = self._with_headers(kwargs)
+        method = method.upper()
+        return PooledRequest(self, method, lambda: self._session.request(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs) -> PooledRequest:
+        return self._call("GET", self._session.get, url, kwargs)
+
+    def post(self, url: str, **kwargs) -> PooledRequest:
+        return self._call("POST", self._session.post, url, kwargs)
+
+    def put(self, url: str, **kwargs) -> PooledRequest:
+        return self._call("PUT", self._session.put, url, kwargs)
+
+    def patch(self, url: str, **kwargs) -> PooledRequest:
+        return self._call("PATCH", self._session.patch, url, kwargs)
+
+    def delete(self, url: str, **kwargs) -> PooledRequest:
+        return self._call("DELETE", self._session.delete, url, kwargs)
+
+    def head(self, url: str, **kwargs) -> PooledRequest:
+        return self._call("HEAD", self._session.head, url, kwargs)
+
+    async def close(self) -> None:
+        await self._session.close()
+
+    async def __aenter__(self) -> "PooledSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+class HTTPConnectionPool:
+    """
+    Manages HTTP connection pooling for external API calls.
+    Reuses connections to reduce overhead and improve performance.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_connections_per_host: int = 10,
+        timeout: int = 30,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        retries: int = DEFAULT_RETRIES
+    ):
+        """
+        Args:
+            max_connections: Open connections across all hosts
+            max_connections_per_host: Open connections to a single host
+            timeout: Default total request timeout in seconds
+            keepalive_timeout: Seconds an idle connection is kept for reuse
+            dns_cache_ttl: Seconds resolved addresses are cached
+            retries: Retries of transient failures per request
+        """
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.retries = retries
+        self._session: Optional[PooledSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._transport = {
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+        }
+        self._trace_config = self._build_trace_config()
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        transport = self._transport
+
+        def counter(key):
+            async def count(session, context, params):
+                transport[key] += 1
+            return count
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(counter("connections_created"))
+        trace_config.on_connection_reuseconn.append(counter("connections_reused"))
+        trace_config.on_dns_cache_hit.append(counter("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(counter("dns_cache_misses"))
+        return trace_config
+
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        # Connectors are bound to an event loop; start a new pool on a new loop
+        loop = asyncio.get_running_loop()
+        if self._connector is None or self._connector.closed or self._loop is not loop:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True
+            )
+            self._loop = loop
+            logger.info(
+                f"Created HTTP connection pool: "
+                f"max_connections={self.max_connections}, "
+                f"max_per_host={self.max_connections_per_host}"
+            )
+        return self._connector
+
+    def session(
+        self,
+        name: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None
+    ) -> PooledSession:
+        """
+        Create a session for a connector on the shared connection pool.
+
+        Must be called from a running event loop.
+
+        Args:
+            name: Connector name that latency and errors are recorded under
+            headers: Headers sent with every request of this session
+            timeout: Request timeout (defaults to the pool's)
+
+        Returns:
+            PooledSession with the aiohttp.ClientSession request interface
+        """
+        session = aiohttp.ClientSession(
+            connector=self._get_connector(),
+            connector_owner=False,
+            timeout=timeout or self.timeout,
+            trace_configs=[self._trace_config]
+        )
+        histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return PooledSession(session, name, histogram, self.retries, headers)
+
+    async def get_session(self) -> PooledSession:
+        """Get or create the pool's default session."""
+        if self._session is None or self._session.closed or self._loop is not asyncio.get_running_loop():
+            self._session = self.session("default")
+        return self._session
+
+    async def close(self):
+        """Close the HTTP session and cleanup connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+            logger.info("Closed HTTP connection pool")
+        self._connector = None
+
+    async def get(self, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """Make GET request using pooled connection."""
+        session = await self.get_session()
+        return await session.get(url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """Make POST request using pooled connection."""
+        session = await self.get_session()
+        return await session.post(url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """Make PUT request using pooled connection."""
+        session = await self.get_session()
+        return await session.put(url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """Make DELETE request using pooled connection."""
+        session = await self.get_session()
+        return await session.delete(url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-connector latency and errors, and connection reuse across the pool."""
+        connector = self._connector
+        open_connections = 0
+        if connector is not None and not connector.closed:
+            # Idle keep-alive connections plus those serving requests
+            open_connections = sum(len(c) for c in connector._conns.values()) + len(connector._acquired)
+        return {
+            "connectors": {name: histogram.to_dict() for name, histogram in self._histograms.items()},
+            "transport": {**self._transport, "open_connections": open_connections},
+            "limits": {
+                "max_connections": self.max_connections,
+                "max_connections_per_host": self.max_connections_per_host,
+                "keepalive_timeout": self.keepalive_timeout,
+                "dns_cache_ttl": self.dns_cache_ttl,
+                "retries": self.retries,
+            },
+        }
+
+
+# Global HTTP connection pool
+_http_pool: Optional[HTTPConnectionPool] = None
+
+
+def get_http_pool() -> HTTPConnectionPool:
+    """Get the global HTTP connection pool."""
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = HTTPConnectionPool()
+    return _http_pool
+
+
+async def close_http_pool():
+    """Close the global HTTP connection pool."""
+    global _http_pool
+    if _http_pool:
+        await _http_pool.close()
+        _http_pool = None
@@ -0,0 +1,440 @@
+"""
+Model metadata cache shared by model registry connectors and services.
+
+Two tiers:
+
+- A bounded in-memory LRU per registry, for the models in current use
+- One SQLite store for all registries, indexed by (namespace, key), with a
+  full-text index so searches can be answered from cached metadata when
+  the registry is unreachable
+
+Entries are loaded from SQLite on first use rather than all at startup.
+Each entry expires after a TTL; get_or_fetch keeps serving an expired
+entry for a grace period while it is refreshed in the background
+(stale-while-revalidate), and serves it at any age when the registry
+cannot be reached.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".peft-studio" / "cache" / "model_metadata.db"
+
+# File name of the store inside a cache directory given explicitly
+DB_FILE_NAME = "model_metadata.db"
+
+# Entries kept in memory per registry
+DEFAULT_MAX_ENTRIES = 1024
+
+DEFAULT_TTL_HOURS = 24
+
+# How long past its TTL an entry is still served while being refreshed
+DEFAULT_STALE_HOURS = 24 * 7
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its timestamps (seconds since the epoch)"""
+    key: str
+    value: Any
+    cached_at: float
+    expires_at: float
+
+    def deadline(self, ttl_hours: Optional[float] = None) -> float:
+        if ttl_hours is None:
+            return self.expires_at
+        return self.cached_at + ttl_hours * 3600
+
+    def fresh(self, ttl_hours: Optional[float] = None) -> bool:
+        return time.time() < self.deadline(ttl_hours)
+
+
+def _match_query(query: str) -> Optional[str]:
+    """FTS5 query matching every word of a search as a prefix"""
+    words = re.findall(r"\w+", query or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class MetadataStore:
+    """SQLite tier: cached metadata of every registry in one indexed table"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS model_metadata (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                cached_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                UNIQUE (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_model_metadata_expiry
+                ON model_metadata (namespace, expires_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS model_metadata_fts
+                USING fts5(text, tokenize='unicode61 remove_diacritics 2');
+        """)
+
+    def get(self, namespace: str, key: str) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT data, cached_at, expires_at FROM model_metadata WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+
+    def put(self, namespace: str, key: str, data: str, cached_at: float, expires_at: float, text: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    """
+                    INSERT INTO model_metadata (namespace, key, data, cached_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (namespace, key) DO UPDATE SET
+                        data = excluded.data,
+                        cached_at = excluded.cached_at,
+                        expires_at = excluded.expires_at
+                    """,
+                    (namespace, key, data, cached_at, expires_at)
+                )
+                rowid = self._conn.execute(
+                    "SELECT rowid FROM model_metadata WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM model_metadata_fts WHERE rowid = ?", (rowid,))
+                self._conn.execute("INSERT INTO model_metadata_fts (rowid, text) VALUES (?, ?)", (rowid, text))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _delete_where(self, condition: str, params: tuple) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    f"DELETE FROM model_metadata_fts WHERE rowid IN "
+                    f"(SELECT rowid FROM model_metadata WHERE {condition})",
+                    params
+                )
+                deleted = self._conn.execute(f"DELETE FROM model_metadata WHERE {condition}", params).rowcount
+                self._conn.execute("COMMIT")
+                return deleted
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, namespace: str, key: str) -> bool:
+        return self._delete_where("namespace = ? AND key = ?", (namespace, key)) > 0
+
+    def delete_expired(self, namespace: str, before: float) -> int:
+        return self._delete_where("namespace = ? AND expires_at < ?", (namespace, before))
+
+    def clear(self, namespace: str) -> None:
+        self._delete_where("namespace = ?", (namespace,))
+
+    def all(self, namespace: str) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, data, cached_at, expires_at FROM model_metadata "
+                "WHERE namespace = ? ORDER BY cached_at DESC",
+                (namespace,)
+            ).fetchall()
+
+    def search(self, namespace: str, match: str, limit: int) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT m.key, m.data, m.cached_at, m.expires_at
+                FROM model_metadata_fts f JOIN model_metadata m ON m.rowid = f.rowid
+                WHERE model_metadata_fts MATCH ? AND m.namespace = ?
+                ORDER BY f.rank
+                LIMIT ?
+                """,
+                (match, namespace, limit)
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class MetadataCache:
+    """
+    Metadata of one registry: a bounded LRU in front of the SQLite store.
+
+    Values are any objects; encode/decode convert them to and from
+    JSON-serialisable dicts, and search_text gives the text they are found
+    by in searches.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        decode: Callable[[Dict], Any],
+        encode: Callable[[Any], Dict],
+        search_text: Optional[Callable[[Any], str]] = None,
+        db_path: Optional[Path] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_hours: float = DEFAULT_TTL_HOURS
+    ):
+        """
+        Args:
+            namespace: Registry the metadata belongs to
+            decode: Builds a value from its dict
+            encode: Converts a value to a dict
+            search_text: Text a value is found by (defaults to its key)
+            db_path: SQLite store to use (defaults to the shared store)
+            max_entries: Entries kept in memory
+            ttl_hours: Default time-to-live of entries
+        """
+        self.namespace = namespace
+        self._decode = decode
+        self._encode = encode
+        self._search_text = search_text
+        self._store = MetadataStore(db_path) if db_path is not None else get_metadata_store()
+        self._max_entries = max_entries
+        self._ttl_hours = ttl_hours
+        self._cache: "OrderedDict[Any, CacheEntry]" = OrderedDict()
+        self._refreshing: Dict[Any, asyncio.Task] = {}
+
+    def _remember(self, key: Any, entry: CacheEntry) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    def _row_entry(self, key: str, data: str, cached_at: float, expires_at: float) -> CacheEntry:
+        return CacheEntry(key, self._decode(json.loads(data)), cached_at, expires_at)
+
+    def lookup(self, key: Any) -> Optional[CacheEntry]:
+        """
+        Cached entry for a key, fresh or not, loading it from the store on
+        first use.
+
+        Args:
+            key: Model identifier
+
+        Returns:
+            CacheEntry or None if never cached
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+        try:
+            row = self._store.get(self.namespace, str(key))
+            if row is None:
+                return None
+            entry = self._row_entry(str(key), *row)
+        except Exception as e:
+            logger.warning(f"Unreadable {self.namespace} cache entry {key}: {e}")
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def get(self, key: Any, ttl_hours: Optional[float] = None) -> Any:
+        """
+        Cached value for a key if not expired.
+
+        Args:
+            key: Model identifier
+            ttl_hours: Time-to-live to check against (defaults to the TTL
+                the entry was stored with)
+
+        Returns:
+            The value, or None if not cached or expired
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        if not entry.fresh(ttl_hours):
+            # Expired entries leave memory but stay in the store for offline use
+            self._cache.pop(key, None)
+            return None
+        return entry.value
+
+    def get_stale(self, key: Any) -> Any:
+        """Cached value for a key at any age (for use while offline)"""
+        entry = self.lookup(key)
+        return entry.value if entry is not None else None
+
+    def put(
+        self,
+        key: Any,
+        value: Any,
+        cached_at: Optional[datetime] = None,
+        ttl_hours: Optional[float] = None
+    ) -> None:
+        """
+        Cache a value.
+
+        Args:
+            key: Model identifier
+            value: Value to cache
+            cached_at: When the value was fetched (defaults to now)
+            ttl_hours: Time-to-live (defaults to the cache's)
+        """
+        timestamp = cached_at.timestamp() if cached_at is not None else time.time()
+        expires_at = timestamp + (ttl_hours if ttl_hours is not None else self._ttl_hours) * 3600
+        entry = CacheEntry(str(key), value, timestamp, expires_at)
+        self._remember(key, entry)
+        try:
+            text = self._search_text(value) if self._search_text else str(key)
+            self._store.put(
+                self.namespace, str(key), json.dumps(self._encode(value)), timestamp, expires_at, text
+            )
+        except Exception as e:
+            # Cache write failure is non-fatal
+            logger.warning(f"Failed to store {self.namespace} cache entry {key}: {e}")
+
+    def remove(self, key: Any) -> bool:
+        """
+        Remove a key from the cache.
+
+        Returns:
+            True if it was in the store
+        """
+        self._cache.pop(key, None)
+        return self._store.delete(self.namespace, str(key))
+
+    def clear(self) -> None:
+        """Remove every entry of this registry"""
+        self._cache.clear()
+        self._store.clear(self.namespace)
+
+    def purge_expired(self, grace_hours: float = 0) -> int:
+        """
+        Remove entries expired for longer than a grace period.
+
+        Returns:
+            Number of entries removed
+        """
+        self._cache.clear()
+        return self._store.delete_expired(self.namespace, time.time() - grace_hours * 3600)
+
+    def entries(self) -> List[CacheEntry]:
+        """Every cached entry of this registry, most recently cached first"""
+        entries = []
+        for row in self._store.all(self.namespace):
+            try:
+                entries.append(self._row_entry(*row))
+            except Exception:
+                continue  # Skip entries that no longer decode
+        return entries
+
+    def values(self) -> List[Any]:
+        """Every cached value of this registry, including expired ones"""
+        return [entry.value for entry in self.entries()]
+
+    def search(self, query: str, limit: int = 20) -> List[Any]:
+        """
+        Search cached values with the full-text index, best matches first.
+
+        Args:
+            query: Words to match (each as a prefix)
+            limit: Maximum number of results
+
+        Returns:
+            Matching values, at any age
+        """
+        match = _match_query(query)
+        if match is None:
+            return self.values()[:limit]
+        results = []
+        for row in self._store.search(self.namespace, match, limit):
+            try:
+                results.append(self._row_entry(*row).value)
+            except Exception:
+                continue
+        return results
+
+    async def get_or_fetch(
+        self,
+        key: Any,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl_hours: Optional[float] = None,
+        stale_hours: float = DEFAULT_STALE_HOURS
+    ) -> Any:
+        """
+        Cached value, fetching it when missing or too old.
+
+        Fresh entries are returned as they are. Entries expired for less
+        than stale_hours are returned immediately and refreshed in the
+        background. Otherwise the value is fetched; if that fails or
+        returns None, an entry of any age is returned instead.
+
+        Args:
+            key: Model identifier
+            fetch: Coroutine function fetching the value (None if unavailable)
+            ttl_hours: Time-to-live to check against
+            stale_hours: Grace period for serving expired entries
+
+        Returns:
+            The value, or None if neither cached nor fetchable
+        """
+        entry = self.lookup(key)
+        if entry is not None:
+            if entry.fresh(ttl_hours):
+                return entry.value
+            if time.time() < entry.deadline(ttl_hours) + stale_hours * 3600:
+                self._refresh(key, fetch)
+                return entry.value
+        try:
+            value = await fetch()
+        except Exception:
+            if entry is None:
+                raise
+            value = None
+        if value is None:
+            return entry.value if entry is not None else None
+        self.put(key, value)
+        return value
+
+    def _refresh(self, key: Any, fetch: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await fetch()
+                if value is not None:
+                    self.put(key, value)
+            except Exception as e:
+                logger.debug(f"Background refresh of {self.namespace} entry {key} failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.ensure_future(refresh())
+
+
+_stores: Dict[Path, MetadataStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_metadata_store(db_path: Optional[Path] = None) -> MetadataStore:
+    """Get the shared store for a database file (the default store if None)"""
+    path = Path(db_path or DEFAULT_DB_PATH).expanduser()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = MetadataStore(path)
+        return store
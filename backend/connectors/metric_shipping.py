@@ -0,0 +1,316 @@
+"""
+Metric shipping pipeline shared by experiment tracker connectors.
+
+Each tracker connector owns one MetricShipper. Entries (metric rows,
+spans, ...) are buffered per job in bounded buffers and sent in bulk: a
+flush turns everything buffered for a job into as few requests as
+possible, using the connector's batch encoder. Flushes are triggered by
+size (``submit`` reports when a batch is full) and by time (a background
+loop per shipper).
+
+When the tracker is unreachable, flushes back off exponentially instead of
+retrying on every submit. Entries that no longer fit in a job's buffer are
+encoded and spilled to disk, then replayed, oldest first, once the tracker
+responds again. Entries are only dropped, and counted, when the spill
+limit is reached.
+"""
+
+from collections import deque
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Entries buffered per job before the oldest are spilled to disk
+DEFAULT_MAX_BUFFERED = 10000
+
+# Entries encoded into a single request
+DEFAULT_MAX_REQUEST_ENTRIES = 1000
+
+# Disk space for spilled requests per tracker
+DEFAULT_MAX_SPILL_BYTES = 64 * 1024 * 1024
+
+# Backoff between flush attempts while the tracker is unreachable
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 60.0
+
+# HTTP statuses treated as accepted
+_OK_STATUSES = (200, 201, 202, 204)
+
+_SPILL_SUFFIX = ".jsonl"
+
+
+@dataclass
+class BatchRequest:
+    """One bulk request produced by a connector's batch encoder"""
+    url: str
+    payload: Any
+    method: str = "POST"
+
+
+class MetricShipper:
+    """
+    Bounded per-job buffers flushed to one tracker in bulk requests.
+
+    Connectors supply ``encode_batch(job_id, entries)``, returning the
+    BatchRequest that uploads those entries (or None if the job is unknown),
+    and a callable returning their HTTP session.
+    """
+
+    def __init__(
+        self,
+        tracker: str,
+        encode_batch: Callable[[str, List[Dict[str, Any]]], Optional[BatchRequest]],
+        session: Callable[[], Any],
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_buffered: int = DEFAULT_MAX_BUFFERED,
+        max_request_entries: int = DEFAULT_MAX_REQUEST_ENTRIES,
+        spill_dir: Optional[Path] = None,
+        max_spill_bytes: int = DEFAULT_MAX_SPILL_BYTES
+    ):
+        """
+        Args:
+            tracker: Tracker name, used for the spill directory and logs
+            encode_batch: Builds the bulk request for a job's entries
+            session: Returns the aiohttp session to send requests with
+            batch_size: Buffered entries that make a flush due
+            flush_interval: Seconds between background flushes
+            max_buffered: Entries buffered per job before spilling to disk
+            max_request_entries: Entries encoded into one request
+            spill_dir: Directory for spilled requests (defaults to the
+                application cache directory)
+            max_spill_bytes: Disk space for spilled requests
+        """
+        self.tracker = tracker
+        self.buffers: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._encode_batch = encode_batch
+        self._session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max(max_buffered, batch_size)
+        self.max_request_entries = max_request_entries
+        self._spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.max_spill_bytes = max_spill_bytes
+        self._loop_task: Optional[asyncio.Task] = None
+        self._send_lock: Optional[asyncio.Lock] = None
+        self._failures = 0
+        self._retry_at = 0.0
+        self._spill_pending: Optional[bool] = None  # None until the spill directory is checked
+        self._stats = {
+            'sent_entries': 0,
+            'requests': 0,
+            'failed_requests': 0,
+            'spilled_entries': 0,
+            'replayed_entries': 0,
+            'dropped_entries': 0,
+        }
+
+    @property
+    def spill_dir(self) -> Path:
+        if self._spill_dir is None:
+            from runtime_paths import get_cache_dir
+
+            self._spill_dir = get_cache_dir() / "metric_spill" / self.tracker
+        return self._spill_dir
+
+    @property
+    def reachable(self) -> bool:
+        return self._failures == 0
+
+    def open(self, job_id: str) -> None:
+        """Start buffering entries for a job"""
+        self.buffers.setdefault(job_id, deque())
+        self._ensure_loop()
+
+    def submit(self, job_id: str, entries: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Buffer entries for a job.
+
+        Args:
+            job_id: Job the entries belong to (must be open)
+            entries: Entries in the connector's own format
+
+        Returns:
+            True if a batch is full and the caller should flush
+        """
+        buffer = self.buffers.get(job_id)
+        if buffer is None:
+            return False
+        buffer.extend(entries)
+        if len(buffer) > self.max_buffered:
+            self._spill_oldest(job_id, buffer, len(buffer) - self.max_buffered)
+        return len(buffer) >= self.batch_size
+
+    async def flush(self, job_id: str) -> bool:
+        """
+        Send everything buffered for a job, after any spilled requests.
+
+        Returns:
+            True if nothing is left to send
+        """
+        if time.monotonic() < self._retry_at:
+            return False
+        async with self._lock():
+            if not await self._replay_spill():
+                return False
+            buffer = self.buffers.get(job_id)
+            while buffer:
+                entries = [buffer.popleft() for _ in range(min(len(buffer), self.max_request_entries))]
+                request = self._encode_batch(job_id, entries)
+                if request is None:
+                    self._stats['dropped_entries'] += len(entries)
+                    continue
+                if not await self._send(request):
+                    # Keep order: put the batch back in front of newer entries
+                    buffer.extendleft(reversed(entries))
+                    if len(buffer) > self.max_buffered:
+                        self._spill_oldest(job_id, buffer, len(buffer) - self.max_buffered)
+                    return False
+                self._stats['sent_entries'] += len(entries)
+            return True
+
+    async def close(self, job_id: str) -> None:
+        """Flush a job's entries and stop buffering; anything unsent is spilled"""
+        if job_id not in self.buffers:
+            return
+        await self.flush(job_id)
+        buffer = self.buffers.pop(job_id)
+        if buffer:
+            self._spill_oldest(job_id, buffer, len(buffer))
+
+    async def shutdown(self) -> None:
+        """Stop the background loop and close every job"""
+        task, self._loop_task = self._loop_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for job_id in list(self.buffers):
+            await self.close(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput, buffering, spill and drop counters"""
+        spilled_files = list(self.spill_dir.glob(f"*{_SPILL_SUFFIX}")) if self._spill_dir else []
+        return {
+            **self._stats,
+            'tracker': self.tracker,
+            'reachable': self.reachable,
+            'buffered_entries': sum(len(buffer) for buffer in self.buffers.values()),
+            'spill_bytes': sum(f.stat().st_size for f in spilled_files),
+        }
+
+    def _lock(self) -> asyncio.Lock:
+        if self._send_lock is None:
+            self._send_lock = asyncio.Lock()
+        return self._send_lock
+
+    def _ensure_loop(self) -> None:
+        if self._loop_task is not None and not self._loop_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._loop_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                for job_id in list(self.buffers):
+                    if self.buffers.get(job_id):
+                        await self.flush(job_id)
+                if time.monotonic() >= self._retry_at:
+                    async with self._lock():
+                        await self._replay_spill()
+            except Exception as e:
+                logger.error(f"Metric shipping to {self.tracker} failed: {e}")
+
+    async def _send(self, request: BatchRequest) -> bool:
+        session = self._session()
+        ok = False
+        if session is not None:
+            try:
+                async with session.request(request.method, request.url, json=request.payload) as response:
+                    ok = response.status in _OK_STATUSES
+            except Exception as e:
+                logger.debug(f"Request to {self.tracker} failed: {e}")
+        self._stats['requests'] += 1
+        if ok:
+            self._failures = 0
+            self._retry_at = 0.0
+        else:
+            self._stats['failed_requests'] += 1
+            self._failures += 1
+            delay = min(RETRY_BASE_SECONDS * 2 ** (self._failures - 1), RETRY_MAX_SECONDS)
+            self._retry_at = time.monotonic() + delay
+        return ok
+
+    def _spill_oldest(self, job_id: str, buffer: Deque[Dict[str, Any]], count: int) -> None:
+        """Move the oldest entries of a buffer to disk as encoded requests"""
+        while count > 0:
+            entries = [buffer.popleft() for _ in range(min(count, self.max_request_entries))]
+            count -= len(entries)
+            request = self._encode_batch(job_id, entries)
+            if request is None or not self._write_spill(request, len(entries)):
+                self._stats['dropped_entries'] += len(entries)
+            else:
+                self._stats['spilled_entries'] += len(entries)
+
+    def _write_spill(self, request: BatchRequest, entries: int) -> bool:
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            line = json.dumps({'entries': entries, **asdict(request)}, default=str) + "\n"
+            used = sum(f.stat().st_size for f in self.spill_dir.glob(f"*{_SPILL_SUFFIX}"))
+            if used + len(line) > self.max_spill_bytes:
+                return False
+            # One file per second keeps files small and in chronological order
+            path = self.spill_dir / f"{time.time_ns() // 1_000_000_000:012d}{_SPILL_SUFFIX}"
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._spill_pending = True
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not spill {self.tracker} metrics to disk: {e}")
+            return False
+
+    async def _replay_spill(self) -> bool:
+        """Send spilled requests oldest first; returns True once none are left"""
+        if self._spill_pending is False:
+            return True
+        for path in sorted(self.spill_dir.glob(f"*{_SPILL_SUFFIX}")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+            except OSError:
+                continue
+            for index, line in enumerate(lines):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                request = BatchRequest(record['url'], record['payload'], record.get('method', 'POST'))
+                if not await self._send(request):
+                    self._rewrite(path, lines[index:])
+                    return False
+                self._stats['replayed_entries'] += record.get('entries', 0)
+                self._stats['sent_entries'] += record.get('entries', 0)
+            path.unlink(missing_ok=True)
+        self._spill_pending = False
+        return True
+
+    @staticmethod
+    def _rewrite(path: Path, lines: List[str]) -> None:
+        temp = path.with_suffix(".tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(temp, path)
@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, JSON, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from config import DATABASE_URL
+from db_engine import get_engine
 
 Base = declarative_base()
 
@@ -103,8 +104,8 @@ class Evaluation(Base):
     metrics = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-# Create engine and tables
-engine = create_engine(DATABASE_URL)
+# Shared, SQLite-tuned engine and tables
+engine = get_engine(DATABASE_URL)
 Base.metadata.create_all(engine)
 
 # Session factory
@@ -0,0 +1,199 @@
+"""
+Shared SQLAlchemy engines tuned for SQLite.
+
+Every component using the application database gets the same engine for
+a given URL from get_engine(), instead of each creating its own. SQLite
+engines are configured on connect with:
+
+- WAL journaling, so readers never block the writer and vice versa
+- synchronous=NORMAL (durable across application crashes under WAL;
+  commits no longer fsync)
+- A memory-mapped read window, a larger page cache and in-memory temp
+  storage
+- A busy timeout, so a connection waits for a lock instead of failing
+
+SQLite allows a single writer. Reads run outside transactions, as with
+pysqlite's own transaction handling, and a connection's first write
+opens the transaction with BEGIN IMMEDIATE while holding the engine's
+writer lock. Writers in this process therefore queue on the lock, and
+writers in other processes wait on SQLite's busy timeout, instead of
+upgrading read locks mid-transaction and failing with "database is
+locked".
+"""
+
+from typing import Dict, Optional
+import logging
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+# How long a connection waits for the write lock
+DEFAULT_BUSY_TIMEOUT_MS = 30_000
+
+# Applied to every new SQLite connection (busy_timeout is added per engine)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # Negative: KiB rather than pages
+    "temp_store": "MEMORY",
+}
+
+# Connections kept open by the pool of a file database; SQLite connections
+# are cheap, and writers are serialized anyway
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+
+# Statements that need the write lock; SAVEPOINT too, since outside a
+# transaction it would open a deferred one
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER", "SAVEPOINT")
+
+# Key in the pooled connection's info dict while it holds the writer lock
+_WRITING = "sqlite_writing"
+
+
+def is_sqlite(engine_or_url) -> bool:
+    """Whether an engine or database URL is SQLite"""
+    url = getattr(engine_or_url, "url", engine_or_url)
+    return str(url).startswith("sqlite")
+
+
+def _in_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def configure_sqlite(engine: Engine, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS) -> Engine:
+    """
+    Apply the SQLite pragmas and writer serialization to an engine.
+
+    Idempotent. Connections opened before the call are discarded so
+    every connection gets the settings.
+
+    Args:
+        engine: Engine on an SQLite database
+        busy_timeout_ms: How long to wait for the write lock
+
+    Returns:
+        The engine
+    """
+    if getattr(engine, "_sqlite_tuned", False):
+        return engine
+    engine._sqlite_tuned = True
+    writer_lock = threading.Lock()
+    engine._sqlite_writer_lock = writer_lock
+    pragmas = dict(SQLITE_PRAGMAS, busy_timeout=busy_timeout_ms)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # Transactions are opened by before_cursor_execute below, not by pysqlite
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_WRITING) or not statement.lstrip()[:9].upper().startswith(_WRITE_PREFIXES):
+            return
+        if not writer_lock.acquire(timeout=busy_timeout_ms / 1000):
+            raise OperationalError(statement, parameters, Exception("database is locked (writer lock timeout)"))
+        try:
+            if not cursor.connection.in_transaction:
+                cursor.connection.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            writer_lock.release()
+            raise
+        conn.info[_WRITING] = True
+
+    def finish(info, dbapi_connection, end) -> None:
+        if not info.pop(_WRITING, False):
+            return
+        try:
+            if dbapi_connection.in_transaction:
+                end()
+        finally:
+            writer_lock.release()
+
+    @event.listens_for(engine, "commit")
+    def on_commit(conn):
+        if conn.info.get(_WRITING):
+            dbapi_connection = conn.connection.dbapi_connection
+            finish(conn.info, dbapi_connection, dbapi_connection.commit)
+
+    @event.listens_for(engine, "rollback")
+    def on_rollback(conn):
+        if conn.info.get(_WRITING):
+            dbapi_connection = conn.connection.dbapi_connection
+            finish(conn.info, dbapi_connection, dbapi_connection.rollback)
+
+    @event.listens_for(engine.pool, "reset")
+    def on_reset(dbapi_connection, connection_record, reset_state):
+        # Connections returned to the pool mid-write (e.g. garbage collected)
+        finish(connection_record.info, dbapi_connection, dbapi_connection.rollback)
+
+    @event.listens_for(engine.pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        if connection_record.info.pop(_WRITING, False):
+            writer_lock.release()
+
+    engine.dispose()
+    return engine
+
+
+def create_sqlite_engine(url: str, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS, **kwargs) -> Engine:
+    """
+    Create an engine on an SQLite database with the tuning applied.
+
+    File databases use a small QueuePool of connections shareable across
+    threads; in-memory databases keep SQLAlchemy's default pool.
+
+    Args:
+        url: SQLite database URL
+        busy_timeout_ms: How long to wait for the write lock
+        **kwargs: Extra arguments for create_engine
+
+    Returns:
+        Configured engine
+    """
+    connect_args = kwargs.pop("connect_args", {})
+    connect_args.setdefault("check_same_thread", False)
+    connect_args.setdefault("timeout", busy_timeout_ms / 1000)
+    if not _in_memory(url):
+        kwargs.setdefault("pool_size", POOL_SIZE)
+        kwargs.setdefault("max_overflow", MAX_OVERFLOW)
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    return configure_sqlite(engine, busy_timeout_ms)
+
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """
+    Get the shared engine for a database URL.
+
+    Args:
+        url: Database URL (defaults to the application database)
+
+    Returns:
+        Engine, tuned if the database is SQLite
+    """
+    if url is None:
+        from config import DATABASE_URL
+
+        url = DATABASE_URL
+    with _engines_lock:
+        engine = _engines.get(url)
+        if engine is None:
+            engine = create_sqlite_engine(url) if is_sqlite(url) else create_engine(url)
+            _engines[url] = engine
+            logger.debug(f"Created shared database engine for {engine.url}")
+        return engine
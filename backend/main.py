@@ -1,4 +1,10 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+# STARTUP OPTIMIZATION: Import startup optimizer first and profile the imports after it
+from services.startup_service import get_startup_optimizer, measure_startup, LazyRouters
+
+startup_optimizer = get_startup_optimizer()
+startup_optimizer.start_import_profiling()
+
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
@@ -6,9 +12,9 @@ import uvicorn
 import logging
 import asyncio
 import json
+import multiprocessing
 
-# STARTUP OPTIMIZATION: Import startup optimizer first
-from services.startup_service import get_startup_optimizer, measure_startup
+from services.metrics_hub import get_metrics_hub, stream_subscription
 
 # Configure logging
 logging.basicConfig(
@@ -17,9 +23,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize startup optimizer
-startup_optimizer = get_startup_optimizer()
-
 # STARTUP OPTIMIZATION: Lazy load heavy services
 # These will be imported only when actually needed
 _services_loaded = False
@@ -57,16 +60,13 @@ def _lazy_load_services():
     
     _services_loaded = True
 
-# STARTUP OPTIMIZATION: Import routers (lightweight)
-from services.experiment_tracking_api import router as experiment_tracking_router
-from services.deployment_api import router as deployment_router
-from services.gradio_demo_api import router as gradio_demo_router
+# STARTUP OPTIMIZATION: Import routers used from the first screen; rarely used
+# API groups are mounted on their first request (see lazy_routers below)
 from services.security_api import router as security_router
-from services.telemetry_api import router as telemetry_router
 from services.settings_api import router as settings_router
 from services.inference_api import router as inference_router
 from services.configuration_management_api import router as configuration_management_router
-from services.logging_api import router as logging_router
+from services.dataset_api import router as dataset_router
 
 # SECURITY: Import security middleware
 from services.security_middleware import SecurityMiddleware, InputValidationMiddleware
@@ -96,6 +96,10 @@ async def performance_monitoring_middleware(request, call_next):
     start_time = time.time()
     error = False
     
+    # STARTUP OPTIMIZATION: Mount a lazily loaded API group before routing its first request
+    if lazy_routers.pending:
+        lazy_routers.mount_for_path(request.url.path)
+    
     try:
         response = await call_next(request)
         return response
@@ -111,14 +115,18 @@ async def performance_monitoring_middleware(request, call_next):
 
 # Include routers
 app.include_router(security_router)
-app.include_router(experiment_tracking_router)
-app.include_router(deployment_router)
-app.include_router(gradio_demo_router)
-app.include_router(telemetry_router)
 app.include_router(settings_router)
 app.include_router(inference_router)
 app.include_router(configuration_management_router)
-app.include_router(logging_router)
+app.include_router(dataset_router)
+
+# STARTUP OPTIMIZATION: Rarely used API groups, mounted on first request
+lazy_routers = LazyRouters(app, startup_optimizer)
+lazy_routers.add("/api/experiments", "services.experiment_tracking_api")
+lazy_routers.add("/api/deployments", "services.deployment_api")
+lazy_routers.add("/api/gradio-demos", "services.gradio_demo_api")
+lazy_routers.add("/api/telemetry", "services.telemetry_api")
+lazy_routers.add("/api/logging", "services.logging_api")
 
 
 # Request/Response Models
@@ -1075,90 +1083,64 @@ async def validate_profile_compatibility(request: ProfileCompatibilityRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, job_id: str):
-        await websocket.accept()
-        if job_id not in self.active_connections:
-            self.active_connections[job_id] = []
-        self.active_connections[job_id].append(websocket)
-        logger.info(f"WebSocket connected for job {job_id}")
-    
-    def disconnect(self, websocket: WebSocket, job_id: str):
-        if job_id in self.active_connections:
-            self.active_connections[job_id].remove(websocket)
-            if not self.active_connections[job_id]:
-                del self.active_connections[job_id]
-        logger.info(f"WebSocket disconnected for job {job_id}")
-    
-    async def broadcast(self, job_id: str, message: dict):
-        if job_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[job_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message: {e}")
-                    disconnected.append(connection)
-            
-            # Remove disconnected clients
-            for connection in disconnected:
-                self.disconnect(connection, job_id)
-
-
-manager = ConnectionManager()
-
-
 # Monitoring Endpoints
 @app.websocket("/ws/training/{job_id}")
-async def websocket_endpoint(websocket: WebSocket, job_id: str):
-    """WebSocket endpoint for real-time training metrics"""
-    await manager.connect(websocket, job_id)
+async def websocket_endpoint(websocket: WebSocket, job_id: str, delta: bool = False, encoding: str = "json"):
+    """
+    WebSocket endpoint for real-time training metrics.
     
+    Metrics are pushed as soon as they are recorded. Query parameters:
+    delta=true sends only changed fields after a full frame, and
+    encoding=msgpack sends binary frames when msgpack is installed.
+    """
+    _lazy_load_services()
+    await websocket.accept()
+    hub = get_metrics_hub()
     try:
-        monitoring_service = get_monitoring_service()
+        subscription = hub.subscribe(job_id, delta=delta, encoding=encoding)
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e))
+        return
+    
+    try:
+        from services.training_orchestration_service import get_training_orchestrator
+        
+        orchestrator = get_training_orchestrator()
+        if job_id in orchestrator.jobs:
+            hub.attach(job_id, orchestrator.register_metrics_callback)
         
         # Send initial connection confirmation
         await websocket.send_json({
             "type": "connected",
             "job_id": job_id,
-            "message": "Connected to training metrics stream"
+            "message": "Connected to training metrics stream",
+            "delta": delta,
+            "encoding": subscription.encoding
         })
         
-        # Keep connection alive and send periodic updates
-        while True:
-            try:
-                # Wait for messages from client (ping/pong)
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=2.0)
-                
-                # Handle client messages if needed
-                if data == "ping":
-                    await websocket.send_json({"type": "pong"})
-                    
-            except asyncio.TimeoutError:
-                # Send latest metrics every 2 seconds
-                latest_metrics = monitoring_service.get_latest_metrics(job_id)
-                if latest_metrics:
-                    await websocket.send_json({
-                        "type": "metrics",
-                        "data": latest_metrics.to_dict()
-                    })
-                    
+        # Without a published update yet, start from the recorded history
+        if not subscription.pending:
+            latest_metrics = get_monitoring_service().get_latest_metrics(job_id)
+            if latest_metrics:
+                await websocket.send_json({
+                    "type": "metrics",
+                    "data": latest_metrics.to_dict()
+                })
+        
+        await stream_subscription(websocket, subscription)
     except WebSocketDisconnect:
-        manager.disconnect(websocket, job_id)
         logger.info(f"Client disconnected from job {job_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        manager.disconnect(websocket, job_id)
+    finally:
+        hub.unsubscribe(subscription)
 
 
 @app.post("/api/monitoring/start/{job_id}")
 async def start_monitoring(job_id: str):
     """Start monitoring a training job"""
     try:
+        _lazy_load_services()
         monitoring_service = get_monitoring_service()
         monitoring_service.start_monitoring(job_id)
         return {"status": "success", "job_id": job_id}
@@ -1171,8 +1153,10 @@ async def start_monitoring(job_id: str):
 async def stop_monitoring(job_id: str):
     """Stop monitoring a training job"""
     try:
+        _lazy_load_services()
         monitoring_service = get_monitoring_service()
         monitoring_service.stop_monitoring(job_id)
+        get_metrics_hub().forget(job_id)
         return {"status": "success", "job_id": job_id}
     except Exception as e:
         logger.error(f"Error stopping monitoring: {e}")
@@ -1195,6 +1179,7 @@ class MetricsRecordRequest(BaseModel):
 async def record_metrics(job_id: str, request: MetricsRecordRequest):
     """Record training metrics for a job"""
     try:
+        _lazy_load_services()
         monitoring_service = get_monitoring_service()
         
         metrics = monitoring_service.record_metrics(
@@ -1210,34 +1195,63 @@ async def record_metrics(job_id: str, request: MetricsRecordRequest):
             val_perplexity=request.val_perplexity
         )
         
-        # Broadcast to connected WebSocket clients
-        await manager.broadcast(job_id, {
-            "type": "metrics",
-            "data": metrics.to_dict()
-        })
+        # Push to connected WebSocket clients
+        data = metrics.to_dict()
+        get_metrics_hub().publish(job_id, data)
         
-        return {"status": "success", "metrics": metrics.to_dict()}
+        return {"status": "success", "metrics": data}
     except Exception as e:
         logger.error(f"Error recording metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Upper bound on rows or points returned by a single metrics query
+MAX_METRICS_POINTS = 5000
+
+
 @app.get("/api/monitoring/metrics/{job_id}")
-async def get_metrics(job_id: str, limit: Optional[int] = 100):
-    """Get metrics history for a job"""
+async def get_metrics(job_id: str, limit: int = Query(100, ge=1, le=MAX_METRICS_POINTS)):
+    """Get the most recent raw metrics rows for a job"""
     try:
+        _lazy_load_services()
         monitoring_service = get_monitoring_service()
-        history = monitoring_service.get_metrics_history(job_id, limit=limit)
-        
         return {
             "job_id": job_id,
-            "metrics": [m.to_dict() for m in history]
+            "metrics": monitoring_service.get_metrics_dicts(job_id, limit=limit)
         }
     except Exception as e:
         logger.error(f"Error getting metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/monitoring/metrics/{job_id}/series")
+async def get_metric_series(
+    job_id: str,
+    metrics: str = Query("loss", description="Comma-separated scalar metric names"),
+    start_step: Optional[int] = Query(None, description="First step to include"),
+    end_step: Optional[int] = Query(None, description="Last step to include"),
+    max_points: int = Query(1000, ge=2, le=MAX_METRICS_POINTS, description="Maximum points per series"),
+    method: str = Query("minmax", pattern="^(minmax|lttb)$", description="Downsampling method")
+):
+    """Get downsampled metric series for a job over a step range"""
+    names = [name.strip() for name in metrics.split(",") if name.strip()]
+    try:
+        _lazy_load_services()
+        monitoring_service = get_monitoring_service()
+        return {
+            "job_id": job_id,
+            "max_points": max_points,
+            "series": monitoring_service.get_metric_series(
+                job_id, names, start_step, end_step, max_points, method
+            )
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting metric series: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/monitoring/latest/{job_id}")
 async def get_latest_metrics(job_id: str):
     """Get the latest metrics for a job"""
@@ -1336,7 +1350,7 @@ async def trigger_quality_analysis(job_id: str):
         if not job.metrics_history:
             raise HTTPException(status_code=400, detail="No training metrics available")
         
-        loss_history = [m.loss for m in job.metrics_history]
+        loss_history = job.metrics_history.column('loss').tolist()
         
         training_result = TrainingResult(
             final_loss=loss_history[-1],
@@ -1530,6 +1544,30 @@ async def resume_paused_training(job_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/training/checkpoints/stats")
+async def get_checkpoint_stats():
+    """Get checkpoint write throughput and training stall time"""
+    try:
+        from services.training_orchestration_service import get_training_orchestrator
+        
+        return get_training_orchestrator().get_checkpoint_stats()
+    except Exception as e:
+        logger.error(f"Error getting checkpoint stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/training/queue")
+async def get_training_queue():
+    """Get admitted local jobs and queued jobs with estimated start times"""
+    try:
+        from services.training_orchestration_service import get_training_orchestrator
+
+        return get_training_orchestrator().get_queue_status()
+    except Exception as e:
+        logger.error(f"Error getting training queue: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/training/paused")
 async def list_paused_runs():
     """Get list of all paused training runs"""
@@ -2034,8 +2072,6 @@ async def delete_conversation(conversation_id: str):
 # Configuration Preset Endpoints
 # ============================================================================
 
-from services.preset_service import get_preset_service, ConfigurationPreset
-
 
 class PresetSaveRequest(BaseModel):
     """Request to save a new configuration preset"""
@@ -2095,6 +2131,7 @@ async def save_preset(request: PresetSaveRequest):
     try:
         from datetime import datetime
         
+        from services.preset_service import get_preset_service, ConfigurationPreset
         preset_service = get_preset_service()
         
         preset = ConfigurationPreset(
@@ -2145,21 +2182,32 @@ async def save_preset(request: PresetSaveRequest):
 
 
 @app.get("/api/presets")
-async def list_presets(search: Optional[str] = None, tags: Optional[str] = None):
+async def list_presets(
+    search: Optional[str] = None,
+    tags: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+):
     """
-    List all presets with optional search and filtering.
+    List all presets with optional search, filtering and pagination.
     Validates: Requirements 8.3
     """
     try:
+        from services.preset_service import get_preset_service
         preset_service = get_preset_service()
         
         tag_list = tags.split(",") if tags else None
         
-        presets = preset_service.list_presets(search=search, tags=tag_list)
+        presets = preset_service.list_presets(search=search, tags=tag_list, limit=limit, offset=offset)
+        total = (
+            preset_service.count_presets(search=search, tags=tag_list)
+            if limit is not None or offset else len(presets)
+        )
         
         return {
             "presets": [preset.dict() for preset in presets],
-            "count": len(presets)
+            "count": len(presets),
+            "total": total
         }
     except Exception as e:
         logger.error(f"Error listing presets: {e}")
@@ -2173,6 +2221,7 @@ async def get_preset(preset_id: str):
     Validates: Requirements 8.4
     """
     try:
+        from services.preset_service import get_preset_service
         preset_service = get_preset_service()
         preset = preset_service.load_preset(preset_id)
         
@@ -2191,6 +2240,7 @@ async def get_preset(preset_id: str):
 async def delete_preset(preset_id: str):
     """Delete a configuration preset"""
     try:
+        from services.preset_service import get_preset_service
         preset_service = get_preset_service()
         success = preset_service.delete_preset(preset_id)
         
@@ -2212,6 +2262,7 @@ async def export_preset(preset_id: str):
     Validates: Requirements 8.3
     """
     try:
+        from services.preset_service import get_preset_service
         preset_service = get_preset_service()
         export_data = preset_service.export_preset(preset_id)
         
@@ -2239,6 +2290,7 @@ async def import_preset(request: PresetImportRequest):
     Validates: Requirements 8.4, 8.5
     """
     try:
+        from services.preset_service import get_preset_service
         preset_service = get_preset_service()
         
         preset = preset_service.import_preset(
@@ -2266,6 +2318,7 @@ class PresetUpdateRequest(BaseModel):
 async def update_preset(preset_id: str, request: PresetUpdateRequest):
     """Update an existing preset"""
     try:
+        from services.preset_service import get_preset_service
         preset_service = get_preset_service()
         
         updated_preset = preset_service.update_preset(preset_id, request.updates)
@@ -2358,6 +2411,12 @@ async def add_run_to_comparison(request: AddRunRequest):
         
         comparison_service.add_run(run)
         
+        # Chart the real loss curve when the orchestrator still holds the run
+        from services.training_orchestration_service import get_training_orchestrator
+        job = get_training_orchestrator().jobs.get(request.job_id)
+        if job is not None:
+            comparison_service.attach_metrics(request.job_id, job.metrics_history)
+        
         return {
             "success": True,
             "message": f"Run {request.job_id} added to comparison cache"
@@ -3065,13 +3124,6 @@ async def list_platforms():
 # Requirements: 16.1, 16.2, 16.3, 16.4, 16.5
 # ============================================================================
 
-from services.multi_run_service import (
-    get_multi_run_manager,
-    RunFilter,
-    RunStatus as MultiRunStatus
-)
-from database import get_db
-
 
 class RunFilterRequest(BaseModel):
     """Request model for run filtering"""
@@ -3091,6 +3143,8 @@ async def get_active_runs():
     Requirements: 16.2
     """
     try:
+        from services.multi_run_service import get_multi_run_manager
+        from database import get_db
         multi_run_manager = get_multi_run_manager()
         db = next(get_db())
         
@@ -3116,6 +3170,8 @@ async def get_run_history(filter_request: RunFilterRequest, limit: int = 100, of
     Requirements: 16.4
     """
     try:
+        from services.multi_run_service import get_multi_run_manager, RunFilter
+        from database import get_db
         multi_run_manager = get_multi_run_manager()
         db = next(get_db())
         
@@ -3155,6 +3211,8 @@ async def get_concurrent_stats():
     Requirements: 16.2
     """
     try:
+        from services.multi_run_service import get_multi_run_manager
+        from database import get_db
         multi_run_manager = get_multi_run_manager()
         db = next(get_db())
         
@@ -3177,6 +3235,8 @@ async def get_run_details(job_id: str):
     Requirements: 16.3
     """
     try:
+        from services.multi_run_service import get_multi_run_manager
+        from database import get_db
         multi_run_manager = get_multi_run_manager()
         db = next(get_db())
         
@@ -3205,6 +3265,8 @@ async def cancel_run(job_id: str):
     Requirements: 16.5
     """
     try:
+        from services.multi_run_service import get_multi_run_manager
+        from database import get_db
         multi_run_manager = get_multi_run_manager()
         db = next(get_db())
         
@@ -3233,6 +3295,8 @@ async def cleanup_run(job_id: str):
     Requirements: 16.5
     """
     try:
+        from services.multi_run_service import get_multi_run_manager
+        from database import get_db
         multi_run_manager = get_multi_run_manager()
         db = next(get_db())
         
@@ -3267,6 +3331,17 @@ async def shutdown_event():
     perf_service = get_performance_service()
     await perf_service.cleanup()
     
+    # Stop tokenizer worker pools and release dataset index mmaps
+    from services.tokenization_service import get_tokenization_service
+    from services.dataset_service import get_dataset_service
+    get_tokenization_service().shutdown()
+    get_dataset_service().close_indexes()
+    
+    # Finish checkpoints still queued on the background writer
+    from services.training_orchestration_service import get_training_orchestrator
+    if not get_training_orchestrator().flush_checkpoints(timeout=60):
+        logger.warning("Timed out waiting for checkpoint writes to finish")
+    
     logger.info("Shutdown complete")
 
 
@@ -3351,6 +3426,18 @@ async def get_slow_queries(limit: int = 10):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/performance/http")
+async def get_http_stats():
+    """Get per-connector HTTP latency, errors and connection reuse."""
+    try:
+        from services.performance_service import get_http_pool
+
+        return get_http_pool().get_stats()
+    except Exception as e:
+        logger.error(f"Error getting HTTP stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/performance/endpoints")
 async def get_endpoint_performance():
     """Get performance metrics for all endpoints."""
@@ -3402,6 +3489,8 @@ async def get_optimization_recommendations():
 
 
 if __name__ == "__main__":
+    # Worker processes of the frozen executable must not start the server again
+    multiprocessing.freeze_support()
     uvicorn.run(app, host="127.0.0.1", port=8000)
 
 
@@ -3928,8 +4017,6 @@ async def set_conflict_strategy(request: ConflictStrategyRequest):
 # Platform Connection Management Endpoints
 # ============================================================================
 
-from services.platform_connection_service import get_platform_connection_service
-
 @app.get("/api/platforms")
 async def list_available_platforms():
     """
@@ -3937,6 +4024,7 @@ async def list_available_platforms():
     Validates: Requirements 1.1
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         platforms = connection_service.list_available_platforms()
         
@@ -3961,6 +4049,7 @@ async def connect_platform(request: ConnectPlatformRequest):
     Validates: Requirements 1.2, 1.3
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         connection = await connection_service.connect_platform(
             platform_name=request.platform_name,
@@ -3984,6 +4073,7 @@ async def disconnect_platform(platform_name: str):
     Validates: Requirements 1.2
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         success = await connection_service.disconnect_platform(platform_name)
         
@@ -4008,6 +4098,7 @@ async def verify_platform_connection(platform_name: str):
     Validates: Requirements 1.4, 1.5
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         result = await connection_service.verify_connection(platform_name)
         
@@ -4024,6 +4115,7 @@ async def test_platform_connection(request: ConnectPlatformRequest):
     Validates: Requirements 1.4
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         result = await connection_service.test_connection(
             platform_name=request.platform_name,
@@ -4043,6 +4135,7 @@ async def list_platform_connections():
     Validates: Requirements 1.1
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         connections = connection_service.list_connections()
         
@@ -4062,6 +4155,7 @@ async def get_platform_connection(platform_name: str):
     Validates: Requirements 1.1
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         connection = connection_service.get_connection(platform_name)
         
@@ -4083,6 +4177,7 @@ async def update_platform_credentials(platform_name: str, request: ConnectPlatfo
     Validates: Requirements 1.2, 1.3
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         success = await connection_service.update_credentials(
             platform_name=platform_name,
@@ -4108,6 +4203,7 @@ async def verify_all_connections():
     Validates: Requirements 1.4
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         results = await connection_service.verify_all_connections()
         
@@ -4129,6 +4225,7 @@ async def get_connection_stats():
     Validates: Requirements 1.1
     """
     try:
+        from services.platform_connection_service import get_platform_connection_service
         connection_service = get_platform_connection_service()
         stats = connection_service.get_connection_stats()
         
@@ -4322,3 +4419,7 @@ async def estimate_platform_cost(request: PlatformCostEstimateRequest):
     except Exception as e:
         logger.error(f"Error estimating cost: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# STARTUP OPTIMIZATION: Module-level imports are done; stop recording import times
+startup_optimizer.stop_import_profiling()
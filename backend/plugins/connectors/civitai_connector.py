@@ -16,7 +16,6 @@ import asyncio
 import aiohttp
 import json
 from pathlib import Path
-import hashlib
 import time
 from datetime import datetime, timedelta
 import sys
@@ -31,6 +30,8 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
+from connectors.metadata_cache import DB_FILE_NAME, MetadataCache
 
 
 class CivitaiModelMetadata:
@@ -95,7 +96,7 @@ class CivitaiModelMetadata:
         return datetime.now() > expiry
 
 
-class CivitaiCache:
+class CivitaiCache(MetadataCache):
     """
     Cache for Civitai model metadata with TTL support.
     
@@ -107,58 +108,19 @@ class CivitaiCache:
         Initialize model cache.
         
         Args:
-            cache_dir: Directory for cache storage
+            cache_dir: Directory for cache storage (default: the shared
+                metadata store)
         """
-        if cache_dir is None:
-            cache_dir = Path.home() / ".peft-studio" / "cache" / "civitai"
-        
-        self.cache_dir = cache_dir
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # In-memory cache
-        self._cache: Dict[int, CivitaiModelMetadata] = {}
-        
-        # Load existing cache from disk
-        self._load_cache()
-    
-    def _get_cache_file(self, model_id: int) -> Path:
-        """Get cache file path for a model."""
-        return self.cache_dir / f"{model_id}.json"
-    
-    def _load_cache(self):
-        """Load cache from disk."""
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    metadata = CivitaiModelMetadata.from_dict(data)
-                    self._cache[metadata.model_id] = metadata
-            except Exception:
-                # Skip corrupted cache files
-                pass
-    
-    def get(self, model_id: int, ttl_hours: int = 24) -> Optional[CivitaiModelMetadata]:
-        """
-        Get cached metadata for a model.
-        
-        Args:
-            model_id: Model identifier
-            ttl_hours: Time-to-live in hours (default: 24)
-            
-        Returns:
-            CivitaiModelMetadata if cached and not expired, None otherwise
-        """
-        metadata = self._cache.get(model_id)
-        
-        if metadata is None:
-            return None
-        
-        if metadata.is_expired(ttl_hours):
-            # Remove expired entry
-            self.remove(model_id)
-            return None
-        
-        return metadata
+        super().__init__(
+            "civitai",
+            decode=CivitaiModelMetadata.from_dict,
+            encode=CivitaiModelMetadata.to_dict,
+            search_text=lambda m: " ".join(
+                [m.name, m.type, str((m.creator or {}).get("username", ""))] + list(m.tags)
+            ),
+            db_path=cache_dir / DB_FILE_NAME if cache_dir is not None else None,
+        )
+        self.cache_dir = self._store.db_path.parent
     
     def set(self, metadata: CivitaiModelMetadata):
         """
@@ -167,40 +129,7 @@ class CivitaiCache:
         Args:
             metadata: Model metadata to cache
         """
-        # Update in-memory cache
-        self._cache[metadata.model_id] = metadata
-        
-        # Persist to disk
-        cache_file = self._get_cache_file(metadata.model_id)
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(metadata.to_dict(), f, indent=2)
-        except Exception:
-            # Cache write failure is non-fatal
-            pass
-    
-    def remove(self, model_id: int):
-        """
-        Remove model from cache.
-        
-        Args:
-            model_id: Model identifier
-        """
-        # Remove from memory
-        self._cache.pop(model_id, None)
-        
-        # Remove from disk
-        cache_file = self._get_cache_file(model_id)
-        if cache_file.exists():
-            cache_file.unlink()
-    
-    def clear(self):
-        """Clear all cached metadata."""
-        self._cache.clear()
-        
-        # Remove all cache files
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
+        self.put(metadata.model_id, metadata, metadata.cached_at)
 
 
 class CivitaiConnector(PlatformConnector):
@@ -234,7 +163,7 @@ class CivitaiConnector(PlatformConnector):
     
     def __init__(self, cache_dir: Optional[Path] = None):
         self._api_key: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._cache = CivitaiCache(cache_dir)
     
@@ -267,7 +196,7 @@ class CivitaiConnector(PlatformConnector):
         if self._api_key:
             headers["Authorization"] = f"Bearer {self._api_key}"
         
-        self._session = aiohttp.ClientSession(headers=headers)
+        self._session = get_http_pool().session(self.name, headers=headers)
         
         # Verify connection by making a test API call
         try:
@@ -345,6 +274,8 @@ class CivitaiConnector(PlatformConnector):
                 f"{self.API_URL}/models",
                 params=params
             ) as response:
+                if response.status >= 500:
+                    return self._search_cached(query, types, limit)
                 if response.status != 200:
                     return []
                 
@@ -361,7 +292,8 @@ class CivitaiConnector(PlatformConnector):
                 return results
                 
         except aiohttp.ClientError:
-            return []
+            # Registry unreachable: answer from cached metadata
+            return self._search_cached(query, types, limit)
     
     async def get_model_metadata(
         self,
@@ -378,15 +310,21 @@ class CivitaiConnector(PlatformConnector):
         Returns:
             Model metadata or None if not found
         """
-        # Check cache first
         if use_cache:
-            cached = self._cache.get(model_id)
-            if cached is not None:
-                return cached
+            return await self._cache.get_or_fetch(model_id, lambda: self._fetch_model_metadata(model_id))
         
-        # Fetch from API
+        metadata = await self._fetch_model_metadata(model_id)
+        if metadata is not None:
+            self._cache.set(metadata)
+        return metadata
+    
+    def _search_cached(self, query: Optional[str], tags: Optional[List[str]], limit: int) -> List[CivitaiModelMetadata]:
+        """Search cached metadata with the local full-text index."""
+        return self._cache.search(" ".join([query or ""] + list(tags or [])), limit)
+    
+    async def _fetch_model_metadata(self, model_id: int) -> Optional[CivitaiModelMetadata]:
+        """Fetch metadata for a model from the API (None if unavailable)."""
         if not self._connected:
-            # If offline and not in cache, return None
             return None
         
         try:
@@ -399,12 +337,7 @@ class CivitaiConnector(PlatformConnector):
                     return None
                 
                 model_data = await response.json()
-                metadata = self._parse_model_metadata(model_data)
-                
-                # Cache the metadata
-                self._cache.set(metadata)
-                
-                return metadata
+                return self._parse_model_metadata(model_data)
                 
         except aiohttp.ClientError:
             return None
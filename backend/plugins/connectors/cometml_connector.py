@@ -15,7 +15,6 @@ from pathlib import Path
 import sys
 import os
 from datetime import datetime
-from collections import deque
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
@@ -27,6 +26,9 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.artifact_stream import ArtifactLocation
+from connectors.http_pool import PooledSession, get_http_pool
+from connectors.metric_shipping import BatchRequest, MetricShipper
 
 
 class CometMLConnector(PlatformConnector):
@@ -59,13 +61,19 @@ class CometMLConnector(PlatformConnector):
     def __init__(self):
         self._api_key: Optional[str] = None
         self._workspace: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._experiments: Dict[str, Dict] = {}  # job_id -> experiment info
-        self._metric_batches: Dict[str, deque] = {}  # job_id -> metric queue
-        self._batch_size = 100  # Batch metrics for efficiency
-        self._batch_interval = 5.0  # Seconds between batch uploads
-        self._batch_tasks: Dict[str, asyncio.Task] = {}  # Background batch tasks
+        # Batched metric uploads: 100 values or every 5 seconds
+        self._shipper = MetricShipper(
+            self.name, self._encode_metric_batch, lambda: self._session,
+            batch_size=100, flush_interval=5.0
+        )
+    
+    @property
+    def _metric_batches(self) -> Dict[str, Any]:
+        """Buffered metric values per job"""
+        return self._shipper.buffers
     
     async def connect(self, credentials: Dict[str, str]) -> bool:
         """
@@ -89,7 +97,8 @@ class CometMLConnector(PlatformConnector):
         self._workspace = credentials.get("workspace")
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Authorization": f"Bearer {self._api_key}",
                 "Content-Type": "application/json",
@@ -124,18 +133,10 @@ class CometMLConnector(PlatformConnector):
     
     async def disconnect(self) -> bool:
         """Disconnect and cleanup resources."""
-        # Cancel all batch tasks
-        for task in self._batch_tasks.values():
-            if not task.done():
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-        
-        # Flush remaining metrics
+        # Flush remaining metrics; anything unsent is spilled to disk
         for job_id in list(self._metric_batches.keys()):
             await self._flush_metrics(job_id)
+        await self._shipper.shutdown()
         
         if self._session:
             await self._session.close()
@@ -146,7 +147,6 @@ class CometMLConnector(PlatformConnector):
         self._workspace = None
         self._experiments.clear()
         self._metric_batches.clear()
-        self._batch_tasks.clear()
         return True
     
     async def verify_connection(self) -> bool:
@@ -243,13 +243,8 @@ class CometMLConnector(PlatformConnector):
                     config.model_source,
                 ])
                 
-                # Initialize metric batch queue
-                self._metric_batches[job_id] = deque()
-                
-                # Start background batch task
-                self._batch_tasks[job_id] = asyncio.create_task(
-                    self._batch_upload_loop(job_id)
-                )
+                # Start buffering metric values
+                self._shipper.open(job_id)
                 
                 return job_id
                 
@@ -291,55 +286,22 @@ class CometMLConnector(PlatformConnector):
         except aiohttp.ClientError:
             pass
     
-    async def _batch_upload_loop(self, job_id: str):
-        """Background task to periodically upload batched metrics."""
-        try:
-            while job_id in self._experiments:
-                await asyncio.sleep(self._batch_interval)
-                await self._flush_metrics(job_id)
-        except asyncio.CancelledError:
-            # Final flush on cancellation
-            await self._flush_metrics(job_id)
-            raise
+    def _encode_metric_batch(self, job_id: str, values: List[Dict[str, Any]]) -> Optional[BatchRequest]:
+        """Encode buffered metric values as one Comet ML metrics write."""
+        exp_info = self._experiments.get(job_id)
+        if not exp_info:
+            return None
+        return BatchRequest(
+            f"{self.BASE_URL}/write/experiment/metrics",
+            {
+                "experimentKey": exp_info['experiment_key'],
+                "metrics": values
+            }
+        )
     
     async def _flush_metrics(self, job_id: str):
         """Flush batched metrics to Comet ML."""
-        if job_id not in self._metric_batches:
-            return
-        
-        batch = self._metric_batches[job_id]
-        if not batch:
-            return
-        
-        # Collect all metrics from batch
-        metrics_to_send = []
-        while batch:
-            metrics_to_send.append(batch.popleft())
-        
-        if not metrics_to_send:
-            return
-        
-        # Send batch to Comet ML
-        exp_info = self._experiments.get(job_id)
-        if not exp_info:
-            return
-        
-        try:
-            async with self._session.post(
-                f"{self.BASE_URL}/write/experiment/metrics",
-                json={
-                    "experimentKey": exp_info['experiment_key'],
-                    "metrics": metrics_to_send
-                }
-            ) as response:
-                if response.status not in [200, 201]:
-                    # Re-queue metrics on failure
-                    for metric in metrics_to_send:
-                        batch.append(metric)
-        except aiohttp.ClientError:
-            # Re-queue metrics on error
-            for metric in metrics_to_send:
-                batch.append(metric)
+        await self._shipper.flush(job_id)
     
     async def log_metrics(self, job_id: str, metrics: Dict[str, Any], step: Optional[int] = None):
         """
@@ -350,21 +312,33 @@ class CometMLConnector(PlatformConnector):
             metrics: Dictionary of metric name -> value
             step: Training step number
         """
+        await self.log_metrics_batch(job_id, [{"metrics": metrics, "step": step}])
+    
+    async def log_metrics_batch(self, job_id: str, entries: List[Dict[str, Any]]):
+        """
+        Log several steps of metrics at once.
+        
+        Args:
+            job_id: Job identifier
+            entries: Dictionaries with 'metrics' and optionally 'step'
+        """
         if job_id not in self._metric_batches:
             return
         
-        # Add to batch queue
-        for name, value in metrics.items():
-            metric_entry = {
+        timestamp = int(datetime.now().timestamp() * 1000)  # milliseconds
+        values = [
+            {
                 "metricName": name,
                 "metricValue": value,
-                "step": step if step is not None else 0,
-                "timestamp": int(datetime.now().timestamp() * 1000),  # milliseconds
+                "step": entry.get("step") if entry.get("step") is not None else 0,
+                "timestamp": timestamp,
             }
-            self._metric_batches[job_id].append(metric_entry)
+            for entry in entries
+            for name, value in entry["metrics"].items()
+        ]
         
         # Flush if batch is full
-        if len(self._metric_batches[job_id]) >= self._batch_size:
+        if self._shipper.submit(job_id, values):
             await self._flush_metrics(job_id)
     
     async def get_job_status(self, job_id: str) -> JobStatus:
@@ -445,17 +419,9 @@ class CometMLConnector(PlatformConnector):
                 success = response.status in [200, 204]
                 
                 if success:
-                    # Cancel batch task
-                    if job_id in self._batch_tasks:
-                        self._batch_tasks[job_id].cancel()
-                        try:
-                            await self._batch_tasks[job_id]
-                        except asyncio.CancelledError:
-                            pass
-                        del self._batch_tasks[job_id]
-                    
                     # Final flush
                     await self._flush_metrics(job_id)
+                    await self._shipper.close(job_id)
                     
                     # Update status
                     exp_info["status"] = JobStatus.CANCELLED
@@ -516,19 +482,19 @@ class CometMLConnector(PlatformConnector):
             
             await asyncio.sleep(2)
     
-    async def fetch_artifact(self, job_id: str) -> bytes:
+    async def artifact_location(self, job_id: str) -> ArtifactLocation:
         """
-        Download artifacts from a Comet ML experiment.
+        Locate the first asset logged to a Comet ML experiment.
         
         Args:
             job_id: Job identifier
             
         Returns:
-            Artifact data as bytes
+            ArtifactLocation of the asset
             
         Raises:
             FileNotFoundError: If artifact doesn't exist
-            RuntimeError: If download fails
+            RuntimeError: If the assets cannot be listed
         """
         if not self._connected:
             raise RuntimeError("Not connected to Comet ML")
@@ -550,33 +516,52 @@ class CometMLConnector(PlatformConnector):
                     raise RuntimeError(f"Failed to list assets: {response.status}")
                 
                 data = await response.json()
+        except aiohttp.ClientError as e:
+            raise RuntimeError(f"Failed to fetch artifact: {str(e)}")
+        
+        assets = data.get("assets")
+        if not assets:
+            raise FileNotFoundError("No assets found for this experiment")
+        
+        # Download first asset
+        asset = assets[0]
+        asset_id = asset.get("assetId")
+        
+        if not asset_id:
+            raise RuntimeError("Asset ID not found")
+        
+        return ArtifactLocation(
+            f"{self.BASE_URL}/experiment/asset/download",
+            self._session,
+            params={
+                "experimentKey": exp_info['experiment_key'],
+                "assetId": asset_id
+            },
+            size=asset.get("fileSize")
+        )
+    
+    async def fetch_artifact(self, job_id: str) -> bytes:
+        """
+        Download artifacts from a Comet ML experiment.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Artifact data as bytes
+            
+        Raises:
+            FileNotFoundError: If artifact doesn't exist
+            RuntimeError: If download fails
+        """
+        location = await self.artifact_location(job_id)
+        
+        try:
+            async with self._session.get(location.url, params=location.params) as asset_response:
+                if asset_response.status != 200:
+                    raise RuntimeError(f"Failed to download asset: {asset_response.status}")
                 
-                if "assets" in data:
-                    assets = data["assets"]
-                    if not assets:
-                        raise FileNotFoundError("No assets found for this experiment")
-                    
-                    # Download first asset
-                    asset = assets[0]
-                    asset_id = asset.get("assetId")
-                    
-                    if not asset_id:
-                        raise RuntimeError("Asset ID not found")
-                    
-                    # Download asset
-                    async with self._session.get(
-                        f"{self.BASE_URL}/experiment/asset/download",
-                        params={
-                            "experimentKey": exp_info['experiment_key'],
-                            "assetId": asset_id
-                        }
-                    ) as asset_response:
-                        if asset_response.status != 200:
-                            raise RuntimeError(f"Failed to download asset: {asset_response.status}")
-                        
-                        return await asset_response.read()
-                else:
-                    raise FileNotFoundError("No assets found for this experiment")
+                return await asset_response.read()
                     
         except aiohttp.ClientError as e:
             raise RuntimeError(f"Failed to fetch artifact: {str(e)}")
@@ -27,6 +27,7 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class DeepEvalConnector(PlatformConnector):
@@ -72,7 +73,7 @@ class DeepEvalConnector(PlatformConnector):
     def __init__(self):
         self._api_key: Optional[str] = None
         self._project_id: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._evaluations: Dict[str, Dict] = {}  # job_id -> evaluation info
         self._test_cases: Dict[str, List[Dict]] = {}  # job_id -> test cases
@@ -99,7 +100,8 @@ class DeepEvalConnector(PlatformConnector):
         self._project_id = credentials.get("project_id")
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Authorization": f"Bearer {self._api_key}",
                 "Content-Type": "application/json",
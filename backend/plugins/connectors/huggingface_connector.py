@@ -17,7 +17,6 @@ import asyncio
 import aiohttp
 import json
 from pathlib import Path
-import hashlib
 import time
 from datetime import datetime, timedelta
 import sys
@@ -32,6 +31,9 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.artifact_upload import get_upload_manifest
+from connectors.http_pool import PooledSession, get_http_pool
+from connectors.metadata_cache import DB_FILE_NAME, MetadataCache
 
 
 class ModelMetadata:
@@ -102,14 +104,15 @@ class ModelMetadata:
         return datetime.now() > expiry
 
 
-class ModelCache:
+class ModelCache(MetadataCache):
     """
     Cache for model metadata with TTL support.
     
     Implements Property 6: Model metadata caching
     - Stores metadata for offline access
     - Expires after 24 hours by default
-    - Persists to disk for cross-session availability
+    - Persists to the shared SQLite metadata store for cross-session
+      availability, loading entries on first use
     """
     
     def __init__(self, cache_dir: Optional[Path] = None):
@@ -117,60 +120,19 @@ class ModelCache:
         Initialize model cache.
         
         Args:
-            cache_dir: Directory for cache storage (default: ~/.peft-studio/cache/models)
+            cache_dir: Directory for cache storage (default: the shared
+                metadata store)
         """
-        if cache_dir is None:
-            cache_dir = Path.home() / ".peft-studio" / "cache" / "models"
-        
-        self.cache_dir = cache_dir
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # In-memory cache
-        self._cache: Dict[str, ModelMetadata] = {}
-        
-        # Load existing cache from disk
-        self._load_cache()
-    
-    def _get_cache_file(self, model_id: str) -> Path:
-        """Get cache file path for a model."""
-        # Use hash to avoid filesystem issues with special characters
-        model_hash = hashlib.md5(model_id.encode()).hexdigest()
-        return self.cache_dir / f"{model_hash}.json"
-    
-    def _load_cache(self):
-        """Load cache from disk."""
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    metadata = ModelMetadata.from_dict(data)
-                    self._cache[metadata.model_id] = metadata
-            except Exception:
-                # Skip corrupted cache files
-                pass
-    
-    def get(self, model_id: str, ttl_hours: int = 24) -> Optional[ModelMetadata]:
-        """
-        Get cached metadata for a model.
-        
-        Args:
-            model_id: Model identifier
-            ttl_hours: Time-to-live in hours (default: 24)
-            
-        Returns:
-            ModelMetadata if cached and not expired, None otherwise
-        """
-        metadata = self._cache.get(model_id)
-        
-        if metadata is None:
-            return None
-        
-        if metadata.is_expired(ttl_hours):
-            # Remove expired entry
-            self.remove(model_id)
-            return None
-        
-        return metadata
+        super().__init__(
+            "huggingface",
+            decode=ModelMetadata.from_dict,
+            encode=ModelMetadata.to_dict,
+            search_text=lambda m: " ".join(
+                [m.model_id, m.author, m.pipeline_tag or "", m.library_name or ""] + list(m.tags)
+            ),
+            db_path=cache_dir / DB_FILE_NAME if cache_dir is not None else None,
+        )
+        self.cache_dir = self._store.db_path.parent
     
     def set(self, metadata: ModelMetadata):
         """
@@ -179,44 +141,11 @@ class ModelCache:
         Args:
             metadata: Model metadata to cache
         """
-        # Update in-memory cache
-        self._cache[metadata.model_id] = metadata
-        
-        # Persist to disk
-        cache_file = self._get_cache_file(metadata.model_id)
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(metadata.to_dict(), f, indent=2)
-        except Exception:
-            # Cache write failure is non-fatal
-            pass
-    
-    def remove(self, model_id: str):
-        """
-        Remove model from cache.
-        
-        Args:
-            model_id: Model identifier
-        """
-        # Remove from memory
-        self._cache.pop(model_id, None)
-        
-        # Remove from disk
-        cache_file = self._get_cache_file(model_id)
-        if cache_file.exists():
-            cache_file.unlink()
-    
-    def clear(self):
-        """Clear all cached metadata."""
-        self._cache.clear()
-        
-        # Remove all cache files
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
+        self.put(metadata.model_id, metadata, metadata.cached_at)
     
     def get_all_cached(self) -> List[ModelMetadata]:
         """Get all cached models (including expired)."""
-        return list(self._cache.values())
+        return self.values()
 
 
 class HuggingFaceConnector(PlatformConnector):
@@ -250,7 +179,7 @@ class HuggingFaceConnector(PlatformConnector):
     
     def __init__(self, cache_dir: Optional[Path] = None):
         self._token: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._cache = ModelCache(cache_dir)
     
@@ -279,7 +208,8 @@ class HuggingFaceConnector(PlatformConnector):
         self._token = token
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Authorization": f"Bearer {self._token}",
                 "Content-Type": "application/json",
@@ -364,6 +294,8 @@ class HuggingFaceConnector(PlatformConnector):
                 f"{self.API_URL}/models",
                 params=params
             ) as response:
+                if response.status >= 500:
+                    return self._search_cached(query, filter_tags, limit)
                 if response.status != 200:
                     return []
                 
@@ -379,7 +311,8 @@ class HuggingFaceConnector(PlatformConnector):
                 return results
                 
         except aiohttp.ClientError:
-            return []
+            # Registry unreachable: answer from cached metadata
+            return self._search_cached(query, filter_tags, limit)
     
     async def get_model_metadata(
         self,
@@ -391,7 +324,8 @@ class HuggingFaceConnector(PlatformConnector):
         
         Implements Property 6: Model metadata caching
         - Checks cache first if use_cache=True
-        - Falls back to API if not cached or expired
+        - Serves recently expired metadata while refreshing it in the background
+        - Falls back to API if not cached, and to stale metadata when offline
         - Caches result for offline access
         
         Args:
@@ -401,15 +335,21 @@ class HuggingFaceConnector(PlatformConnector):
         Returns:
             Model metadata or None if not found
         """
-        # Check cache first
         if use_cache:
-            cached = self._cache.get(model_id)
-            if cached is not None:
-                return cached
+            return await self._cache.get_or_fetch(model_id, lambda: self._fetch_model_metadata(model_id))
         
-        # Fetch from API
+        metadata = await self._fetch_model_metadata(model_id)
+        if metadata is not None:
+            self._cache.set(metadata)
+        return metadata
+    
+    def _search_cached(self, query: Optional[str], tags: Optional[List[str]], limit: int) -> List[ModelMetadata]:
+        """Search cached metadata with the local full-text index."""
+        return self._cache.search(" ".join([query or ""] + list(tags or [])), limit)
+    
+    async def _fetch_model_metadata(self, model_id: str) -> Optional[ModelMetadata]:
+        """Fetch metadata for a model from the API (None if unavailable)."""
         if not self._connected:
-            # If offline and not in cache, return None
             return None
         
         try:
@@ -422,12 +362,7 @@ class HuggingFaceConnector(PlatformConnector):
                     return None
                 
                 model_data = await response.json()
-                metadata = self._parse_model_metadata(model_data)
-                
-                # Cache the metadata
-                self._cache.set(metadata)
-                
-                return metadata
+                return self._parse_model_metadata(model_data)
                 
         except aiohttp.ClientError:
             return None
@@ -553,14 +488,30 @@ class HuggingFaceConnector(PlatformConnector):
             with open(card_path, 'w') as f:
                 f.write(model_card)
             
-            # Upload all files in the adapter directory
-            api.upload_folder(
-                folder_path=str(adapter_path),
-                repo_id=repo_id,
-                token=self._token,
-            )
+            # Upload only the files whose content isn't in the repo yet;
+            # the Hub client sends large files in parallel multipart chunks
+            manifest = get_upload_manifest()
+            changed = {}
+            for file in sorted(p for p in adapter_path.rglob("*") if p.is_file()):
+                name = file.relative_to(adapter_path).as_posix()
+                sha256 = await manifest.file_hash(file)
+                if manifest.uploaded(f"{self.name}:{repo_id}/{name}", sha256) is None:
+                    changed[name] = sha256
+            
+            if changed:
+                api.upload_folder(
+                    folder_path=str(adapter_path),
+                    repo_id=repo_id,
+                    token=self._token,
+                    allow_patterns=list(changed),
+                )
+            
+            url = f"{self.BASE_URL}/{repo_id}"
+            for name, sha256 in changed.items():
+                manifest.record_uploaded(f"{self.name}:{repo_id}/{name}", sha256, url)
+            manifest.save()
             
-            return f"{self.BASE_URL}/{repo_id}"
+            return url
             
         except ImportError:
             raise RuntimeError("huggingface_hub library not installed")
@@ -29,6 +29,7 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class LambdaLabsConnector(PlatformConnector):
@@ -61,7 +62,7 @@ class LambdaLabsConnector(PlatformConnector):
     
     def __init__(self):
         self._api_key: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._jobs: Dict[str, Dict] = {}
         self._ssh_clients: Dict[str, paramiko.SSHClient] = {}
@@ -88,7 +89,8 @@ class LambdaLabsConnector(PlatformConnector):
         self._ssh_key_path = credentials.get("ssh_key_path")
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Authorization": f"Bearer {self._api_key}",
                 "Content-Type": "application/json",
@@ -29,6 +29,7 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class ModalConnector(PlatformConnector):
@@ -61,7 +62,7 @@ class ModalConnector(PlatformConnector):
     def __init__(self):
         self._token_id: Optional[str] = None
         self._token_secret: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._functions: Dict[str, Dict] = {}
         self._deployments: Dict[str, Dict] = {}
@@ -97,7 +98,7 @@ class ModalConnector(PlatformConnector):
             "Content-Type": "application/json",
         }
         
-        self._session = aiohttp.ClientSession(headers=headers)
+        self._session = get_http_pool().session(self.name, headers=headers)
         
         # Verify connection by fetching workspace info
         try:
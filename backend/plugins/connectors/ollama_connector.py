@@ -16,7 +16,6 @@ import asyncio
 import aiohttp
 import json
 from pathlib import Path
-import hashlib
 import time
 from datetime import datetime, timedelta
 import sys
@@ -31,6 +30,8 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
+from connectors.metadata_cache import DB_FILE_NAME, MetadataCache
 
 
 class OllamaModelMetadata:
@@ -80,7 +81,7 @@ class OllamaModelMetadata:
         return datetime.now() > expiry
 
 
-class OllamaCache:
+class OllamaCache(MetadataCache):
     """
     Cache for Ollama model metadata with TTL support.
     
@@ -92,60 +93,19 @@ class OllamaCache:
         Initialize model cache.
         
         Args:
-            cache_dir: Directory for cache storage
-        """
-        if cache_dir is None:
-            cache_dir = Path.home() / ".peft-studio" / "cache" / "ollama"
-        
-        self.cache_dir = cache_dir
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # In-memory cache
-        self._cache: Dict[str, OllamaModelMetadata] = {}
-        
-        # Load existing cache from disk
-        self._load_cache()
-    
-    def _get_cache_file(self, model_name: str) -> Path:
-        """Get cache file path for a model."""
-        # Use hash to avoid filesystem issues with special characters
-        model_hash = hashlib.md5(model_name.encode()).hexdigest()
-        return self.cache_dir / f"{model_hash}.json"
-    
-    def _load_cache(self):
-        """Load cache from disk."""
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    metadata = OllamaModelMetadata.from_dict(data)
-                    self._cache[metadata.name] = metadata
-            except Exception:
-                # Skip corrupted cache files
-                pass
-    
-    def get(self, model_name: str, ttl_hours: int = 24) -> Optional[OllamaModelMetadata]:
-        """
-        Get cached metadata for a model.
-        
-        Args:
-            model_name: Model name
-            ttl_hours: Time-to-live in hours (default: 24)
-            
-        Returns:
-            OllamaModelMetadata if cached and not expired, None otherwise
-        """
-        metadata = self._cache.get(model_name)
-        
-        if metadata is None:
-            return None
-        
-        if metadata.is_expired(ttl_hours):
-            # Remove expired entry
-            self.remove(model_name)
-            return None
-        
-        return metadata
+            cache_dir: Directory for cache storage (default: the shared
+                metadata store)
+        """
+        super().__init__(
+            "ollama",
+            decode=OllamaModelMetadata.from_dict,
+            encode=OllamaModelMetadata.to_dict,
+            search_text=lambda m: " ".join(
+                [m.name, m.model] + [str(v) for v in m.details.values() if isinstance(v, str)]
+            ),
+            db_path=cache_dir / DB_FILE_NAME if cache_dir is not None else None,
+        )
+        self.cache_dir = self._store.db_path.parent
     
     def set(self, metadata: OllamaModelMetadata):
         """
@@ -154,40 +114,7 @@ class OllamaCache:
         Args:
             metadata: Model metadata to cache
         """
-        # Update in-memory cache
-        self._cache[metadata.name] = metadata
-        
-        # Persist to disk
-        cache_file = self._get_cache_file(metadata.name)
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(metadata.to_dict(), f, indent=2)
-        except Exception:
-            # Cache write failure is non-fatal
-            pass
-    
-    def remove(self, model_name: str):
-        """
-        Remove model from cache.
-        
-        Args:
-            model_name: Model name
-        """
-        # Remove from memory
-        self._cache.pop(model_name, None)
-        
-        # Remove from disk
-        cache_file = self._get_cache_file(model_name)
-        if cache_file.exists():
-            cache_file.unlink()
-    
-    def clear(self):
-        """Clear all cached metadata."""
-        self._cache.clear()
-        
-        # Remove all cache files
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
+        self.put(metadata.name, metadata, metadata.cached_at)
 
 
 class OllamaConnector(PlatformConnector):
@@ -227,7 +154,7 @@ class OllamaConnector(PlatformConnector):
             cache_dir: Directory for cache storage
         """
         self._base_url = base_url or self.DEFAULT_BASE_URL
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._cache = OllamaCache(cache_dir)
     
@@ -252,7 +179,8 @@ class OllamaConnector(PlatformConnector):
             self._base_url = credentials["base_url"]
         
         # Create session
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={"Content-Type": "application/json"}
         )
         
@@ -321,7 +249,8 @@ class OllamaConnector(PlatformConnector):
                 return results
                 
         except aiohttp.ClientError:
-            return []
+            # Ollama unreachable: list the models seen before
+            return self._cache.values()
     
     async def get_model_metadata(
         self,
@@ -338,15 +267,15 @@ class OllamaConnector(PlatformConnector):
         Returns:
             Model metadata or None if not found
         """
-        # Check cache first
         if use_cache:
-            cached = self._cache.get(model_name)
-            if cached is not None:
-                return cached
+            return await self._cache.get_or_fetch(model_name, lambda: self._fetch_model_metadata(model_name))
         
+        return await self._fetch_model_metadata(model_name)
+    
+    async def _fetch_model_metadata(self, model_name: str) -> Optional[OllamaModelMetadata]:
+        """Fetch metadata for a model from Ollama (None if unavailable)."""
         # Fetch from API by listing all models and finding the match
         if not self._connected:
-            # If offline and not in cache, return None
             return None
         
         try:
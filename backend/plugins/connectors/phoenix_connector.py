@@ -15,7 +15,6 @@ from pathlib import Path
 import sys
 import os
 from datetime import datetime
-from collections import deque
 import uuid
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -28,6 +27,8 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
+from connectors.metric_shipping import BatchRequest, MetricShipper
 
 
 class PhoenixConnector(PlatformConnector):
@@ -60,13 +61,19 @@ class PhoenixConnector(PlatformConnector):
     def __init__(self):
         self._api_key: Optional[str] = None
         self._project_id: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._traces: Dict[str, Dict] = {}  # job_id -> trace info
-        self._span_batches: Dict[str, deque] = {}  # job_id -> span queue
-        self._batch_size = 50  # Batch spans for efficiency
-        self._batch_interval = 3.0  # Seconds between batch uploads
-        self._batch_tasks: Dict[str, asyncio.Task] = {}  # Background batch tasks
+        # Batched span uploads: 50 spans or every 3 seconds
+        self._shipper = MetricShipper(
+            self.name, self._encode_span_batch, lambda: self._session,
+            batch_size=50, flush_interval=3.0
+        )
+    
+    @property
+    def _span_batches(self) -> Dict[str, Any]:
+        """Buffered spans per job"""
+        return self._shipper.buffers
     
     async def connect(self, credentials: Dict[str, str]) -> bool:
         """
@@ -90,7 +97,8 @@ class PhoenixConnector(PlatformConnector):
         self._project_id = credentials.get("project_id")
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Authorization": f"Bearer {self._api_key}",
                 "Content-Type": "application/json",
@@ -143,18 +151,10 @@ class PhoenixConnector(PlatformConnector):
     
     async def disconnect(self) -> bool:
         """Disconnect and cleanup resources."""
-        # Cancel all batch tasks
-        for task in self._batch_tasks.values():
-            if not task.done():
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-        
-        # Flush remaining spans
+        # Flush remaining spans; anything unsent is spilled to disk
         for job_id in list(self._span_batches.keys()):
             await self._flush_spans(job_id)
+        await self._shipper.shutdown()
         
         if self._session:
             await self._session.close()
@@ -165,7 +165,6 @@ class PhoenixConnector(PlatformConnector):
         self._project_id = None
         self._traces.clear()
         self._span_batches.clear()
-        self._batch_tasks.clear()
         return True
     
     async def verify_connection(self) -> bool:
@@ -248,68 +247,30 @@ class PhoenixConnector(PlatformConnector):
                     "spans": [],
                 }
                 
-                # Initialize span batch queue
-                self._span_batches[job_id] = deque()
-                
-                # Start background batch task
-                self._batch_tasks[job_id] = asyncio.create_task(
-                    self._batch_upload_loop(job_id)
-                )
+                # Start buffering spans
+                self._shipper.open(job_id)
                 
                 return job_id
                 
         except aiohttp.ClientError as e:
             raise RuntimeError(f"Failed to create trace: {str(e)}")
     
-    async def _batch_upload_loop(self, job_id: str):
-        """Background task to periodically upload batched spans."""
-        try:
-            while job_id in self._traces:
-                await asyncio.sleep(self._batch_interval)
-                await self._flush_spans(job_id)
-        except asyncio.CancelledError:
-            # Final flush on cancellation
-            await self._flush_spans(job_id)
-            raise
+    def _encode_span_batch(self, job_id: str, spans: List[Dict[str, Any]]) -> Optional[BatchRequest]:
+        """Encode buffered spans as one Phoenix span upload."""
+        trace_info = self._traces.get(job_id)
+        if not trace_info:
+            return None
+        return BatchRequest(
+            f"{self.BASE_URL}/spans",
+            {
+                "trace_id": trace_info['trace_id'],
+                "spans": spans
+            }
+        )
     
     async def _flush_spans(self, job_id: str):
         """Flush batched spans to Phoenix."""
-        if job_id not in self._span_batches:
-            return
-        
-        batch = self._span_batches[job_id]
-        if not batch:
-            return
-        
-        # Collect all spans from batch
-        spans_to_send = []
-        while batch:
-            spans_to_send.append(batch.popleft())
-        
-        if not spans_to_send:
-            return
-        
-        # Send batch to Phoenix
-        trace_info = self._traces.get(job_id)
-        if not trace_info:
-            return
-        
-        try:
-            async with self._session.post(
-                f"{self.BASE_URL}/spans",
-                json={
-                    "trace_id": trace_info['trace_id'],
-                    "spans": spans_to_send
-                }
-            ) as response:
-                if response.status not in [200, 201]:
-                    # Re-queue spans on failure
-                    for span in spans_to_send:
-                        batch.append(span)
-        except aiohttp.ClientError:
-            # Re-queue spans on error
-            for span in spans_to_send:
-                batch.append(span)
+        await self._shipper.flush(job_id)
     
     async def log_span(
         self,
@@ -350,15 +311,12 @@ class PhoenixConnector(PlatformConnector):
             "parent_span_id": parent_span_id,
         }
         
-        # Add to batch queue
-        self._span_batches[job_id].append(span_entry)
-        
         # Store span ID in trace
         if job_id in self._traces:
             self._traces[job_id]["spans"].append(span_id)
         
-        # Flush if batch is full
-        if len(self._span_batches[job_id]) >= self._batch_size:
+        # Add to batch queue; flush if batch is full
+        if self._shipper.submit(job_id, [span_entry]):
             await self._flush_spans(job_id)
         
         return span_id
@@ -547,17 +505,9 @@ class PhoenixConnector(PlatformConnector):
                 success = response.status in [200, 204]
                 
                 if success:
-                    # Cancel batch task
-                    if job_id in self._batch_tasks:
-                        self._batch_tasks[job_id].cancel()
-                        try:
-                            await self._batch_tasks[job_id]
-                        except asyncio.CancelledError:
-                            pass
-                        del self._batch_tasks[job_id]
-                    
                     # Final flush
                     await self._flush_spans(job_id)
+                    await self._shipper.close(job_id)
                     
                     # Update status
                     trace_info["status"] = JobStatus.CANCELLED
@@ -29,6 +29,7 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class PredibaseConnector(PlatformConnector):
@@ -62,7 +63,7 @@ class PredibaseConnector(PlatformConnector):
     def __init__(self):
         self._api_key: Optional[str] = None
         self._tenant_id: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._deployments: Dict[str, Dict] = {}
         self._adapters: Dict[str, Dict] = {}
@@ -97,7 +98,7 @@ class PredibaseConnector(PlatformConnector):
         if self._tenant_id:
             headers["X-Tenant-Id"] = self._tenant_id
         
-        self._session = aiohttp.ClientSession(headers=headers)
+        self._session = get_http_pool().session(self.name, headers=headers)
         
         # Verify connection by fetching tenant info
         try:
@@ -28,6 +28,7 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class ReplicateConnector(PlatformConnector):
@@ -59,7 +60,7 @@ class ReplicateConnector(PlatformConnector):
     
     def __init__(self):
         self._api_token: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._models: Dict[str, Dict] = {}
         self._versions: Dict[str, List[Dict]] = {}
@@ -91,7 +92,7 @@ class ReplicateConnector(PlatformConnector):
             "Content-Type": "application/json",
         }
         
-        self._session = aiohttp.ClientSession(headers=headers)
+        self._session = get_http_pool().session(self.name, headers=headers)
         
         # Verify connection by fetching account info
         try:
@@ -10,6 +10,7 @@ RunPod API Documentation: https://docs.runpod.io/
 from typing import Dict, List, AsyncIterator, Optional
 import asyncio
 import aiohttp
+import hashlib
 import json
 from pathlib import Path
 import sys
@@ -24,6 +25,9 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.artifact_stream import ArtifactLocation
+from connectors.artifact_upload import ChunkedUploader, MultipartUploadTarget
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class RunPodConnector(PlatformConnector):
@@ -57,7 +61,7 @@ class RunPodConnector(PlatformConnector):
     
     def __init__(self):
         self._api_key: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._jobs: Dict[str, Dict] = {}
     
@@ -82,7 +86,8 @@ class RunPodConnector(PlatformConnector):
         self._api_key = api_key
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Authorization": f"Bearer {self._api_key}",
                 "Content-Type": "application/json",
@@ -448,19 +453,18 @@ print('Training complete!')
                 
                 await asyncio.sleep(2)
     
-    async def fetch_artifact(self, job_id: str) -> bytes:
+    async def artifact_location(self, job_id: str) -> ArtifactLocation:
         """
-        Download the trained adapter artifact.
+        Locate the trained adapter in pod storage.
         
         Args:
             job_id: Job identifier (pod ID)
             
         Returns:
-            Artifact data as bytes
+            ArtifactLocation of the adapter
             
         Raises:
-            FileNotFoundError: If artifact doesn't exist
-            RuntimeError: If download fails
+            RuntimeError: If the job is not completed
         """
         if not self._connected:
             raise RuntimeError("Not connected to RunPod")
@@ -470,12 +474,27 @@ print('Training complete!')
         if status != JobStatus.COMPLETED:
             raise RuntimeError(f"Job not completed, status: {status.value}")
         
-        # Download artifact from pod storage
         # RunPod stores outputs in /workspace/output by default
-        artifact_url = f"{self.BASE_URL}/{job_id}/files/output/adapter"
+        return ArtifactLocation(f"{self.BASE_URL}/{job_id}/files/output/adapter", self._session)
+    
+    async def fetch_artifact(self, job_id: str) -> bytes:
+        """
+        Download the trained adapter artifact.
+        
+        Args:
+            job_id: Job identifier (pod ID)
+            
+        Returns:
+            Artifact data as bytes
+            
+        Raises:
+            FileNotFoundError: If artifact doesn't exist
+            RuntimeError: If download fails
+        """
+        location = await self.artifact_location(job_id)
         
         try:
-            async with self._session.get(artifact_url) as response:
+            async with self._session.get(location.url) as response:
                 if response.status == 404:
                     raise FileNotFoundError(f"Artifact not found for job {job_id}")
                 elif response.status != 200:
@@ -509,21 +528,18 @@ print('Training complete!')
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {path}")
         
-        # Upload to RunPod storage
-        upload_url = f"{self.BASE_URL}/upload"
+        # Upload to RunPod storage in parallel parts; content already
+        # uploaded from this machine is skipped
+        account = hashlib.sha256(self._api_key.encode()).hexdigest()[:16]
+        target = MultipartUploadTarget(
+            self._session,
+            f"{self.BASE_URL}/upload",
+            destination=f"{self.name}:{account}"
+        )
         
         try:
-            with open(file_path, 'rb') as f:
-                data = aiohttp.FormData()
-                data.add_field('file', f, filename=file_path.name)
-                data.add_field('metadata', json.dumps(metadata))
-                
-                async with self._session.post(upload_url, data=data) as response:
-                    if response.status != 200:
-                        raise RuntimeError(f"Upload failed: {response.status}")
-                    
-                    result = await response.json()
-                    return result.get("url", "")
+            result = await ChunkedUploader(target).upload_file(file_path, metadata=metadata)
+            return result.url
                     
         except aiohttp.ClientError as e:
             raise RuntimeError(f"Failed to upload artifact: {str(e)}")
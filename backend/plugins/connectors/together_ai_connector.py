@@ -29,6 +29,7 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class TogetherAIConnector(PlatformConnector):
@@ -61,7 +62,7 @@ class TogetherAIConnector(PlatformConnector):
     
     def __init__(self):
         self._api_key: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._endpoints: Dict[str, Dict] = {}
         self._models: Dict[str, Dict] = {}
@@ -92,7 +93,7 @@ class TogetherAIConnector(PlatformConnector):
             "Content-Type": "application/json",
         }
         
-        self._session = aiohttp.ClientSession(headers=headers)
+        self._session = get_http_pool().session(self.name, headers=headers)
         
         # Verify connection by fetching account info
         try:
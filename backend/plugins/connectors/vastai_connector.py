@@ -27,6 +27,7 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.http_pool import PooledSession, get_http_pool
 
 
 class VastAIConnector(PlatformConnector):
@@ -59,7 +60,7 @@ class VastAIConnector(PlatformConnector):
     
     def __init__(self):
         self._api_key: Optional[str] = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._jobs: Dict[str, Dict] = {}
         self._ssh_clients: Dict[str, paramiko.SSHClient] = {}
@@ -85,7 +86,8 @@ class VastAIConnector(PlatformConnector):
         self._api_key = api_key
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Accept": "application/json",
             }
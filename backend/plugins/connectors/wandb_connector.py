@@ -15,7 +15,6 @@ from pathlib import Path
 import sys
 import os
 from datetime import datetime
-from collections import deque
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
@@ -27,6 +26,9 @@ from connectors.base import (
     TrainingConfig,
     JobStatus,
 )
+from connectors.artifact_stream import ArtifactLocation
+from connectors.http_pool import PooledSession, get_http_pool
+from connectors.metric_shipping import BatchRequest, MetricShipper
 
 
 class WandBConnector(PlatformConnector):
@@ -59,13 +61,19 @@ class WandBConnector(PlatformConnector):
     def __init__(self):
         self._api_key: Optional[str] = None
         self._entity: Optional[str] = None  # Username or team name
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[PooledSession] = None
         self._connected = False
         self._runs: Dict[str, Dict] = {}  # job_id -> run info
-        self._metric_batches: Dict[str, deque] = {}  # job_id -> metric queue
-        self._batch_size = 100  # Batch metrics for efficiency
-        self._batch_interval = 5.0  # Seconds between batch uploads
-        self._batch_tasks: Dict[str, asyncio.Task] = {}  # Background batch tasks
+        # Batched history uploads: 100 rows or every 5 seconds
+        self._shipper = MetricShipper(
+            self.name, self._encode_metric_batch, lambda: self._session,
+            batch_size=100, flush_interval=5.0
+        )
+    
+    @property
+    def _metric_batches(self) -> Dict[str, Any]:
+        """Buffered history rows per job"""
+        return self._shipper.buffers
     
     async def connect(self, credentials: Dict[str, str]) -> bool:
         """
@@ -89,7 +97,8 @@ class WandBConnector(PlatformConnector):
         self._entity = credentials.get("entity")  # Optional
         
         # Create session with headers
-        self._session = aiohttp.ClientSession(
+        self._session = get_http_pool().session(
+            self.name,
             headers={
                 "Authorization": f"Bearer {self._api_key}",
                 "Content-Type": "application/json",
@@ -121,18 +130,10 @@ class WandBConnector(PlatformConnector):
     
     async def disconnect(self) -> bool:
         """Disconnect and cleanup resources."""
-        # Cancel all batch tasks
-        for task in self._batch_tasks.values():
-            if not task.done():
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-        
-        # Flush remaining metrics
+        # Flush remaining metrics; anything unsent is spilled to disk
         for job_id in list(self._metric_batches.keys()):
             await self._flush_metrics(job_id)
+        await self._shipper.shutdown()
         
         if self._session:
             await self._session.close()
@@ -143,7 +144,6 @@ class WandBConnector(PlatformConnector):
         self._entity = None
         self._runs.clear()
         self._metric_batches.clear()
-        self._batch_tasks.clear()
         return True
     
     async def verify_connection(self) -> bool:
@@ -233,65 +233,27 @@ class WandBConnector(PlatformConnector):
                     "created_at": datetime.now().isoformat(),
                 }
                 
-                # Initialize metric batch queue
-                self._metric_batches[job_id] = deque()
-                
-                # Start background batch task
-                self._batch_tasks[job_id] = asyncio.create_task(
-                    self._batch_upload_loop(job_id)
-                )
+                # Start buffering history rows
+                self._shipper.open(job_id)
                 
                 return job_id
                 
         except aiohttp.ClientError as e:
             raise RuntimeError(f"Failed to create run: {str(e)}")
     
-    async def _batch_upload_loop(self, job_id: str):
-        """Background task to periodically upload batched metrics."""
-        try:
-            while job_id in self._runs:
-                await asyncio.sleep(self._batch_interval)
-                await self._flush_metrics(job_id)
-        except asyncio.CancelledError:
-            # Final flush on cancellation
-            await self._flush_metrics(job_id)
-            raise
+    def _encode_metric_batch(self, job_id: str, rows: List[Dict[str, Any]]) -> Optional[BatchRequest]:
+        """Encode buffered history rows as one W&B history upload."""
+        run_info = self._runs.get(job_id)
+        if not run_info:
+            return None
+        return BatchRequest(
+            f"{self.BASE_URL}/runs/{run_info['wandb_id']}/history",
+            {"history": rows}
+        )
     
     async def _flush_metrics(self, job_id: str):
         """Flush batched metrics to W&B."""
-        if job_id not in self._metric_batches:
-            return
-        
-        batch = self._metric_batches[job_id]
-        if not batch:
-            return
-        
-        # Collect all metrics from batch
-        metrics_to_send = []
-        while batch:
-            metrics_to_send.append(batch.popleft())
-        
-        if not metrics_to_send:
-            return
-        
-        # Send batch to W&B
-        run_info = self._runs.get(job_id)
-        if not run_info:
-            return
-        
-        try:
-            async with self._session.post(
-                f"{self.BASE_URL}/runs/{run_info['wandb_id']}/history",
-                json={"history": metrics_to_send}
-            ) as response:
-                if response.status not in [200, 201]:
-                    # Re-queue metrics on failure
-                    for metric in metrics_to_send:
-                        batch.append(metric)
-        except aiohttp.ClientError:
-            # Re-queue metrics on error
-            for metric in metrics_to_send:
-                batch.append(metric)
+        await self._shipper.flush(job_id)
     
     async def log_metrics(self, job_id: str, metrics: Dict[str, Any], step: Optional[int] = None):
         """
@@ -302,20 +264,31 @@ class WandBConnector(PlatformConnector):
             metrics: Dictionary of metric name -> value
             step: Training step number
         """
+        await self.log_metrics_batch(job_id, [{"metrics": metrics, "step": step}])
+    
+    async def log_metrics_batch(self, job_id: str, entries: List[Dict[str, Any]]):
+        """
+        Log several steps of metrics at once.
+        
+        Args:
+            job_id: Job identifier
+            entries: Dictionaries with 'metrics' and optionally 'step'
+        """
         if job_id not in self._metric_batches:
             return
         
-        # Add to batch queue
-        metric_entry = {
-            "_step": step if step is not None else 0,
-            "_timestamp": datetime.now().timestamp(),
-            **metrics
-        }
-        
-        self._metric_batches[job_id].append(metric_entry)
+        timestamp = datetime.now().timestamp()
+        rows = [
+            {
+                "_step": entry.get("step") if entry.get("step") is not None else 0,
+                "_timestamp": timestamp,
+                **entry["metrics"]
+            }
+            for entry in entries
+        ]
         
         # Flush if batch is full
-        if len(self._metric_batches[job_id]) >= self._batch_size:
+        if self._shipper.submit(job_id, rows):
             await self._flush_metrics(job_id)
     
     async def get_job_status(self, job_id: str) -> JobStatus:
@@ -392,17 +365,9 @@ class WandBConnector(PlatformConnector):
                 success = response.status in [200, 204]
                 
                 if success:
-                    # Cancel batch task
-                    if job_id in self._batch_tasks:
-                        self._batch_tasks[job_id].cancel()
-                        try:
-                            await self._batch_tasks[job_id]
-                        except asyncio.CancelledError:
-                            pass
-                        del self._batch_tasks[job_id]
-                    
                     # Final flush
                     await self._flush_metrics(job_id)
+                    await self._shipper.close(job_id)
                     
                     # Update status
                     run_info["status"] = JobStatus.CANCELLED
@@ -465,19 +430,19 @@ class WandBConnector(PlatformConnector):
             
             await asyncio.sleep(2)
     
-    async def fetch_artifact(self, job_id: str) -> bytes:
+    async def artifact_location(self, job_id: str) -> ArtifactLocation:
         """
-        Download artifacts from a W&B run.
+        Locate the first artifact logged to a W&B run.
         
         Args:
             job_id: Job identifier
             
         Returns:
-            Artifact data as bytes
+            ArtifactLocation of the artifact
             
         Raises:
             FileNotFoundError: If artifact doesn't exist
-            RuntimeError: If download fails
+            RuntimeError: If the artifacts cannot be listed
         """
         if not self._connected:
             raise RuntimeError("Not connected to W&B")
@@ -496,27 +461,47 @@ class WandBConnector(PlatformConnector):
                     raise RuntimeError(f"Failed to list artifacts: {response.status}")
                 
                 data = await response.json()
+        except aiohttp.ClientError as e:
+            raise RuntimeError(f"Failed to fetch artifact: {str(e)}")
+        
+        if "data" not in data or "artifacts" not in data["data"]:
+            raise FileNotFoundError("No artifacts found for this run")
+        
+        artifacts = data["data"]["artifacts"]
+        if not artifacts:
+            raise FileNotFoundError("No artifacts found for this run")
+        
+        # Download first artifact
+        artifact = artifacts[0]
+        artifact_url = artifact.get("url")
+        
+        if not artifact_url:
+            raise RuntimeError("Artifact URL not found")
+        
+        return ArtifactLocation(artifact_url, self._session, size=artifact.get("size"))
+    
+    async def fetch_artifact(self, job_id: str) -> bytes:
+        """
+        Download artifacts from a W&B run.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Artifact data as bytes
+            
+        Raises:
+            FileNotFoundError: If artifact doesn't exist
+            RuntimeError: If download fails
+        """
+        location = await self.artifact_location(job_id)
+        
+        try:
+            async with self._session.get(location.url) as artifact_response:
+                if artifact_response.status != 200:
+                    raise RuntimeError(f"Failed to download artifact: {artifact_response.status}")
                 
-                if "data" in data and "artifacts" in data["data"]:
-                    artifacts = data["data"]["artifacts"]
-                    if not artifacts:
-                        raise FileNotFoundError("No artifacts found for this run")
-                    
-                    # Download first artifact
-                    artifact = artifacts[0]
-                    artifact_url = artifact.get("url")
-                    
-                    if not artifact_url:
-                        raise RuntimeError("Artifact URL not found")
-                    
-                    # Download artifact
-                    async with self._session.get(artifact_url) as artifact_response:
-                        if artifact_response.status != 200:
-                            raise RuntimeError(f"Failed to download artifact: {artifact_response.status}")
-                        
-                        return await artifact_response.read()
-                else:
-                    raise FileNotFoundError("No artifacts found for this run")
+                return await artifact_response.read()
                     
         except aiohttp.ClientError as e:
             raise RuntimeError(f"Failed to fetch artifact: {str(e)}")
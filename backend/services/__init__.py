@@ -2,143 +2,175 @@
 Services module for PEFT Studio backend.
 
 STARTUP OPTIMIZATION: This module uses lazy loading to improve startup time.
-Heavy services are only imported when actually needed.
+The names below are resolved on first access (PEP 562), so importing one
+service module, or ``services`` itself, no longer imports every service
+along with its heavy dependencies (huggingface_hub, GPUtil, psutil...).
 """
 
-# Import startup service first (lightweight)
-from .startup_service import (
-    get_startup_optimizer,
-    measure_startup,
-    lazy_import_torch,
-    lazy_import_transformers,
-    lazy_import_unsloth
-)
+from importlib import import_module
+from typing import Dict, Tuple
 
-from .peft_service import (
-    PEFTService,
-    PEFTAlgorithm,
-    PEFTConfig,
-    ModelInfo,
-    get_peft_service
-)
+# Exported names by the submodule defining them
+_LAZY_EXPORTS: Dict[str, Tuple[str, ...]] = {
+    "startup_service": (
+        "get_startup_optimizer",
+        "measure_startup",
+        "lazy_import_torch",
+        "lazy_import_transformers",
+        "lazy_import_unsloth",
+    ),
+    "peft_service": (
+        "PEFTService",
+        "PEFTAlgorithm",
+        "PEFTConfig",
+        "ModelInfo",
+        "get_peft_service",
+    ),
+    "hardware_service": (
+        "HardwareService",
+        "GPUInfo",
+        "CPUInfo",
+        "RAMInfo",
+        "HardwareProfile",
+        "get_hardware_service",
+    ),
+    "model_registry_service": (
+        "ModelRegistryService",
+        "ModelMetadata",
+        "get_model_registry_service",
+    ),
+    "smart_config_service": (
+        "SmartConfigEngine",
+        "SmartConfig",
+        "HardwareSpecs",
+        "ModelSpecs",
+        "DatasetSpecs",
+        "PrecisionType",
+        "QuantizationType",
+        "get_smart_config_engine",
+    ),
+    "profile_service": (
+        "ProfileService",
+        "OptimizationProfile",
+        "ProfileConfig",
+        "HardwareRequirements",
+        "UseCase",
+        "get_profile_service",
+    ),
+    "dataset_service": (
+        "DatasetService",
+        "DatasetFormat",
+        "ValidationLevel",
+        "ValidationResult",
+        "DatasetStatistics",
+        "DatasetPreview",
+        "QualityReport",
+        "get_dataset_service",
+    ),
+    "tokenization_service": (
+        "TokenizationService",
+        "get_tokenization_service",
+    ),
+    "training_orchestration_service": (
+        "TrainingOrchestrator",
+        "TrainingState",
+        "TrainingJob",
+        "TrainingConfig",
+        "TrainingMetrics",
+        "CheckpointData",
+        "ArtifactInfo",
+        "get_training_orchestrator",
+    ),
+    "metrics_store": (
+        "MetricsStore",
+        "MetricsRow",
+    ),
+    "monitoring_service": (
+        "MonitoringService",
+        "get_monitoring_service",
+    ),
+    "metrics_hub": (
+        "MetricsHub",
+        "Subscription",
+        "get_metrics_hub",
+    ),
+    "anomaly_detection_service": (
+        "AnomalyDetectionService",
+        "AnomalyType",
+        "AnomalySeverity",
+        "Anomaly",
+        "Action",
+        "get_anomaly_detection_service",
+    ),
+    "model_versioning_service": (
+        "ModelVersioningService",
+        "ModelVersion",
+        "VersionComparison",
+        "DiskSpaceInfo",
+        "get_model_versioning_service",
+    ),
+    "inference_service": (
+        "InferenceService",
+        "InferenceRequest",
+        "InferenceResult",
+        "ComparisonResult",
+        "ConversationMessage",
+        "ConversationHistory",
+        "get_inference_service",
+    ),
+    "export_service": (
+        "ModelExporter",
+        "ExportResult",
+        "ExportFormat",
+        "HuggingFaceExport",
+        "OllamaExport",
+        "GGUFExport",
+        "LMStudioExport",
+        "get_model_exporter",
+    ),
+    "cost_calculator_service": (
+        "CostCalculatorService",
+        "CostEstimates",
+        "GPUPowerProfile",
+        "get_cost_calculator",
+    ),
+    "cloud_platform_service": (
+        "CloudPlatformService",
+        "PlatformType",
+        "GPUType",
+        "GPUInstance",
+        "PlatformCostEstimate",
+        "CostComparison",
+        "get_cloud_platform_service",
+    ),
+}
 
-from .hardware_service import (
-    HardwareService,
-    GPUInfo,
-    CPUInfo,
-    RAMInfo,
-    HardwareProfile,
-    get_hardware_service
-)
+# Exported names bound to a differently named attribute
+_LAZY_ALIASES: Dict[str, Tuple[str, str]] = {
+    "MonitoringMetrics": ("monitoring_service", "TrainingMetrics"),
+}
 
-from .model_registry_service import (
-    ModelRegistryService,
-    ModelMetadata,
-    get_model_registry_service
-)
+_EXPORT_SOURCES: Dict[str, Tuple[str, str]] = {
+    name: (module, name) for module, names in _LAZY_EXPORTS.items() for name in names
+}
+_EXPORT_SOURCES.update(_LAZY_ALIASES)
 
-from .smart_config_service import (
-    SmartConfigEngine,
-    SmartConfig,
-    HardwareSpecs,
-    ModelSpecs,
-    DatasetSpecs,
-    PrecisionType,
-    QuantizationType,
-    get_smart_config_engine
-)
 
-from .profile_service import (
-    ProfileService,
-    OptimizationProfile,
-    ProfileConfig,
-    HardwareRequirements,
-    UseCase,
-    get_profile_service
-)
+def __getattr__(name: str):
+    """Import the submodule defining an exported name on first access"""
+    try:
+        module_name, attribute = _EXPORT_SOURCES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f".{module_name}", __name__), attribute)
+    # Later lookups find the name directly
+    globals()[name] = value
+    return value
 
-from .dataset_service import (
-    DatasetService,
-    DatasetFormat,
-    ValidationLevel,
-    ValidationResult,
-    DatasetStatistics,
-    DatasetPreview,
-    QualityReport,
-    get_dataset_service
-)
 
-from .training_orchestration_service import (
-    TrainingOrchestrator,
-    TrainingState,
-    TrainingJob,
-    TrainingConfig,
-    TrainingMetrics,
-    CheckpointData,
-    ArtifactInfo,
-    get_training_orchestrator
-)
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORT_SOURCES))
 
-from .monitoring_service import (
-    MonitoringService,
-    TrainingMetrics as MonitoringMetrics,
-    get_monitoring_service
-)
-
-from .anomaly_detection_service import (
-    AnomalyDetectionService,
-    AnomalyType,
-    AnomalySeverity,
-    Anomaly,
-    Action,
-    get_anomaly_detection_service
-)
-
-from .model_versioning_service import (
-    ModelVersioningService,
-    ModelVersion,
-    VersionComparison,
-    DiskSpaceInfo,
-    get_model_versioning_service
-)
-
-from .inference_service import (
-    InferenceService,
-    InferenceRequest,
-    InferenceResult,
-    ComparisonResult,
-    ConversationMessage,
-    ConversationHistory,
-    get_inference_service
-)
-
-from .export_service import (
-    ModelExporter,
-    ExportResult,
-    ExportFormat,
-    HuggingFaceExport,
-    OllamaExport,
-    GGUFExport,
-    LMStudioExport,
-    get_model_exporter
-)
-
-from .cost_calculator_service import (
-    CostCalculatorService,
-    CostEstimates,
-    GPUPowerProfile,
-    get_cost_calculator
-)
-
-from .cloud_platform_service import (
-    CloudPlatformService,
-    PlatformType,
-    GPUType,
-    GPUInstance,
-    PlatformCostEstimate,
-    CostComparison,
-    get_cloud_platform_service
-)
 
 __all__ = [
     # PEFT Service
@@ -189,6 +221,10 @@ __all__ = [
     "QualityReport",
     "get_dataset_service",
     
+    # Tokenization Service
+    "TokenizationService",
+    "get_tokenization_service",
+    
     # Training Orchestration Service
     "TrainingOrchestrator",
     "TrainingState",
@@ -199,11 +235,20 @@ __all__ = [
     "ArtifactInfo",
     "get_training_orchestrator",
     
+    # Metrics Store
+    "MetricsStore",
+    "MetricsRow",
+    
     # Monitoring Service
     "MonitoringService",
     "MonitoringMetrics",
     "get_monitoring_service",
     
+    # Metrics Hub
+    "MetricsHub",
+    "Subscription",
+    "get_metrics_hub",
+    
     # Anomaly Detection Service
     "AnomalyDetectionService",
     "AnomalyType",
@@ -0,0 +1,306 @@
+"""
+Artifact Download Service
+
+Downloads training artifacts from providers straight to disk:
+
+- Chunks are written as they arrive and hashed (SHA-256) incrementally,
+  so memory use stays flat whatever the artifact size
+- Interrupted downloads resume from the bytes already on disk, within a
+  download (after connection errors) and across restarts (a small state
+  file records progress next to the partial file)
+- Large artifacts on servers that accept Range requests are fetched as
+  several ranges in parallel
+
+Connectors that can only return an artifact whole (no artifact_location)
+are still supported; the data is written and hashed in one pass.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import aiohttp
+
+from connectors.artifact_stream import (
+    ArtifactLocation,
+    DEFAULT_CHUNK_SIZE,
+    RangeNotSupportedError,
+    iter_artifact_range,
+    probe_artifact
+)
+from connectors.base import PlatformConnector
+
+logger = logging.getLogger(__name__)
+
+# Artifacts at least this large are downloaded as parallel ranges
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+# Ranges downloaded in parallel
+DEFAULT_PARALLEL_RANGES = 4
+
+# Attempts per range before the download fails
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 1.0
+
+# Progress is recorded in the state file every this many bytes per range
+STATE_SAVE_INTERVAL = 8 * 1024 * 1024
+
+_PART_SUFFIX = ".part"
+_STATE_SUFFIX = ".part.json"
+
+
+@dataclass
+class DownloadResult:
+    """A completed artifact download"""
+    path: Path
+    size_bytes: int
+    sha256: str
+    resumed_bytes: int = 0  # Bytes already on disk from an earlier attempt
+    ranges: int = 1
+
+
+@dataclass
+class _Range:
+    start: int
+    end: Optional[int]  # None while the artifact size is unknown
+    done: int = 0
+    saved: int = field(default=0, repr=False)
+
+    @property
+    def position(self) -> int:
+        return self.start + self.done
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None and self.position >= self.end
+
+
+class _PrefixHasher:
+    """
+    SHA-256 of the downloaded prefix of a file.
+
+    Chunks written at the end of the hashed prefix are hashed directly;
+    bytes written further on (by other ranges, or before a restart) are
+    read back once the prefix reaches them.
+    """
+
+    def __init__(self, fd: int, chunk_size: int):
+        self._fd = fd
+        self._chunk_size = chunk_size
+        self.sha = hashlib.sha256()
+        self.offset = 0
+
+    def written(self, position: int, chunk: bytes) -> None:
+        if position == self.offset:
+            self.sha.update(chunk)
+            self.offset += len(chunk)
+
+    def catch_up(self, end: int) -> None:
+        while self.offset < end:
+            data = os.pread(self._fd, min(self._chunk_size, end - self.offset), self.offset)
+            if not data:
+                raise RuntimeError("Partial artifact file is shorter than recorded")
+            self.sha.update(data)
+            self.offset += len(data)
+
+
+class _RangedDownload:
+    """Download state of one artifact: the partial file, ranges and hash"""
+
+    def __init__(self, location: ArtifactLocation, dest: Path, parts: int, chunk_size: int):
+        self.location = location
+        self.dest = dest
+        self.part_path = dest.with_name(dest.name + _PART_SUFFIX)
+        self.state_path = dest.with_name(dest.name + _STATE_SUFFIX)
+        self.chunk_size = chunk_size
+        self.ranges = self._load_ranges() or self._plan_ranges(parts)
+        self.resumed_bytes = sum(r.done for r in self.ranges)
+        self._lock = threading.Lock()
+        self._fd = os.open(self.part_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if self.resumed_bytes == 0:
+            os.ftruncate(self._fd, 0)
+        self.hasher = _PrefixHasher(self._fd, chunk_size)
+
+    def _plan_ranges(self, parts: int) -> List[_Range]:
+        size = self.location.size
+        if size is None or not self.location.accepts_ranges or size < PARALLEL_THRESHOLD or parts < 2:
+            return [_Range(0, size)]
+        step = -(-size // parts)
+        return [_Range(start, min(start + step, size)) for start in range(0, size, step)]
+
+    def _load_ranges(self) -> Optional[List[_Range]]:
+        if not self.part_path.exists() or not self.state_path.exists():
+            return None
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != self.location.url or state.get("size") != self.location.size:
+            return None  # A different artifact; start over
+        if len(state["ranges"]) > 1 and not self.location.accepts_ranges:
+            return None
+        ranges = [_Range(start, end, done, done) for start, end, done in state["ranges"]]
+        logger.info(f"Resuming download of {self.dest.name} from {sum(r.done for r in ranges)} bytes")
+        return ranges
+
+    def save_state(self) -> None:
+        state = {
+            "url": self.location.url,
+            "size": self.location.size,
+            "ranges": [[r.start, r.end, r.done] for r in self.ranges],
+        }
+        temp = self.state_path.with_suffix(".tmp")
+        temp.write_text(json.dumps(state))
+        os.replace(temp, self.state_path)
+        for r in self.ranges:
+            r.saved = r.done
+
+    def checkpoint(self) -> None:
+        with self._lock:
+            self.save_state()
+
+    def _contiguous_end(self) -> int:
+        end = 0
+        for r in self.ranges:
+            if r.start > end:
+                break
+            end = r.position
+            if not r.complete:
+                break
+        return end
+
+    def commit(self, r: _Range, chunk: bytes) -> None:
+        """Write a chunk at a range's position and advance its progress (runs in a worker thread)"""
+        with self._lock:
+            if self._fd is None:
+                raise RuntimeError("Download was closed")
+            position = r.position
+            if r.end is not None and position + len(chunk) > r.end:
+                raise RuntimeError("Server sent more data than requested")
+            os.pwrite(self._fd, chunk, position)
+            r.done += len(chunk)
+            self.hasher.written(position, chunk)
+            self.hasher.catch_up(self._contiguous_end())
+            if r.done - r.saved >= STATE_SAVE_INTERVAL:
+                self.save_state()
+
+    def restart_whole(self) -> None:
+        """Fall back to one range from the start, for servers that ignore Range"""
+        logger.warning(f"Server does not support ranged downloads; restarting {self.dest.name}")
+        os.ftruncate(self._fd, 0)
+        self.ranges = [_Range(0, self.location.size)]
+        self.resumed_bytes = 0
+        self.hasher = _PrefixHasher(self._fd, self.chunk_size)
+
+    def finish(self) -> DownloadResult:
+        size = sum(r.done for r in self.ranges)
+        if self.location.size is not None and size != self.location.size:
+            raise RuntimeError(f"Downloaded {size} bytes, expected {self.location.size}")
+        self.hasher.catch_up(size)
+        os.fsync(self._fd)
+        self.close()
+        os.replace(self.part_path, self.dest)
+        self.state_path.unlink(missing_ok=True)
+        return DownloadResult(self.dest, size, self.hasher.sha.hexdigest(), self.resumed_bytes, len(self.ranges))
+
+    def close(self) -> None:
+        # Waits for a chunk still being written by a worker thread
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+async def _fetch_range(download: _RangedDownload, r: _Range) -> None:
+    attempts = 0
+    while not r.complete:
+        try:
+            async for chunk in iter_artifact_range(download.location, r.position, r.end, download.chunk_size):
+                await asyncio.to_thread(download.commit, r, chunk)
+            if r.end is None:
+                r.end = r.position  # Size was unknown; the stream ended at the artifact's end
+            elif not r.complete:
+                raise aiohttp.ClientPayloadError("Connection closed before the range was complete")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            attempts += 1
+            if attempts >= MAX_ATTEMPTS:
+                raise RuntimeError(f"Failed to download artifact: {e}")
+            logger.warning(f"Artifact download interrupted at byte {r.position} ({e}); resuming")
+            await asyncio.to_thread(download.checkpoint)
+            await asyncio.sleep(RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+async def download_to_file(
+    connector: PlatformConnector,
+    job_id: str,
+    dest: Path,
+    parallel_ranges: int = DEFAULT_PARALLEL_RANGES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> DownloadResult:
+    """
+    Download a job's artifact to a file, hashing it on the way.
+
+    Args:
+        connector: Connector of the provider that ran the job
+        job_id: Provider job identifier
+        dest: File to write; the download goes to dest.part until complete
+        parallel_ranges: Ranges fetched at once for large artifacts
+        chunk_size: Bytes read and written at a time
+
+    Returns:
+        DownloadResult with the size and SHA-256 of the artifact
+
+    Raises:
+        FileNotFoundError: If the artifact doesn't exist
+        RuntimeError: If the download fails
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    location = None
+    if isinstance(connector, PlatformConnector):
+        location = await connector.artifact_location(job_id)
+    if location is None:
+        data = await connector.fetch_artifact(job_id)
+        return await asyncio.to_thread(_write_whole, dest, data)
+
+    location = await probe_artifact(location)
+    download = _RangedDownload(location, dest, parallel_ranges, chunk_size)
+    try:
+        try:
+            await _fetch_ranges(download)
+        except RangeNotSupportedError:
+            download.restart_whole()
+            await _fetch_ranges(download)
+        return await asyncio.to_thread(download.finish)
+    except BaseException:
+        # Keep the partial file and record progress so the next attempt resumes
+        download.close()
+        if download.part_path.exists():
+            download.save_state()
+        raise
+
+
+async def _fetch_ranges(download: _RangedDownload) -> None:
+    tasks = [asyncio.ensure_future(_fetch_range(download, r)) for r in download.ranges]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # One range failing stops the others
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _write_whole(dest: Path, data: bytes) -> DownloadResult:
+    part_path = dest.with_name(dest.name + _PART_SUFFIX)
+    with open(part_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(part_path, dest)
+    return DownloadResult(dest, len(data), hashlib.sha256(data).hexdigest())
@@ -0,0 +1,138 @@
+"""
+Content-addressed, chunk-deduplicated storage for checkpoint tensors.
+
+Each tensor is cut into fixed-size chunks of raw bytes, and each chunk is
+stored once under its SHA-256 digest in a per-job blob directory. A
+checkpoint then only needs a small manifest listing the chunks of every
+tensor, so frozen weights and unchanged optimizer slots are not written
+again at every ``save_steps``. Blobs no longer referenced by any manifest
+are removed by ``collect_garbage`` after old checkpoints are pruned.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+import hashlib
+import json
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Per-checkpoint list of tensor chunks
+MANIFEST_FILE = "manifest.json"
+
+# Bytes per chunk; small enough that a partly changed tensor shares chunks
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _tensor_bytes(tensor: Any):
+    """Raw bytes of a tensor as a NumPy uint8 array (no copy for CPU tensors)"""
+    import torch
+
+    flat = tensor.detach().cpu().contiguous().reshape(-1)
+    return flat.view(torch.uint8).numpy()
+
+
+class ChunkStore:
+    """Blob directory addressed by the SHA-256 of each chunk"""
+
+    def __init__(self, root: Path, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            root: Directory holding the blobs
+            chunk_size: Bytes per chunk for new tensors
+        """
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def _put_blob(self, digest: str, data) -> int:
+        """Store a chunk unless it already exists; returns bytes written"""
+        path = self._blob_path(digest)
+        if path.exists():
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.parent / f".{digest}-{uuid.uuid4().hex[:8]}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(data)
+        os.replace(temp, path)
+        return len(data)
+
+    def put_tensor(self, tensor: Any) -> Tuple[Dict[str, Any], int]:
+        """
+        Store a tensor's chunks.
+
+        Returns:
+            Tuple of (manifest entry, bytes of new chunks written)
+        """
+        data = memoryview(_tensor_bytes(tensor))
+        chunks = []
+        written = 0
+        for offset in range(0, len(data), self.chunk_size):
+            chunk = data[offset:offset + self.chunk_size]
+            digest = hashlib.sha256(chunk).hexdigest()
+            written += self._put_blob(digest, chunk)
+            chunks.append(digest)
+        entry = {
+            'dtype': str(tensor.dtype).replace('torch.', ''),
+            'shape': list(tensor.shape),
+            'nbytes': len(data),
+            'chunks': chunks,
+        }
+        return entry, written
+
+    def get_tensor(self, entry: Dict[str, Any]) -> Any:
+        """Rebuild a tensor from its manifest entry"""
+        import torch
+
+        buffer = bytearray(entry['nbytes'])
+        offset = 0
+        for digest in entry['chunks']:
+            with open(self._blob_path(digest), 'rb') as f:
+                chunk = f.read()
+            buffer[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        if offset != entry['nbytes']:
+            raise ValueError(f"Checkpoint chunks hold {offset} bytes, expected {entry['nbytes']}")
+        dtype = getattr(torch, entry['dtype'])
+        if not buffer:
+            return torch.empty(entry['shape'], dtype=dtype)
+        return torch.frombuffer(buffer, dtype=torch.uint8).view(dtype).reshape(entry['shape'])
+
+    def collect_garbage(self, manifests: Iterable[Path]) -> int:
+        """
+        Delete blobs not referenced by any of the given manifests.
+
+        Args:
+            manifests: Manifest files of every checkpoint still kept
+
+        Returns:
+            Bytes removed
+        """
+        if not self.root.exists():
+            return 0
+        live = set()
+        for manifest in manifests:
+            try:
+                with open(manifest, 'r') as f:
+                    tensors = json.load(f)['tensors']
+            except (OSError, ValueError, KeyError) as e:
+                # Keep everything rather than lose chunks of an unreadable manifest
+                logger.warning(f"Skipping checkpoint garbage collection, cannot read {manifest}: {e}")
+                return 0
+            for entry in tensors.values():
+                live.update(entry['chunks'])
+
+        removed = 0
+        for blob in self.root.glob('*/*'):
+            if blob.name not in live:
+                try:
+                    size = blob.stat().st_size
+                    blob.unlink()
+                    removed += size
+                except OSError as e:
+                    logger.debug(f"Could not remove checkpoint blob {blob}: {e}")
+        return removed
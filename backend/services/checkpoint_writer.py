@@ -0,0 +1,249 @@
+"""
+Background checkpoint writer.
+
+The training thread only pays for copying tensors to host memory; the
+snapshot is then serialized (safetensors or deduplicated chunks for
+tensors, JSON for everything else) by a single writer thread into a
+temporary directory that is renamed into place once complete. Old
+checkpoints are pruned on the same thread.
+Write throughput and training-thread stall time are tracked for the
+monitoring endpoints.
+"""
+
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import copy
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# File holding every tensor of a checkpoint
+TENSORS_FILE = "model_checkpoint.safetensors"
+
+# Checkpoints queued behind the one being written before submit() blocks
+DEFAULT_MAX_PENDING = 2
+
+# Placeholder key marking where a tensor was taken out of a state dict
+_TENSOR_REF = "__tensor__"
+
+
+def _is_tensor(value: Any) -> bool:
+    return type(value).__module__.startswith("torch") and hasattr(value, "detach")
+
+
+def snapshot_state(state: Any) -> Any:
+    """
+    Copy a (nested) state dict into host memory.
+
+    Tensors are detached and copied to CPU so later optimizer steps cannot
+    change the snapshot; other values are deep-copied.
+    """
+    if _is_tensor(state):
+        return state.detach().to("cpu", copy=True)
+    if isinstance(state, dict):
+        return {key: snapshot_state(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(snapshot_state(value) for value in state)
+    return copy.deepcopy(state)
+
+
+def split_tensors(state: Any, prefix: str = "") -> Tuple[Any, Dict[str, Any]]:
+    """
+    Separate tensors from a nested state dict.
+
+    Args:
+        state: Nested dicts/lists containing tensors and plain values
+        prefix: Key prefix for tensors found in state
+
+    Returns:
+        Tuple of (JSON-serializable skeleton with tensor references,
+        flat dict of tensor key to contiguous tensor)
+    """
+    tensors: Dict[str, Any] = {}
+
+    def walk(value: Any, key: str) -> Any:
+        if _is_tensor(value):
+            tensors[key] = value.contiguous()
+            return {_TENSOR_REF: key}
+        if isinstance(value, dict):
+            return {str(k): walk(v, f"{key}.{k}" if key else str(k)) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [walk(v, f"{key}.{i}") for i, v in enumerate(value)]
+        return value
+
+    return walk(state, prefix), tensors
+
+
+def join_tensors(skeleton: Any, tensors: Dict[str, Any]) -> Any:
+    """Inverse of split_tensors"""
+    if isinstance(skeleton, dict):
+        if set(skeleton) == {_TENSOR_REF}:
+            return tensors[skeleton[_TENSOR_REF]]
+        return {key: join_tensors(value, tensors) for key, value in skeleton.items()}
+    if isinstance(skeleton, list):
+        return [join_tensors(value, tensors) for value in skeleton]
+    return skeleton
+
+
+def replace_directory(source: Path, target: Path) -> None:
+    """Move a fully written directory into place, replacing any existing one"""
+    old = None
+    if target.exists():
+        old = target.parent / f".{target.name}-{uuid.uuid4().hex[:8]}.old"
+        os.replace(target, old)
+    os.replace(source, target)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+class AsyncCheckpointWriter:
+    """
+    Single background thread that writes checkpoint snapshots.
+
+    ``submit`` snapshots the checkpoint's state dicts to host memory on the
+    caller's thread and returns a Future that resolves to the checkpoint
+    directory once it has been written and renamed into place.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING):
+        """
+        Args:
+            max_pending: Checkpoints queued before submit() blocks
+        """
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'written': 0,
+            'failed': 0,
+            'bytes_written': 0,
+            'write_seconds': 0.0,
+            'stall_seconds': 0.0,
+            'last_stall_ms': 0.0,
+            'max_stall_ms': 0.0,
+        }
+
+    def submit(
+        self,
+        checkpoint: Any,
+        path: Path,
+        on_complete: Optional[Callable[[Path], None]] = None,
+        save_options: Optional[Dict[str, Any]] = None
+    ) -> Future:
+        """
+        Snapshot a checkpoint and queue it for writing.
+
+        Args:
+            checkpoint: CheckpointData-like object with state dicts and a
+                ``save(path)`` method returning bytes written
+            path: Final checkpoint directory
+            on_complete: Called on the writer thread after the checkpoint is
+                in place, e.g. to record it and prune old checkpoints
+            save_options: Extra keyword arguments for ``checkpoint.save``
+
+        Returns:
+            Future resolving to path
+        """
+        started = time.perf_counter()
+        for name in ('model_state_dict', 'optimizer_state_dict', 'scheduler_state_dict'):
+            setattr(checkpoint, name, snapshot_state(getattr(checkpoint, name)))
+        future: Future = Future()
+        self._ensure_thread()
+        # Blocks only when the writer is max_pending checkpoints behind
+        self._queue.put((checkpoint, Path(path), on_complete, save_options or {}, future))
+        self._record_stall(time.perf_counter() - started)
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued checkpoint has been written.
+
+        Returns:
+            True if the queue drained before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Write everything still queued, then stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Write throughput, stall time and queue depth"""
+        with self._lock:
+            stats = dict(self._stats)
+        seconds = stats['write_seconds']
+        stats['pending'] = self._queue.unfinished_tasks
+        stats['write_throughput_mb_s'] = (
+            stats['bytes_written'] / (1024 * 1024) / seconds if seconds > 0 else 0.0
+        )
+        return stats
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="checkpoint-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _record_stall(self, seconds: float) -> None:
+        with self._lock:
+            self._stats['stall_seconds'] += seconds
+            self._stats['last_stall_ms'] = seconds * 1000
+            self._stats['max_stall_ms'] = max(self._stats['max_stall_ms'], seconds * 1000)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, checkpoint: Any, path: Path, on_complete, save_options, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        started = time.perf_counter()
+        try:
+            written = checkpoint.save(path, **save_options)
+            if written is None:
+                written = _directory_size(path)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats['written'] += 1
+                self._stats['bytes_written'] += written
+                self._stats['write_seconds'] += elapsed
+            if on_complete is not None:
+                on_complete(path)
+        except Exception as e:
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.error(f"Failed to write checkpoint {path}: {e}")
+            future.set_exception(e)
+            return
+        future.set_result(path)
@@ -9,8 +9,13 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime
 import logging
 
+from .metrics_store import MetricsStore
+
 logger = logging.getLogger(__name__)
 
+# Most points per series in a loss curve chart
+MAX_CHART_POINTS = 1000
+
 
 @dataclass
 class TrainingRunSummary:
@@ -112,6 +117,7 @@ class ComparisonService:
     
     def __init__(self):
         self.runs_cache: Dict[str, TrainingRunSummary] = {}
+        self.metrics_histories: Dict[str, MetricsStore] = {}
         logger.info("ComparisonService initialized")
     
     def add_run(self, run: TrainingRunSummary) -> None:
@@ -124,6 +130,16 @@ class ComparisonService:
         self.runs_cache[run.job_id] = run
         logger.debug(f"Added run {run.job_id} to comparison cache")
     
+    def attach_metrics(self, job_id: str, history: MetricsStore) -> None:
+        """
+        Attach the per-step metrics history of a run for loss curve charts.
+        
+        Args:
+            job_id: Job identifier
+            history: Columnar metrics history of the run
+        """
+        self.metrics_histories[job_id] = history
+    
     def get_run(self, job_id: str) -> Optional[TrainingRunSummary]:
         """
         Get a training run from cache.
@@ -208,15 +224,10 @@ class ComparisonService:
         # Loss comparison chart
         loss_series = []
         for run in runs:
-            # In a real implementation, we would get the full loss history
-            # For now, we create a simple series with start and end points
             loss_series.append({
                 'job_id': run.job_id,
                 'label': f"{run.model_name} ({run.job_id[:8]})",
-                'data': [
-                    {'x': 0, 'y': run.final_loss * 2},  # Simulated initial loss
-                    {'x': run.total_steps, 'y': run.final_loss}
-                ]
+                'data': self._loss_curve(run)
             })
         
         charts.append(ComparisonChart(
@@ -261,6 +272,23 @@ class ComparisonService:
         logger.debug(f"Generated {len(charts)} comparison charts")
         return charts
     
+    def _loss_curve(self, run: TrainingRunSummary) -> List[Dict[str, float]]:
+        """
+        Build loss curve points from the attached metrics history.
+        
+        Falls back to a start/end estimate when no history is attached, and
+        downsamples long histories to MAX_CHART_POINTS with LTTB.
+        """
+        history = self.metrics_histories.get(run.job_id)
+        if not history:
+            return [
+                {'x': 0, 'y': run.final_loss * 2},  # Simulated initial loss
+                {'x': run.total_steps, 'y': run.final_loss}
+            ]
+        
+        steps, losses = history.downsample('loss', max_points=MAX_CHART_POINTS, method='lttb')
+        return [{'x': x, 'y': y} for x, y in zip(steps.tolist(), losses.tolist())]
+    
     def _identify_best_performers(self, runs: List[TrainingRunSummary]) -> List[BestPerformer]:
         """
         Identify best performing runs for each metric.
@@ -364,6 +392,7 @@ class ComparisonService:
     def clear_cache(self) -> None:
         """Clear the runs cache"""
         self.runs_cache.clear()
+        self.metrics_histories.clear()
         logger.info("Cleared comparison cache")
 
 
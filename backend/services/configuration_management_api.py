@@ -58,6 +58,8 @@ class ListConfigurationsRequest(BaseModel):
     """Request to list configurations with filters"""
     tags: Optional[List[str]] = None
     search_query: Optional[str] = None
+    limit: Optional[int] = None
+    offset: int = 0
 
 
 @router.post("/export")
@@ -226,12 +228,19 @@ async def list_library_configurations(request: ListConfigurationsRequest):
         # List configurations
         configurations = service.list_library_configurations(
             tags=request.tags,
-            search_query=request.search_query
+            search_query=request.search_query,
+            limit=request.limit,
+            offset=request.offset
+        )
+        total = (
+            service.count_library_configurations(tags=request.tags, search_query=request.search_query)
+            if request.limit is not None or request.offset else len(configurations)
         )
         
         return {
             "success": True,
-            "configurations": [config.__dict__ for config in configurations]
+            "configurations": [config.__dict__ for config in configurations],
+            "total": total
         }
     
     except Exception as e:
@@ -13,6 +13,7 @@ from datetime import datetime
 from pathlib import Path
 import logging
 
+from services.library_index import LibraryIndex, LibraryRecord
 from services.training_config_service import (
     TrainingConfiguration,
     PEFTAlgorithm,
@@ -68,9 +69,22 @@ class ConfigurationManagementService:
         
         self.library_path = Path(library_path)
         self.library_path.mkdir(parents=True, exist_ok=True)
+        self._index = LibraryIndex(self.library_path, self._index_record)
         
         self.logger.info(f"Configuration library initialized at: {self.library_path}")
     
+    @staticmethod
+    def _index_record(export_data: dict) -> LibraryRecord:
+        """Indexed fields of a library file (raises if its metadata is invalid)"""
+        metadata = ConfigurationMetadata(**export_data.get("metadata", {}))
+        return LibraryRecord(
+            name=metadata.name,
+            description=metadata.description,
+            sort_key=metadata.modified_at,
+            summary=asdict(metadata),
+            tags=metadata.tags
+        )
+    
     def export_configuration(
         self, 
         config: TrainingConfiguration,
@@ -219,12 +233,9 @@ class ConfigurationManagementService:
         
         # Save to file
         config_id = export_data["metadata"]["id"]
-        file_path = self.library_path / f"{config_id}.json"
+        self._index.write(config_id, export_data)
         
-        with open(file_path, 'w') as f:
-            json.dump(export_data, f, indent=2)
-        
-        self.logger.info(f"Saved configuration to library: {name} at {file_path}")
+        self.logger.info(f"Saved configuration to library: {name} (ID: {config_id})")
         return config_id
     
     def load_from_library(self, config_id: str) -> SavedConfiguration:
@@ -254,50 +265,45 @@ class ConfigurationManagementService:
     def list_library_configurations(
         self,
         tags: Optional[List[str]] = None,
-        search_query: Optional[str] = None
+        search_query: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[ConfigurationMetadata]:
         """
-        List all configurations in the library.
+        List configurations in the library, most recently modified first.
         Requirement 18.3: Configuration library browser
         
+        Served from the library index rather than by reading every file.
+        
         Args:
             tags: Filter by tags (optional)
             search_query: Search in name and description (optional)
+            limit: Maximum number of configurations to return (optional)
+            offset: Number of matching configurations to skip
             
         Returns:
             List of configuration metadata
         """
-        configurations = []
-        
-        for file_path in self.library_path.glob("*.json"):
-            try:
-                with open(file_path, 'r') as f:
-                    export_data = json.load(f)
-                
-                metadata_dict = export_data.get("metadata", {})
-                metadata = ConfigurationMetadata(**metadata_dict)
-                
-                # Apply filters
-                if tags:
-                    if not any(tag in metadata.tags for tag in tags):
-                        continue
-                
-                if search_query:
-                    query_lower = search_query.lower()
-                    if (query_lower not in metadata.name.lower() and 
-                        query_lower not in metadata.description.lower()):
-                        continue
-                
-                configurations.append(metadata)
-            
-            except Exception as e:
-                self.logger.error(f"Error loading configuration from {file_path}: {e}")
-                continue
-        
-        # Sort by modified date (newest first)
-        configurations.sort(key=lambda x: x.modified_at, reverse=True)
+        summaries = self._index.query(search=search_query, tags=tags, limit=limit, offset=offset)
+        return [ConfigurationMetadata(**summary) for summary in summaries]
+    
+    def count_library_configurations(
+        self,
+        tags: Optional[List[str]] = None,
+        search_query: Optional[str] = None
+    ) -> int:
+        """
+        Count library configurations matching the same filters as
+        list_library_configurations.
         
-        return configurations
+        Args:
+            tags: Filter by tags (optional)
+            search_query: Search in name and description (optional)
+            
+        Returns:
+            Number of matching configurations
+        """
+        return self._index.count(search=search_query, tags=tags)
     
     def delete_from_library(self, config_id: str) -> bool:
         """
@@ -310,12 +316,9 @@ class ConfigurationManagementService:
         Returns:
             True if deleted successfully
         """
-        file_path = self.library_path / f"{config_id}.json"
-        
-        if not file_path.exists():
+        if not self._index.remove(config_id):
             return False
         
-        file_path.unlink()
         self.logger.info(f"Deleted configuration from library: {config_id}")
         return True
     
@@ -437,8 +440,7 @@ class ConfigurationManagementService:
         metadata["modified_at"] = datetime.utcnow().isoformat()
         
         # Save updated configuration
-        with open(file_path, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        self._index.write(config_id, export_data)
         
         self.logger.info(f"Updated metadata for configuration: {config_id}")
         return True
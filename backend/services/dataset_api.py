@@ -0,0 +1,63 @@
+"""
+Dataset API
+
+REST API endpoints for dataset validation jobs. Validation of large files runs
+in the background across CPU cores; clients poll the job for progress and
+results instead of holding a request open.
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from pydantic import BaseModel, Field
+from pathlib import Path
+
+from services.dataset_service import get_dataset_service, DatasetFormat
+
+
+router = APIRouter(prefix="/api/datasets", tags=["datasets"])
+
+
+class ValidationJobRequest(BaseModel):
+    """Request to validate a dataset file"""
+    file_path: str
+    format: Optional[DatasetFormat] = None
+    max_workers: Optional[int] = Field(None, ge=1)  # Capped at the CPU count
+
+
+@router.post("/validate")
+async def start_validation(request: ValidationJobRequest):
+    """
+    Start validating a dataset in the background.
+    
+    Returns:
+    - Validation job with its ID, status and progress
+    """
+    if not Path(request.file_path).is_file():
+        raise HTTPException(status_code=404, detail=f"Dataset file not found: {request.file_path}")
+    
+    try:
+        service = get_dataset_service()
+        job = service.start_validation_job(
+            request.file_path,
+            format=request.format,
+            max_workers=request.max_workers
+        )
+        return job.to_dict()
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/validate/{job_id}")
+async def get_validation_job(job_id: str):
+    """
+    Get the status of a validation job.
+    
+    Returns:
+    - Job status and progress; results once the job has completed
+    """
+    job = get_dataset_service().get_validation_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Validation job {job_id} not found")
+    
+    return job.to_dict()
@@ -3,18 +3,64 @@ Dataset Processing Service for validating, analyzing, and preparing training dat
 Supports CSV, JSON, JSONL, and TXT formats with quality checks and error detection.
 """
 
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Callable, Iterator, TextIO
 from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+import hashlib
+import io
 import json
+import mmap
+import os
+import random
 import csv
 import logging
+import multiprocessing
 import re
-from collections import Counter
+import tempfile
+import threading
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Characters read per refill by the incremental JSON array parser
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Number of non-empty lines inspected when sniffing JSONL content
+FORMAT_SNIFF_LINES = 1000
+
+_NON_WHITESPACE = re.compile(r'[^ \t\n\r]')
+_VALUE_TERMINATORS = frozenset(' \t\n\r,]}')
+
+# Bytes scanned per vectorized pass when building offset indexes
+_INDEX_BLOCK_SIZE = 64 * 1024 * 1024
+
+# Bytes that can start or end a whitespace-only UTF-8 line (str.strip semantics):
+# ASCII whitespace, the \x1c-\x1f separators, lead bytes of multi-byte
+# whitespace (U+0085, U+00A0, U+1680, U+2000-U+3000) and continuation bytes
+_BLANK_LEAD_BYTES = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f\xc2\xe1\xe2\xe3'
+_BLANK_TRAIL_BYTES = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f' + bytes(range(0x80, 0xC0))
+
+# Offset indexes kept open (file handle and mmap) per DatasetService
+_MAX_OPEN_INDEXES = 16
+
+# Bump when the on-disk offset index layout changes
+_INDEX_VERSION = 1
+
+# Target bytes per chunk when validating a dataset across processes
+PARALLEL_VALIDATION_CHUNK_BYTES = 16 * 1024 * 1024
+
+# Finished validation jobs kept for polling
+_MAX_VALIDATION_JOBS = 100
+
+# Validation jobs running at once; each uses a process pool of up to the CPU count
+MAX_CONCURRENT_VALIDATION_JOBS = 2
+
 
 class DatasetFormat(str, Enum):
     """Supported dataset formats"""
@@ -56,6 +102,10 @@ class DatasetStatistics:
     empty_samples: int
     duplicate_samples: int
     unique_samples: int
+    token_count_method: str = "heuristic"  # "tokenizer" when counted with a real tokenizer
+    tokenizer_name: Optional[str] = None
+    estimated_total_tokens: Optional[int] = None  # Character heuristic, always reported
+    estimated_max_tokens: Optional[int] = None
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for API responses"""
@@ -69,7 +119,11 @@ class DatasetStatistics:
             "avg_chars_per_sample": self.avg_chars_per_sample,
             "empty_samples": self.empty_samples,
             "duplicate_samples": self.duplicate_samples,
-            "unique_samples": self.unique_samples
+            "unique_samples": self.unique_samples,
+            "token_count_method": self.token_count_method,
+            "tokenizer_name": self.tokenizer_name,
+            "estimated_total_tokens": self.estimated_total_tokens,
+            "estimated_max_tokens": self.estimated_max_tokens
         }
 
 
@@ -89,6 +143,52 @@ class DatasetPreview:
         }
 
 
+@dataclass
+class DuplicateCluster:
+    """Group of samples that are exact or near duplicates of each other"""
+    sample_indices: List[int]  # Capped to the first few members
+    size: int
+    exact: bool  # True if every member is identical after normalization
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for API responses"""
+        return {
+            "sample_indices": self.sample_indices,
+            "size": self.size,
+            "exact": self.exact
+        }
+
+
+@dataclass
+class DuplicateReport:
+    """Exact and near-duplicate analysis of a dataset"""
+    num_samples: int
+    exact_duplicate_samples: int
+    near_duplicate_samples: int
+    exact_clusters: int
+    near_duplicate_clusters: int
+    similarity_threshold: float
+    clusters: List[DuplicateCluster]  # Largest clusters first
+    
+    @property
+    def removable_samples(self) -> int:
+        """Samples dropped by keeping one representative per cluster"""
+        return self.exact_duplicate_samples + self.near_duplicate_samples
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for API responses"""
+        return {
+            "num_samples": self.num_samples,
+            "exact_duplicate_samples": self.exact_duplicate_samples,
+            "near_duplicate_samples": self.near_duplicate_samples,
+            "exact_clusters": self.exact_clusters,
+            "near_duplicate_clusters": self.near_duplicate_clusters,
+            "removable_samples": self.removable_samples,
+            "similarity_threshold": self.similarity_threshold,
+            "clusters": [cluster.to_dict() for cluster in self.clusters]
+        }
+
+
 @dataclass
 class QualityReport:
     """Dataset quality assessment"""
@@ -96,6 +196,7 @@ class QualityReport:
     issues: List[ValidationResult]
     recommendations: List[str]
     is_ready_for_training: bool
+    duplicates: Optional[DuplicateReport] = None
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for API responses"""
@@ -113,14 +214,918 @@ class QualityReport:
                 for issue in self.issues
             ],
             "recommendations": self.recommendations,
-            "is_ready_for_training": self.is_ready_for_training
+            "is_ready_for_training": self.is_ready_for_training,
+            "duplicates": self.duplicates.to_dict() if self.duplicates else None
+        }
+
+
+@dataclass
+class DatasetScan:
+    """Validation results and statistics collected in a single pass over a dataset"""
+    issues: List[ValidationResult]
+    statistics: DatasetStatistics
+    duplicates: Optional[DuplicateReport] = None
+
+
+@dataclass
+class ValidationJob:
+    """Background validation of a dataset file, polled for progress"""
+    job_id: str
+    file_path: str
+    format: DatasetFormat
+    status: str = "pending"  # pending, running, completed, failed
+    total_chunks: int = 0
+    completed_chunks: int = 0
+    results: Optional[List[ValidationResult]] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+    
+    @property
+    def progress(self) -> float:
+        """Fraction of the file validated so far, from 0.0 to 1.0"""
+        if self.status == "completed":
+            return 1.0
+        if not self.total_chunks:
+            return 0.0
+        return self.completed_chunks / self.total_chunks
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for API responses"""
+        return {
+            "job_id": self.job_id,
+            "file_path": self.file_path,
+            "format": self.format.value,
+            "status": self.status,
+            "progress": self.progress,
+            "total_chunks": self.total_chunks,
+            "completed_chunks": self.completed_chunks,
+            "results": [
+                {
+                    "field": result.field,
+                    "level": result.level.value,
+                    "message": result.message,
+                    "suggestion": result.suggestion,
+                    "auto_fixable": result.auto_fixable,
+                    "line_number": result.line_number
+                }
+                for result in self.results
+            ] if self.results is not None else None,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None
         }
 
 
+class JSONStructureError(ValueError):
+    """Raised when a JSON document is valid but its top-level value is not an array"""
+
+
+class _JSONStream:
+    """Buffered character stream used by iter_json_array"""
+    
+    def __init__(self, f: TextIO, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+    
+    def fill(self) -> bool:
+        """Read more input, discarding the consumed prefix. Returns False at EOF."""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        # Grow reads with the pending value so huge elements decode in O(n)
+        chunk = self._f.read(max(self._chunk_size, len(self.buf)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+    
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)"""
+        while True:
+            match = _NON_WHITESPACE.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self.fill():
+                return ''
+    
+    def decode(self) -> Any:
+        """Decode the JSON value starting at the current position"""
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number or literal may continue in the next chunk
+            if (end == len(self.buf) or self.buf[end] not in _VALUE_TERMINATORS) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(f: TextIO, chunk_size: int = JSON_STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Incrementally parse a top-level JSON array, yielding one element at a time.
+    
+    Only the element being decoded is buffered, so arrays of any size are
+    parsed in bounded memory instead of via json.load.
+    
+    Args:
+        f: Text file object positioned at the start of the document
+        chunk_size: Number of characters to read per refill
+    
+    Yields:
+        Decoded array elements
+    
+    Raises:
+        JSONStructureError: If the document is valid JSON but not an array
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    stream = _JSONStream(f, chunk_size)
+    
+    if stream.peek() != '[':
+        # Decode the whole value so invalid documents still report syntax errors
+        stream.decode()
+        raise JSONStructureError("Top-level JSON value is not an array")
+    stream.pos += 1
+    
+    if stream.peek() == ']':
+        stream.pos += 1
+    else:
+        while True:
+            stream.peek()
+            yield stream.decode()
+            
+            delimiter = stream.peek()
+            stream.pos += 1
+            if delimiter == ']':
+                break
+            if delimiter != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", stream.buf, stream.pos - 1)
+    
+    if stream.peek():
+        raise json.JSONDecodeError("Extra data", stream.buf, stream.pos)
+
+
+class _StreamingStatistics:
+    """
+    Accumulates DatasetStatistics over a stream of sample texts.
+    
+    Samples are never retained: token counts are folded into running totals and
+    exact duplicates are tracked as 8-byte content digests. An optional token
+    counter receives every text so real tokenizer counts can replace the
+    heuristic ones when the statistics are finalized.
+    """
+    
+    __slots__ = (
+        "_estimate_tokens", "num_samples", "total_tokens", "total_chars",
+        "min_tokens", "max_tokens", "distribution", "empty_samples", "_digests",
+        "near_duplicates", "token_counter"
+    )
+    
+    def __init__(
+        self,
+        estimate_tokens: Callable[[str], int],
+        near_duplicates: Optional["NearDuplicateDetector"] = None,
+        token_counter: Optional[Any] = None
+    ):
+        self._estimate_tokens = estimate_tokens
+        self.near_duplicates = near_duplicates
+        self.token_counter = token_counter
+        self.num_samples = 0
+        self.total_tokens = 0
+        self.total_chars = 0
+        self.min_tokens = 0
+        self.max_tokens = 0
+        self.distribution = {"0-100": 0, "100-500": 0, "500-1000": 0, "1000+": 0}
+        self.empty_samples = 0
+        self._digests = array('Q')
+    
+    def add(self, text: str):
+        """Fold one sample's text into the running statistics"""
+        tokens = self._estimate_tokens(text)
+        
+        if self.num_samples == 0:
+            self.min_tokens = self.max_tokens = tokens
+        elif tokens < self.min_tokens:
+            self.min_tokens = tokens
+        elif tokens > self.max_tokens:
+            self.max_tokens = tokens
+        
+        self.num_samples += 1
+        self.total_tokens += tokens
+        self.total_chars += len(text)
+        
+        if tokens < 100:
+            self.distribution["0-100"] += 1
+        elif tokens < 500:
+            self.distribution["100-500"] += 1
+        elif tokens < 1000:
+            self.distribution["500-1000"] += 1
+        else:
+            self.distribution["1000+"] += 1
+        
+        if not text.strip():
+            self.empty_samples += 1
+        
+        self._digests.frombytes(
+            hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+        )
+        
+        if self.near_duplicates is not None:
+            self.near_duplicates.add(text)
+        
+        if self.token_counter is not None:
+            self.token_counter.add(text)
+    
+    def _count_unique(self) -> int:
+        """Count distinct digests by sorting them in place"""
+        if not self._digests:
+            return 0
+        
+        import numpy as np
+        
+        digests = np.frombuffer(self._digests, dtype=np.uint64)
+        digests.sort()
+        return int(np.count_nonzero(digests[1:] != digests[:-1])) + 1
+    
+    def finalize(self) -> DatasetStatistics:
+        """
+        Build the DatasetStatistics for everything seen so far.
+        
+        When a token counter was attached and produced a length for every
+        sample, token figures come from the tokenizer and the heuristic totals
+        are reported alongside them.
+        """
+        token_lengths = self.token_counter.finalize() if self.token_counter is not None else None
+        
+        if self.num_samples == 0:
+            return DatasetStatistics(
+                num_samples=0,
+                total_tokens=0,
+                avg_tokens_per_sample=0.0,
+                min_tokens=0,
+                max_tokens=0,
+                token_length_distribution={},
+                avg_chars_per_sample=0.0,
+                empty_samples=0,
+                duplicate_samples=0,
+                unique_samples=0
+            )
+        
+        unique = self._count_unique()
+        
+        statistics = DatasetStatistics(
+            num_samples=self.num_samples,
+            total_tokens=self.total_tokens,
+            avg_tokens_per_sample=self.total_tokens / self.num_samples,
+            min_tokens=self.min_tokens,
+            max_tokens=self.max_tokens,
+            token_length_distribution=dict(self.distribution),
+            avg_chars_per_sample=self.total_chars / self.num_samples,
+            empty_samples=self.empty_samples,
+            duplicate_samples=self.num_samples - unique,
+            unique_samples=unique,
+            estimated_total_tokens=self.total_tokens,
+            estimated_max_tokens=self.max_tokens
+        )
+        
+        if token_lengths is not None:
+            if len(token_lengths) == self.num_samples:
+                self._apply_token_lengths(statistics, token_lengths)
+            else:
+                logger.warning(
+                    f"Token length count {len(token_lengths)} does not match "
+                    f"{self.num_samples} samples; using estimated token counts"
+                )
+        
+        return statistics
+    
+    def _apply_token_lengths(self, statistics: DatasetStatistics, token_lengths):
+        """Replace heuristic token figures with exact per-sample counts"""
+        import numpy as np
+        
+        lengths = np.asarray(token_lengths, dtype=np.int64)
+        buckets = np.bincount(np.searchsorted([100, 500, 1000], lengths, side='right'), minlength=4)
+        
+        statistics.total_tokens = int(lengths.sum())
+        statistics.avg_tokens_per_sample = statistics.total_tokens / self.num_samples
+        statistics.min_tokens = int(lengths.min())
+        statistics.max_tokens = int(lengths.max())
+        statistics.token_length_distribution = dict(zip(self.distribution, (int(b) for b in buckets)))
+        statistics.token_count_method = "tokenizer"
+        statistics.tokenizer_name = self.token_counter.tokenizer_name
+
+
+class NearDuplicateDetector:
+    """
+    Streaming MinHash + LSH near-duplicate detector.
+    
+    Texts are buffered into chunks; each chunk is shingled into character
+    k-grams and MinHashed with vectorized NumPy operations. Signatures and
+    LSH band keys are spilled to anonymous temporary files, so resident
+    memory is bounded by the chunk size plus a few bytes per sample.
+    Candidate pairs sharing a band are verified against their estimated
+    Jaccard similarity and merged into clusters with union-find.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        chunk_size: int = 2048,
+        max_clusters: int = 20,
+        max_cluster_members: int = 10,
+        seed: int = 1
+    ):
+        import numpy as np
+        
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.chunk_size = chunk_size
+        self.max_clusters = max_clusters
+        self.max_cluster_members = max_cluster_members
+        
+        rng = np.random.default_rng(seed)
+        self._hash_a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._hash_b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        
+        self.num_samples = 0
+        self._pending: List[str] = []
+        self._digests = array('Q')
+        self._empty = bytearray()
+        self._labels = None
+        self._signatures = tempfile.TemporaryFile(prefix="peft_minhash_")
+        self._band_keys = tempfile.TemporaryFile(prefix="peft_lsh_")
+    
+    def add(self, text: str):
+        """Queue one sample; samples are indexed in the order they are added"""
+        self._pending.append(text)
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+    
+    def finalize(self) -> DuplicateReport:
+        """Cluster everything added so far and build the report"""
+        self._flush()
+        self._labels = self._cluster_labels()
+        return self._build_report(self._labels)
+    
+    def duplicate_mask(self):
+        """Boolean array marking samples that duplicate an earlier sample (after finalize)"""
+        import numpy as np
+        
+        if self._labels is None:
+            raise RuntimeError("finalize() must be called before duplicate_mask()")
+        return self._labels != np.arange(len(self._labels))
+    
+    def close(self):
+        """Release the temporary signature storage"""
+        self._signatures.close()
+        self._band_keys.close()
+    
+    def _normalize(self, text: str) -> bytes:
+        return ' '.join(text.lower().split()).encode('utf-8', 'surrogatepass')
+    
+    def _flush(self):
+        """MinHash the pending chunk and spill signatures and band keys"""
+        import numpy as np
+        
+        if not self._pending:
+            return
+        
+        texts = [self._normalize(text) for text in self._pending]
+        self._pending = []
+        self.num_samples += len(texts)
+        
+        for text in texts:
+            self._digests.frombytes(hashlib.blake2b(text, digest_size=8).digest())
+            self._empty.append(0 if text else 1)
+        
+        signatures = self._minhash(texts)
+        self._signatures.write(signatures.tobytes())
+        self._band_keys.write(self._band_hashes(signatures).tobytes())
+    
+    def _minhash(self, texts: List[bytes]):
+        """Compute (len(texts), num_perm) uint32 MinHash signatures"""
+        import numpy as np
+        
+        k = self.shingle_size
+        # Pad short texts so every text yields at least one shingle
+        padded = [text.ljust(k, b'\0') for text in texts]
+        lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+        data = np.frombuffer(b''.join(padded), dtype=np.uint8)
+        
+        # Pack each k-byte window into an integer shingle
+        windows = len(data) - k + 1
+        shingles = np.zeros(windows, dtype=np.uint64)
+        for j in range(k):
+            shingles |= data[j:j + windows].astype(np.uint64) << np.uint64(8 * j)
+        
+        # Drop the k - 1 windows that straddle each boundary between texts
+        text_ends = np.cumsum(lengths)
+        straddling = np.zeros(windows + k - 1, dtype=bool)
+        for j in range(1, k):
+            straddling[text_ends[:-1] - j] = True
+        shingles = shingles[~straddling[:windows]]
+        shingles *= np.uint64(0x9E3779B97F4A7C15)
+        counts = lengths - k + 1
+        segment_starts = np.cumsum(counts) - counts
+        
+        # Shifting is monotonic, so take minima over the full 64-bit hashes and
+        # keep only the high 32 bits of each minimum
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        hashed = np.empty_like(shingles)
+        for p in range(self.num_perm):
+            np.multiply(shingles, self._hash_a[p], out=hashed)
+            np.add(hashed, self._hash_b[p], out=hashed)
+            signatures[:, p] = np.minimum.reduceat(hashed, segment_starts) >> np.uint64(32)
+        
+        return signatures
+    
+    def _band_hashes(self, signatures):
+        """Hash each band of rows into a single uint64 LSH bucket key"""
+        import numpy as np
+        
+        keys = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+        for band in range(self.bands):
+            key = np.full(len(signatures), 0xCBF29CE484222325, dtype=np.uint64)
+            for row in range(band * self.rows, (band + 1) * self.rows):
+                key = (key ^ signatures[:, row].astype(np.uint64)) * np.uint64(0x100000001B3)
+            keys[:, band] = key
+        return keys
+    
+    def _cluster_labels(self):
+        """Label each sample with the smallest index in its duplicate cluster"""
+        import numpy as np
+        
+        n = self.num_samples
+        labels = np.arange(n)
+        if n < 2:
+            return labels
+        
+        non_empty = np.frombuffer(bytes(self._empty), dtype=np.uint8) == 0
+        
+        # Exact duplicates collapse onto their first occurrence up front, so
+        # only one representative per distinct text takes part in LSH
+        digests = np.frombuffer(self._digests, dtype=np.uint64)
+        order = np.argsort(digests, kind='stable')
+        labels[order] = order[self._group_leaders(digests[order])]
+        labels[~non_empty] = np.flatnonzero(~non_empty)
+        representatives = non_empty & (labels == np.arange(n))
+        
+        self._signatures.flush()
+        self._band_keys.flush()
+        signatures = np.memmap(self._signatures, dtype=np.uint32, mode='r', shape=(n, self.num_perm))
+        band_keys = np.memmap(self._band_keys, dtype=np.uint64, mode='r', shape=(n, self.bands))
+        
+        # Each band links a representative to the first member of its bucket;
+        # pairs are verified and merged band by band so that at most one
+        # band's candidates are held in memory
+        for band in range(self.bands):
+            keys = np.array(band_keys[:, band])
+            order = np.argsort(keys, kind='stable')
+            order = order[representatives[order]]
+            leaders = order[self._group_leaders(keys[order])]
+            del keys
+            
+            # Skip pairs already merged through an earlier band
+            pending = labels[leaders] != labels[order]
+            left, right = leaders[pending], order[pending]
+            del order, leaders, pending
+            
+            # Verify candidates by estimated Jaccard similarity
+            for start in range(0, len(left), 8192):
+                batch_left, batch_right = left[start:start + 8192], right[start:start + 8192]
+                similarity = (signatures[batch_left] == signatures[batch_right]).mean(axis=1)
+                keep = similarity >= self.threshold
+                labels = self._merge(labels, batch_left[keep], batch_right[keep])
+        
+        del signatures, band_keys
+        
+        return labels
+    
+    @staticmethod
+    def _merge(labels, left, right):
+        """Union-find over an edge list by min-label propagation with pointer jumping"""
+        import numpy as np
+        
+        while len(left):
+            previous = labels.copy()
+            smallest = np.minimum(labels[left], labels[right])
+            np.minimum.at(labels, labels[left], smallest)
+            np.minimum.at(labels, labels[right], smallest)
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+            if np.array_equal(labels, previous):
+                break
+        return labels
+    
+    @staticmethod
+    def _group_leaders(sorted_keys):
+        """For each position in a sorted key array, the position where its run of equal keys starts"""
+        import numpy as np
+        
+        group_start = np.ones(len(sorted_keys), dtype=bool)
+        group_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        return np.flatnonzero(group_start)[np.cumsum(group_start) - 1]
+    
+    def _build_report(self, labels) -> DuplicateReport:
+        import numpy as np
+        
+        n = self.num_samples
+        digests = np.frombuffer(self._digests, dtype=np.uint64)
+        non_empty = np.frombuffer(bytes(self._empty), dtype=np.uint8) == 0
+        
+        exact_duplicates = int(non_empty.sum()) - len(np.unique(digests[non_empty]))
+        removable = int(np.count_nonzero(labels != np.arange(n)))
+        
+        # Group samples by cluster label
+        order = np.argsort(labels, kind='stable')
+        sorted_labels = labels[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_labels[1:] != sorted_labels[:-1]))) if n else order
+        sizes = np.diff(np.append(starts, n))
+        
+        # A cluster is exact when every member shares the first member's digest
+        sorted_digests = digests[order]
+        same = sorted_digests == np.repeat(sorted_digests[starts], sizes)
+        exact = np.logical_and.reduceat(same, starts) if n else same
+        
+        multi = np.flatnonzero(sizes > 1)
+        exact_clusters = int(np.count_nonzero(exact[multi]))
+        
+        clusters = []
+        for group in multi[np.argsort(-sizes[multi], kind='stable')][:self.max_clusters]:
+            members = order[starts[group]:starts[group] + min(sizes[group], self.max_cluster_members)]
+            clusters.append(DuplicateCluster(
+                sample_indices=[int(i) for i in members],
+                size=int(sizes[group]),
+                exact=bool(exact[group])
+            ))
+        
+        return DuplicateReport(
+            num_samples=n,
+            exact_duplicate_samples=exact_duplicates,
+            near_duplicate_samples=removable - exact_duplicates,
+            exact_clusters=exact_clusters,
+            near_duplicate_clusters=len(multi) - exact_clusters,
+            similarity_threshold=self.threshold,
+            clusters=clusters
+        )
+
+
+class DatasetIndex:
+    """
+    Persistent record offset index for O(1) random access into a dataset file.
+    
+    Record boundaries are found once with a vectorized scan over an mmap of the
+    file and stored as a (start, end) byte-offset table. The table is saved as
+    an .npy file keyed by path and validated against the file's mtime and size,
+    so reopening an unchanged dataset maps the existing index instead of
+    rescanning. Reads seek straight to a record through the mmap.
+    
+    Supports JSONL, TXT and CSV (record boundaries honour quoted newlines).
+    """
+    
+    SUPPORTED_FORMATS = (DatasetFormat.JSONL, DatasetFormat.TXT, DatasetFormat.CSV)
+    
+    def __init__(self, file_path: str, format: DatasetFormat, index_dir: Path):
+        if format not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"Offset index does not support format: {format.value}")
+        
+        self.file_path = str(Path(file_path).resolve())
+        self.format = format
+        self.index_dir = Path(index_dir)
+        
+        stat = os.stat(self.file_path)
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        
+        key = hashlib.sha256(f"{self.file_path}|{format.value}".encode('utf-8')).hexdigest()[:32]
+        self._offsets_path = self.index_dir / f"{key}.npy"
+        self._meta_path = self.index_dir / f"{key}.json"
+        
+        self._file = None
+        self._mmap = None
+        self._lock = threading.Lock()
+        self._fieldnames: Optional[List[str]] = None
+        self._offsets = self._load()
+        if self._offsets is None:
+            self._offsets = self._build()
+        self._num_records = len(self._offsets)
+    
+    def __len__(self) -> int:
+        return self._num_records
+    
+    @property
+    def fieldnames(self) -> Optional[List[str]]:
+        """CSV header columns (None for other formats)"""
+        return self._fieldnames
+    
+    def chunk_starts(self, chunk_bytes: int) -> List[int]:
+        """Byte offsets of the records that split the file into chunks of about chunk_bytes"""
+        import numpy as np
+        
+        if not len(self):
+            return []
+        
+        starts = np.array(self._table()[:, 0])
+        targets = np.arange(int(starts[0]), self.size, max(chunk_bytes, 1))
+        picks = np.unique(np.searchsorted(starts, targets))
+        return [int(starts[i]) for i in picks[picks < len(starts)]]
+    
+    def is_current(self) -> bool:
+        """Check whether the indexed file is unchanged on disk"""
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return False
+        return stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size
+    
+    def read(self, index: int) -> Dict[str, Any]:
+        """Read and parse the record at position index"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Record index out of range: {index}")
+        
+        start, end = self._table()[index]
+        return self._parse(self._record_bytes(int(start), int(end)))
+    
+    def read_range(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Read up to limit consecutive records starting at offset.
+        
+        Records that fail to decode or parse are logged and skipped, so one
+        malformed line does not hide the rest of the page.
+        """
+        stop = len(self) if limit is None else min(len(self), offset + limit)
+        records = []
+        for i in range(max(offset, 0), stop):
+            try:
+                records.append(self.read(i))
+            except ValueError as e:
+                logger.warning(f"Skipping unreadable record {i} in {self.file_path}: {str(e)}")
+        return records
+    
+    def sample(self, num_samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read num_samples distinct records chosen uniformly at random"""
+        import numpy as np
+        
+        count = min(num_samples, len(self))
+        if count <= 0:
+            return []
+        
+        rng = np.random.default_rng(seed)
+        indices = rng.choice(len(self), size=count, replace=False)
+        return [self.read(int(i)) for i in indices]
+    
+    def close(self):
+        """
+        Release the dataset mmap, its file handle and the mapped offset table.
+        
+        A closed index reopens them lazily if it is read again.
+        """
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._offsets = None
+    
+    def _table(self):
+        """Offset table, remapped from disk if the index was closed"""
+        offsets = self._offsets
+        if offsets is None:
+            with self._lock:
+                if self._offsets is None:
+                    self._offsets = self._load()
+                    if self._offsets is None:
+                        raise ValueError(f"Offset index for {self.file_path} is no longer valid")
+                offsets = self._offsets
+        return offsets
+    
+    def _record_bytes(self, start: int, end: int) -> bytes:
+        with self._lock:
+            if self._mmap is None:
+                self._file = open(self.file_path, 'rb')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap[start:end]
+    
+    def _parse(self, raw: bytes) -> Dict[str, Any]:
+        text = raw.decode('utf-8')
+        
+        if self.format == DatasetFormat.JSONL:
+            return json.loads(text)
+        if self.format == DatasetFormat.TXT:
+            return {"text": text.strip()}
+        
+        reader = csv.DictReader(io.StringIO(text), fieldnames=self._fieldnames)
+        return dict(next(reader))
+    
+    def _load(self):
+        """Map a previously built index if it matches the current file"""
+        import numpy as np
+        
+        try:
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if (
+                meta.get("version") != _INDEX_VERSION
+                or meta.get("mtime_ns") != self.mtime_ns
+                or meta.get("size") != self.size
+            ):
+                return None
+            
+            offsets = np.load(self._offsets_path, mmap_mode='r')
+            if len(offsets) != meta.get("num_records"):
+                return None
+        except (OSError, ValueError):
+            return None
+        
+        self._fieldnames = meta.get("fieldnames")
+        return offsets
+    
+    def _build(self):
+        """Scan the file for record boundaries and persist the offset table"""
+        import numpy as np
+        
+        logger.info(f"Building offset index for {self.file_path}")
+        
+        with open(self.file_path, 'rb') as f:
+            if self.size == 0:
+                offsets = np.empty((0, 2), dtype=np.uint64)
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    offsets = self._scan_boundaries(mm)
+        
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Write the table before the metadata that validates it. Temp files are
+        # unique so concurrent builders of the same index never share one.
+        self._write_atomic(self._offsets_path, lambda f: np.save(f, offsets))
+        meta = json.dumps({
+            "version": _INDEX_VERSION,
+            "path": self.file_path,
+            "format": self.format.value,
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "num_records": len(offsets),
+            "fieldnames": self._fieldnames
+        }).encode('utf-8')
+        self._write_atomic(self._meta_path, lambda f: f.write(meta))
+        
+        return offsets
+    
+    def _write_atomic(self, path: Path, write: Callable[[Any], Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, prefix=f"{path.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _scan_boundaries(self, mm: mmap.mmap):
+        """Return a (num_records, 2) array of record start/end byte offsets"""
+        import numpy as np
+        
+        data = np.frombuffer(mm, dtype=np.uint8)
+        newlines = []
+        quotes = []
+        for block_start in range(0, len(data), _INDEX_BLOCK_SIZE):
+            block = data[block_start:block_start + _INDEX_BLOCK_SIZE]
+            newlines.append(np.flatnonzero(block == 0x0A) + block_start)
+            if self.format == DatasetFormat.CSV:
+                quotes.append(np.flatnonzero(block == 0x22) + block_start)
+        del data, block
+        
+        newlines = np.concatenate(newlines)
+        if self.format == DatasetFormat.CSV:
+            # A newline ends a record only when preceded by an even number of quotes
+            quotes = np.concatenate(quotes)
+            newlines = newlines[np.searchsorted(quotes, newlines) % 2 == 0]
+        
+        starts = np.concatenate(([0], newlines + 1))
+        ends = np.concatenate((newlines, [self.size]))
+        keep = ends > starts
+        
+        data = np.frombuffer(mm, dtype=np.uint8)
+        if self.format == DatasetFormat.CSV:
+            # csv.DictReader skips only empty rows (a bare "\r" included)
+            keep &= ~((ends - starts == 1) & (data[np.minimum(starts, self.size - 1)] == 0x0D))
+        else:
+            # Blank lines are skipped like line.strip() does. Only records that
+            # both start and end with a possible whitespace byte are decoded.
+            lead = np.zeros(256, dtype=bool)
+            lead[np.frombuffer(_BLANK_LEAD_BYTES, dtype=np.uint8)] = True
+            trail = np.zeros(256, dtype=bool)
+            trail[np.frombuffer(_BLANK_TRAIL_BYTES, dtype=np.uint8)] = True
+            candidates = np.flatnonzero(keep)
+            candidates = candidates[
+                lead[data[starts[candidates]]] & trail[data[ends[candidates] - 1]]
+            ]
+            for i in candidates:
+                if not mm[starts[i]:ends[i]].decode('utf-8', errors='replace').strip():
+                    keep[i] = False
+        del data
+        
+        offsets = np.stack((starts[keep], ends[keep]), axis=1).astype(np.uint64)
+        
+        if self.format == DatasetFormat.CSV and len(offsets):
+            header = mm[int(offsets[0][0]):int(offsets[0][1])].decode('utf-8')
+            self._fieldnames = next(csv.reader(io.StringIO(header)))
+            offsets = offsets[1:]
+        
+        return offsets
+
+
+@dataclass
+class _ChunkValidation:
+    """Validation counts for one byte range of a JSONL or CSV file"""
+    records: int = 0  # Lines (JSONL) or data rows (CSV) in the chunk
+    flagged: int = 0  # Invalid lines or empty rows
+    first_flagged: List[Tuple[int, str]] = field(default_factory=list)  # (record number in chunk, kind)
+    error: Optional[str] = None
+    
+    def flag(self, record: int, kind: str):
+        self.flagged += 1
+        if len(self.first_flagged) < 3:  # Only the first few are reported individually
+            self.first_flagged.append((record, kind))
+
+
+def _validate_chunk(
+    file_path: str,
+    format: DatasetFormat,
+    start: int,
+    end: int,
+    fieldnames: Optional[List[str]] = None
+) -> _ChunkValidation:
+    """Process pool task: validate the records in bytes [start, end) of a dataset file"""
+    chunk = _ChunkValidation()
+    
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        
+        # Decode like a text-mode open() so line splitting matches the serial validators
+        text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+        
+        if format == DatasetFormat.JSONL:
+            for i, line in enumerate(text, start=1):
+                chunk.records = i
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    if not isinstance(json.loads(line), dict):
+                        chunk.flag(i, "structure")
+                except json.JSONDecodeError:
+                    chunk.flag(i, "syntax")
+        else:
+            for i, row in enumerate(csv.DictReader(text, fieldnames=fieldnames), start=1):
+                chunk.records = i
+                if all(not isinstance(value, str) or not value.strip() for value in row.values()):
+                    chunk.flag(i, "empty")
+    
+    except Exception as e:
+        chunk.error = str(e)
+    
+    return chunk
+
+
 class DatasetService:
     """Service for dataset processing and validation"""
     
-    def __init__(self):
+    def __init__(self, index_dir: Optional[str] = None, tokenization_service: Optional[Any] = None):
         logger.info("DatasetService initialized")
         self._format_detectors = {
             DatasetFormat.CSV: self._is_csv,
@@ -128,6 +1133,13 @@ class DatasetService:
             DatasetFormat.JSONL: self._is_jsonl,
             DatasetFormat.TXT: self._is_txt
         }
+        self._index_dir = Path(index_dir) if index_dir else None
+        self._indexes: 'OrderedDict[Tuple[str, DatasetFormat], DatasetIndex]' = OrderedDict()
+        self._indexes_lock = threading.Lock()
+        self._tokenization_service = tokenization_service
+        self._validation_jobs: Dict[str, ValidationJob] = {}
+        self._jobs_lock = threading.Lock()
+        self._validation_slots = threading.Semaphore(MAX_CONCURRENT_VALIDATION_JOBS)
     
     def detect_format(self, file_path: str) -> DatasetFormat:
         """
@@ -229,6 +1241,17 @@ class DatasetService:
         """Check if file is valid JSON (single object or array)"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
+                head = f.read(JSON_STREAM_CHUNK_SIZE)
+                match = _NON_WHITESPACE.search(head)
+                if not match:
+                    return False
+                
+                f.seek(0)
+                if head[match.start()] == '[':
+                    # Arrays are sniffed by decoding the first element only
+                    next(iter_json_array(f), None)
+                    return True
+                
                 data = json.load(f)
             
             # Valid JSON should be a list or dict
@@ -240,34 +1263,30 @@ class DatasetService:
     def _is_jsonl(self, file_path: str) -> bool:
         """Check if file is valid JSONL (JSON Lines)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            if not lines:
-                return False
-            
-            # Each non-empty line should be valid JSON
+            # Each non-empty line in the sniffed prefix should be a JSON object;
+            # problems further into the file are reported by validation
             valid_lines = 0
-            non_empty_lines = 0
             
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                non_empty_lines += 1
-                try:
-                    obj = json.loads(line)
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    
+                    try:
+                        obj = json.loads(line)
+                    except json.JSONDecodeError:
+                        return False
+                    
                     # JSONL should have objects, not arrays or primitives
-                    if isinstance(obj, dict):
-                        valid_lines += 1
-                    else:
+                    if not isinstance(obj, dict):
                         return False
-                except json.JSONDecodeError:
-                    return False
+                    
+                    valid_lines += 1
+                    if valid_lines >= FORMAT_SNIFF_LINES:
+                        break
             
-            # All non-empty lines should be valid JSON objects
-            return valid_lines > 0 and valid_lines == non_empty_lines
+            return valid_lines > 0
             
         except Exception:
             return False
@@ -299,12 +1318,257 @@ class DatasetService:
         Returns:
             List of ValidationResult objects
         """
+        if format is None:
+            format = self.detect_format(file_path)
+        
+        return self._scan(file_path, format, stats=None)
+    
+    def validate_dataset_parallel(
+        self,
+        file_path: str,
+        format: Optional[DatasetFormat] = None,
+        max_workers: Optional[int] = None,
+        chunk_bytes: int = PARALLEL_VALIDATION_CHUNK_BYTES,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[ValidationResult]:
+        """
+        Validate a dataset across CPU cores.
+        
+        JSONL and CSV files are split at record boundaries (taken from the
+        offset index) into byte-range chunks that are validated in a process
+        pool. Chunk results are merged with file-wide line numbers, so the
+        output is the same as validate_dataset. Other formats, and files that
+        fit in a single chunk, are validated serially.
+        
+        Args:
+            file_path: Path to the dataset file
+            format: Optional format hint (will auto-detect if not provided)
+            max_workers: Worker processes (defaults to, and capped at, the CPU count)
+            chunk_bytes: Target size of each chunk
+            progress_callback: Called with (completed_chunks, total_chunks)
+            
+        Returns:
+            List of ValidationResult objects
+        """
+        if format is None:
+            format = self.detect_format(file_path)
+        
+        chunks, fieldnames = self._validation_chunks(file_path, format, chunk_bytes)
+        if len(chunks) < 2:
+            results = self.validate_dataset(file_path, format)
+            if progress_callback:
+                progress_callback(1, 1)
+            return results
+        
+        outcomes: List[Optional[_ChunkValidation]] = [None] * len(chunks)
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(max_workers or cpu_count, cpu_count, len(chunks)))
+        
+        # Spawned workers: the service runs inside a threaded server, where fork is unsafe
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = {
+                executor.submit(_validate_chunk, file_path, format, start, end, fieldnames): i
+                for i, (start, end) in enumerate(chunks)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                outcomes[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(completed, len(chunks))
+        
+        results = self._merge_chunk_results(format, outcomes, fieldnames)
+        results.extend(self._validate_common(file_path, format))
+        
+        return results
+    
+    def start_validation_job(
+        self,
+        file_path: str,
+        format: Optional[DatasetFormat] = None,
+        max_workers: Optional[int] = None
+    ) -> ValidationJob:
+        """
+        Start parallel validation in a background thread.
+        
+        At most MAX_CONCURRENT_VALIDATION_JOBS jobs run at once; later jobs
+        stay pending until a slot is free.
+        
+        Args:
+            file_path: Path to the dataset file
+            format: Optional format hint (will auto-detect if not provided)
+            max_workers: Worker processes (defaults to the CPU count)
+            
+        Returns:
+            ValidationJob to poll with get_validation_job
+        """
+        if format is None:
+            format = self.detect_format(file_path)
+        
+        job = ValidationJob(job_id=str(uuid.uuid4()), file_path=file_path, format=format)
+        
+        with self._jobs_lock:
+            finished = [
+                job_id for job_id, existing in self._validation_jobs.items()
+                if existing.status in ("completed", "failed")
+            ]
+            for job_id in finished[:max(0, len(self._validation_jobs) - _MAX_VALIDATION_JOBS + 1)]:
+                del self._validation_jobs[job_id]
+            self._validation_jobs[job.job_id] = job
+        
+        threading.Thread(
+            target=self._run_validation_job,
+            args=(job, max_workers),
+            name=f"dataset-validation-{job.job_id[:8]}",
+            daemon=True
+        ).start()
+        
+        return job
+    
+    def get_validation_job(self, job_id: str) -> Optional[ValidationJob]:
+        """Get a validation job by ID"""
+        with self._jobs_lock:
+            return self._validation_jobs.get(job_id)
+    
+    def _run_validation_job(self, job: ValidationJob, max_workers: Optional[int]):
+        with self._validation_slots:
+            self._execute_validation_job(job, max_workers)
+    
+    def _execute_validation_job(self, job: ValidationJob, max_workers: Optional[int]):
+        job.status = "running"
+        
+        def on_progress(completed: int, total: int):
+            job.total_chunks = total
+            job.completed_chunks = completed
+        
+        try:
+            job.results = self.validate_dataset_parallel(
+                job.file_path,
+                job.format,
+                max_workers=max_workers,
+                progress_callback=on_progress
+            )
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"Validation job {job.job_id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.completed_at = datetime.now()
+    
+    def _validation_chunks(
+        self,
+        file_path: str,
+        format: DatasetFormat,
+        chunk_bytes: int
+    ) -> Tuple[List[Tuple[int, int]], Optional[List[str]]]:
+        """Byte ranges that split a JSONL or CSV file at record boundaries"""
+        if format not in (DatasetFormat.JSONL, DatasetFormat.CSV):
+            return [], None
+        
+        index = self.get_dataset_index(file_path, format)
+        if index is None or index.size <= chunk_bytes:
+            return [], None
+        
+        starts = index.chunk_starts(chunk_bytes)
+        
+        if format == DatasetFormat.JSONL:
+            # Leading blank lines still count towards line numbers
+            starts[:1] = [0]
+        else:
+            # The header must be the first line for DictReader to pick it up
+            with open(file_path, 'rb') as f:
+                if not index.fieldnames or not f.readline().strip():
+                    return [], None
+        
+        ends = starts[1:] + [index.size]
+        return list(zip(starts, ends)), index.fieldnames
+    
+    def _merge_chunk_results(
+        self,
+        format: DatasetFormat,
+        outcomes: List[_ChunkValidation],
+        fieldnames: Optional[List[str]]
+    ) -> List[ValidationResult]:
+        """Combine per-chunk counts into the results the serial validator reports"""
+        results = []
+        if format == DatasetFormat.CSV:
+            results.extend(self._csv_column_results(fieldnames))
+        
+        # CSV rows are numbered from 2, after the header
+        records_before = 1 if format == DatasetFormat.CSV else 0
+        flagged = 0
+        
+        for chunk in outcomes:
+            for record, kind in chunk.first_flagged:
+                if flagged < 3:
+                    results.append(self._record_issue_result(kind, records_before + record))
+                flagged += 1
+            flagged += chunk.flagged - len(chunk.first_flagged)
+            records_before += chunk.records
+            
+            if chunk.error is not None:
+                results.append(self._read_error_result(format, chunk.error))
+                return results
+        
+        if flagged > 3:
+            results.append(self._record_issue_summary(
+                "empty" if format == DatasetFormat.CSV else "invalid", flagged
+            ))
+        
+        return results
+    
+    def scan_dataset(
+        self,
+        file_path: str,
+        format: Optional[DatasetFormat] = None,
+        detect_near_duplicates: bool = False,
+        tokenizer_name: Optional[str] = None
+    ) -> DatasetScan:
+        """
+        Validate and analyze a dataset in a single streaming pass.
+        
+        The file is read once, one sample at a time, so memory stays bounded
+        regardless of dataset size.
+        
+        Args:
+            file_path: Path to the dataset file
+            format: Optional format hint (will auto-detect if not provided)
+            detect_near_duplicates: Also run MinHash/LSH near-duplicate detection
+            tokenizer_name: Count tokens with this model's tokenizer instead of
+                estimating them; falls back to the estimate if it cannot be loaded
+            
+        Returns:
+            DatasetScan with validation results and statistics
+        """
+        if format is None:
+            format = self.detect_format(file_path)
+        
+        detector = NearDuplicateDetector() if detect_near_duplicates else None
+        try:
+            stats = _StreamingStatistics(
+                self._estimate_token_count,
+                near_duplicates=detector,
+                token_counter=self._token_counter(file_path, tokenizer_name)
+            )
+            issues = self._scan(file_path, format, stats)
+            duplicates = detector.finalize() if detector else None
+        finally:
+            if detector:
+                detector.close()
+        
+        return DatasetScan(issues=issues, statistics=stats.finalize(), duplicates=duplicates)
+    
+    def _scan(
+        self,
+        file_path: str,
+        format: DatasetFormat,
+        stats: Optional[_StreamingStatistics]
+    ) -> List[ValidationResult]:
+        """Run format-specific validation, feeding samples into stats when given"""
         results = []
         
-        # Detect format if not provided
-        if format is None:
-            format = self.detect_format(file_path)
-        
         if format == DatasetFormat.UNKNOWN:
             results.append(ValidationResult(
                 field="format",
@@ -317,20 +1581,24 @@ class DatasetService:
         
         # Format-specific validation
         if format == DatasetFormat.CSV:
-            results.extend(self._validate_csv(file_path))
+            results.extend(self._validate_csv(file_path, stats))
         elif format == DatasetFormat.JSON:
-            results.extend(self._validate_json(file_path))
+            results.extend(self._validate_json(file_path, stats))
         elif format == DatasetFormat.JSONL:
-            results.extend(self._validate_jsonl(file_path))
+            results.extend(self._validate_jsonl(file_path, stats))
         elif format == DatasetFormat.TXT:
-            results.extend(self._validate_txt(file_path))
+            results.extend(self._validate_txt(file_path, stats))
         
         # Common validation checks
         results.extend(self._validate_common(file_path, format))
         
         return results
     
-    def _validate_csv(self, file_path: str) -> List[ValidationResult]:
+    def _validate_csv(
+        self,
+        file_path: str,
+        stats: Optional[_StreamingStatistics] = None
+    ) -> List[ValidationResult]:
         """Validate CSV format"""
         results = []
         
@@ -350,76 +1618,55 @@ class DatasetService:
                     return results
                 
                 # Check for required fields (common patterns)
-                has_text_field = any(
-                    field.lower() in ['text', 'content', 'input', 'prompt', 'instruction']
-                    for field in fieldnames
-                )
-                
-                if not has_text_field:
-                    results.append(ValidationResult(
-                        field="columns",
-                        level=ValidationLevel.WARNING,
-                        message="No standard text field found (text, content, input, prompt, instruction)",
-                        suggestion="Ensure your CSV has a column containing the training text",
-                        auto_fixable=False
-                    ))
+                results.extend(self._csv_column_results(fieldnames))
                 
                 # Check for empty rows
                 empty_rows = 0
-                row_count = 0
                 for i, row in enumerate(reader, start=2):  # Start at 2 (after header)
-                    row_count += 1
-                    if all(not value.strip() for value in row.values()):
+                    if stats is not None:
+                        stats.add(self._extract_text_from_sample(row))
+                    
+                    if all(not isinstance(value, str) or not value.strip() for value in row.values()):
                         empty_rows += 1
                         if empty_rows <= 3:  # Report first 3 empty rows
-                            results.append(ValidationResult(
-                                field="data",
-                                level=ValidationLevel.WARNING,
-                                message=f"Empty row found",
-                                suggestion="Remove empty rows from the dataset",
-                                auto_fixable=True,
-                                line_number=i
-                            ))
+                            results.append(self._record_issue_result("empty", i))
                 
                 if empty_rows > 3:
-                    results.append(ValidationResult(
-                        field="data",
-                        level=ValidationLevel.WARNING,
-                        message=f"Found {empty_rows} empty rows total",
-                        suggestion="Remove all empty rows from the dataset",
-                        auto_fixable=True
-                    ))
+                    results.append(self._record_issue_summary("empty", empty_rows))
                 
         except Exception as e:
-            results.append(ValidationResult(
-                field="format",
-                level=ValidationLevel.ERROR,
-                message=f"Error reading CSV file: {str(e)}",
-                suggestion="Check file encoding and CSV format",
-                auto_fixable=False
-            ))
+            results.append(self._read_error_result(DatasetFormat.CSV, str(e)))
         
         return results
     
-    def _validate_json(self, file_path: str) -> List[ValidationResult]:
+    def _validate_json(
+        self,
+        file_path: str,
+        stats: Optional[_StreamingStatistics] = None
+    ) -> List[ValidationResult]:
         """Validate JSON format"""
         results = []
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list):
-                results.append(ValidationResult(
-                    field="structure",
-                    level=ValidationLevel.ERROR,
-                    message="JSON file must contain an array of objects",
-                    suggestion="Wrap your data in a JSON array: [{...}, {...}]",
-                    auto_fixable=False
-                ))
-                return results
+                num_items = 0
+                for item in iter_json_array(f):
+                    num_items += 1
+                    
+                    # Check first item structure
+                    if num_items == 1 and not isinstance(item, dict):
+                        results.append(ValidationResult(
+                            field="structure",
+                            level=ValidationLevel.ERROR,
+                            message="JSON array items must be objects",
+                            suggestion="Each item should be a JSON object with key-value pairs",
+                            auto_fixable=False
+                        ))
+                    
+                    if stats is not None and isinstance(item, dict):
+                        stats.add(self._extract_text_from_sample(item))
             
-            if len(data) == 0:
+            if num_items == 0:
                 results.append(ValidationResult(
                     field="data",
                     level=ValidationLevel.ERROR,
@@ -427,19 +1674,15 @@ class DatasetService:
                     suggestion="Add training samples to the array",
                     auto_fixable=False
                 ))
-                return results
-            
-            # Check first item structure
-            first_item = data[0]
-            if not isinstance(first_item, dict):
-                results.append(ValidationResult(
-                    field="structure",
-                    level=ValidationLevel.ERROR,
-                    message="JSON array items must be objects",
-                    suggestion="Each item should be a JSON object with key-value pairs",
-                    auto_fixable=False
-                ))
             
+        except JSONStructureError:
+            results.append(ValidationResult(
+                field="structure",
+                level=ValidationLevel.ERROR,
+                message="JSON file must contain an array of objects",
+                suggestion="Wrap your data in a JSON array: [{...}, {...}]",
+                auto_fixable=False
+            ))
         except json.JSONDecodeError as e:
             results.append(ValidationResult(
                 field="format",
@@ -459,15 +1702,39 @@ class DatasetService:
         
         return results
     
-    def _validate_jsonl(self, file_path: str) -> List[ValidationResult]:
+    def _validate_jsonl(
+        self,
+        file_path: str,
+        stats: Optional[_StreamingStatistics] = None
+    ) -> List[ValidationResult]:
         """Validate JSONL format"""
         results = []
         
         try:
+            num_lines = 0
+            invalid_lines = 0
+            
             with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+                for i, line in enumerate(f, start=1):
+                    num_lines = i
+                    line = line.strip()
+                    if not line:
+                        continue
+                    
+                    try:
+                        obj = json.loads(line)
+                        if not isinstance(obj, dict):
+                            invalid_lines += 1
+                            if invalid_lines <= 3:
+                                results.append(self._record_issue_result("structure", i))
+                        elif stats is not None:
+                            stats.add(self._extract_text_from_sample(obj))
+                    except json.JSONDecodeError:
+                        invalid_lines += 1
+                        if invalid_lines <= 3:
+                            results.append(self._record_issue_result("syntax", i))
             
-            if len(lines) == 0:
+            if num_lines == 0:
                 results.append(ValidationResult(
                     field="data",
                     level=ValidationLevel.ERROR,
@@ -477,66 +1744,122 @@ class DatasetService:
                 ))
                 return results
             
-            invalid_lines = []
-            for i, line in enumerate(lines, start=1):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                try:
-                    obj = json.loads(line)
-                    if not isinstance(obj, dict):
-                        invalid_lines.append(i)
-                        if len(invalid_lines) <= 3:
-                            results.append(ValidationResult(
-                                field="structure",
-                                level=ValidationLevel.ERROR,
-                                message=f"Line {i} is not a JSON object",
-                                suggestion="Each line must be a valid JSON object",
-                                auto_fixable=False,
-                                line_number=i
-                            ))
-                except json.JSONDecodeError:
-                    invalid_lines.append(i)
-                    if len(invalid_lines) <= 3:
-                        results.append(ValidationResult(
-                            field="format",
-                            level=ValidationLevel.ERROR,
-                            message=f"Line {i} has invalid JSON syntax",
-                            suggestion="Fix JSON syntax on this line",
-                            auto_fixable=False,
-                            line_number=i
-                        ))
-            
-            if len(invalid_lines) > 3:
-                results.append(ValidationResult(
-                    field="format",
-                    level=ValidationLevel.ERROR,
-                    message=f"Found {len(invalid_lines)} lines with invalid JSON",
-                    suggestion="Fix all JSON syntax errors in the file",
-                    auto_fixable=False
-                ))
+            if invalid_lines > 3:
+                results.append(self._record_issue_summary("invalid", invalid_lines))
         
         except Exception as e:
-            results.append(ValidationResult(
+            results.append(self._read_error_result(DatasetFormat.JSONL, str(e)))
+        
+        return results
+    
+    def _csv_column_results(self, fieldnames: List[str]) -> List[ValidationResult]:
+        """Check CSV headers for a recognizable text column"""
+        has_text_field = any(
+            field.lower() in ['text', 'content', 'input', 'prompt', 'instruction']
+            for field in fieldnames
+        )
+        
+        if has_text_field:
+            return []
+        
+        return [ValidationResult(
+            field="columns",
+            level=ValidationLevel.WARNING,
+            message="No standard text field found (text, content, input, prompt, instruction)",
+            suggestion="Ensure your CSV has a column containing the training text",
+            auto_fixable=False
+        )]
+    
+    def _record_issue_result(self, kind: str, line_number: int) -> ValidationResult:
+        """Result for one bad JSONL line ("structure", "syntax") or empty CSV row ("empty")"""
+        if kind == "structure":
+            return ValidationResult(
+                field="structure",
+                level=ValidationLevel.ERROR,
+                message=f"Line {line_number} is not a JSON object",
+                suggestion="Each line must be a valid JSON object",
+                auto_fixable=False,
+                line_number=line_number
+            )
+        if kind == "syntax":
+            return ValidationResult(
+                field="format",
+                level=ValidationLevel.ERROR,
+                message=f"Line {line_number} has invalid JSON syntax",
+                suggestion="Fix JSON syntax on this line",
+                auto_fixable=False,
+                line_number=line_number
+            )
+        return ValidationResult(
+            field="data",
+            level=ValidationLevel.WARNING,
+            message=f"Empty row found",
+            suggestion="Remove empty rows from the dataset",
+            auto_fixable=True,
+            line_number=line_number
+        )
+    
+    def _record_issue_summary(self, kind: str, count: int) -> ValidationResult:
+        """Summary for invalid JSONL lines ("invalid") or empty CSV rows ("empty")"""
+        if kind == "invalid":
+            return ValidationResult(
                 field="format",
                 level=ValidationLevel.ERROR,
-                message=f"Error reading JSONL file: {str(e)}",
-                suggestion="Check file encoding",
+                message=f"Found {count} lines with invalid JSON",
+                suggestion="Fix all JSON syntax errors in the file",
                 auto_fixable=False
-            ))
-        
-        return results
+            )
+        return ValidationResult(
+            field="data",
+            level=ValidationLevel.WARNING,
+            message=f"Found {count} empty rows total",
+            suggestion="Remove all empty rows from the dataset",
+            auto_fixable=True
+        )
+    
+    def _read_error_result(self, format: DatasetFormat, error: str) -> ValidationResult:
+        """Result for a JSONL or CSV file that could not be read"""
+        if format == DatasetFormat.CSV:
+            return ValidationResult(
+                field="format",
+                level=ValidationLevel.ERROR,
+                message=f"Error reading CSV file: {error}",
+                suggestion="Check file encoding and CSV format",
+                auto_fixable=False
+            )
+        return ValidationResult(
+            field="format",
+            level=ValidationLevel.ERROR,
+            message=f"Error reading JSONL file: {error}",
+            suggestion="Check file encoding",
+            auto_fixable=False
+        )
     
-    def _validate_txt(self, file_path: str) -> List[ValidationResult]:
+    def _validate_txt(
+        self,
+        file_path: str,
+        stats: Optional[_StreamingStatistics] = None
+    ) -> List[ValidationResult]:
         """Validate TXT format"""
         results = []
         
         try:
+            # Line count as produced by content.split('\n')
+            num_lines = 1
+            has_content = False
+            
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+                for line in f:
+                    if line.endswith('\n'):
+                        num_lines += 1
+                    
+                    text = line.strip()
+                    if text:
+                        has_content = True
+                        if stats is not None:
+                            stats.add(text)
             
-            if not content.strip():
+            if not has_content:
                 results.append(ValidationResult(
                     field="data",
                     level=ValidationLevel.ERROR,
@@ -547,12 +1870,11 @@ class DatasetService:
                 return results
             
             # Check for reasonable line breaks
-            lines = content.split('\n')
-            if len(lines) < 10:
+            if num_lines < 10:
                 results.append(ValidationResult(
                     field="structure",
                     level=ValidationLevel.WARNING,
-                    message=f"File has only {len(lines)} lines",
+                    message=f"File has only {num_lines} lines",
                     suggestion="For better training, consider having more samples (one per line or paragraph)",
                     auto_fixable=False
                 ))
@@ -611,7 +1933,8 @@ class DatasetService:
     def analyze_statistics(
         self,
         file_path: str,
-        format: Optional[DatasetFormat] = None
+        format: Optional[DatasetFormat] = None,
+        tokenizer_name: Optional[str] = None
     ) -> DatasetStatistics:
         """
         Analyze dataset statistics.
@@ -619,6 +1942,7 @@ class DatasetService:
         Args:
             file_path: Path to the dataset file
             format: Optional format hint
+            tokenizer_name: Model ID or path of a tokenizer for exact token counts
             
         Returns:
             DatasetStatistics object
@@ -626,94 +1950,229 @@ class DatasetService:
         if format is None:
             format = self.detect_format(file_path)
         
-        samples = self._load_samples(file_path, format)
-        
-        if not samples:
-            return DatasetStatistics(
-                num_samples=0,
-                total_tokens=0,
-                avg_tokens_per_sample=0.0,
-                min_tokens=0,
-                max_tokens=0,
-                token_length_distribution={},
-                avg_chars_per_sample=0.0,
-                empty_samples=0,
-                duplicate_samples=0,
-                unique_samples=0
-            )
-        
-        # Extract text from samples
-        texts = []
-        for sample in samples:
-            text = self._extract_text_from_sample(sample)
-            texts.append(text)
-        
-        # Calculate statistics
-        token_counts = [self._estimate_token_count(text) for text in texts]
-        char_counts = [len(text) for text in texts]
-        
-        # Token length distribution
-        distribution = {
-            "0-100": sum(1 for t in token_counts if 0 <= t < 100),
-            "100-500": sum(1 for t in token_counts if 100 <= t < 500),
-            "500-1000": sum(1 for t in token_counts if 500 <= t < 1000),
-            "1000+": sum(1 for t in token_counts if t >= 1000)
-        }
-        
-        # Duplicates
-        text_counter = Counter(texts)
-        duplicates = sum(count - 1 for count in text_counter.values() if count > 1)
-        unique = len(text_counter)
-        
-        # Empty samples
-        empty = sum(1 for text in texts if not text.strip())
-        
-        return DatasetStatistics(
-            num_samples=len(samples),
-            total_tokens=sum(token_counts),
-            avg_tokens_per_sample=sum(token_counts) / len(token_counts) if token_counts else 0.0,
-            min_tokens=min(token_counts) if token_counts else 0,
-            max_tokens=max(token_counts) if token_counts else 0,
-            token_length_distribution=distribution,
-            avg_chars_per_sample=sum(char_counts) / len(char_counts) if char_counts else 0.0,
-            empty_samples=empty,
-            duplicate_samples=duplicates,
-            unique_samples=unique
+        stats = _StreamingStatistics(
+            self._estimate_token_count,
+            token_counter=self._token_counter(file_path, tokenizer_name)
         )
+        self._scan(file_path, format, stats)
+        
+        return stats.finalize()
     
     def generate_preview(
         self,
         file_path: str,
         format: Optional[DatasetFormat] = None,
-        num_samples: int = 5
+        num_samples: int = 5,
+        offset: int = 0
     ) -> DatasetPreview:
         """
         Generate a preview of the dataset.
         
+        JSONL, TXT and CSV previews are served from the persistent offset
+        index, so paging to any offset is a direct seek.
+        
         Args:
             file_path: Path to the dataset file
             format: Optional format hint
             num_samples: Number of samples to include in preview
-            
+            offset: Index of the first sample to include
+        
         Returns:
             DatasetPreview object
         """
         if format is None:
             format = self.detect_format(file_path)
         
-        samples = self._load_samples(file_path, format, limit=num_samples)
+        index = self.get_dataset_index(file_path, format)
+        if index is not None:
+            try:
+                samples = index.read_range(offset, num_samples)
+            except Exception as e:
+                logger.error(f"Error loading samples: {str(e)}")
+                samples = []
+            
+            return DatasetPreview(
+                samples=samples,
+                total_count=len(index),
+                format=format
+            )
+        
+        samples = self._load_samples(file_path, format, limit=offset + num_samples)
         total_count = self._count_samples(file_path, format)
         
         return DatasetPreview(
-            samples=samples,
+            samples=samples[offset:],
             total_count=total_count,
             format=format
         )
     
-    def check_quality(
+    def sample_dataset(
+        self,
+        file_path: str,
+        num_samples: int = 5,
+        format: Optional[DatasetFormat] = None,
+        seed: Optional[int] = None
+    ) -> DatasetPreview:
+        """
+        Draw a uniform random sample of records from the dataset.
+        
+        Args:
+            file_path: Path to the dataset file
+            num_samples: Number of samples to draw
+            format: Optional format hint
+            seed: Optional random seed for reproducible samples
+        
+        Returns:
+            DatasetPreview object
+        """
+        if format is None:
+            format = self.detect_format(file_path)
+        
+        index = self.get_dataset_index(file_path, format)
+        if index is not None:
+            try:
+                samples = index.sample(num_samples, seed=seed)
+            except Exception as e:
+                logger.error(f"Error sampling dataset: {str(e)}")
+                samples = []
+            
+            return DatasetPreview(
+                samples=samples,
+                total_count=len(index),
+                format=format
+            )
+        
+        # Formats without an offset index fall back to reservoir sampling
+        rng = random.Random(seed)
+        reservoir: List[Dict[str, Any]] = []
+        total_count = 0
+        try:
+            for total_count, sample in enumerate(self._iter_samples(file_path, format), start=1):
+                if len(reservoir) < num_samples:
+                    reservoir.append(sample)
+                else:
+                    j = rng.randrange(total_count)
+                    if j < num_samples:
+                        reservoir[j] = sample
+        except Exception as e:
+            logger.error(f"Error sampling dataset: {str(e)}")
+        
+        return DatasetPreview(
+            samples=reservoir,
+            total_count=total_count,
+            format=format
+        )
+    
+    def get_dataset_index(
         self,
         file_path: str,
         format: Optional[DatasetFormat] = None
+    ) -> Optional[DatasetIndex]:
+        """
+        Get the offset index for a dataset, building it on first use.
+        
+        Args:
+            file_path: Path to the dataset file
+            format: Optional format hint
+        
+        Returns:
+            DatasetIndex, or None if the format is not indexable or indexing failed
+        """
+        if format is None:
+            format = self.detect_format(file_path)
+        
+        if format not in DatasetIndex.SUPPORTED_FORMATS:
+            return None
+        
+        key = (str(Path(file_path).resolve()), format)
+        with self._indexes_lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                if index.is_current():
+                    self._indexes.move_to_end(key)
+                    return index
+                del self._indexes[key]
+                index.close()
+        
+        # Build outside the lock; a concurrent builder of the same index
+        # writes its own temp files and the first one cached is kept
+        try:
+            index = DatasetIndex(file_path, format, self._get_index_dir())
+        except Exception as e:
+            logger.error(f"Error building dataset index: {str(e)}")
+            return None
+        
+        evicted = []
+        with self._indexes_lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached.is_current():
+                evicted.append(index)
+                index = cached
+            else:
+                if cached is not None:
+                    evicted.append(cached)
+                self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > _MAX_OPEN_INDEXES:
+                evicted.append(self._indexes.popitem(last=False)[1])
+        
+        for stale in evicted:
+            stale.close()
+        return index
+    
+    def close_indexes(self):
+        """Close every cached offset index, releasing file handles and mmaps"""
+        with self._indexes_lock:
+            indexes = list(self._indexes.values())
+            self._indexes.clear()
+        for index in indexes:
+            index.close()
+    
+    def _get_index_dir(self) -> Path:
+        """Offset indexes are stored beside the application database"""
+        if self._index_dir is None:
+            from runtime_paths import get_data_dir
+            self._index_dir = get_data_dir() / 'dataset_index'
+            self._prune_index_dir(self._index_dir)
+        return self._index_dir
+    
+    def _prune_index_dir(self, index_dir: Path):
+        """Remove persisted indexes whose dataset file no longer exists"""
+        if not index_dir.is_dir():
+            return
+        
+        for meta_path in index_dir.glob('*.json'):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    source = json.load(f).get("path")
+                if source and os.path.exists(source):
+                    continue
+                meta_path.unlink()
+                meta_path.with_suffix('.npy').unlink(missing_ok=True)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not prune dataset index {meta_path}: {str(e)}")
+    
+    def _token_counter(self, file_path: str, tokenizer_name: Optional[str]):
+        """Token counter for one scan, or None to keep the heuristic estimate"""
+        if not tokenizer_name:
+            return None
+        
+        if self._tokenization_service is None:
+            from services.tokenization_service import get_tokenization_service
+            self._tokenization_service = get_tokenization_service()
+        
+        try:
+            return self._tokenization_service.token_counter(tokenizer_name, file_path)
+        except Exception as e:
+            logger.warning(f"Tokenizer counting unavailable, using estimates: {str(e)}")
+            return None
+    
+    def check_quality(
+        self,
+        file_path: str,
+        format: Optional[DatasetFormat] = None,
+        detect_near_duplicates: bool = True,
+        tokenizer_name: Optional[str] = None
     ) -> QualityReport:
         """
         Perform comprehensive quality check on dataset.
@@ -721,6 +2180,8 @@ class DatasetService:
         Args:
             file_path: Path to the dataset file
             format: Optional format hint
+            detect_near_duplicates: Include MinHash/LSH near-duplicate clusters
+            tokenizer_name: Model ID or path of a tokenizer for exact token counts
             
         Returns:
             QualityReport object
@@ -728,11 +2189,15 @@ class DatasetService:
         if format is None:
             format = self.detect_format(file_path)
         
-        # Run validation
-        issues = self.validate_dataset(file_path, format)
-        
-        # Get statistics
-        stats = self.analyze_statistics(file_path, format)
+        # Run validation and gather statistics in a single pass
+        scan = self.scan_dataset(
+            file_path,
+            format,
+            detect_near_duplicates=detect_near_duplicates,
+            tokenizer_name=tokenizer_name
+        )
+        issues = scan.issues
+        stats = scan.statistics
         
         # Calculate quality score
         score = 100.0
@@ -761,6 +2226,16 @@ class DatasetService:
                 "Consider removing duplicate samples"
             )
         
+        # Check for near-duplicates that exact matching misses
+        duplicates = scan.duplicates
+        if duplicates and duplicates.near_duplicate_samples > stats.num_samples * 0.1:
+            score -= 5
+            recommendations.append(
+                f"Found {duplicates.near_duplicate_samples} near-duplicate samples in "
+                f"{duplicates.near_duplicate_clusters} clusters. "
+                "Export a deduplicated copy of the dataset before training"
+            )
+        
         # Check for empty samples
         if stats.empty_samples > 0:
             score -= 5
@@ -781,6 +2256,12 @@ class DatasetService:
                 "They may be truncated during training"
             )
         
+        if stats.token_count_method == "heuristic" and tokenizer_name:
+            recommendations.append(
+                f"Could not load tokenizer '{tokenizer_name}'; token counts are "
+                "estimated from character length and may be inaccurate"
+            )
+        
         # Ensure score is in valid range
         score = max(0.0, min(100.0, score))
         
@@ -798,56 +2279,150 @@ class DatasetService:
             overall_score=score,
             issues=issues,
             recommendations=recommendations,
-            is_ready_for_training=is_ready
+            is_ready_for_training=is_ready,
+            duplicates=duplicates
         )
     
-    def _load_samples(
+    def export_deduplicated(
         self,
         file_path: str,
-        format: DatasetFormat,
-        limit: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
-        """Load samples from dataset file"""
-        samples = []
+        output_path: str,
+        format: Optional[DatasetFormat] = None,
+        threshold: float = 0.8
+    ) -> DuplicateReport:
+        """
+        Write a copy of the dataset keeping one sample per duplicate cluster.
+        
+        Exact and near-duplicates (estimated Jaccard similarity at or above
+        threshold) are dropped; the first occurrence of each cluster is kept
+        and the output uses the same format as the input.
+        
+        Args:
+            file_path: Path to the dataset file
+            output_path: Path for the deduplicated dataset
+            format: Optional format hint
+            threshold: Minimum similarity for samples to count as duplicates
+            
+        Returns:
+            DuplicateReport describing what was removed
+        """
+        if format is None:
+            format = self.detect_format(file_path)
+        
+        if format == DatasetFormat.UNKNOWN:
+            raise ValueError(f"Could not detect dataset format: {file_path}")
         
+        detector = NearDuplicateDetector(threshold=threshold)
         try:
+            for sample in self._iter_valid_samples(file_path, format):
+                detector.add(self._extract_text_from_sample(sample))
+            report = detector.finalize()
+            duplicate = detector.duplicate_mask()
+        finally:
+            detector.close()
+        
+        kept = (
+            sample for i, sample in enumerate(self._iter_valid_samples(file_path, format))
+            if not duplicate[i]
+        )
+        self._write_samples(output_path, format, kept)
+        
+        logger.info(
+            f"Exported deduplicated dataset to {output_path}: "
+            f"removed {report.removable_samples} of {report.num_samples} samples"
+        )
+        return report
+    
+    def _write_samples(self, output_path: str, format: DatasetFormat, samples: Iterator[Dict[str, Any]]):
+        """Stream samples to a file in the given format"""
+        newline = '' if format == DatasetFormat.CSV else None
+        with open(output_path, 'w', encoding='utf-8', newline=newline) as f:
             if format == DatasetFormat.CSV:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for i, row in enumerate(reader):
-                        if limit and i >= limit:
-                            break
-                        samples.append(dict(row))
+                writer = None
+                for sample in samples:
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(sample.keys()))
+                        writer.writeheader()
+                    writer.writerow(sample)
             
             elif format == DatasetFormat.JSON:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                if isinstance(data, list):
-                    samples = data[:limit] if limit else data
+                f.write('[')
+                for i, sample in enumerate(samples):
+                    f.write(',\n' if i else '\n')
+                    f.write(json.dumps(sample, ensure_ascii=False))
+                f.write('\n]\n')
             
             elif format == DatasetFormat.JSONL:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    for i, line in enumerate(f):
-                        if limit and i >= limit:
-                            break
-                        line = line.strip()
-                        if line:
-                            samples.append(json.loads(line))
+                for sample in samples:
+                    f.write(json.dumps(sample, ensure_ascii=False) + '\n')
             
             elif format == DatasetFormat.TXT:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                for i, line in enumerate(lines):
-                    if limit and i >= limit:
-                        break
-                    if line.strip():
-                        samples.append({"text": line.strip()})
+                for sample in samples:
+                    f.write(sample["text"] + '\n')
+    
+    def _load_samples(
+        self,
+        file_path: str,
+        format: DatasetFormat,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Load samples from dataset file"""
+        samples = []
         
+        try:
+            samples.extend(islice(self._iter_samples(file_path, format), limit or None))
         except Exception as e:
             logger.error(f"Error loading samples: {str(e)}")
         
         return samples
     
+    def _iter_samples(self, file_path: str, format: DatasetFormat) -> Iterator[Dict[str, Any]]:
+        """Lazily yield samples from dataset file, one at a time"""
+        if format == DatasetFormat.CSV:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    yield dict(row)
+        
+        elif format == DatasetFormat.JSON:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                try:
+                    yield from iter_json_array(f)
+                except JSONStructureError:
+                    return
+        
+        elif format == DatasetFormat.JSONL:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+        
+        elif format == DatasetFormat.TXT:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield {"text": line.strip()}
+    
+    def _iter_valid_samples(self, file_path: str, format: DatasetFormat) -> Iterator[Dict[str, Any]]:
+        """Yield samples in scan order, skipping records that fail validation"""
+        if format == DatasetFormat.JSONL:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        obj = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(obj, dict):
+                        yield obj
+            return
+        
+        for sample in self._iter_samples(file_path, format):
+            if isinstance(sample, dict):
+                yield sample
+    
     def _count_samples(self, file_path: str, format: DatasetFormat) -> int:
         """Count total number of samples in dataset"""
         try:
@@ -857,8 +2432,7 @@ class DatasetService:
             
             elif format == DatasetFormat.JSON:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return len(data) if isinstance(data, list) else 0
+                    return sum(1 for _ in iter_json_array(f))
             
             elif format == DatasetFormat.JSONL:
                 with open(file_path, 'r', encoding='utf-8') as f:
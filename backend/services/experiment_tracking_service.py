@@ -209,7 +209,13 @@ class ExperimentTrackingService:
             return False
     
     async def _flush_metrics(self, job_id: str):
-        """Flush buffered metrics to tracker."""
+        """
+        Flush buffered metrics to tracker.
+        
+        Connectors with log_metrics_batch receive the whole buffer in one
+        call and ship it as a single bulk request; others get one
+        log_metrics call per entry.
+        """
         if job_id not in self._metric_buffer:
             return
         
@@ -225,13 +231,15 @@ class ExperimentTrackingService:
         tracker_job_id = exp_info["tracker_job_id"]
         
         try:
-            # Log all buffered metrics
-            for entry in buffer:
-                await connector.log_metrics(
-                    tracker_job_id,
-                    entry["metrics"],
-                    entry["step"]
-                )
+            if hasattr(connector, "log_metrics_batch"):
+                await connector.log_metrics_batch(tracker_job_id, list(buffer))
+            else:
+                for entry in buffer:
+                    await connector.log_metrics(
+                        tracker_job_id,
+                        entry["metrics"],
+                        entry["step"]
+                    )
             
             # Clear buffer
             buffer.clear()
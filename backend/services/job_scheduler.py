@@ -0,0 +1,540 @@
+"""
+Resource-aware scheduling of local training jobs.
+
+Each local job declares what it holds while it runs (GPU memory, CPU
+cores, RAM) in a ResourceRequest; needs left unset on the config are
+estimated from the model size and precision with the SmartConfigEngine
+memory model. The scheduler admits a job only when its request fits what
+the admitted jobs leave of the hardware profile, placing its GPU memory
+on a single device. Jobs that do not fit wait in a queue ordered by a
+policy:
+
+- ``fifo``: highest priority first, then submission order.
+- ``fair``: highest priority first, then the owner holding the smallest
+  dominant share (the largest fraction of any one resource held by the
+  owner's admitted jobs), then submission order.
+
+A smaller job never overtakes the queue head, so large jobs are not
+starved, and a job too large for the whole machine runs alone once
+nothing else is admitted. Queued jobs get an estimated start time by
+replaying the policy against the expected finish times of admitted jobs.
+
+Capacity is the total memory of each GPU and of RAM times the
+SmartConfigEngine safety margin, and the logical core count. On a machine
+without GPUs a job's GPU memory is placed in RAM, where it trains on the
+CPU.
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import heapq
+import itertools
+import logging
+import math
+import platform
+import re
+import threading
+import time
+
+from .smart_config_service import PrecisionType, SmartConfigEngine
+
+logger = logging.getLogger(__name__)
+
+# Supported queue orderings
+SCHEDULING_POLICIES = ('fifo', 'fair')
+
+# Owner of jobs that do not name one
+DEFAULT_OWNER = "default"
+
+# Seconds per step assumed until a job has reported progress
+DEFAULT_STEP_SECONDS = 1.5
+
+# Host RAM a job needs besides its model weights (data loading, tokenizer, interpreter)
+JOB_BASE_RAM_MB = 1024
+
+# Parameters assumed for a model whose name does not state its size
+DEFAULT_MODEL_PARAMETERS = 1_000_000_000
+
+# Parameter counts of common models whose names do not state their size
+KNOWN_MODEL_PARAMETERS = {
+    'distilgpt2': 82_000_000,
+    'gpt2': 124_000_000,
+    'gpt2-medium': 355_000_000,
+    'gpt2-large': 774_000_000,
+    'gpt2-xl': 1_500_000_000,
+}
+
+# A size such as "7b", "1.5B" or "350m" in a model name
+_SIZE_PATTERN = re.compile(r'(?<![\w.])(\d+(?:\.\d+)?)([bm])(?![a-z])', re.IGNORECASE)
+
+_MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ResourceRequest:
+    """Resources a job holds while it runs"""
+    gpu_memory_mb: int = 0
+    cpu_cores: int = 1
+    ram_mb: int = 0
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Resources granted to an admitted job; gpu_id is None when it uses no GPU"""
+    gpu_id: Optional[int]
+    gpu_memory_mb: int
+    cpu_cores: int
+    ram_mb: int
+
+
+@dataclass(frozen=True)
+class Capacity:
+    """Schedulable resources of a machine"""
+    gpu_memory_mb: Tuple[int, ...]
+    cpu_cores: int
+    ram_mb: int
+
+    @classmethod
+    def from_profile(cls, profile: Any, margin: float = SmartConfigEngine.MEMORY_SAFETY_MARGIN) -> 'Capacity':
+        """
+        Args:
+            profile: HardwareProfile of the machine
+            margin: Fraction of each memory pool that may be scheduled
+
+        Returns:
+            Capacity of the profile
+        """
+        return cls(
+            gpu_memory_mb=tuple(int(gpu.memory_total / _MB * margin) for gpu in profile.gpus),
+            cpu_cores=max(1, profile.cpu.cores_logical),
+            ram_mb=int(profile.ram.total / _MB * margin)
+        )
+
+
+@dataclass
+class ScheduledJob:
+    """A job known to the scheduler, queued or admitted"""
+    job_id: str
+    request: ResourceRequest
+    priority: int
+    owner: str
+    total_steps: int
+    start_step: int
+    sequence: int
+    submitted_at: float
+    admitted_at: Optional[float] = None
+    placement: Optional[Placement] = None
+
+
+def model_parameters(model_name: str) -> int:
+    """
+    Estimate a model's parameter count from its name.
+
+    Args:
+        model_name: Model name or Hugging Face repository id
+
+    Returns:
+        Parameter count
+    """
+    name = model_name.rsplit('/', 1)[-1].lower()
+    if name in KNOWN_MODEL_PARAMETERS:
+        return KNOWN_MODEL_PARAMETERS[name]
+    match = _SIZE_PATTERN.search(name)
+    if match is None:
+        return DEFAULT_MODEL_PARAMETERS
+    scale = 1_000_000_000 if match.group(2).lower() == 'b' else 1_000_000
+    return int(float(match.group(1)) * scale)
+
+
+def estimate_resources(config: Any) -> ResourceRequest:
+    """
+    Resources a training job needs; needs set on the config are kept.
+
+    GPU memory follows SmartConfigEngine: weights times the precision's
+    overhead multiplier (gradients, optimizer states), plus activations of
+    about 10% of the model per sample in the batch.
+
+    Args:
+        config: TrainingConfig of the job
+
+    Returns:
+        ResourceRequest of the job
+    """
+    quantization = (config.quantization or '').lower()
+    if quantization in ('4bit', 'int4') or config.peft_method == 'qlora':
+        precision = PrecisionType.INT4
+    elif quantization in ('8bit', 'int8'):
+        precision = PrecisionType.INT8
+    else:
+        try:
+            precision = PrecisionType(config.precision)
+        except ValueError:
+            precision = PrecisionType.FP16
+
+    model_mb = model_parameters(config.model_name) * SmartConfigEngine.BYTES_PER_PARAM[precision] / _MB
+    overhead = SmartConfigEngine.MEMORY_OVERHEAD_MULTIPLIER[precision]
+    gpu_memory_mb = model_mb * overhead * (1 + 0.1 * max(1, config.batch_size))
+
+    return ResourceRequest(
+        gpu_memory_mb=config.gpu_memory_mb if config.gpu_memory_mb is not None else math.ceil(gpu_memory_mb),
+        cpu_cores=max(0, config.cpu_cores),
+        ram_mb=config.ram_mb if config.ram_mb is not None else math.ceil(model_mb) + JOB_BASE_RAM_MB
+    )
+
+
+def simulated_profile(
+    gpu_memory_mb: Sequence[int] = (),
+    cpu_cores: int = 8,
+    ram_mb: int = 32768
+) -> Any:
+    """
+    HardwareProfile of an imaginary machine, for capacity planning and tests.
+
+    Args:
+        gpu_memory_mb: Memory of each GPU in MB (none for a CPU-only machine)
+        cpu_cores: Logical CPU cores
+        ram_mb: System RAM in MB
+
+    Returns:
+        HardwareProfile
+    """
+    from .hardware_service import CPUInfo, GPUInfo, HardwareProfile, RAMInfo
+
+    gpus = [
+        GPUInfo(
+            id=index, name="Simulated GPU", memory_total=memory * _MB, memory_available=memory * _MB,
+            memory_used=0, compute_capability="8.0", cuda_version="simulated"
+        )
+        for index, memory in enumerate(gpu_memory_mb)
+    ]
+    return HardwareProfile(
+        gpus=gpus,
+        cpu=CPUInfo(cores_physical=cpu_cores, cores_logical=cpu_cores, frequency_mhz=0.0,
+                    architecture="simulated", utilization=0.0),
+        ram=RAMInfo(total=ram_mb * _MB, available=ram_mb * _MB, used=0, percent_used=0.0),
+        platform="simulated",
+        python_version=platform.python_version(),
+        torch_version="simulated",
+        cuda_available=bool(gpus),
+        timestamp=datetime.now()
+    )
+
+
+def _live_profile() -> Any:
+    from .hardware_service import get_hardware_service
+
+    return get_hardware_service().get_hardware_profile()
+
+
+def place(
+    capacity: Capacity,
+    allocations: Sequence[Placement],
+    request: ResourceRequest,
+    alone: bool = False
+) -> Optional[Placement]:
+    """
+    Place a request next to existing allocations.
+
+    GPU memory goes to the device with the least free memory that fits it
+    (best fit), or to RAM on a machine without GPUs.
+
+    Args:
+        capacity: Machine capacity
+        allocations: Placements of admitted jobs
+        request: Resources to place
+        alone: Grant the request even if it exceeds the capacity (no
+            allocations exist)
+
+    Returns:
+        Placement, or None if the request does not fit
+    """
+    gpu_memory_mb = request.gpu_memory_mb if capacity.gpu_memory_mb else 0
+    ram_mb = request.ram_mb + (0 if capacity.gpu_memory_mb else request.gpu_memory_mb)
+
+    free_gpu = list(capacity.gpu_memory_mb)
+    free_cores = capacity.cpu_cores
+    free_ram = capacity.ram_mb
+    for allocation in allocations:
+        if allocation.gpu_id is not None:
+            free_gpu[allocation.gpu_id] -= allocation.gpu_memory_mb
+        free_cores -= allocation.cpu_cores
+        free_ram -= allocation.ram_mb
+    if not alone and min([free_cores, free_ram] + free_gpu) < 0:
+        # An oversized job is running alone
+        return None
+
+    gpu_id = None
+    if gpu_memory_mb:
+        fitting = [(free, index) for index, free in enumerate(free_gpu) if free >= gpu_memory_mb]
+        if fitting:
+            gpu_id = min(fitting)[1]
+        elif alone:
+            gpu_id = max(range(len(free_gpu)), key=lambda index: free_gpu[index])
+        else:
+            return None
+    if not alone and (request.cpu_cores > free_cores or ram_mb > free_ram):
+        return None
+    return Placement(gpu_id=gpu_id, gpu_memory_mb=gpu_memory_mb, cpu_cores=request.cpu_cores, ram_mb=ram_mb)
+
+
+def dominant_share(capacity: Capacity, allocations: Sequence[Placement]) -> float:
+    """Largest fraction of any one resource held by the allocations"""
+    totals = (sum(capacity.gpu_memory_mb), capacity.cpu_cores, capacity.ram_mb)
+    held = (
+        sum(a.gpu_memory_mb for a in allocations),
+        sum(a.cpu_cores for a in allocations),
+        sum(a.ram_mb for a in allocations)
+    )
+    return max((used / total for used, total in zip(held, totals) if total > 0), default=0.0)
+
+
+def admit(
+    capacity: Capacity,
+    active: Dict[str, Tuple[str, Placement]],
+    waiting: List[ScheduledJob],
+    policy: str
+) -> List[Tuple[ScheduledJob, Placement]]:
+    """
+    Admit waiting jobs in policy order until the next one does not fit.
+
+    Admitted jobs are removed from waiting and added to active.
+
+    Args:
+        capacity: Machine capacity
+        active: (owner, placement) of each admitted job by job id
+        waiting: Queued jobs
+        policy: One of SCHEDULING_POLICIES
+
+    Returns:
+        (job, placement) of each newly admitted job, in admission order
+    """
+    admitted = []
+    while waiting:
+        if policy == 'fair':
+            held: Dict[str, List[Placement]] = {}
+            for owner, placement in active.values():
+                held.setdefault(owner, []).append(placement)
+            shares = {owner: dominant_share(capacity, placements) for owner, placements in held.items()}
+            job = min(waiting, key=lambda j: (-j.priority, shares.get(j.owner, 0.0), j.sequence))
+        else:
+            job = min(waiting, key=lambda j: (-j.priority, j.sequence))
+
+        placement = place(capacity, [p for _, p in active.values()], job.request, alone=not active)
+        if placement is None:
+            break
+        waiting.remove(job)
+        active[job.job_id] = (job.owner, placement)
+        admitted.append((job, placement))
+    return admitted
+
+
+class JobScheduler:
+    """
+    Admission control and queueing of local jobs against the hardware profile.
+
+    Admitted jobs are started through the launch function; callers release
+    a job's resources when it stops running (completes, fails, pauses or is
+    stopped), which admits the jobs waiting behind it.
+    """
+
+    def __init__(
+        self,
+        launch: Callable[[str], None],
+        profile_provider: Optional[Callable[[], Any]] = None,
+        policy: str = 'fifo',
+        progress: Optional[Callable[[str], Optional[int]]] = None,
+        margin: float = SmartConfigEngine.MEMORY_SAFETY_MARGIN
+    ):
+        """
+        Args:
+            launch: Starts an admitted job by id
+            profile_provider: Returns the current HardwareProfile (defaults
+                to the HardwareService profile)
+            policy: Queue ordering, one of SCHEDULING_POLICIES
+            progress: Returns the number of steps a job has completed, or
+                None if unknown; used for start time estimates
+            margin: Fraction of each memory pool that may be scheduled
+        """
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.launch = launch
+        self.profile_provider = profile_provider or _live_profile
+        self.policy = policy
+        self.progress = progress
+        self.margin = margin
+        self._lock = threading.RLock()
+        self._queued: List[ScheduledJob] = []
+        self._running: Dict[str, ScheduledJob] = {}
+        self._sequence = itertools.count()
+        self._step_seconds: Optional[float] = None
+
+    def capacity(self) -> Capacity:
+        """Capacity of the current hardware profile"""
+        return Capacity.from_profile(self.profile_provider(), self.margin)
+
+    def submit(
+        self,
+        job_id: str,
+        request: ResourceRequest,
+        priority: int = 0,
+        owner: str = DEFAULT_OWNER,
+        total_steps: int = 0,
+        start_step: int = 0
+    ) -> bool:
+        """
+        Queue a job and admit whatever fits.
+
+        Args:
+            job_id: Job identifier
+            request: Resources the job holds while it runs
+            priority: Jobs with a higher priority are admitted first
+            owner: User or team the job counts against under fair share
+            total_steps: Total training steps, for start time estimates
+            start_step: First step of this run (after resuming)
+
+        Returns:
+            True if the job was admitted (and launched) immediately
+        """
+        with self._lock:
+            if job_id in self._running or any(job.job_id == job_id for job in self._queued):
+                raise ValueError(f"Job already scheduled: {job_id}")
+            self._queued.append(ScheduledJob(
+                job_id=job_id,
+                request=request,
+                priority=priority,
+                owner=owner,
+                total_steps=total_steps,
+                start_step=start_step,
+                sequence=next(self._sequence),
+                submitted_at=time.monotonic()
+            ))
+        return job_id in self._schedule()
+
+    def release(self, job_id: str) -> None:
+        """
+        Return an admitted job's resources and admit the jobs that now fit.
+
+        Args:
+            job_id: Job identifier; unknown jobs are ignored
+        """
+        with self._lock:
+            job = self._running.pop(job_id, None)
+            if job is None:
+                return
+            seconds = self._measured_step_seconds(job, time.monotonic())
+            if seconds is not None:
+                self._step_seconds = seconds
+        self._schedule()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Remove a queued job.
+
+        Returns:
+            True if the job was waiting in the queue
+        """
+        with self._lock:
+            for job in self._queued:
+                if job.job_id == job_id:
+                    self._queued.remove(job)
+                    return True
+        return False
+
+    def is_queued(self, job_id: str) -> bool:
+        """Whether a job is waiting for resources"""
+        with self._lock:
+            return any(job.job_id == job_id for job in self._queued)
+
+    def _schedule(self) -> List[str]:
+        with self._lock:
+            if not self._queued:
+                return []
+            capacity = self.capacity()
+            active = {job_id: (job.owner, job.placement) for job_id, job in self._running.items()}
+            admitted = admit(capacity, active, self._queued, self.policy)
+            now = time.monotonic()
+            for job, placement in admitted:
+                job.admitted_at = now
+                job.placement = placement
+                self._running[job.job_id] = job
+
+        # Launch outside the lock: a launched job may finish and release at once
+        for job, _ in admitted:
+            logger.info(f"Admitted job {job.job_id} ({job.placement})")
+            try:
+                self.launch(job.job_id)
+            except Exception as e:
+                logger.error(f"Failed to launch job {job.job_id}: {e}")
+                self.release(job.job_id)
+        return [job.job_id for job, _ in admitted]
+
+    def _measured_step_seconds(self, job: ScheduledJob, now: float) -> Optional[float]:
+        done = self.progress(job.job_id) if self.progress else None
+        if done is None or done <= job.start_step or job.admitted_at is None:
+            return None
+        return (now - job.admitted_at) / (done - job.start_step)
+
+    def _remaining_seconds(self, job: ScheduledJob, now: float, step_seconds: float) -> float:
+        done = self.progress(job.job_id) if self.progress else None
+        measured = self._measured_step_seconds(job, now)
+        if done is None or measured is None:
+            elapsed = now - job.admitted_at if job.admitted_at is not None else 0.0
+            return max(0.0, (job.total_steps - job.start_step) * step_seconds - elapsed)
+        return max(0.0, (job.total_steps - done) * measured)
+
+    def estimate_start_times(self) -> Dict[str, float]:
+        """
+        Seconds from now until each queued job is expected to start.
+
+        Admitted jobs finish after their remaining steps at their measured
+        step time; queued jobs are expected to take the step time last
+        measured (DEFAULT_STEP_SECONDS before any measurement).
+
+        Returns:
+            Estimated seconds until start by job id, for queued jobs
+        """
+        with self._lock:
+            now = time.monotonic()
+            capacity = self.capacity()
+            measured = [s for s in (self._measured_step_seconds(j, now) for j in self._running.values())
+                        if s is not None]
+            step_seconds = (sum(measured) / len(measured) if measured
+                            else self._step_seconds or DEFAULT_STEP_SECONDS)
+            active = {job_id: (job.owner, job.placement) for job_id, job in self._running.items()}
+            finishing = [(self._remaining_seconds(job, now, step_seconds), job_id)
+                         for job_id, job in self._running.items()]
+            waiting = list(self._queued)
+
+        heapq.heapify(finishing)
+        starts: Dict[str, float] = {}
+        clock = 0.0
+        while waiting:
+            for job, _ in admit(capacity, active, waiting, self.policy):
+                starts[job.job_id] = clock
+                duration = max(0, job.total_steps - job.start_step) * step_seconds
+                heapq.heappush(finishing, (clock + duration, job.job_id))
+            if not waiting or not finishing:
+                break
+            clock = finishing[0][0]
+            while finishing and finishing[0][0] <= clock:
+                active.pop(heapq.heappop(finishing)[1], None)
+        return starts
+
+    def get_status(self) -> Dict[str, Any]:
+        """Policy, capacity, admitted jobs and the queue with start time estimates"""
+        starts = self.estimate_start_times()
+        with self._lock:
+            capacity = self.capacity()
+            running = [
+                {'job_id': job.job_id, 'owner': job.owner, 'priority': job.priority,
+                 'placement': asdict(job.placement)}
+                for job in self._running.values()
+            ]
+            order = sorted(self._queued, key=lambda j: (j.job_id not in starts, starts.get(j.job_id, 0.0), j.sequence))
+            queued = [
+                {'job_id': job.job_id, 'position': position, 'owner': job.owner, 'priority': job.priority,
+                 'request': asdict(job.request), 'eta_seconds': starts.get(job.job_id)}
+                for position, job in enumerate(order)
+            ]
+        return {'policy': self.policy, 'capacity': asdict(capacity), 'running': running, 'queued': queued}
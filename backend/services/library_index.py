@@ -0,0 +1,309 @@
+"""
+Persistent search index over a directory of JSON documents.
+
+Presets and saved configurations are kept one JSON file per entry. Listing
+them used to mean opening and validating every file on each call; this
+index keeps, in one SQLite file next to the documents:
+
+- A summary of each entry (the dict the service lists) and its sort key
+- Its tags, in a table indexed by tag for any-of tag filters
+- Its lowercased name and description in an FTS5 trigram index, so
+  substring searches are index lookups rather than scans
+
+Writes made through the index (write/remove) update it directly. Files
+added, replaced or removed by other means are picked up by refresh(),
+which compares file sizes and modification times and only parses files
+that changed; queries run it whenever the directory itself has changed.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Index file kept inside the indexed directory (not matched by *.json)
+INDEX_FILE_NAME = ".library_index.db"
+
+# Trigram FTS needs at least this many characters to use the index
+_MIN_TRIGRAM_QUERY = 3
+
+
+@dataclass
+class LibraryRecord:
+    """Indexed fields of one document"""
+    name: str
+    description: str
+    sort_key: str
+    summary: Dict[str, Any]  # Returned by queries in place of the document
+    tags: List[str] = field(default_factory=list)
+
+
+class LibraryIndex:
+    """
+    Index of the ``*.json`` documents in one directory, keyed by file stem.
+
+    ``extract`` turns a parsed document into its LibraryRecord and raises
+    if the document is invalid; invalid files are remembered (so they are
+    not parsed again until they change) but never returned.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        extract: Callable[[Dict[str, Any]], LibraryRecord],
+        db_path: Optional[Path] = None
+    ):
+        """
+        Args:
+            directory: Directory of JSON documents
+            extract: Builds the indexed fields of a document
+            db_path: Index file (defaults to INDEX_FILE_NAME in the directory)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._extract = extract
+        self._lock = threading.RLock()
+        self._dir_mtime_ns: Optional[int] = None  # Directory mtime at the last refresh
+        self._conn = sqlite3.connect(
+            str(db_path or self.directory / INDEX_FILE_NAME), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                sort_key TEXT NOT NULL DEFAULT '',
+                summary TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_sort ON entries (sort_key);
+            CREATE TABLE IF NOT EXISTS entry_tags (
+                tag TEXT NOT NULL,
+                entry_id TEXT NOT NULL,
+                PRIMARY KEY (tag, entry_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_entry_tags_entry ON entry_tags (entry_id);
+        """)
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(name, description, tokenize='trigram')"
+            )
+            self._trigram = True
+        except sqlite3.OperationalError:
+            # SQLite before 3.34: keep the text in FTS5 and scan it for substrings
+            self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(name, description)")
+            self._trigram = False
+
+    def _path(self, entry_id: str) -> Path:
+        return self.directory / f"{entry_id}.json"
+
+    def _dir_mtime(self) -> int:
+        return os.stat(self.directory).st_mtime_ns
+
+    def _index(self, entry_id: str, stat: os.stat_result, data: Optional[Dict[str, Any]]) -> None:
+        """Replace the index rows of an entry (called with the lock held)"""
+        record = None
+        if data is not None:
+            try:
+                record = self._extract(data)
+            except Exception as e:
+                logger.error(f"Error indexing {self._path(entry_id)}: {e}")
+
+        self._conn.execute(
+            """
+            INSERT INTO entries (id, mtime_ns, size, sort_key, summary) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns,
+                size = excluded.size,
+                sort_key = excluded.sort_key,
+                summary = excluded.summary
+            """,
+            (
+                entry_id, stat.st_mtime_ns, stat.st_size,
+                record.sort_key if record else "",
+                json.dumps(record.summary) if record else None,
+            )
+        )
+        rowid = self._conn.execute("SELECT rowid FROM entries WHERE id = ?", (entry_id,)).fetchone()[0]
+        self._conn.execute("DELETE FROM entries_fts WHERE rowid = ?", (rowid,))
+        self._conn.execute("DELETE FROM entry_tags WHERE entry_id = ?", (entry_id,))
+        if record is not None:
+            self._conn.execute(
+                "INSERT INTO entries_fts (rowid, name, description) VALUES (?, ?, ?)",
+                (rowid, record.name.lower(), record.description.lower())
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entry_tags (tag, entry_id) VALUES (?, ?)",
+                [(tag, entry_id) for tag in record.tags]
+            )
+
+    def _unindex(self, entry_ids: List[str]) -> None:
+        """Drop the index rows of entries (called with the lock held)"""
+        for entry_id in entry_ids:
+            self._conn.execute(
+                "DELETE FROM entries_fts WHERE rowid IN (SELECT rowid FROM entries WHERE id = ?)", (entry_id,)
+            )
+            self._conn.execute("DELETE FROM entry_tags WHERE entry_id = ?", (entry_id,))
+            self._conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN")
+        try:
+            yield
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def write(self, entry_id: str, data: Dict[str, Any]) -> None:
+        """
+        Write a document to its JSON file and index it.
+
+        Args:
+            entry_id: Document ID (the file stem)
+            data: Document to write
+        """
+        with self._lock:
+            in_sync = self._dir_mtime_ns is not None and self._dir_mtime_ns == self._dir_mtime()
+            path = self._path(entry_id)
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+            with self._transaction():
+                self._index(entry_id, path.stat(), data)
+            if in_sync:
+                # Our own write changed the directory; nothing else to pick up
+                self._dir_mtime_ns = self._dir_mtime()
+
+    def remove(self, entry_id: str) -> bool:
+        """
+        Delete a document's JSON file and its index rows.
+
+        Returns:
+            True if the file existed
+        """
+        with self._lock:
+            in_sync = self._dir_mtime_ns is not None and self._dir_mtime_ns == self._dir_mtime()
+            path = self._path(entry_id)
+            existed = path.exists()
+            if existed:
+                path.unlink()
+            with self._transaction():
+                self._unindex([entry_id])
+            if in_sync:
+                self._dir_mtime_ns = self._dir_mtime()
+            return existed
+
+    def refresh(self) -> int:
+        """
+        Bring the index in line with the directory, parsing only files
+        whose size or modification time changed.
+
+        Returns:
+            Number of entries added, updated or removed
+        """
+        with self._lock:
+            dir_mtime_ns = self._dir_mtime()
+            on_disk: Dict[str, os.stat_result] = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        on_disk[entry.name[:-len(".json")]] = entry.stat()
+            indexed = {
+                entry_id: (mtime_ns, size)
+                for entry_id, mtime_ns, size in self._conn.execute("SELECT id, mtime_ns, size FROM entries")
+            }
+
+            removed = [entry_id for entry_id in indexed if entry_id not in on_disk]
+            changed = [
+                entry_id for entry_id, stat in on_disk.items()
+                if indexed.get(entry_id) != (stat.st_mtime_ns, stat.st_size)
+            ]
+            if removed or changed:
+                with self._transaction():
+                    self._unindex(removed)
+                    for entry_id in changed:
+                        try:
+                            with open(self._path(entry_id), 'r') as f:
+                                data = json.load(f)
+                        except (OSError, ValueError) as e:
+                            logger.error(f"Error loading {self._path(entry_id)}: {e}")
+                            data = None
+                        self._index(entry_id, on_disk[entry_id], data)
+                logger.debug(f"Reindexed {len(changed)} and dropped {len(removed)} entries in {self.directory}")
+            self._dir_mtime_ns = dir_mtime_ns
+            return len(removed) + len(changed)
+
+    def _sync(self) -> None:
+        """Refresh if files were added or removed since the last refresh"""
+        if self._dir_mtime_ns != self._dir_mtime():
+            self.refresh()
+
+    def _where(self, search: Optional[str], tags: Optional[List[str]]) -> Tuple[str, List[Any]]:
+        conditions = ["e.summary IS NOT NULL"]
+        params: List[Any] = []
+        if search:
+            query = search.lower()
+            substring = "(instr(name, ?) > 0 OR instr(description, ?) > 0)"
+            if self._trigram and len(query) >= _MIN_TRIGRAM_QUERY:
+                # The trigram match narrows candidates; instr keeps exact substring semantics
+                conditions.append(
+                    f"e.rowid IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ? AND {substring})"
+                )
+                params.append('"' + query.replace('"', '""') + '"')
+            else:
+                conditions.append(f"e.rowid IN (SELECT rowid FROM entries_fts WHERE {substring})")
+            params += [query, query]
+        if tags:
+            conditions.append(
+                f"e.id IN (SELECT entry_id FROM entry_tags WHERE tag IN ({', '.join('?' * len(tags))}))"
+            )
+            params += list(tags)
+        return " AND ".join(conditions), params
+
+    def query(
+        self,
+        search: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Summaries of matching entries, newest sort key first.
+
+        Args:
+            search: Case-insensitive substring of the name or description
+            tags: Return entries having any of these tags
+            limit: Maximum number of entries (None for all)
+            offset: Matching entries to skip
+
+        Returns:
+            List of summaries
+        """
+        with self._lock:
+            self._sync()
+            where, params = self._where(search, tags)
+            rows = self._conn.execute(
+                f"SELECT e.summary FROM entries e WHERE {where} ORDER BY e.sort_key DESC, e.id LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+        return [json.loads(summary) for (summary,) in rows]
+
+    def count(self, search: Optional[str] = None, tags: Optional[List[str]] = None) -> int:
+        """Number of entries matching a search and tag filter"""
+        with self._lock:
+            self._sync()
+            where, params = self._where(search, tags)
+            return self._conn.execute(f"SELECT COUNT(*) FROM entries e WHERE {where}", params).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
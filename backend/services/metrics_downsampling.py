@@ -0,0 +1,227 @@
+"""
+Multi-resolution downsampling for metrics histories.
+
+A ``ResolutionTiers`` index keeps, for every scalar metric column, the row
+offsets of the minimum and maximum value inside fixed-size buckets of 10,
+100, 1000 and 10000 rows. Buckets are filled in as soon as their last row
+is appended, so the tiers never need rebuilding. A query picks the finest
+tier that keeps the candidate set bounded, collects the bucket extremes
+(plus raw rows at the ragged range edges) and reduces them to the target
+point count with min-max bucketing or LTTB.
+"""
+
+from array import array
+from typing import Callable, Dict, List, Tuple
+
+# Rows per bucket for each precomputed tier (the raw rows are the 1x tier)
+TIER_FACTORS = (10, 100, 1000, 10000)
+
+# Default number of points returned by a downsampling query
+DEFAULT_MAX_POINTS = 1000
+
+# Supported reduction methods
+METHODS = ('minmax', 'lttb')
+
+# A tier is used only when it yields at most this many buckets per output point
+_BUCKETS_PER_POINT = 4
+
+
+def _extreme_offsets(values):
+    """Row offsets of the NaN-aware minimum and maximum of each bucket row"""
+    import numpy as np
+
+    missing = np.isnan(values)
+    argmin = np.where(missing, np.inf, values).argmin(axis=-1)
+    argmax = np.where(missing, -np.inf, values).argmax(axis=-1)
+    return argmin, argmax
+
+
+class ResolutionTiers:
+    """
+    Incrementally maintained min/max bucket index over scalar columns.
+
+    Only row offsets (uint16) are kept; values are read back from the
+    store, so the index costs about 4 / 10 bytes per column per row.
+    """
+
+    def __init__(self, columns: List[str]):
+        """
+        Args:
+            columns: Names of the scalar columns to index
+        """
+        self.columns = list(columns)
+        self._argmin: Dict[str, List[array]] = {
+            name: [array('H') for _ in TIER_FACTORS] for name in self.columns
+        }
+        self._argmax: Dict[str, List[array]] = {
+            name: [array('H') for _ in TIER_FACTORS] for name in self.columns
+        }
+
+    def update(self, size: int, read: Callable[[str, int, int], object]) -> None:
+        """
+        Fill in every bucket that was completed by the row count reaching size.
+
+        Args:
+            size: Number of rows in the store after the latest append
+            read: Function returning column values for rows [start, stop)
+                as float64 with NaN for missing values
+        """
+        for tier, factor in enumerate(TIER_FACTORS):
+            if size % factor:
+                break
+            for name in self.columns:
+                argmin, argmax = _extreme_offsets(read(name, size - factor, size))
+                self._argmin[name][tier].append(int(argmin))
+                self._argmax[name][tier].append(int(argmax))
+
+    def bucket_counts(self) -> List[int]:
+        """Number of completed buckets per tier"""
+        if not self.columns:
+            return [0] * len(TIER_FACTORS)
+        return [len(buckets) for buckets in self._argmin[self.columns[0]]]
+
+    def clear(self) -> None:
+        for index in (self._argmin, self._argmax):
+            for buckets in index.values():
+                for tier in buckets:
+                    del tier[:]
+
+    def candidate_rows(self, name: str, start: int, stop: int, max_points: int, counts: List[int]):
+        """
+        Rows that may appear in a downsampled view of rows [start, stop).
+
+        Args:
+            name: Column name
+            start: First row of the range
+            stop: End of the range (exclusive)
+            max_points: Target number of output points
+            counts: Completed buckets per tier, snapshotted with the row count
+
+        Returns:
+            Sorted int64 array of row indices
+        """
+        # Finest granularity (raw rows first) with a bounded number of buckets
+        budget = _BUCKETS_PER_POINT * max_points
+        tier = -1
+        while tier + 1 < len(TIER_FACTORS) and stop - start > budget * (TIER_FACTORS[tier] if tier >= 0 else 1):
+            tier += 1
+        return self._rows(name, start, stop, tier, counts)
+
+    def _rows(self, name: str, start: int, stop: int, tier: int, counts: List[int]):
+        import numpy as np
+
+        if start >= stop:
+            return np.empty(0, dtype=np.int64)
+        if tier < 0:
+            return np.arange(start, stop, dtype=np.int64)
+        factor = TIER_FACTORS[tier]
+        first = -(-start // factor)
+        last = min(stop // factor, counts[tier])
+        if first >= last:
+            return self._rows(name, start, stop, tier - 1, counts)
+        base = np.arange(first, last, dtype=np.int64) * factor
+        argmin = np.frombuffer(self._argmin[name][tier][first:last], dtype=np.uint16)
+        argmax = np.frombuffer(self._argmax[name][tier][first:last], dtype=np.uint16)
+        rows = np.concatenate([
+            self._rows(name, start, first * factor, tier - 1, counts),
+            base + argmin,
+            base + argmax,
+            self._rows(name, last * factor, stop, tier - 1, counts),
+        ])
+        return np.unique(rows)
+
+
+def minmax_indices(rows, values, start: int, stop: int, max_points: int):
+    """
+    Pick the minimum and maximum of each of max_points // 2 equal row ranges.
+
+    Args:
+        rows: Sorted row index of each candidate point
+        values: Candidate values (no NaN)
+        start: First row of the queried range
+        stop: End of the queried range (exclusive)
+        max_points: Maximum number of points to keep
+
+    Returns:
+        Sorted indices into rows/values
+    """
+    import numpy as np
+
+    if len(rows) <= max_points:
+        return np.arange(len(rows))
+    groups = max(1, max_points // 2)
+    edges = np.linspace(start, stop, groups + 1)[1:-1]
+    group = np.searchsorted(edges, rows, side='right')
+    keep = []
+    for key in (values, -values):
+        order = np.lexsort((key, group))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = group[order][1:] != group[order][:-1]
+        keep.append(order[first])
+    return np.unique(np.concatenate(keep))
+
+
+def lttb_indices(x, y, max_points: int):
+    """
+    Largest-Triangle-Three-Buckets selection of max_points points.
+
+    The first and last points are always kept; for each bucket in between,
+    the point forming the largest triangle with the previously selected
+    point and the average of the next bucket is kept.
+
+    Args:
+        x: Increasing x coordinates
+        y: Values (no NaN)
+        max_points: Maximum number of points to keep
+
+    Returns:
+        Sorted indices into x/y
+    """
+    import numpy as np
+
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1])
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    picks = np.empty(max_points, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_lo, next_hi = hi, max(edges[i + 2], hi + 1)
+            avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        px, py = x[previous], y[previous]
+        area = np.abs((px - avg_x) * (y[lo:hi] - py) - (px - x[lo:hi]) * (avg_y - py))
+        previous = lo + int(area.argmax())
+        picks[i + 1] = previous
+    return np.unique(picks)
+
+
+def reduce_points(method: str, x, y, rows, start: int, stop: int, max_points: int) -> Tuple[object, object]:
+    """
+    Reduce candidate points to at most max_points with the given method.
+
+    Args:
+        method: 'minmax' or 'lttb'
+        x: Candidate x coordinates (steps)
+        y: Candidate values
+        rows: Candidate row indices
+        start: First row of the queried range
+        stop: End of the queried range (exclusive)
+        max_points: Maximum number of points to return
+
+    Returns:
+        Tuple of (x, y) arrays
+    """
+    if method == 'lttb':
+        keep = lttb_indices(x, y, max_points)
+    else:
+        keep = minmax_indices(rows, y, start, stop, max_points)
+    return x[keep], y[keep]
@@ -0,0 +1,297 @@
+"""
+Push-based pub/sub hub for streaming training metrics over WebSockets.
+
+Producers (the orchestrator's metrics callbacks, running on training
+threads, or API handlers on the event loop) publish metrics for a job.
+Each update is encoded once per wire format and fanned out to per-socket
+bounded queues. A subscriber that falls behind has its pending frames
+coalesced into a single full snapshot, so one slow client never stalls
+the producer or the other clients.
+
+Subscribers can ask for delta frames, which carry only the fields that
+changed since the previous update, and for msgpack instead of JSON when
+the optional ``msgpack`` package is installed.
+"""
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple, Union
+import asyncio
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered per subscriber before pending frames are coalesced
+DEFAULT_QUEUE_SIZE = 64
+
+# Supported wire formats
+ENCODINGS = ('json', 'msgpack')
+
+Frame = Union[str, bytes]
+
+
+def _encode(message: Dict[str, Any], encoding: str) -> Frame:
+    if encoding == 'msgpack':
+        import msgpack
+        return msgpack.packb(message, default=str)
+    return json.dumps(message, separators=(',', ':'), default=str)
+
+
+def _msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _Update:
+    """One published update, encoded lazily and at most once per variant"""
+
+    __slots__ = ('seq', 'full', 'delta', '_frames')
+
+    def __init__(self, seq: int, full: Dict[str, Any], delta: Optional[Dict[str, Any]]):
+        self.seq = seq
+        self.full = full
+        self.delta = delta
+        self._frames: Dict[Tuple[str, bool], Frame] = {}
+
+    def frame(self, encoding: str, as_delta: bool) -> Frame:
+        key = (encoding, as_delta)
+        frame = self._frames.get(key)
+        if frame is None:
+            frame = self._frames[key] = _encode(self.delta if as_delta else self.full, encoding)
+        return frame
+
+
+class Subscription:
+    """Bounded, coalescing frame queue for one WebSocket client"""
+
+    def __init__(self, job_id: str, delta: bool, encoding: str, max_queue: int):
+        self.job_id = job_id
+        self.delta = delta
+        self.encoding = encoding
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.closed = False
+        self._frames: Deque[Frame] = deque()
+        self._event = asyncio.Event()
+        self._last_seq: Optional[int] = None
+
+    def _offer(self, update: _Update) -> None:
+        """Queue an update; runs on the event loop"""
+        resync = self._last_seq is None or self._last_seq != update.seq - 1
+        if len(self._frames) >= self.max_queue:
+            # Coalesce: everything pending is superseded by one full snapshot
+            self.dropped += len(self._frames)
+            self._frames.clear()
+            resync = True
+        as_delta = self.delta and not resync and update.delta is not None
+        self._frames.append(update.frame(self.encoding, as_delta))
+        self._last_seq = update.seq
+        self._event.set()
+
+    def send_control(self, message: Dict[str, Any]) -> None:
+        """Queue a control message such as a pong"""
+        self._frames.append(_encode(message, self.encoding))
+        self._event.set()
+
+    async def next_frame(self) -> Optional[Frame]:
+        """Wait for the next frame; returns None once the subscription is closed"""
+        while not self._frames:
+            if self.closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+        return self._frames.popleft()
+
+    def close(self) -> None:
+        self.closed = True
+        self._event.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._frames)
+
+
+class MetricsHub:
+    """
+    Fan-out of per-job metrics updates to WebSocket subscribers.
+
+    ``publish`` is thread-safe; subscriptions and dispatch live on the
+    event loop that created the first subscription.
+    """
+
+    def __init__(self, max_queue: int = DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            max_queue: Frames buffered per subscriber before coalescing
+        """
+        self.max_queue = max_queue
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._latest: Dict[str, _Update] = {}
+        self._attached: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id: str, delta: bool = False, encoding: str = 'json') -> Subscription:
+        """
+        Subscribe to a job's updates; must be called on the event loop.
+
+        The latest update, if any, is queued immediately as a full snapshot.
+        Unavailable encodings fall back to JSON (see ``Subscription.encoding``).
+
+        Args:
+            job_id: Job identifier
+            delta: Send only changed fields after the first full frame
+            encoding: 'json' or 'msgpack'
+
+        Returns:
+            Subscription to read frames from
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{encoding}', expected one of {ENCODINGS}")
+        if encoding == 'msgpack' and not _msgpack_available():
+            logger.warning("msgpack is not installed; streaming metrics as JSON")
+            encoding = 'json'
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(job_id, delta, encoding, self.max_queue)
+        self._subscribers.setdefault(job_id, set()).add(subscription)
+        latest = self._latest.get(job_id)
+        if latest is not None:
+            subscription._offer(latest)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subscribers = self._subscribers.get(subscription.job_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.job_id]
+
+    def publish(self, job_id: str, data: Dict[str, Any], message_type: str = 'metrics') -> None:
+        """
+        Publish an update for a job from any thread.
+
+        Args:
+            job_id: Job identifier
+            data: JSON-serializable payload, e.g. ``TrainingMetrics.to_dict()``
+            message_type: Message type for full frames
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(job_id, data, message_type)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, job_id, data, message_type)
+            except RuntimeError:
+                # Loop closed between the check and the call
+                pass
+
+    def publisher(self, job_id: str) -> Callable[[Any], None]:
+        """Metrics callback that publishes dataclass metrics for a job"""
+        def callback(metrics: Any) -> None:
+            if job_id in self._subscribers:
+                self.publish(job_id, metrics.to_dict())
+        return callback
+
+    def attach(self, job_id: str, register: Callable[[str, Callable[[Any], None]], None]) -> None:
+        """
+        Register this hub as a metrics callback for a job exactly once.
+
+        Args:
+            job_id: Job identifier
+            register: Callback registration function, e.g. the orchestrator's
+                ``register_metrics_callback``
+        """
+        with self._lock:
+            if job_id in self._attached:
+                return
+            self._attached.add(job_id)
+        register(job_id, self.publisher(job_id))
+
+    def _dispatch(self, job_id: str, data: Dict[str, Any], message_type: str) -> None:
+        previous = self._latest.get(job_id)
+        seq = previous.seq + 1 if previous is not None else 0
+        full = {'type': message_type, 'seq': seq, 'data': data}
+        delta = None
+        if previous is not None and previous.full['type'] == message_type:
+            old = previous.full['data']
+            delta = {
+                'type': f'{message_type}_delta',
+                'seq': seq,
+                'data': {key: value for key, value in data.items() if old.get(key) != value}
+            }
+        update = _Update(seq, full, delta)
+        self._latest[job_id] = update
+        for subscription in list(self._subscribers.get(job_id, ())):
+            subscription._offer(update)
+
+    def forget(self, job_id: str) -> None:
+        """Drop cached state for a finished job"""
+        self._latest.pop(job_id, None)
+        with self._lock:
+            self._attached.discard(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Subscriber counts, pending frames and coalesced drops"""
+        subscriptions = [s for subscribers in self._subscribers.values() for s in subscribers]
+        return {
+            'jobs': len(self._subscribers),
+            'subscribers': len(subscriptions),
+            'pending_frames': sum(s.pending for s in subscriptions),
+            'dropped_frames': sum(s.dropped for s in subscriptions),
+        }
+
+
+async def stream_subscription(websocket, subscription: Subscription) -> None:
+    """
+    Pump frames from a subscription to a WebSocket until either side closes.
+
+    Text messages from the client are read concurrently; "ping" is answered
+    with a pong through the same queue.
+    """
+    async def send():
+        while True:
+            frame = await subscription.next_frame()
+            if frame is None:
+                return
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+
+    async def receive():
+        while True:
+            if await websocket.receive_text() == "ping":
+                subscription.send_control({"type": "pong"})
+
+    tasks = [asyncio.ensure_future(send()), asyncio.ensure_future(receive())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global metrics hub instance
+_metrics_hub = None
+
+
+def get_metrics_hub() -> MetricsHub:
+    """Get or create the global metrics hub instance"""
+    global _metrics_hub
+    if _metrics_hub is None:
+        _metrics_hub = MetricsHub()
+    return _metrics_hub
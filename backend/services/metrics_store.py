@@ -0,0 +1,499 @@
+"""
+Columnar, append-only store for per-step training metrics.
+
+Each field of a metrics dataclass is kept in its own NumPy column instead of
+one Python object per step. Rows are appended into preallocated segments that
+grow by doubling; full segments are sealed and, when a spill directory is
+configured, written to disk as .npy files and memory-mapped read-only.
+Indexing returns ``MetricsRow`` views that expose the same attributes and
+``to_dict()`` as the dataclass, so existing readers keep working while
+charts and endpoints read whole columns. Scalar columns are also indexed by
+``ResolutionTiers`` so long histories can be downsampled without scanning
+every row.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+from datetime import datetime, timedelta
+from pathlib import Path
+import dataclasses
+import logging
+import threading
+import typing
+import uuid
+
+from .metrics_downsampling import (
+    DEFAULT_MAX_POINTS,
+    METHODS,
+    ResolutionTiers,
+    reduce_points,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows per segment; a segment is sealed (and spilled, if enabled) once full
+DEFAULT_SEGMENT_SIZE = 16384
+
+# Rows allocated by the first append; doubled until DEFAULT_SEGMENT_SIZE
+_INITIAL_CAPACITY = 64
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Column kinds
+_INT = 'int'
+_FLOAT = 'float'
+_OPTIONAL = 'optional'
+_VECTOR = 'vector'
+_TIMESTAMP = 'timestamp'
+
+
+def _column_kind(f: dataclasses.Field) -> str:
+    """Map a dataclass field to the column kind that stores it"""
+    if f.name == 'timestamp':
+        return _TIMESTAMP
+    annotation = f.type
+    origin = typing.get_origin(annotation)
+    if origin in (list, List):
+        return _VECTOR
+    if origin is Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if args in ([float], [int]):
+            return _OPTIONAL
+    if annotation is int:
+        return _INT
+    if annotation is float:
+        return _FLOAT
+    raise TypeError(f"Unsupported metrics field '{f.name}': {annotation!r}")
+
+
+def _to_micros(value: Union[datetime, str, None]) -> int:
+    """Convert a timestamp to microseconds since the epoch in local wall time"""
+    if value is None:
+        value = datetime.now()
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+class _Segment:
+    """Fixed-capacity block of rows, one array per column"""
+
+    __slots__ = ('capacity', 'size', 'columns', 'present', 'lengths', 'path')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 0
+        self.columns: Dict[str, Any] = {}
+        self.present: Dict[str, Any] = {}
+        self.lengths: Dict[str, Any] = {}
+        self.path: Optional[Path] = None
+
+
+class MetricsRow:
+    """Read-only view of one row of a MetricsStore"""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: 'MetricsStore', index: int):
+        self._store = store
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self._store._value(name, self._index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization (same shape as the dataclass)"""
+        return self._store._row_dict(self._index)
+
+    def materialize(self) -> Any:
+        """Rebuild the original metrics dataclass for this row"""
+        store = self._store
+        return store.row_type(**{name: store._value(name, self._index) for name, _ in store._schema})
+
+    def __repr__(self) -> str:
+        return f"MetricsRow({self._index}, {self.to_dict()!r})"
+
+
+class MetricsStore:
+    """
+    Append-only columnar history of metrics dataclass instances.
+
+    Behaves like a list of metrics for existing callers (append, len,
+    indexing, slicing, iteration) while storing integers and floats as int64
+    and float64 columns, optional floats with a presence mask, per-GPU lists
+    as float32 matrices and timestamps as int64 microseconds.
+    """
+
+    def __init__(
+        self,
+        row_type: Type,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        spill_dir: Optional[Union[str, Path]] = None
+    ):
+        """
+        Args:
+            row_type: Metrics dataclass whose fields define the columns
+            segment_size: Rows per segment before it is sealed
+            spill_dir: Directory for memory-mapped sealed segments; when None
+                sealed segments stay in memory
+        """
+        self.row_type = row_type
+        self._schema: List[Tuple[str, str]] = [
+            (f.name, _column_kind(f)) for f in dataclasses.fields(row_type)
+        ]
+        self._kinds: Dict[str, str] = dict(self._schema)
+        timestamp_fields = [f for f in dataclasses.fields(row_type) if f.name == 'timestamp']
+        self._timestamp_as_text = bool(timestamp_fields) and timestamp_fields[0].type is str
+        self.segment_size = segment_size
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._segments: List[_Segment] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._spill_prefix = uuid.uuid4().hex
+        # Steps are the x axis of downsampled series; rows are used without them
+        self._x_column = 'step' if self._kinds.get('step') == _INT else None
+        self._tiers = ResolutionTiers([
+            name for name, kind in self._schema
+            if kind in (_INT, _FLOAT, _OPTIONAL) and name != self._x_column
+        ])
+
+    # -- writing ---------------------------------------------------------
+
+    def append(self, metrics: Any) -> None:
+        """Append one metrics dataclass (or MetricsRow) as a new row"""
+        with self._lock:
+            segment = self._writable_segment()
+            i = segment.size
+            for name, kind in self._schema:
+                value = getattr(metrics, name)
+                if kind == _VECTOR:
+                    self._write_vector(segment, name, i, value or ())
+                elif kind == _OPTIONAL:
+                    present = value is not None
+                    segment.present[name][i] = present
+                    segment.columns[name][i] = value if present else 0.0
+                elif kind == _TIMESTAMP:
+                    segment.columns[name][i] = _to_micros(value)
+                else:
+                    segment.columns[name][i] = value
+            segment.size = i + 1
+            self._size += 1
+            self._tiers.update(self._size, self._float_column)
+
+    def extend(self, rows) -> None:
+        """Append every metrics object from an iterable"""
+        for row in rows:
+            self.append(row)
+
+    def clear(self) -> None:
+        """Drop all rows and remove spilled segment files"""
+        with self._lock:
+            segments, self._segments, self._size = self._segments, [], 0
+            self._tiers.clear()
+        for segment in segments:
+            if segment.path is not None:
+                segment.columns = segment.present = segment.lengths = {}
+                for path in segment.path.parent.glob(f"{segment.path.name}-*.npy"):
+                    try:
+                        path.unlink()
+                    except OSError as e:
+                        logger.debug(f"Could not remove spilled metrics segment {path}: {e}")
+
+    def _writable_segment(self) -> _Segment:
+        if self._segments:
+            segment = self._segments[-1]
+            if segment.size < segment.capacity:
+                return segment
+            if segment.capacity < self.segment_size:
+                self._resize(segment, min(segment.capacity * 2, self.segment_size))
+                return segment
+            self._seal(segment)
+        segment = self._allocate(min(_INITIAL_CAPACITY, self.segment_size) if not self._segments
+                                 else self.segment_size)
+        self._segments.append(segment)
+        return segment
+
+    def _allocate(self, capacity: int) -> _Segment:
+        import numpy as np
+
+        segment = _Segment(capacity)
+        for name, kind in self._schema:
+            if kind == _VECTOR:
+                segment.columns[name] = np.full((capacity, 0), np.nan, dtype=np.float32)
+                segment.lengths[name] = np.zeros(capacity, dtype=np.uint16)
+            elif kind in (_INT, _TIMESTAMP):
+                segment.columns[name] = np.zeros(capacity, dtype=np.int64)
+            else:
+                segment.columns[name] = np.zeros(capacity, dtype=np.float64)
+                if kind == _OPTIONAL:
+                    segment.present[name] = np.zeros(capacity, dtype=bool)
+        return segment
+
+    def _resize(self, segment: _Segment, capacity: int) -> None:
+        """Grow the active segment in place by copying into larger arrays"""
+        import numpy as np
+
+        def grow(array, fill=0):
+            shape = (capacity,) + array.shape[1:]
+            grown = np.full(shape, fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        for name, kind in self._schema:
+            segment.columns[name] = grow(segment.columns[name], np.nan if kind == _VECTOR else 0)
+        for arrays in (segment.present, segment.lengths):
+            for name, array in arrays.items():
+                arrays[name] = grow(array)
+        segment.capacity = capacity
+
+    def _write_vector(self, segment: _Segment, name: str, i: int, values) -> None:
+        import numpy as np
+
+        matrix = segment.columns[name]
+        count = len(values)
+        if count > matrix.shape[1]:
+            widened = np.full((segment.capacity, count), np.nan, dtype=np.float32)
+            widened[:, :matrix.shape[1]] = matrix
+            segment.columns[name] = matrix = widened
+        matrix[i, :count] = values
+        segment.lengths[name][i] = count
+
+    def _seal(self, segment: _Segment) -> None:
+        """Spill a full segment to memory-mapped .npy files if configured"""
+        if self.spill_dir is None:
+            return
+        import numpy as np
+
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        base = self.spill_dir / f"{self._spill_prefix}-{len(self._segments) - 1}"
+        for arrays, suffix in ((segment.columns, ''), (segment.present, '.present'), (segment.lengths, '.lengths')):
+            for name, array in list(arrays.items()):
+                path = base.parent / f"{base.name}-{name}{suffix}.npy"
+                np.save(path, array)
+                arrays[name] = np.load(path, mmap_mode='r')
+        segment.path = base
+
+    # -- reading ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[MetricsRow]:
+        for i in range(self._size):
+            yield MetricsRow(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MetricsRow(self, i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("metrics index out of range")
+        return MetricsRow(self, index)
+
+    def _locate(self, index: int) -> Tuple[_Segment, int]:
+        # Only the last segment can be smaller than segment_size while it grows
+        k = index // self.segment_size
+        return self._segments[k], index - k * self.segment_size
+
+    def _value(self, name: str, index: int) -> Any:
+        kind = self._kinds.get(name)
+        if kind is None:
+            raise AttributeError(f"'{self.row_type.__name__}' row has no attribute '{name}'")
+        segment, i = self._locate(index)
+        column = segment.columns[name]
+        if kind == _VECTOR:
+            return column[i, :segment.lengths[name][i]].tolist()
+        if kind == _OPTIONAL:
+            return float(column[i]) if segment.present[name][i] else None
+        if kind == _TIMESTAMP:
+            timestamp = _from_micros(int(column[i]))
+            return timestamp.isoformat() if self._timestamp_as_text else timestamp
+        return column[i].item()
+
+    def _row_dict(self, index: int) -> Dict[str, Any]:
+        row = {name: self._value(name, index) for name, _ in self._schema}
+        if 'timestamp' in row and isinstance(row['timestamp'], datetime):
+            row['timestamp'] = row['timestamp'].isoformat()
+        return row
+
+    def _bounds(self, start: Optional[int], stop: Optional[int]) -> Tuple[int, int]:
+        start, stop, _ = slice(start, stop).indices(self._size)
+        return start, max(start, stop)
+
+    def column(self, name: str, start: Optional[int] = None, stop: Optional[int] = None):
+        """
+        Get a copy of one column for rows [start, stop).
+
+        Optional columns are returned as float64 with NaN for missing values,
+        vector columns as a float32 matrix padded with NaN to the widest row,
+        and timestamps as int64 microseconds since the epoch.
+        """
+        import numpy as np
+
+        kind = self._kinds.get(name)
+        if kind is None:
+            raise KeyError(f"Unknown metrics column: {name}")
+        start, stop = self._bounds(start, stop)
+        parts = []
+        for segment, lo, hi in self._segment_ranges(start, stop):
+            part = segment.columns[name][lo:hi]
+            if kind == _OPTIONAL:
+                part = np.where(segment.present[name][lo:hi], part, np.nan)
+            parts.append(part)
+        if kind == _VECTOR:
+            width = max((part.shape[1] for part in parts), default=0)
+            padded = np.full((stop - start, width), np.nan, dtype=np.float32)
+            offset = 0
+            for part in parts:
+                padded[offset:offset + len(part), :part.shape[1]] = part
+                offset += len(part)
+            return padded
+        if not parts:
+            dtype = np.int64 if kind in (_INT, _TIMESTAMP) else np.float64
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(parts)
+
+    def _segment_ranges(self, start: int, stop: int):
+        offset = 0
+        for segment in list(self._segments):
+            lo, hi = max(start - offset, 0), min(stop - offset, segment.size)
+            if lo < hi:
+                yield segment, lo, hi
+            offset += segment.size
+
+    def to_dicts(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Serialize rows [start, stop) column by column instead of row by row"""
+        start, stop = self._bounds(start, stop)
+        columns: Dict[str, List[Any]] = {}
+        for name, kind in self._schema:
+            values: List[Any] = []
+            for segment, lo, hi in self._segment_ranges(start, stop):
+                data = segment.columns[name][lo:hi]
+                if kind == _VECTOR:
+                    lengths = segment.lengths[name][lo:hi].tolist()
+                    values.extend(row[:n] for row, n in zip(data.tolist(), lengths))
+                elif kind == _OPTIONAL:
+                    values.extend(v if p else None for v, p in zip(data.tolist(), segment.present[name][lo:hi].tolist()))
+                elif kind == _TIMESTAMP:
+                    values.extend(_from_micros(v).isoformat() for v in data.tolist())
+                else:
+                    values.extend(data.tolist())
+            columns[name] = values
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+    def downsample(
+        self,
+        name: str,
+        start_step: Optional[int] = None,
+        end_step: Optional[int] = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+        method: str = 'minmax'
+    ):
+        """
+        Get a bounded view of one scalar column over a step range.
+
+        Uses the precomputed resolution tiers, so the work done depends on
+        max_points rather than on the number of rows. Steps are assumed to be
+        non-decreasing; missing optional values are skipped.
+
+        Args:
+            name: Scalar column to downsample
+            start_step: First step to include (None for the beginning)
+            end_step: Last step to include (None for the end)
+            max_points: Maximum number of points to return (at least 2)
+            method: 'minmax' keeps the extremes of equal step buckets,
+                'lttb' keeps the visually most significant points
+
+        Returns:
+            Tuple of (steps, values) NumPy arrays
+        """
+        import numpy as np
+
+        if name not in self._tiers.columns:
+            raise KeyError(f"Cannot downsample metrics column: {name}")
+        if method not in METHODS:
+            raise ValueError(f"Unknown downsampling method '{method}', expected one of {METHODS}")
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2")
+
+        with self._lock:
+            size = self._size
+            counts = self._tiers.bucket_counts()
+        start = 0 if start_step is None else self._row_for_step(start_step, size)
+        stop = size if end_step is None else self._row_for_step(end_step, size, right=True)
+        if start >= stop:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        rows = self._tiers.candidate_rows(name, start, stop, max_points, counts)
+        values = self._gather(name, rows)
+        present = ~np.isnan(values)
+        rows, values = rows[present], values[present]
+        steps = self._gather(self._x_column, rows).astype(np.int64) if self._x_column else rows
+        return reduce_points(method, steps, values, rows, start, stop, max_points)
+
+    def _row_for_step(self, step: int, size: int, right: bool = False) -> int:
+        """Binary search for the first row whose step is >= step (> step if right)"""
+        if self._x_column is None:
+            return min(max(step + (1 if right else 0), 0), size)
+        lo, hi = 0, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            segment, i = self._locate(mid)
+            value = segment.columns[self._x_column][i]
+            if value < step or (right and value == step):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _gather(self, name: str, rows):
+        """Read a scalar column at sorted row indices as float64 (NaN if missing)"""
+        import numpy as np
+
+        values = np.empty(len(rows), dtype=np.float64)
+        segment_ids = rows // self.segment_size
+        for k in np.unique(segment_ids).tolist():
+            mask = segment_ids == k
+            segment = self._segments[k]
+            local = rows[mask] - k * self.segment_size
+            part = segment.columns[name][local]
+            if name in segment.present:
+                part = np.where(segment.present[name][local], part, np.nan)
+            values[mask] = part
+        return values
+
+    def _float_column(self, name: str, start: int, stop: int):
+        import numpy as np
+
+        return self.column(name, start, stop).astype(np.float64, copy=False)
+
+    def latest(self) -> Optional[MetricsRow]:
+        """Most recent row, or None when empty"""
+        return MetricsRow(self, self._size - 1) if self._size else None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by in-memory (non-spilled) columns"""
+        total = 0
+        for segment in list(self._segments):
+            if segment.path is not None:
+                continue
+            for arrays in (segment.columns, segment.present, segment.lengths):
+                total += sum(array.nbytes for array in arrays.values())
+        return total
+
+    def __repr__(self) -> str:
+        return f"MetricsStore({self.row_type.__name__}, rows={self._size})"
@@ -4,10 +4,8 @@ Model Registry Service for multi-registry integration (HuggingFace, Civitai, Oll
 
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
-import json
-import sqlite3
 from pathlib import Path
 from huggingface_hub import HfApi, list_models
 try:
@@ -17,6 +15,8 @@ except ImportError:
     ModelFilter = None
 from huggingface_hub.utils import RepositoryNotFoundError
 
+from connectors.metadata_cache import MetadataCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,31 +53,24 @@ class CachedModel:
 class ModelRegistryService:
     """Service for interacting with multiple model registries"""
     
-    def __init__(self, db_path: str = "~/.peft-studio/data/peft_studio.db"):
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite metadata store (default: the store shared with
+                the registry connectors)
+        """
         self.api = HfApi()
-        self._model_cache: Dict[str, ModelMetadata] = {}
-        self.db_path = Path(db_path).expanduser()
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_cache_db()
+        self._cache = MetadataCache(
+            "model_registry",
+            decode=lambda data: ModelMetadata(**data),
+            encode=asdict,
+            search_text=lambda m: " ".join(
+                [m.model_id, m.author, m.pipeline_tag or "", m.architecture or ""] + list(m.tags)
+            ),
+            db_path=Path(db_path).expanduser() if db_path else None
+        )
         logger.info("ModelRegistryService initialized with multi-registry support")
     
-    def _init_cache_db(self):
-        """Initialize the cache database"""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS model_cache (
-                id TEXT PRIMARY KEY,
-                source TEXT NOT NULL,
-                model_id TEXT NOT NULL,
-                metadata TEXT NOT NULL,
-                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL
-            )
-        """)
-        conn.commit()
-        conn.close()
-    
     def search_models(
         self,
         query: Optional[str] = None,
@@ -127,14 +120,15 @@ class ModelRegistryService:
                 metadata = self._convert_to_metadata(model)
                 results.append(metadata)
                 # Cache the result
-                self._model_cache[model.modelId] = metadata
+                self._cache.put(f"huggingface:{model.modelId}", metadata)
             
             logger.info(f"Found {len(results)} models")
             return results
             
         except Exception as e:
             logger.error(f"Error searching models: {str(e)}")
-            return []
+            # Answer from cached metadata while the Hub is unreachable
+            return self._cache.search(" ".join(filter(None, [query, task] + list(tags or []))), limit)
     
     def get_model_info(self, model_id: str, use_cache: bool = True) -> Optional[ModelMetadata]:
         """
@@ -148,9 +142,12 @@ class ModelRegistryService:
             ModelMetadata object or None if not found
         """
         # Check cache
-        if use_cache and model_id in self._model_cache:
-            logger.debug(f"Returning cached info for {model_id}")
-            return self._model_cache[model_id]
+        cache_key = f"huggingface:{model_id}"
+        if use_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Returning cached info for {model_id}")
+                return cached
         
         try:
             logger.info(f"Fetching model info for {model_id}")
@@ -158,7 +155,7 @@ class ModelRegistryService:
             metadata = self._convert_to_metadata(model_info)
             
             # Cache the result
-            self._model_cache[model_id] = metadata
+            self._cache.put(cache_key, metadata)
             
             return metadata
             
@@ -167,7 +164,8 @@ class ModelRegistryService:
             return None
         except Exception as e:
             logger.error(f"Error fetching model info for {model_id}: {str(e)}")
-            return None
+            # Serve expired metadata while the Hub is unreachable
+            return self._cache.get_stale(cache_key)
     
     def get_popular_models(
         self,
@@ -373,26 +371,8 @@ class ModelRegistryService:
             metadata: Model metadata to cache
             ttl_hours: Time to live in hours
         """
-        try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cache_id = f"{registry}:{model_id}"
-            cached_at = datetime.now().isoformat()
-            expires_at = (datetime.now() + timedelta(hours=ttl_hours)).isoformat()
-            metadata_json = json.dumps(asdict(metadata))
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO model_cache 
-                (id, source, model_id, metadata, cached_at, expires_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (cache_id, registry, model_id, metadata_json, cached_at, expires_at))
-            
-            conn.commit()
-            conn.close()
-            logger.debug(f"Cached metadata for {cache_id}")
-        except Exception as e:
-            logger.error(f"Error caching model metadata: {str(e)}")
+        self._cache.put(f"{registry}:{model_id}", metadata, ttl_hours=ttl_hours)
+        logger.debug(f"Cached metadata for {registry}:{model_id}")
     
     def get_cached_metadata(
         self,
@@ -409,34 +389,7 @@ class ModelRegistryService:
         Returns:
             ModelMetadata if cached and valid, None otherwise
         """
-        try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cache_id = f"{registry}:{model_id}"
-            cursor.execute("""
-                SELECT metadata, expires_at FROM model_cache
-                WHERE id = ?
-            """, (cache_id,))
-            
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row:
-                metadata_json, expires_at = row
-                expires_dt = datetime.fromisoformat(expires_at)
-                
-                if datetime.now() < expires_dt:
-                    metadata_dict = json.loads(metadata_json)
-                    return ModelMetadata(**metadata_dict)
-                else:
-                    # Expired, remove from cache
-                    self.remove_from_cache(model_id, registry)
-            
-            return None
-        except Exception as e:
-            logger.error(f"Error getting cached metadata: {str(e)}")
-            return None
+        return self._cache.get(f"{registry}:{model_id}")
     
     def list_cached_models(self) -> List[CachedModel]:
         """
@@ -446,29 +399,17 @@ class ModelRegistryService:
             List of CachedModel objects
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT model_id, source, cached_at, expires_at, metadata
-                FROM model_cache
-                WHERE expires_at > ?
-                ORDER BY cached_at DESC
-            """, (datetime.now().isoformat(),))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
             cached_models = []
-            for row in rows:
-                model_id, registry, cached_at, expires_at, metadata_json = row
-                metadata = json.loads(metadata_json)
+            for entry in self._cache.entries():
+                if not entry.fresh():
+                    continue
+                registry, model_id = entry.key.split(":", 1)
                 cached_models.append(CachedModel(
                     model_id=model_id,
                     registry=registry,
-                    cached_at=cached_at,
-                    expires_at=expires_at,
-                    metadata=metadata
+                    cached_at=datetime.fromtimestamp(entry.cached_at).isoformat(),
+                    expires_at=datetime.fromtimestamp(entry.expires_at).isoformat(),
+                    metadata=asdict(entry.value)
                 ))
             
             return cached_models
@@ -492,18 +433,8 @@ class ModelRegistryService:
             True if removed, False otherwise
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cache_id = f"{registry}:{model_id}"
-            cursor.execute("DELETE FROM model_cache WHERE id = ?", (cache_id,))
-            
-            conn.commit()
-            rows_deleted = cursor.rowcount
-            conn.close()
-            
-            if rows_deleted > 0:
-                logger.info(f"Removed {cache_id} from cache")
+            if self._cache.remove(f"{registry}:{model_id}"):
+                logger.info(f"Removed {registry}:{model_id} from cache")
                 return True
             return False
         except Exception as e:
@@ -513,16 +444,7 @@ class ModelRegistryService:
     def clear_cache(self) -> None:
         """Clear all model metadata cache"""
         try:
-            # Clear in-memory cache
-            self._model_cache.clear()
-            
-            # Clear database cache
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM model_cache")
-            conn.commit()
-            conn.close()
-            
+            self._cache.clear()
             logger.info("Model metadata cache cleared")
         except Exception as e:
             logger.error(f"Error clearing cache: {str(e)}")
@@ -535,18 +457,7 @@ class ModelRegistryService:
             Number of entries removed
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                DELETE FROM model_cache
-                WHERE expires_at < ?
-            """, (datetime.now().isoformat(),))
-            
-            conn.commit()
-            rows_deleted = cursor.rowcount
-            conn.close()
-            
+            rows_deleted = self._cache.purge_expired()
             logger.info(f"Cleared {rows_deleted} expired cache entries")
             return rows_deleted
         except Exception as e:
@@ -10,6 +10,9 @@ import time
 import psutil
 import GPUtil
 
+from .metrics_store import MetricsStore, MetricsRow
+from .metrics_downsampling import DEFAULT_MAX_POINTS
+
 
 @dataclass
 class TrainingMetrics:
@@ -59,19 +62,31 @@ class TrainingMetrics:
 class MonitoringService:
     """Service for collecting and managing training metrics"""
     
-    def __init__(self):
-        self.metrics_history: Dict[str, List[TrainingMetrics]] = {}
+    def __init__(self, spill_dir: Optional[str] = None):
+        """
+        Args:
+            spill_dir: Optional directory where sealed metrics segments of each
+                job are memory-mapped instead of kept in RAM
+        """
+        self.metrics_history: Dict[str, MetricsStore] = {}
         self.start_times: Dict[str, float] = {}
+        self.spill_dir = spill_dir
+    
+    def _new_store(self, job_id: str) -> MetricsStore:
+        spill_dir = f"{self.spill_dir}/{job_id}" if self.spill_dir else None
+        return MetricsStore(TrainingMetrics, spill_dir=spill_dir)
     
     def start_monitoring(self, job_id: str):
         """Start monitoring a training job"""
-        self.metrics_history[job_id] = []
+        if job_id in self.metrics_history:
+            self.metrics_history[job_id].clear()
+        self.metrics_history[job_id] = self._new_store(job_id)
         self.start_times[job_id] = time.time()
     
     def stop_monitoring(self, job_id: str):
         """Stop monitoring a training job"""
         if job_id in self.metrics_history:
-            del self.metrics_history[job_id]
+            self.metrics_history.pop(job_id).clear()
         if job_id in self.start_times:
             del self.start_times[job_id]
     
@@ -143,7 +158,7 @@ class MonitoringService:
         
         # Store in history
         if job_id not in self.metrics_history:
-            self.metrics_history[job_id] = []
+            self.metrics_history[job_id] = self._new_store(job_id)
         self.metrics_history[job_id].append(metrics)
         
         return metrics
@@ -152,21 +167,65 @@ class MonitoringService:
         self,
         job_id: str,
         limit: Optional[int] = None
-    ) -> List[TrainingMetrics]:
-        """Get metrics history for a job"""
+    ) -> List[MetricsRow]:
+        """Get metrics history for a job as row views"""
         if job_id not in self.metrics_history:
             return []
         
         history = self.metrics_history[job_id]
         if limit:
             return history[-limit:]
-        return history
+        return history[:]
+    
+    def get_metrics_dicts(
+        self,
+        job_id: str,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get serialized metrics history for a job, built column by column"""
+        if job_id not in self.metrics_history:
+            return []
+        return self.metrics_history[job_id].to_dicts(-limit if limit else None)
     
-    def get_latest_metrics(self, job_id: str) -> Optional[TrainingMetrics]:
+    def get_metric_series(
+        self,
+        job_id: str,
+        names: List[str],
+        start_step: Optional[int] = None,
+        end_step: Optional[int] = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+        method: str = 'minmax'
+    ) -> Dict[str, List[Dict[str, float]]]:
+        """
+        Get downsampled metric series for charts.
+
+        Each series has at most max_points points regardless of run length.
+
+        Args:
+            job_id: Job identifier
+            names: Scalar metric names, e.g. ['loss', 'learning_rate']
+            start_step: First step to include
+            end_step: Last step to include
+            max_points: Maximum points per series
+            method: 'minmax' or 'lttb'
+
+        Returns:
+            Dictionary mapping metric name to [{'step', 'value'}] points
+        """
+        history = self.metrics_history.get(job_id)
+        if history is None:
+            return {name: [] for name in names}
+        series = {}
+        for name in names:
+            steps, values = history.downsample(name, start_step, end_step, max_points, method)
+            series[name] = [{'step': s, 'value': v} for s, v in zip(steps.tolist(), values.tolist())]
+        return series
+    
+    def get_latest_metrics(self, job_id: str) -> Optional[MetricsRow]:
         """Get the most recent metrics for a job"""
-        if job_id not in self.metrics_history or not self.metrics_history[job_id]:
+        if job_id not in self.metrics_history:
             return None
-        return self.metrics_history[job_id][-1]
+        return self.metrics_history[job_id].latest()
     
     def calculate_loss_zone(
         self,
@@ -230,11 +289,8 @@ class MonitoringService:
         if job_id not in self.metrics_history or not self.metrics_history[job_id]:
             return 0.0
         
-        # Get recent metrics (last 10 data points)
-        recent_metrics = self.metrics_history[job_id][-10:]
-        
-        # Calculate average throughput
-        avg_throughput = sum(m.throughput for m in recent_metrics) / len(recent_metrics)
+        # Average throughput over the last 10 data points
+        avg_throughput = float(self.metrics_history[job_id].column('throughput', -10).mean())
         
         if avg_throughput <= 0:
             return 0.0
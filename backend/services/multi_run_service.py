@@ -12,8 +12,9 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import logging
+import weakref
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, func
 
 from database import TrainingRun, get_db
 from .training_orchestration_service import (
@@ -120,8 +121,97 @@ class MultiRunManager:
             orchestrator: Training orchestrator instance (uses singleton if None)
         """
         self.orchestrator = orchestrator or get_training_orchestrator()
+        # Per database engine: job_id -> job revision last written to it
+        self._synced_revisions: "weakref.WeakKeyDictionary[Any, Dict[str, int]]" = weakref.WeakKeyDictionary()
         logger.info("MultiRunManager initialized")
     
+    def _synced(self, db: Session) -> Dict[str, int]:
+        return self._synced_revisions.setdefault(db.get_bind(), {})
+    
+    @staticmethod
+    def _run_values(job: TrainingJob) -> Dict[str, Any]:
+        """TrainingRun column values for a job"""
+        metrics = job.current_metrics
+        total_steps = None
+        if job.config.max_steps:
+            total_steps = job.config.max_steps
+        elif job.config.num_epochs:
+            # Estimate total steps (rough estimate)
+            total_steps = job.config.num_epochs * 1000
+        
+        return {
+            'job_id': job.job_id,
+            'name': job.config.job_id,
+            'status': job.state.value,
+            'config': job.config.to_dict(),
+            'started_at': job.started_at or datetime.utcnow(),
+            'completed_at': job.completed_at,
+            'paused_at': job.paused_at,
+            'error_message': job.error_message,
+            'provider': job.provider,
+            'provider_job_id': job.provider_job_id,
+            'current_step': metrics.step if metrics else 0,
+            'current_epoch': metrics.epoch if metrics else 0,
+            'current_loss': metrics.loss if metrics else None,
+            'gpu_utilization': (
+                sum(metrics.gpu_utilization) / len(metrics.gpu_utilization)
+                if metrics and metrics.gpu_utilization else None
+            ),
+            'memory_used': (
+                sum(metrics.gpu_memory_used) / len(metrics.gpu_memory_used)
+                if metrics and metrics.gpu_memory_used else None
+            ),
+            'artifact_path': str(job.artifact_info.path) if job.artifact_info else None,
+            'artifact_hash': job.artifact_info.hash_sha256 if job.artifact_info else None,
+            'total_steps': total_steps,
+        }
+    
+    def sync_runs_to_database(self, jobs: List[TrainingJob], db: Session) -> int:
+        """
+        Sync training jobs to the database in one upsert.
+        
+        Jobs unchanged since they were last synced to this database are
+        skipped. Like sync_run_to_database, an existing run keeps the name,
+        config, start time and provider it was created with.
+        
+        Args:
+            jobs: Training jobs to sync
+            db: Database session
+            
+        Returns:
+            Number of runs inserted or updated
+            
+        Requirements: 16.1
+        """
+        synced = self._synced(db)
+        changed = [job for job in jobs if synced.get(job.job_id) != job.revision]
+        if not changed:
+            return 0
+        
+        dialect = db.get_bind().dialect.name
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            for job in changed:
+                self.sync_run_to_database(job, db)
+            return len(changed)
+        
+        # Revisions are read before the values so a concurrent change is synced next time
+        revisions = {job.job_id: job.revision for job in changed}
+        rows = [self._run_values(job) for job in changed]
+        stmt = insert(TrainingRun.__table__)
+        kept_on_update = {'job_id', 'name', 'config', 'started_at', 'provider'}
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['job_id'],
+            set_={column: stmt.excluded[column] for column in rows[0] if column not in kept_on_update}
+        )
+        db.execute(stmt, rows)
+        db.commit()
+        synced.update(revisions)
+        return len(changed)
+    
     def sync_run_to_database(self, job: TrainingJob, db: Session) -> TrainingRun:
         """
         Sync a training job to the database.
@@ -185,8 +275,10 @@ class MultiRunManager:
             # Estimate total steps (rough estimate)
             db_run.total_steps = job.config.num_epochs * 1000
         
+        revision = job.revision
         db.commit()
         db.refresh(db_run)
+        self._synced(db)[job.job_id] = revision
         
         return db_run
     
@@ -202,9 +294,8 @@ class MultiRunManager:
             
         Requirements: 16.2
         """
-        # Sync all jobs from orchestrator to database
-        for job in self.orchestrator.list_jobs():
-            self.sync_run_to_database(job, db)
+        # Sync changed jobs from orchestrator to database
+        self.sync_runs_to_database(self.orchestrator.list_jobs(), db)
         
         # Query active runs
         active_runs = db.query(TrainingRun).filter(
@@ -287,39 +378,29 @@ class MultiRunManager:
             
         Requirements: 16.2
         """
-        # Sync all jobs first
-        for job in self.orchestrator.list_jobs():
-            self.sync_run_to_database(job, db)
-        
-        # Count active runs
-        active_runs = db.query(TrainingRun).filter(
-            TrainingRun.status.in_([RunStatus.RUNNING.value, RunStatus.PAUSED.value])
-        ).all()
-        
-        running_count = sum(1 for r in active_runs if r.status == RunStatus.RUNNING.value)
-        paused_count = sum(1 for r in active_runs if r.status == RunStatus.PAUSED.value)
+        # Sync changed jobs first, then count everything in one aggregate
+        self.sync_runs_to_database(self.orchestrator.list_jobs(), db)
         
-        # Count completed and failed
-        completed_count = db.query(TrainingRun).filter(
-            TrainingRun.status == RunStatus.COMPLETED.value
-        ).count()
+        counts = db.query(
+            TrainingRun.status, TrainingRun.provider, func.count()
+        ).group_by(TrainingRun.status, TrainingRun.provider).all()
         
-        failed_count = db.query(TrainingRun).filter(
-            TrainingRun.status == RunStatus.FAILED.value
-        ).count()
+        by_status: Dict[str, int] = {}
+        provider_counts: Dict[str, int] = {}
+        for status, provider, count in counts:
+            by_status[status] = by_status.get(status, 0) + count
+            if provider and status in (RunStatus.RUNNING.value, RunStatus.PAUSED.value):
+                provider_counts[provider] = provider_counts.get(provider, 0) + count
         
-        # Count by provider
-        provider_counts = {}
-        for run in active_runs:
-            if run.provider:
-                provider_counts[run.provider] = provider_counts.get(run.provider, 0) + 1
+        running_count = by_status.get(RunStatus.RUNNING.value, 0)
+        paused_count = by_status.get(RunStatus.PAUSED.value, 0)
         
         return ConcurrentRunStats(
-            total_active=len(active_runs),
+            total_active=running_count + paused_count,
             running=running_count,
             paused=paused_count,
-            total_completed=completed_count,
-            total_failed=failed_count,
+            total_completed=by_status.get(RunStatus.COMPLETED.value, 0),
+            total_failed=by_status.get(RunStatus.FAILED.value, 0),
             active_providers=provider_counts
         )
     
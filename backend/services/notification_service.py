@@ -6,13 +6,21 @@ Supports desktop notifications, taskbar progress, and Do Not Disturb integration
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Callable, Optional, List
 from enum import Enum
 import platform
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Progress percentages that trigger a notification
+PROGRESS_MILESTONES = (25, 50, 75, 100)
+
+# Seconds a Do Not Disturb reading is reused before it is refreshed
+DND_REFRESH_SECONDS = 30.0
+
 
 class NotificationType(str, Enum):
     PROGRESS = "progress"
@@ -68,17 +76,43 @@ def check_progress_milestone(progress_update: ProgressUpdate) -> Optional[Notifi
     current_progress = (progress_update.current_step / progress_update.total_steps) * 100
     previous_progress = (progress_update.previous_step / progress_update.total_steps) * 100
     
-    # Define milestones
-    milestones = [25, 50, 75, 100]
-    
     # Check if we crossed any milestone
-    for milestone in milestones:
+    for milestone in PROGRESS_MILESTONES:
         if previous_progress < milestone <= current_progress:
             return _create_milestone_notification(milestone, progress_update)
     
     return None
 
 
+def milestone_steps(total_steps: int) -> List[int]:
+    """
+    Steps at which each progress milestone is reached.
+    
+    Step ``s`` is listed for a milestone when it is the first step that
+    check_progress_milestone considers at or past it, so a loop moving one
+    step at a time only needs to check progress when it reaches a listed step.
+    
+    Args:
+        total_steps: Total training steps
+        
+    Returns:
+        One step per milestone, in increasing order (empty if total_steps is 0)
+    """
+    if total_steps <= 0:
+        return []
+    
+    steps = []
+    for milestone in PROGRESS_MILESTONES:
+        # Integer estimate, corrected to the float comparison used above
+        step = -(-milestone * total_steps // 100)
+        while step > 0 and ((step - 1) / total_steps) * 100 >= milestone:
+            step -= 1
+        while (step / total_steps) * 100 < milestone:
+            step += 1
+        steps.append(step)
+    return steps
+
+
 def _create_milestone_notification(milestone: int, progress_update: ProgressUpdate) -> NotificationEvent:
     """
     Create a notification for a specific milestone.
@@ -251,6 +285,72 @@ def check_do_not_disturb() -> bool:
     return False
 
 
+class DoNotDisturbMonitor:
+    """
+    Do Not Disturb status, cached and refreshed in the background.
+    
+    check_do_not_disturb() may start a subprocess; the first read runs it
+    once, later reads return the cached status and, once it is older than
+    the refresh interval, start a background refresh.
+    """
+    
+    def __init__(self, refresh_seconds: float = DND_REFRESH_SECONDS, check: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            refresh_seconds: Age after which a reading is refreshed
+            check: Reads the status (defaults to check_do_not_disturb)
+        """
+        self.refresh_seconds = refresh_seconds
+        self._check = check
+        self._enabled = False
+        self._checked_at: Optional[float] = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+    
+    def _read(self) -> bool:
+        check = self._check or check_do_not_disturb
+        try:
+            return bool(check())
+        except Exception as e:
+            logger.debug(f"Could not detect Do Not Disturb status: {e}")
+            return False
+    
+    def _refresh(self):
+        enabled = self._read()
+        with self._lock:
+            self._enabled = enabled
+            self._checked_at = time.monotonic()
+            self._refreshing = False
+    
+    def is_enabled(self) -> bool:
+        """Cached Do Not Disturb status"""
+        if self._checked_at is None:
+            with self._lock:
+                first = self._checked_at is None and not self._refreshing
+                if first:
+                    self._refreshing = True
+            if first:
+                self._refresh()
+        elif time.monotonic() - self._checked_at > self.refresh_seconds:
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh, name="dnd-refresh", daemon=True).start()
+        return self._enabled
+
+
+_dnd_monitor: Optional[DoNotDisturbMonitor] = None
+
+
+def get_dnd_monitor() -> DoNotDisturbMonitor:
+    """Get the shared Do Not Disturb monitor"""
+    global _dnd_monitor
+    if _dnd_monitor is None:
+        _dnd_monitor = DoNotDisturbMonitor()
+    return _dnd_monitor
+
+
 def calculate_taskbar_progress(current_step: int, total_steps: int) -> float:
     """
     Calculate taskbar progress percentage.
@@ -304,8 +404,8 @@ class NotificationManager:
         self.sent_milestones.add(milestone)
     
     def update_dnd_status(self):
-        """Update the Do Not Disturb status."""
-        self.dnd_enabled = check_do_not_disturb()
+        """Update the Do Not Disturb status (cached; see DoNotDisturbMonitor)."""
+        self.dnd_enabled = get_dnd_monitor().is_enabled()
     
     def should_respect_dnd(self, notification: NotificationEvent) -> bool:
         """
@@ -0,0 +1,127 @@
+"""
+Offline Queue Compaction
+
+Folds queued offline operations on the same resource into fewer network
+calls before they are replayed:
+
+- Consecutive metric batches are concatenated into one upload
+- Updates are merged into the pending create or update they follow
+  (last write wins per field)
+- A delete supersedes the pending updates before it, and cancels out
+  together with a pending create
+
+Only the most recent operations on a resource are folded, so the order of
+operations on each resource is unchanged. Operations already being
+executed are never modified.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# Payload "action" values understood by compaction
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_DELETE = "delete"
+
+# Outcomes of folding a new operation into the queue
+QUEUED = "queued"
+MERGED = "merged"
+CANCELLED = "cancelled"
+
+
+def merge_payloads(local: Dict[str, Any], remote: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge two payloads.
+
+    Simple merge strategy:
+    - Use local values for keys that exist in local
+    - Add remote values for keys that don't exist in local
+
+    Args:
+        local: Local (newer) payload
+        remote: Remote (older) payload
+
+    Returns:
+        Merged payload
+    """
+    merged = remote.copy()
+    merged.update(local)
+    return merged
+
+
+@dataclass
+class QueuedOperation:
+    """A pending operation as seen by compaction"""
+    operation_type: str
+    payload: Dict[str, Any]
+    priority: int = 0
+    id: Optional[int] = None
+    locked: bool = False  # In progress: nothing merges into or past it
+    changed: bool = False  # Payload or priority changed by a merge
+
+    @property
+    def action(self) -> Optional[str]:
+        return self.payload.get("action") if isinstance(self.payload, dict) else None
+
+    @property
+    def is_metric_batch(self) -> bool:
+        return isinstance(self.payload, dict) and isinstance(self.payload.get("metrics"), list)
+
+    def absorb(self, payload: Dict[str, Any], priority: int) -> None:
+        self.payload = payload
+        self.priority = max(self.priority, priority)
+        self.changed = True
+
+
+def _foldable(existing: Optional[QueuedOperation], operation: QueuedOperation) -> bool:
+    return (
+        existing is not None
+        and not existing.locked
+        and existing.operation_type == operation.operation_type
+    )
+
+
+def fold(
+    pending: List[QueuedOperation],
+    operation: QueuedOperation,
+    metric_log_type: str
+) -> Tuple[str, List[QueuedOperation], int]:
+    """
+    Fold a new operation into the pending operations of its resource.
+
+    Args:
+        pending: Pending operations on the resource in queue order; updated
+            in place
+        operation: Operation being added after them
+        metric_log_type: Operation type whose metric batches are concatenated
+
+    Returns:
+        Tuple of (outcome, existing operations removed from pending,
+        network calls saved)
+    """
+    last = pending[-1] if pending else None
+    if _foldable(last, operation):
+        if (operation.operation_type == metric_log_type
+                and last.is_metric_batch and operation.is_metric_batch):
+            merged = merge_payloads(operation.payload, last.payload)
+            merged["metrics"] = last.payload["metrics"] + operation.payload["metrics"]
+            last.absorb(merged, operation.priority)
+            return MERGED, [], 1
+        if operation.action == ACTION_UPDATE and last.action in (ACTION_CREATE, ACTION_UPDATE):
+            merged = merge_payloads(operation.payload, last.payload)
+            merged["action"] = last.action
+            last.absorb(merged, operation.priority)
+            return MERGED, [], 1
+
+    if operation.action == ACTION_DELETE:
+        removed = []
+        while _foldable(pending[-1] if pending else None, operation) and pending[-1].action == ACTION_UPDATE:
+            removed.append(pending.pop())
+        if _foldable(pending[-1] if pending else None, operation) and pending[-1].action == ACTION_CREATE:
+            removed.append(pending.pop())
+            return CANCELLED, removed, len(removed) + 1
+        pending.append(operation)
+        return QUEUED, removed, len(removed)
+
+    pending.append(operation)
+    return QUEUED, [], 0
@@ -3,17 +3,31 @@ Offline Queue Service
 
 Manages operations that need to be performed when online connectivity is restored.
 Implements offline-first architecture with SQLite persistence.
+
+Replay runs operations concurrently, bounded per operation type, while
+operations on the same target resource still run in queue order. Status
+changes are written in batches, one transaction per batch, and failed
+operations are rescheduled with exponential backoff. Operations on the
+same resource are compacted (see offline_compaction) when enqueued and
+again before each sync.
 """
 
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
 from enum import Enum
 import json
 import asyncio
-from sqlalchemy import Column, Integer, String, DateTime, Text, create_engine
+import logging
+import random
+from sqlalchemy import Column, Integer, String, DateTime, Text, inspect, text, update, bindparam
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import DATABASE_URL
+from db_engine import get_engine
+
+from .offline_compaction import CANCELLED, MERGED, QueuedOperation, fold
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
@@ -48,6 +62,76 @@ class OfflineOperation(Base):
     retry_count = Column(Integer, default=0)
     error_message = Column(Text, nullable=True)
     priority = Column(Integer, default=0)  # Higher priority = executed first
+    next_attempt_at = Column(DateTime, nullable=True)  # Backoff before the next retry
+    resource = Column(String, nullable=True, index=True)  # See resource_key
+
+
+class OfflineQueueCounter(Base):
+    """Running totals kept across restarts, e.g. operations saved by compaction"""
+    __tablename__ = 'offline_queue_counters'
+    
+    name = Column(String, primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
+
+
+# Operations of each type executed at the same time during replay
+DEFAULT_REPLAY_CONCURRENCY = {
+    OperationType.API_CALL: 8,
+    OperationType.FILE_UPLOAD: 2,
+    OperationType.METRIC_LOG: 16,
+    OperationType.MODEL_PUSH: 1,
+    OperationType.EXPERIMENT_SYNC: 4,
+}
+
+# Status changes written per transaction during replay
+STATUS_BATCH_SIZE = 500
+
+# Exponential backoff for failed operations
+RETRY_BASE_SECONDS = 2.0
+RETRY_MAX_SECONDS = 300.0
+
+# SQLite allows at most 999 bound parameters per statement
+_ID_CHUNK = 500
+
+# Payload fields naming the resource an operation acts on, in lookup order
+_RESOURCE_FIELDS = (
+    "resource", "repo_name", "repo_id", "model_name", "experiment_id",
+    "run_id", "job_id", "file_path", "path", "endpoint",
+)
+
+
+def resource_key(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Identify the resource an operation targets.
+    
+    Operations with the same key are replayed in queue order; operations
+    without one are independent of every other operation.
+    
+    Args:
+        payload: Operation data
+        
+    Returns:
+        Resource key, or None if the payload names no resource
+    """
+    for field in _RESOURCE_FIELDS:
+        value = payload.get(field)
+        if isinstance(value, (str, int)) and value != "":
+            return f"{field}:{value}"
+    return None
+
+
+def retry_delay(retry_count: int) -> float:
+    """
+    Backoff before the next attempt of an operation.
+    
+    Args:
+        retry_count: Failed attempts so far (at least 1)
+        
+    Returns:
+        Delay in seconds, doubled per failure with up to 10% jitter
+    """
+    delay = min(RETRY_BASE_SECONDS * (2 ** (retry_count - 1)), RETRY_MAX_SECONDS)
+    return delay * (1 + random.random() * 0.1)
 
 
 class OfflineQueueManager:
@@ -64,54 +148,196 @@ class OfflineQueueManager:
     
     def __init__(self, db_url: str = DATABASE_URL):
         """Initialize the offline queue manager"""
-        # Add check_same_thread=False for SQLite to work with multiple connections
-        connect_args = {}
-        if "sqlite" in db_url:
-            connect_args = {"check_same_thread": False}
-        
-        self.engine = create_engine(db_url, connect_args=connect_args)
+        # Shares the application's engine (and its SQLite tuning) for the same URL
+        self.engine = get_engine(db_url)
         Base.metadata.create_all(self.engine)
+        self._migrate()
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self._sync_task: Optional[asyncio.Task] = None
         self._is_syncing = False
         self.max_retries = 3
     
+    def _migrate(self) -> None:
+        """Add columns introduced after the queue table was first created"""
+        table = OfflineOperation.__tablename__
+        columns = {c["name"] for c in inspect(self.engine).get_columns(table)}
+        with self.engine.begin() as conn:
+            if "next_attempt_at" not in columns:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN next_attempt_at DATETIME"))
+            if "resource" not in columns:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN resource VARCHAR"))
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_resource ON {table} (resource)"))
+    
     def close(self):
-        """Close all database connections"""
+        """Close the idle connections of the (shared) engine"""
         self.engine.dispose()
     
     def enqueue(
         self,
         operation_type: OperationType,
         payload: Dict[str, Any],
-        priority: int = 0
+        priority: int = 0,
+        coalesce: bool = True
     ) -> int:
         """
         Add an operation to the queue.
         
+        Unless coalesce is False, the operation is first folded into the
+        pending operations on the same resource: it may be merged into the
+        latest of them, or cancel out with them (see offline_compaction).
+        
         Args:
             operation_type: Type of operation
             payload: Operation data (must be JSON serializable)
             priority: Priority level (higher = executed first)
+            coalesce: Fold into pending operations on the same resource
             
         Returns:
-            Operation ID
+            Operation ID; for a merged operation, the ID of the operation it
+            was merged into, and for a cancelled one, the ID of the pending
+            operation it cancelled
         """
+        key = resource_key(payload) if isinstance(payload, dict) else None
         db = self.SessionLocal()
         try:
-            operation = OfflineOperation(
+            operation = QueuedOperation(operation_type.value, payload, priority)
+            if coalesce and key is not None:
+                pending = self._load_pending(db, key)
+                outcome, removed, saved = fold(pending, operation, OperationType.METRIC_LOG.value)
+                if outcome == MERGED:
+                    self._store_changes(db, pending, removed)
+                    self._count(db, coalesced=saved)
+                    db.commit()
+                    return pending[-1].id
+                if outcome == CANCELLED:
+                    self._store_changes(db, pending, removed)
+                    self._count(db, cancelled=saved)
+                    db.commit()
+                    return removed[-1].id
+                self._store_changes(db, pending[:-1], removed)
+                self._count(db, cancelled=saved)
+            
+            row = OfflineOperation(
                 operation_type=operation_type.value,
                 payload=json.dumps(payload),
                 priority=priority,
-                status=OperationStatus.PENDING.value
+                status=OperationStatus.PENDING.value,
+                resource=key
             )
-            db.add(operation)
+            db.add(row)
+            db.commit()
+            db.refresh(row)
+            return row.id
+        finally:
+            db.close()
+    
+    def compact(self) -> int:
+        """
+        Compact all pending operations, resource by resource.
+        
+        Covers operations enqueued without coalescing or before resources
+        were recorded; runs before every sync.
+        
+        Returns:
+            Network calls saved
+        """
+        db = self.SessionLocal()
+        try:
+            rows = db.query(
+                OfflineOperation.id,
+                OfflineOperation.operation_type,
+                OfflineOperation.payload,
+                OfflineOperation.priority,
+                OfflineOperation.resource
+            ).filter(
+                OfflineOperation.status == OperationStatus.PENDING.value
+            ).order_by(OfflineOperation.id.asc()).all()
+            
+            by_resource: Dict[str, List[QueuedOperation]] = {}
+            removed: List[QueuedOperation] = []
+            backfill: List[Dict[str, Any]] = []
+            coalesced = cancelled = 0
+            for row in rows:
+                payload = json.loads(row.payload)
+                key = row.resource or (resource_key(payload) if isinstance(payload, dict) else None)
+                if key is None:
+                    continue
+                if row.resource is None:
+                    backfill.append({"_id": row.id, "resource": key})
+                operation = QueuedOperation(row.operation_type, payload, row.priority, id=row.id)
+                outcome, dropped, saved = fold(by_resource.setdefault(key, []), operation,
+                                               OperationType.METRIC_LOG.value)
+                if outcome == MERGED:
+                    removed.append(operation)
+                    coalesced += saved
+                else:
+                    removed.extend(dropped)
+                    cancelled += saved
+                    if outcome == CANCELLED:
+                        removed.append(operation)
+            
+            if backfill:
+                db.connection().execute(
+                    update(OfflineOperation.__table__)
+                    .where(OfflineOperation.__table__.c.id == bindparam("_id"))
+                    .values(resource=bindparam("resource")),
+                    backfill
+                )
+            if not (coalesced or cancelled):
+                db.commit()
+                return 0
+            changed = [op for ops in by_resource.values() for op in ops]
+            self._store_changes(db, changed, removed)
+            self._count(db, coalesced=coalesced, cancelled=cancelled)
             db.commit()
-            db.refresh(operation)
-            return operation.id
+            logger.info(f"Compacted offline queue: {coalesced} coalesced, {cancelled} cancelled")
+            return coalesced + cancelled
         finally:
             db.close()
     
+    def _load_pending(self, db, key: str) -> List[QueuedOperation]:
+        """Pending and in-progress operations on a resource in queue order"""
+        rows = db.query(OfflineOperation).filter(
+            OfflineOperation.resource == key,
+            OfflineOperation.status.in_([OperationStatus.PENDING.value, OperationStatus.IN_PROGRESS.value])
+        ).order_by(OfflineOperation.id.asc()).all()
+        return [
+            QueuedOperation(
+                row.operation_type,
+                json.loads(row.payload),
+                row.priority,
+                id=row.id,
+                locked=row.status == OperationStatus.IN_PROGRESS.value
+            )
+            for row in rows
+        ]
+    
+    def _store_changes(self, db, kept: List[QueuedOperation], removed: List[QueuedOperation]) -> None:
+        """Write merged payloads and delete removed operations"""
+        now = datetime.utcnow()
+        for operation in kept:
+            if operation.changed and operation.id is not None:
+                db.query(OfflineOperation).filter(OfflineOperation.id == operation.id).update(
+                    {"payload": json.dumps(operation.payload), "priority": operation.priority, "updated_at": now},
+                    synchronize_session=False
+                )
+        ids = [operation.id for operation in removed if operation.id is not None]
+        for i in range(0, len(ids), _ID_CHUNK):
+            db.query(OfflineOperation).filter(
+                OfflineOperation.id.in_(ids[i:i + _ID_CHUNK])
+            ).delete(synchronize_session=False)
+    
+    def _count(self, db, **increments: int) -> None:
+        """Add to persistent counters"""
+        for name, amount in increments.items():
+            if not amount:
+                continue
+            counter = db.get(OfflineQueueCounter, name)
+            if counter is None:
+                db.add(OfflineQueueCounter(name=name, value=amount))
+            else:
+                counter.value += amount
+    
     def get_pending_operations(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get pending operations ordered by priority and creation time.
@@ -184,6 +410,8 @@ class OfflineQueueManager:
             
             if status == OperationStatus.FAILED:
                 operation.retry_count += 1
+            elif status == OperationStatus.PENDING:
+                operation.next_attempt_at = None
             
             db.commit()
             return True
@@ -251,6 +479,12 @@ class OfflineQueueManager:
                     OfflineOperation.status == OperationStatus.FAILED.value
                 ).count()
             }
+            
+            # Operations compaction removed from the queue
+            counters = {c.name: c.value for c in db.query(OfflineQueueCounter).all()}
+            stats["coalesced"] = counters.get("coalesced", 0)
+            stats["cancelled"] = counters.get("cancelled", 0)
+            stats["network_calls_saved"] = stats["coalesced"] + stats["cancelled"]
             return stats
         finally:
             db.close()
@@ -280,16 +514,31 @@ class OfflineQueueManager:
         
         return self.update_status(operation_id, OperationStatus.PENDING)
     
-    async def sync_all(self, executor_func) -> Dict[str, Any]:
+    async def sync_all(
+        self,
+        executor_func,
+        concurrency: Optional[Dict[OperationType, int]] = None,
+        batch_size: int = STATUS_BATCH_SIZE
+    ) -> Dict[str, Any]:
         """
-        Sync all pending operations using the provided executor function.
+        Sync all pending operations that are due using the provided executor function.
+        
+        Operations run concurrently up to the per-type limit, except that
+        operations on the same resource (see resource_key) run one after
+        another in queue order; once one of them fails, the rest wait for
+        its retry. Failed operations are rescheduled with exponential
+        backoff until max_retries is reached, then marked failed.
         
         Args:
             executor_func: Async function that executes an operation
                           Should accept (operation_type, payload) and return success bool
+            concurrency: Operations of each type run at the same time
+                         (defaults to DEFAULT_REPLAY_CONCURRENCY)
+            batch_size: Status changes written per transaction
         
         Returns:
-            Dictionary with sync results
+            Dictionary with sync results; next_retry_in is the number of
+            seconds until the earliest rescheduled operation is due
         """
         if self._is_syncing:
             return {"status": "already_syncing"}
@@ -299,49 +548,145 @@ class OfflineQueueManager:
             "processed": 0,
             "succeeded": 0,
             "failed": 0,
-            "errors": []
+            "retry_scheduled": 0,
+            "deferred": 0,
+            "errors": [],
+            "next_retry_in": None
         }
         
         try:
-            operations = self.get_pending_operations()
+            # Operations left in progress can only come from an interrupted sync
+            self._reset_in_progress()
+            self.compact()
+            chains = self._claim_due_chains()
+            if not chains:
+                results["next_retry_in"] = self._next_retry_in()
+                return results
             
-            for op in operations:
-                results["processed"] += 1
-                
-                # Update to in_progress
-                self.update_status(op["id"], OperationStatus.IN_PROGRESS)
-                
-                try:
-                    # Execute the operation
-                    success = await executor_func(
-                        OperationType(op["operation_type"]),
-                        json.loads(op["payload"])
-                    )
+            limits = {**DEFAULT_REPLAY_CONCURRENCY, **(concurrency or {})}
+            semaphores = {op_type: asyncio.Semaphore(limits.get(op_type, 1)) for op_type in OperationType}
+            updates = _StatusUpdates(self, batch_size)
+            
+            async def run_chain(chain: List[Tuple[int, OperationType, Dict[str, Any], int]]) -> None:
+                for position, (op_id, op_type, payload, retry_count) in enumerate(chain):
+                    async with semaphores[op_type]:
+                        try:
+                            success = await executor_func(op_type, payload)
+                            error = None if success else "Executor returned False"
+                        except Exception as e:
+                            error = str(e) or type(e).__name__
                     
-                    if success:
-                        self.mark_completed(op["id"])
+                    results["processed"] += 1
+                    if error is None:
                         results["succeeded"] += 1
-                    else:
-                        self.mark_failed(op["id"], "Executor returned False")
-                        results["failed"] += 1
-                        results["errors"].append({
-                            "id": op["id"],
-                            "error": "Executor returned False"
-                        })
-                        
-                except Exception as e:
-                    error_msg = str(e)
-                    self.mark_failed(op["id"], error_msg)
+                        updates.completed(op_id)
+                        continue
+                    
                     results["failed"] += 1
-                    results["errors"].append({
-                        "id": op["id"],
-                        "error": error_msg
-                    })
+                    results["errors"].append({"id": op_id, "error": error})
+                    if updates.failed(op_id, retry_count + 1, error):
+                        results["retry_scheduled"] += 1
+                    # Later operations on this resource wait for the retry
+                    for later_id, _, _, _ in chain[position + 1:]:
+                        updates.deferred(later_id)
+                        results["deferred"] += 1
+                    return
             
+            try:
+                await asyncio.gather(*(run_chain(chain) for chain in chains))
+            finally:
+                updates.flush()
+            results["next_retry_in"] = self._next_retry_in()
             return results
         finally:
             self._is_syncing = False
     
+    def _reset_in_progress(self) -> None:
+        """Return operations claimed by an interrupted sync to the queue"""
+        db = self.SessionLocal()
+        try:
+            db.query(OfflineOperation).filter(
+                OfflineOperation.status == OperationStatus.IN_PROGRESS.value
+            ).update({"status": OperationStatus.PENDING.value}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+    
+    def _claim_due_chains(self) -> List[List[Tuple[int, OperationType, Dict[str, Any], int]]]:
+        """
+        Group due operations into per-resource chains and mark them in progress.
+        
+        Chains keep queue order. An operation still backing off holds back
+        every later operation on its resource. All claimed operations are
+        marked in progress in one transaction.
+        """
+        now = datetime.utcnow()
+        db = self.SessionLocal()
+        try:
+            rows = db.query(
+                OfflineOperation.id,
+                OfflineOperation.operation_type,
+                OfflineOperation.payload,
+                OfflineOperation.retry_count,
+                OfflineOperation.next_attempt_at
+            ).filter(
+                OfflineOperation.status == OperationStatus.PENDING.value
+            ).order_by(
+                OfflineOperation.priority.desc(),
+                OfflineOperation.created_at.asc(),
+                OfflineOperation.id.asc()
+            ).all()
+            
+            chains: List[list] = []
+            by_resource: Dict[str, Optional[list]] = {}
+            for row in rows:
+                payload = json.loads(row.payload)
+                key = resource_key(payload) if isinstance(payload, dict) else None
+                due = row.next_attempt_at is None or row.next_attempt_at <= now
+                if key is not None and key in by_resource:
+                    chain = by_resource[key]
+                    if chain is None:
+                        continue  # blocked behind an operation still backing off
+                    if not due:
+                        by_resource[key] = None
+                        continue
+                    chain.append((row.id, OperationType(row.operation_type), payload, row.retry_count or 0))
+                    continue
+                if not due:
+                    if key is not None:
+                        by_resource[key] = None
+                    continue
+                chain = [(row.id, OperationType(row.operation_type), payload, row.retry_count or 0)]
+                chains.append(chain)
+                if key is not None:
+                    by_resource[key] = chain
+            
+            ids = [item[0] for chain in chains for item in chain]
+            for i in range(0, len(ids), _ID_CHUNK):
+                db.execute(
+                    update(OfflineOperation)
+                    .where(OfflineOperation.id.in_(ids[i:i + _ID_CHUNK]))
+                    .values(status=OperationStatus.IN_PROGRESS.value, updated_at=now)
+                )
+            db.commit()
+            return chains
+        finally:
+            db.close()
+    
+    def _next_retry_in(self) -> Optional[float]:
+        """Seconds until the earliest backed-off operation is due"""
+        db = self.SessionLocal()
+        try:
+            earliest = db.query(OfflineOperation.next_attempt_at).filter(
+                OfflineOperation.status == OperationStatus.PENDING.value,
+                OfflineOperation.next_attempt_at.isnot(None)
+            ).order_by(OfflineOperation.next_attempt_at.asc()).first()
+        finally:
+            db.close()
+        if earliest is None:
+            return None
+        return max((earliest[0] - datetime.utcnow()).total_seconds(), 0.0)
+    
     def _operation_to_dict(self, operation: OfflineOperation) -> Dict[str, Any]:
         """Convert operation model to dictionary"""
         return {
@@ -353,10 +698,93 @@ class OfflineQueueManager:
             "updated_at": operation.updated_at.isoformat(),
             "retry_count": operation.retry_count,
             "error_message": operation.error_message,
-            "priority": operation.priority
+            "priority": operation.priority,
+            "next_attempt_at": operation.next_attempt_at.isoformat() if operation.next_attempt_at else None
         }
 
 
+class _StatusUpdates:
+    """Buffers replay status changes and writes them in batched transactions"""
+    
+    def __init__(self, manager: OfflineQueueManager, batch_size: int):
+        self._manager = manager
+        self._batch_size = max(1, batch_size)
+        self._completed: List[int] = []
+        self._deferred: List[int] = []
+        self._failed: List[Dict[str, Any]] = []
+    
+    def completed(self, operation_id: int) -> None:
+        self._completed.append(operation_id)
+        self._maybe_flush()
+    
+    def deferred(self, operation_id: int) -> None:
+        self._deferred.append(operation_id)
+        self._maybe_flush()
+    
+    def failed(self, operation_id: int, retry_count: int, error: str) -> bool:
+        """
+        Record a failed attempt.
+        
+        Returns:
+            True if the operation was rescheduled, False if it is out of retries
+        """
+        now = datetime.utcnow()
+        retry = retry_count < self._manager.max_retries
+        self._failed.append({
+            "_id": operation_id,
+            "status": (OperationStatus.PENDING if retry else OperationStatus.FAILED).value,
+            "retry_count": retry_count,
+            "error_message": error,
+            "next_attempt_at": now + timedelta(seconds=retry_delay(retry_count)) if retry else None,
+            "updated_at": now,
+        })
+        self._maybe_flush()
+        return retry
+    
+    def _maybe_flush(self) -> None:
+        if len(self._completed) + len(self._deferred) + len(self._failed) >= self._batch_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write all buffered status changes in one transaction"""
+        completed, self._completed = self._completed, []
+        deferred, self._deferred = self._deferred, []
+        failed, self._failed = self._failed, []
+        if not (completed or deferred or failed):
+            return
+        
+        now = datetime.utcnow()
+        db = self._manager.SessionLocal()
+        try:
+            for ids, status in ((completed, OperationStatus.COMPLETED), (deferred, OperationStatus.PENDING)):
+                for i in range(0, len(ids), _ID_CHUNK):
+                    db.execute(
+                        update(OfflineOperation)
+                        .where(OfflineOperation.id.in_(ids[i:i + _ID_CHUNK]))
+                        .values(status=status.value, updated_at=now)
+                    )
+            if failed:
+                db.connection().execute(
+                    update(OfflineOperation.__table__)
+                    .where(OfflineOperation.__table__.c.id == bindparam("_id"))
+                    .values(
+                        status=bindparam("status"),
+                        retry_count=bindparam("retry_count"),
+                        error_message=bindparam("error_message"),
+                        next_attempt_at=bindparam("next_attempt_at"),
+                        updated_at=bindparam("updated_at")
+                    ),
+                    failed
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # Operations stay in progress and are replayed by the next sync
+            logger.error(f"Failed to write offline queue status updates: {e}")
+        finally:
+            db.close()
+
+
 # Global instance
 _queue_manager: Optional[OfflineQueueManager] = None
 
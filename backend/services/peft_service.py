@@ -408,7 +408,7 @@ class PEFTService:
         self,
         model_name: str,
         max_seq_length: int = 2048,
-        dtype: Optional[torch.dtype] = None,
+        dtype: Optional["torch.dtype"] = None,
         load_in_4bit: bool = False,
         load_in_8bit: bool = False
     ) -> ModelInfo:
@@ -2,7 +2,7 @@
 Backend Performance Optimization Service
 
 Implements:
-- Connection pooling for HTTP clients
+- Connection pooling for HTTP clients (shared with platform connectors)
 - Request caching with TTL
 - Database query optimization
 - Performance monitoring
@@ -18,12 +18,13 @@ from typing import Dict, Any, Optional, Callable, List
 from datetime import datetime, timedelta
 from functools import wraps
 from collections import OrderedDict
-import aiohttp
 from sqlalchemy import event, Index
 from sqlalchemy.engine import Engine
 from sqlalchemy.pool import QueuePool
 import psutil
 
+from db_engine import configure_sqlite, is_sqlite
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,91 +32,8 @@ logger = logging.getLogger(__name__)
 # Connection Pooling
 # ============================================================================
 
-class HTTPConnectionPool:
-    """
-    Manages HTTP connection pooling for external API calls.
-    Reuses connections to reduce overhead and improve performance.
-    """
-    
-    def __init__(
-        self,
-        max_connections: int = 100,
-        max_connections_per_host: int = 10,
-        timeout: int = 30
-    ):
-        self.max_connections = max_connections
-        self.max_connections_per_host = max_connections_per_host
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._lock = asyncio.Lock()
-    
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session with connection pooling."""
-        if self._session is None or self._session.closed:
-            async with self._lock:
-                if self._session is None or self._session.closed:
-                    connector = aiohttp.TCPConnector(
-                        limit=self.max_connections,
-                        limit_per_host=self.max_connections_per_host,
-                        ttl_dns_cache=300,  # Cache DNS for 5 minutes
-                        enable_cleanup_closed=True
-                    )
-                    self._session = aiohttp.ClientSession(
-                        connector=connector,
-                        timeout=self.timeout
-                    )
-                    logger.info(
-                        f"Created HTTP connection pool: "
-                        f"max_connections={self.max_connections}, "
-                        f"max_per_host={self.max_connections_per_host}"
-                    )
-        return self._session
-    
-    async def close(self):
-        """Close the HTTP session and cleanup connections."""
-        if self._session and not self._session.closed:
-            await self._session.close()
-            logger.info("Closed HTTP connection pool")
-    
-    async def get(self, url: str, **kwargs) -> aiohttp.ClientResponse:
-        """Make GET request using pooled connection."""
-        session = await self.get_session()
-        return await session.get(url, **kwargs)
-    
-    async def post(self, url: str, **kwargs) -> aiohttp.ClientResponse:
-        """Make POST request using pooled connection."""
-        session = await self.get_session()
-        return await session.post(url, **kwargs)
-    
-    async def put(self, url: str, **kwargs) -> aiohttp.ClientResponse:
-        """Make PUT request using pooled connection."""
-        session = await self.get_session()
-        return await session.put(url, **kwargs)
-    
-    async def delete(self, url: str, **kwargs) -> aiohttp.ClientResponse:
-        """Make DELETE request using pooled connection."""
-        session = await self.get_session()
-        return await session.delete(url, **kwargs)
-
-
-# Global HTTP connection pool
-_http_pool: Optional[HTTPConnectionPool] = None
-
-
-def get_http_pool() -> HTTPConnectionPool:
-    """Get the global HTTP connection pool."""
-    global _http_pool
-    if _http_pool is None:
-        _http_pool = HTTPConnectionPool()
-    return _http_pool
-
-
-async def close_http_pool():
-    """Close the global HTTP connection pool."""
-    global _http_pool
-    if _http_pool:
-        await _http_pool.close()
-        _http_pool = None
+# Connectors and services share one pool; see connectors/http_pool.py
+from connectors.http_pool import HTTPConnectionPool, get_http_pool, close_http_pool
 
 
 # ============================================================================
@@ -272,9 +190,18 @@ class DatabaseOptimizer:
         """
         Configure database connection pooling.
         
+        SQLite engines keep their own pool (a large QueuePool only adds
+        connections contending for SQLite's single writer) and get the
+        pragmas and writer serialization from db_engine instead.
+        
         Args:
             engine: SQLAlchemy engine
         """
+        if is_sqlite(engine):
+            configure_sqlite(engine)
+            logger.info(f"Configured SQLite engine: {type(engine.pool).__name__}, WAL, serialized writers")
+            return
+        
         # Configure pool
         engine.pool = QueuePool(
             engine.pool._creator,
@@ -562,6 +489,7 @@ class PerformanceService:
         """Get all performance metrics."""
         return {
             "cache": self.cache.get_stats(),
+            "http": self.http_pool.get_stats(),
             "database": self.db_optimizer.get_query_stats(),
             "requests": self.monitor.get_metrics(),
             "system": self.monitor.get_system_metrics(),
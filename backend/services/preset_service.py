@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, field_validator
 
+from .library_index import LibraryIndex, LibraryRecord
+
 
 class ConfigurationPreset(BaseModel):
     """Complete training configuration preset"""
@@ -110,6 +112,19 @@ class PresetService:
         """Initialize preset service with storage directory"""
         self.presets_dir = Path(presets_dir)
         self.presets_dir.mkdir(parents=True, exist_ok=True)
+        self._index = LibraryIndex(self.presets_dir, self._index_record)
+    
+    @staticmethod
+    def _index_record(data: Dict[str, Any]) -> LibraryRecord:
+        """Indexed fields of a preset file (raises if it isn't a valid preset)"""
+        preset = ConfigurationPreset(**data)
+        return LibraryRecord(
+            name=preset.name,
+            description=preset.description,
+            sort_key=preset.updated_at,
+            summary=preset.dict(),
+            tags=preset.tags
+        )
     
     def save_preset(self, preset: ConfigurationPreset) -> ConfigurationPreset:
         """
@@ -123,9 +138,7 @@ class PresetService:
         """
         preset.updated_at = datetime.utcnow().isoformat()
         
-        preset_path = self.presets_dir / f"{preset.id}.json"
-        with open(preset_path, 'w') as f:
-            json.dump(preset.dict(), f, indent=2)
+        self._index.write(preset.id, preset.dict())
         
         return preset
     
@@ -152,47 +165,44 @@ class PresetService:
     def list_presets(
         self, 
         search: Optional[str] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[ConfigurationPreset]:
         """
-        List all presets with optional filtering
+        List presets with optional filtering, newest first
+        
+        Served from the preset index rather than by reading every file.
         
         Args:
             search: Optional search term for name/description
             tags: Optional list of tags to filter by
+            limit: Optional maximum number of presets to return
+            offset: Number of matching presets to skip
             
         Returns:
             List of matching presets
         """
-        presets = []
-        
-        for preset_file in self.presets_dir.glob("*.json"):
-            try:
-                with open(preset_file, 'r') as f:
-                    data = json.load(f)
-                preset = ConfigurationPreset(**data)
-                
-                # Apply search filter
-                if search:
-                    search_lower = search.lower()
-                    if (search_lower not in preset.name.lower() and 
-                        search_lower not in preset.description.lower()):
-                        continue
-                
-                # Apply tag filter
-                if tags:
-                    if not any(tag in preset.tags for tag in tags):
-                        continue
-                
-                presets.append(preset)
-            except Exception as e:
-                print(f"Error loading preset {preset_file}: {e}")
-                continue
-        
-        # Sort by updated_at descending
-        presets.sort(key=lambda p: p.updated_at, reverse=True)
+        summaries = self._index.query(search=search, tags=tags, limit=limit, offset=offset)
+        # Summaries were validated when indexed
+        return [ConfigurationPreset.model_construct(**summary) for summary in summaries]
+    
+    def count_presets(
+        self,
+        search: Optional[str] = None,
+        tags: Optional[List[str]] = None
+    ) -> int:
+        """
+        Count presets matching the same filters as list_presets
         
-        return presets
+        Args:
+            search: Optional search term for name/description
+            tags: Optional list of tags to filter by
+            
+        Returns:
+            Number of matching presets
+        """
+        return self._index.count(search=search, tags=tags)
     
     def delete_preset(self, preset_id: str) -> bool:
         """
@@ -204,13 +214,7 @@ class PresetService:
         Returns:
             True if deleted, False if not found
         """
-        preset_path = self.presets_dir / f"{preset_id}.json"
-        
-        if not preset_path.exists():
-            return False
-        
-        preset_path.unlink()
-        return True
+        return self._index.remove(preset_id)
     
     def export_preset(self, preset_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -7,6 +7,8 @@ Validates: Requirements 14.1 - Application must launch within 3 seconds
 
 import time
 import logging
+import sys
+import threading
 from typing import Dict, Any, Optional, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -15,6 +17,9 @@ from functools import wraps
 
 logger = logging.getLogger(__name__)
 
+# Component name prefix of the import times recorded while profiling imports
+IMPORT_COMPONENT_PREFIX = "import:"
+
 
 @dataclass
 class StartupMetrics:
@@ -98,6 +103,95 @@ class LazyLoader:
         self._loading.clear()
 
 
+class LazyRouters:
+    """
+    API routers mounted on their first request instead of at startup.
+
+    Rarely used API groups are registered by path prefix and module; their
+    module (and whatever it imports) is only loaded once a request for that
+    prefix arrives, or the OpenAPI schema is requested.
+    """
+
+    def __init__(self, app, optimizer: Optional["StartupOptimizer"] = None):
+        """
+        Args:
+            app: FastAPI application to mount the routers on
+            optimizer: Records how long mounting each router took
+        """
+        self.app = app
+        self.optimizer = optimizer
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> bool:
+        """Whether any router is still unmounted"""
+        return bool(self._pending)
+
+    def add(self, prefix: str, module_path: str):
+        """
+        Register a router to mount later.
+
+        Args:
+            prefix: Path prefix of the router's routes
+            module_path: Module defining the router as ``router``
+        """
+        self._pending[prefix.rstrip("/")] = module_path
+
+    def _mount(self, prefix: str):
+        """Import and include one pending router (called with the lock held)"""
+        import importlib
+
+        module_path = self._pending[prefix]
+
+        def load():
+            return importlib.import_module(module_path)
+
+        if self.optimizer is not None:
+            load = self.optimizer.measure(f"router:{prefix}")(load)
+        self.app.include_router(load().router)
+        del self._pending[prefix]
+        logger.debug(f"Mounted router {module_path} on first request to {prefix}")
+
+    def mount_for_path(self, path: str) -> bool:
+        """
+        Mount the routers a request path needs.
+
+        Args:
+            path: Request path
+
+        Returns:
+            True if a router was mounted
+        """
+        if path == getattr(self.app, "openapi_url", None):
+            return self.mount_all()
+
+        for prefix in list(self._pending):
+            if path == prefix or path.startswith(prefix + "/"):
+                with self._lock:
+                    if prefix not in self._pending:
+                        return False
+                    self._mount(prefix)
+                    self.app.openapi_schema = None
+                return True
+        return False
+
+    def mount_all(self) -> bool:
+        """
+        Mount every pending router.
+
+        Returns:
+            True if a router was mounted
+        """
+        with self._lock:
+            if not self._pending:
+                return False
+            for prefix in list(self._pending):
+                self._mount(prefix)
+            self.app.openapi_schema = None
+        return True
+
+
 class StartupOptimizer:
     """
     Manages application startup optimization.
@@ -114,6 +208,8 @@ class StartupOptimizer:
         self.lazy_loader = LazyLoader()
         self._critical_resources_loaded = False
         self._ml_libraries_loaded = False
+        self._original_import: Optional[Callable] = None
+        self._profiled_import: Optional[Callable] = None
     
     def measure(self, component_name: str):
         """
@@ -135,6 +231,72 @@ class StartupOptimizer:
             return wrapper
         return decorator
     
+    def start_import_profiling(self):
+        """
+        Record the import time of each module imported from now on.
+
+        Only top-level imports are recorded, each including the modules it
+        imports in turn, as components named IMPORT_COMPONENT_PREFIX plus
+        the module name. Modules already imported are not recorded.
+        """
+        if self._original_import is not None:
+            return
+        
+        import builtins
+        import importlib.util
+        
+        original_import = builtins.__import__
+        state = threading.local()
+        
+        def profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if getattr(state, "importing", False):
+                return original_import(name, globals, locals, fromlist, level)
+            
+            module = name
+            if level:
+                package = (globals or {}).get("__package__") or ""
+                module = importlib.util.resolve_name("." * level + name, package)
+            if module in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            
+            state.importing = True
+            try:
+                timed_import = self.measure(f"{IMPORT_COMPONENT_PREFIX}{module}")(original_import)
+                return timed_import(name, globals, locals, fromlist, level)
+            finally:
+                state.importing = False
+        
+        self._original_import = original_import
+        self._profiled_import = profiled_import
+        builtins.__import__ = profiled_import
+    
+    def stop_import_profiling(self):
+        """Stop recording import times"""
+        if self._original_import is None:
+            return
+        
+        import builtins
+        
+        # Leave a hook installed over ours in place rather than dropping it
+        if builtins.__import__ is self._profiled_import:
+            builtins.__import__ = self._original_import
+        self._original_import = None
+        self._profiled_import = None
+    
+    def get_import_times(self) -> Dict[str, float]:
+        """
+        Get the recorded import times.
+        
+        Returns:
+            Seconds per module, slowest first
+        """
+        imports = {
+            name[len(IMPORT_COMPONENT_PREFIX):]: duration
+            for name, duration in self.metrics.components.items()
+            if name.startswith(IMPORT_COMPONENT_PREFIX)
+        }
+        return dict(sorted(imports.items(), key=lambda item: item[1], reverse=True))
+    
     async def preload_critical_resources(self):
         """
         Preload critical resources needed for the UI to be interactive.
@@ -292,11 +454,12 @@ class StartupOptimizer:
             Dictionary with startup metrics and recommendations
         """
         self.metrics.finalize()
+        imports = self.get_import_times()
+        self.metrics.import_time = sum(imports.values())
         
         # Determine target based on mode (production vs development)
         # Production bundled executables should start within 5 seconds
         # Development mode has a 3-second target
-        import sys
         is_bundled = getattr(sys, 'frozen', False)
         target_time = 5.0 if is_bundled else 3.0
         
@@ -306,6 +469,8 @@ class StartupOptimizer:
             "target_time": target_time,
             "mode": "production" if is_bundled else "development",
             "phases": self.metrics.components,
+            "import_time": self.metrics.import_time,
+            "imports": imports,
             "recommendations": []
         }
         
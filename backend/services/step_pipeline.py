@@ -0,0 +1,233 @@
+"""
+Low-overhead bookkeeping for the training step loop.
+
+Per step, the loop records the step's scalars and compares the step with
+two precomputed thresholds:
+
+- Progress milestones: the steps at which a milestone can be crossed are
+  computed once (see notification_service.milestone_steps), so the
+  notification manager is only consulted on those steps.
+- Metrics emission: a TrainingMetrics is built, stored and handed to the
+  metrics callbacks every ``logging_steps`` steps, and for the last
+  recorded step when the loop ends or pauses, rather than on every step.
+
+Metrics callbacks run on a dispatcher thread fed through a bounded queue,
+so a slow callback (a database write, a WebSocket fan-out) never stalls
+training. When callbacks fall behind, the oldest pending updates are
+dropped in favour of newer ones.
+"""
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+import logging
+import threading
+import time
+
+from .notification_service import NotificationEvent, NotificationManager, ProgressUpdate, milestone_steps
+
+logger = logging.getLogger(__name__)
+
+# Metrics updates queued for callbacks before the oldest is dropped
+DEFAULT_MAX_PENDING = 256
+
+# Past every threshold
+_NEVER = float("inf")
+
+
+class CallbackDispatcher:
+    """
+    Single background thread running callbacks for submitted values.
+
+    Values are dispatched in submission order; each value's callbacks are
+    called in registration order and their exceptions are logged.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING):
+        """
+        Args:
+            max_pending: Values queued before the oldest is dropped
+        """
+        self.max_pending = max_pending
+        self._pending: Deque[Tuple[Sequence[Callable[[Any], None]], Any]] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._busy = False
+        self._stopping = False
+        self._stats = {'dispatched': 0, 'dropped': 0, 'errors': 0}
+
+    def submit(self, callbacks: Sequence[Callable[[Any], None]], value: Any) -> None:
+        """
+        Queue a value for its callbacks without waiting for them.
+
+        Args:
+            callbacks: Callbacks to call with the value
+            value: Argument for the callbacks
+        """
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self._stats['dropped'] += 1
+            self._pending.append((tuple(callbacks), value))
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="metrics-callbacks", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    if self._stopping:
+                        return
+                    self._condition.wait()
+                callbacks, value = self._pending.popleft()
+                self._busy = True
+            errors = 0
+            for callback in callbacks:
+                try:
+                    callback(value)
+                except Exception as e:
+                    errors += 1
+                    logger.error(f"Error in metrics callback: {e}")
+            with self._condition:
+                self._busy = False
+                self._stats['dispatched'] += 1
+                self._stats['errors'] += errors
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued value has been dispatched.
+
+        Returns:
+            True if the queue drained before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Dispatch everything still queued, then stop the thread"""
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Values dispatched and dropped, callback errors and queue depth"""
+        with self._condition:
+            return dict(self._stats, pending=len(self._pending))
+
+
+class StepPipeline:
+    """
+    Per-run step bookkeeping for one job: progress notifications and
+    decimated metrics emission.
+    """
+
+    def __init__(
+        self,
+        job: Any,
+        total_steps: int,
+        make_metrics: Callable[[int, int, float], Any],
+        start_step: int = 0,
+        logging_steps: int = 1,
+        notification_manager: Optional[NotificationManager] = None,
+        notify: Optional[Callable[[NotificationEvent], None]] = None,
+        get_callbacks: Optional[Callable[[], Optional[List[Callable[[Any], None]]]]] = None,
+        dispatcher: Optional[CallbackDispatcher] = None
+    ):
+        """
+        Args:
+            job: TrainingJob receiving current_metrics and metrics_history
+            total_steps: Total training steps
+            make_metrics: Builds the TrainingMetrics of (step, epoch, loss)
+            start_step: First step of this run (after resuming)
+            logging_steps: Emit metrics every this many steps
+            notification_manager: Decides which milestone notifications to send
+            notify: Sends a notification
+            get_callbacks: Returns the job's current metrics callbacks
+            dispatcher: Runs metrics callbacks off the training thread
+        """
+        self.job = job
+        self.total_steps = total_steps
+        self.logging_steps = max(1, logging_steps)
+        self._make_metrics = make_metrics
+        self._notification_manager = notification_manager
+        self._notify = notify
+        self._get_callbacks = get_callbacks
+        self._dispatcher = dispatcher
+        self._previous_step = start_step
+        self._next_emit: float = start_step
+        self._unemitted: Optional[Tuple[int, int, float]] = None
+
+        # Milestones at or before the start step were crossed by an earlier run
+        self._milestones = [step for step in milestone_steps(total_steps) if step > start_step]
+        self._milestone_index = 0
+        self._next_milestone: float = self._milestones[0] if self._milestones and notification_manager else _NEVER
+
+    def record(self, step: int, epoch: int, loss: float) -> None:
+        """
+        Record a finished step; the per-step hot path.
+
+        Args:
+            step: Step number
+            epoch: Epoch of the step
+            loss: Loss of the step
+        """
+        if step >= self._next_milestone:
+            self._check_milestone(step)
+        if step >= self._next_emit:
+            self._emit(step, epoch, loss)
+            self._next_emit = step + self.logging_steps
+            self._unemitted = None
+        else:
+            self._unemitted = (step, epoch, loss)
+        self._previous_step = step
+
+    def flush(self) -> None:
+        """Emit the last recorded step if it has not been emitted"""
+        if self._unemitted is not None:
+            self._emit(*self._unemitted)
+            self._unemitted = None
+
+    def _check_milestone(self, step: int) -> None:
+        notification = self._notification_manager.get_next_notification(ProgressUpdate(
+            current_step=step,
+            total_steps=self.total_steps,
+            previous_step=self._previous_step
+        ))
+        if notification and self._notify is not None:
+            self._notify(notification)
+
+        while self._milestone_index < len(self._milestones) and self._milestones[self._milestone_index] <= step:
+            self._milestone_index += 1
+        if self._milestone_index < len(self._milestones):
+            self._next_milestone = self._milestones[self._milestone_index]
+        else:
+            self._next_milestone = _NEVER
+
+    def _emit(self, step: int, epoch: int, loss: float) -> None:
+        metrics = self._make_metrics(step, epoch, loss)
+        self.job.current_metrics = metrics
+        self.job.metrics_history.append(metrics)
+
+        callbacks = self._get_callbacks() if self._get_callbacks is not None else None
+        if not callbacks:
+            return
+        if self._dispatcher is not None:
+            self._dispatcher.submit(callbacks, metrics)
+            return
+        for callback in callbacks:
+            try:
+                callback(metrics)
+            except Exception as e:
+                logger.error(f"Error in metrics callback: {e}")
@@ -15,6 +15,7 @@ from services.offline_queue_service import (
     OperationType,
     OperationStatus
 )
+from services.offline_compaction import merge_payloads
 from services.network_service import get_network_monitor, NetworkStatus
 
 
@@ -43,6 +44,7 @@ class SyncEngine:
         self.network_monitor = get_network_monitor()
         self._is_syncing = False
         self._sync_task: Optional[asyncio.Task] = None
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
         self._operation_handlers: Dict[OperationType, Callable] = {}
         self._conflict_strategy = ConflictResolution.LOCAL_WINS
         
@@ -103,6 +105,7 @@ class SyncEngine:
         
         try:
             results = await self.queue_manager.sync_all(self._execute_operation)
+            self._schedule_retry(results.get("next_retry_in"))
             
             # Clean up completed operations
             cleaned = self.queue_manager.clear_completed()
@@ -120,6 +123,19 @@ class SyncEngine:
         finally:
             self._is_syncing = False
     
+    def _schedule_retry(self, delay: Optional[float]) -> None:
+        """Run another sync when the earliest backed-off operation is due"""
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+        if delay is None:
+            return
+        self._retry_handle = asyncio.get_running_loop().call_later(delay, self._retry_due)
+    
+    def _retry_due(self) -> None:
+        self._retry_handle = None
+        self._sync_task = asyncio.get_running_loop().create_task(self.sync())
+    
     async def _execute_operation(
         self,
         operation_type: OperationType,
@@ -241,9 +257,7 @@ class SyncEngine:
         Returns:
             Merged payload
         """
-        merged = remote.copy()
-        merged.update(local)
-        return merged
+        return merge_payloads(local, remote)
     
     def get_sync_status(self) -> Dict[str, Any]:
         """Get current sync status"""
@@ -264,6 +278,7 @@ class SyncEngine:
     
     async def stop_auto_sync(self) -> None:
         """Stop automatic synchronization"""
+        self._schedule_retry(None)
         await self.network_monitor.stop_monitoring()
 
 
@@ -0,0 +1,355 @@
+"""
+Tokenization Service for counting tokens with a model's real tokenizer.
+
+Tokenizers are loaded lazily (transformers is only imported when a count is
+requested), texts are tokenized in large batches across a process pool, and
+per-dataset token length arrays are cached on disk as compact NumPy files so
+repeat analyses of an unchanged dataset skip tokenization entirely.
+"""
+
+from typing import Dict, List, Optional
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from pathlib import Path
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from .lazy_imports import lazy_transformers
+
+logger = logging.getLogger(__name__)
+
+# Texts sent to the tokenizer per batch
+TOKENIZE_BATCH_SIZE = 1024
+
+# Bytes hashed from each end of a dataset file when fingerprinting it
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024
+
+# Seconds a tokenizer that failed to load or run is skipped before it is retried
+UNAVAILABLE_RETRY_SECONDS = 300
+
+# Tokenizer loaded once per worker process by the pool initializer
+_worker_tokenizer = None
+_worker_error: Optional[str] = None
+
+
+def _load_tokenizer(tokenizer_name: str):
+    """Load a tokenizer by model ID or local path"""
+    transformers = lazy_transformers()
+    return transformers.AutoTokenizer.from_pretrained(tokenizer_name, use_fast=True)
+
+
+def _init_worker(tokenizer_name: str):
+    """Process pool initializer: load the tokenizer for this worker"""
+    global _worker_tokenizer, _worker_error
+    # Each worker is its own unit of parallelism
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    try:
+        _worker_tokenizer = _load_tokenizer(tokenizer_name)
+    except Exception as e:
+        # Reported by each task instead of breaking the pool, so the caller
+        # sees the load error rather than BrokenProcessPool
+        _worker_error = f"Could not load tokenizer '{tokenizer_name}': {e}"
+
+
+def _token_lengths(tokenizer, texts: List[str]):
+    """Count tokens for a batch of texts as a uint32 array"""
+    import numpy as np
+    
+    encoded = tokenizer(
+        texts,
+        add_special_tokens=False,
+        return_attention_mask=False,
+        return_token_type_ids=False
+    )["input_ids"]
+    return np.fromiter((len(ids) for ids in encoded), dtype=np.uint32, count=len(encoded))
+
+
+def _count_batch(texts: List[str]):
+    """Process pool task: count tokens with the worker's tokenizer"""
+    if _worker_tokenizer is None:
+        raise RuntimeError(_worker_error or "Tokenizer not loaded")
+    return _token_lengths(_worker_tokenizer, texts)
+
+
+class TokenCounter:
+    """
+    Collects sample texts and counts their tokens in order.
+    
+    Full batches are submitted to the tokenizer as they fill up, so counting
+    overlaps with reading the dataset. When the dataset's lengths are already
+    cached, added texts are ignored and finalize() returns the cached array.
+    """
+    
+    def __init__(
+        self,
+        service: "TokenizationService",
+        tokenizer_name: str,
+        cache_path: Optional[Path] = None,
+        cached=None
+    ):
+        self.service = service
+        self.tokenizer_name = tokenizer_name
+        self.cache_path = cache_path
+        self.from_cache = cached is not None
+        self._cached = cached
+        self._pending: List[str] = []
+        self._in_flight: deque = deque()
+        self._results = []
+        self._error: Optional[BaseException] = None
+    
+    def add(self, text: str):
+        """Queue one sample's text for counting"""
+        if self.from_cache or self._error is not None:
+            return
+        self._pending.append(text)
+        if len(self._pending) >= self.service.batch_size:
+            self._submit()
+    
+    def finalize(self):
+        """
+        Return the token length of every added text, or None if the tokenizer
+        could not be used. Newly computed lengths are written to the cache.
+        """
+        import numpy as np
+        
+        if self.from_cache:
+            return self._cached
+        
+        self._submit()
+        while self._in_flight and self._error is None:
+            self._collect()
+        
+        if self._error is not None:
+            logger.warning(f"Token counting with '{self.tokenizer_name}' failed: {self._error}")
+            self.service.mark_unavailable(self.tokenizer_name, self._error)
+            return None
+        
+        lengths = np.concatenate(self._results) if self._results else np.empty(0, dtype=np.uint32)
+        if self.cache_path is not None:
+            self.service.save_lengths(self.cache_path, lengths)
+        return lengths
+    
+    def _submit(self):
+        if not self._pending or self._error is not None:
+            return
+        
+        batch, self._pending = self._pending, []
+        try:
+            self._in_flight.append(self.service.submit_batch(self.tokenizer_name, batch))
+        except Exception as e:
+            self._error = e
+            return
+        
+        # Bound the number of batches held in memory
+        while len(self._in_flight) > 2 * self.service.max_workers and self._error is None:
+            self._collect()
+    
+    def _collect(self):
+        try:
+            self._results.append(self._in_flight.popleft().result())
+        except Exception as e:
+            self._error = e
+
+
+class TokenizationService:
+    """
+    Batched, cached token counting with real model tokenizers.
+    
+    Each tokenizer gets its own process pool whose workers load the tokenizer
+    once. With a single worker the tokenizer is loaded in-process instead.
+    Token length arrays are cached per (dataset fingerprint, tokenizer).
+    Workers are spawned rather than forked, since the service runs inside a
+    threaded server (and a frozen executable on Windows).
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        batch_size: int = TOKENIZE_BATCH_SIZE
+    ):
+        """
+        Initialize tokenization service.
+        
+        Args:
+            cache_dir: Directory for cached token lengths (defaults to the app cache dir)
+            max_workers: Tokenizer worker processes (defaults to the CPU count, up to 8)
+            batch_size: Texts per tokenizer batch
+        """
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        self.batch_size = batch_size
+        self._executors: Dict[str, ProcessPoolExecutor] = {}
+        self._tokenizers: Dict[str, object] = {}
+        self._unavailable: Dict[str, float] = {}  # tokenizer name -> retry time
+        self._lock = threading.Lock()
+    
+    def is_available(self, tokenizer_name: str) -> bool:
+        """Whether counting with this tokenizer has not recently failed"""
+        with self._lock:
+            retry_at = self._unavailable.get(tokenizer_name)
+            if retry_at is not None and time.monotonic() >= retry_at:
+                del self._unavailable[tokenizer_name]
+                retry_at = None
+        return retry_at is None
+    
+    def mark_unavailable(self, tokenizer_name: str, error: Optional[BaseException] = None):
+        """
+        Discard a tokenizer that failed to load or run.
+        
+        The tokenizer is skipped for UNAVAILABLE_RETRY_SECONDS, so transient
+        failures (such as a network error while downloading) are retried
+        later. A broken worker pool is only replaced, not skipped.
+        """
+        with self._lock:
+            if not isinstance(error, BrokenProcessPool):
+                self._unavailable[tokenizer_name] = time.monotonic() + UNAVAILABLE_RETRY_SECONDS
+            executor = self._executors.pop(tokenizer_name, None)
+            self._tokenizers.pop(tokenizer_name, None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def token_counter(self, tokenizer_name: str, file_path: Optional[str] = None) -> Optional[TokenCounter]:
+        """
+        Create a counter for one pass over a dataset.
+        
+        Args:
+            tokenizer_name: Model ID or local path of the tokenizer
+            file_path: Dataset file; when given, lengths are cached for it
+        
+        Returns:
+            TokenCounter, or None if the tokenizer is known to be unavailable
+        """
+        if not self.is_available(tokenizer_name):
+            return None
+        
+        if file_path is None:
+            return TokenCounter(self, tokenizer_name)
+        
+        cache_path = self._cache_path(file_path, tokenizer_name)
+        return TokenCounter(self, tokenizer_name, cache_path, cached=self.load_lengths(cache_path))
+    
+    def count_tokens(self, texts: List[str], tokenizer_name: str):
+        """
+        Count tokens for a list of texts.
+        
+        Returns:
+            uint32 array of token counts, or None if the tokenizer is unavailable
+        """
+        counter = self.token_counter(tokenizer_name)
+        if counter is None:
+            return None
+        for text in texts:
+            counter.add(text)
+        return counter.finalize()
+    
+    def submit_batch(self, tokenizer_name: str, texts: List[str]) -> Future:
+        """Tokenize one batch, in the tokenizer's process pool when there is one"""
+        if self.max_workers <= 1:
+            future = Future()
+            try:
+                future.set_result(_token_lengths(self._get_tokenizer(tokenizer_name), texts))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        return self._get_executor(tokenizer_name).submit(_count_batch, texts)
+    
+    def dataset_fingerprint(self, file_path: str) -> str:
+        """
+        Fingerprint a dataset file from its size, modification time and the
+        bytes at both ends, without reading the whole file.
+        """
+        stat = os.stat(file_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+        
+        with open(file_path, 'rb') as f:
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+            if stat.st_size > FINGERPRINT_SAMPLE_BYTES:
+                f.seek(max(FINGERPRINT_SAMPLE_BYTES, stat.st_size - FINGERPRINT_SAMPLE_BYTES))
+                digest.update(f.read())
+        
+        return digest.hexdigest()
+    
+    def load_lengths(self, cache_path: Path):
+        """Load a cached length array, or None if there is no usable cache entry"""
+        import numpy as np
+        
+        if not cache_path.exists():
+            return None
+        try:
+            return np.load(cache_path, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token length cache {cache_path}: {e}")
+            return None
+    
+    def save_lengths(self, cache_path: Path, lengths):
+        """Atomically write a length array to the cache"""
+        import numpy as np
+        
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(cache_path.name + f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, lengths.astype(np.uint32, copy=False), allow_pickle=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache token lengths at {cache_path}: {e}")
+    
+    def shutdown(self):
+        """Stop all tokenizer worker pools"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+            self._tokenizers.clear()
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _cache_path(self, file_path: str, tokenizer_name: str) -> Path:
+        tokenizer_key = hashlib.sha256(tokenizer_name.encode('utf-8')).hexdigest()[:16]
+        return self._get_cache_dir() / f"{self.dataset_fingerprint(file_path)}-{tokenizer_key}.npy"
+    
+    def _get_cache_dir(self) -> Path:
+        if self._cache_dir is None:
+            from runtime_paths import get_cache_dir
+            self._cache_dir = get_cache_dir() / 'token_lengths'
+        return self._cache_dir
+    
+    def _get_tokenizer(self, tokenizer_name: str):
+        with self._lock:
+            tokenizer = self._tokenizers.get(tokenizer_name)
+            if tokenizer is None:
+                tokenizer = _load_tokenizer(tokenizer_name)
+                self._tokenizers[tokenizer_name] = tokenizer
+            return tokenizer
+    
+    def _get_executor(self, tokenizer_name: str) -> ProcessPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(tokenizer_name)
+            if executor is None:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(tokenizer_name,)
+                )
+                self._executors[tokenizer_name] = executor
+            return executor
+
+
+# Singleton instance
+_tokenization_service_instance = None
+
+
+def get_tokenization_service() -> TokenizationService:
+    """Get singleton instance of TokenizationService"""
+    global _tokenization_service_instance
+    if _tokenization_service_instance is None:
+        _tokenization_service_instance = TokenizationService()
+    return _tokenization_service_instance
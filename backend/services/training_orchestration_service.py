@@ -7,17 +7,21 @@ Requirements: 5.1, 5.2, 5.3, 5.4, 5.5
 """
 
 from typing import Dict, List, Optional, Any, Callable
+from concurrent.futures import Future
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from datetime import datetime
 import json
 import logging
 import threading
+import time
 import queue
 from pathlib import Path
 import shutil
 import hashlib
 import asyncio
+import os
+import uuid
 
 # Lazy import torch to reduce startup memory usage
 _torch = None
@@ -46,13 +50,36 @@ from .notification_service import (
     ProgressUpdate,
     NotificationEvent
 )
+from .metrics_store import MetricsStore
+from .step_pipeline import CallbackDispatcher, StepPipeline
+from .job_scheduler import DEFAULT_OWNER, JobScheduler, estimate_resources
+from .training_worker import PAUSE, STOP, WORKER_MODES, TrainingWorker, simulated_step
+from .checkpoint_writer import (
+    AsyncCheckpointWriter,
+    TENSORS_FILE,
+    join_tensors,
+    replace_directory,
+    split_tensors,
+)
+from .checkpoint_store import ChunkStore, MANIFEST_FILE
+from .artifact_download import download_to_file
 
 logger = logging.getLogger(__name__)
 
+# Duration of one step of the simulated local training loop
+SIMULATED_STEP_SECONDS = 0.01
+
+# How long a finishing run waits for its queued metrics callbacks
+CALLBACK_FLUSH_TIMEOUT = 5.0
+
+# How often a thread supervising a worker process checks for new steps and signals
+WORKER_POLL_SECONDS = 0.05
+
 
 class TrainingState(str, Enum):
     """Training job states"""
     CREATED = "created"
+    QUEUED = "queued"
     INITIALIZING = "initializing"
     RUNNING = "running"
     PAUSED = "paused"
@@ -121,44 +148,93 @@ class CheckpointData:
     timestamp: datetime = field(default_factory=datetime.now)
     checkpoint_reason: str = "manual"  # manual, scheduled, anomaly
     
-    def save(self, path: Path) -> None:
-        """Save checkpoint to disk"""
-        path.parent.mkdir(parents=True, exist_ok=True)
+    def save(self, path: Path, store: Optional[ChunkStore] = None) -> int:
+        """
+        Save checkpoint to disk.
         
-        # Save model and optimizer states separately (they're large)
-        _get_torch().save({
-            'model_state_dict': self.model_state_dict,
-            'optimizer_state_dict': self.optimizer_state_dict,
-            'scheduler_state_dict': self.scheduler_state_dict,
-        }, path / "model_checkpoint.pt")
-        
-        # Save metadata and metrics
-        metadata = {
-            'step': self.step,
-            'epoch': self.epoch,
-            'loss': self.loss,
-            'learning_rate': self.learning_rate,
-            'metrics_history': self.metrics_history,
-            'config': self.config,
-            'timestamp': self.timestamp.isoformat(),
-            'checkpoint_reason': self.checkpoint_reason
-        }
+        Tensors go to a safetensors file, or, when a chunk store is given, to
+        deduplicated chunks listed in a manifest; everything else goes to
+        JSON. Files are written to a temporary directory that replaces path
+        once complete, so readers never see a partial checkpoint.
+        
+        Args:
+            path: Checkpoint directory
+            store: Chunk store shared by the job's checkpoints
         
-        with open(path / "checkpoint_metadata.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        Returns:
+            Number of bytes written, including new chunks
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.parent / f".{path.name}-{uuid.uuid4().hex[:8]}.tmp"
+        staging.mkdir()
+        try:
+            state, tensors = split_tensors({
+                'model_state_dict': self.model_state_dict,
+                'optimizer_state_dict': self.optimizer_state_dict,
+                'scheduler_state_dict': self.scheduler_state_dict,
+            })
+            chunk_bytes = 0
+            if store is None:
+                from safetensors.torch import save_file
+                
+                save_file(tensors, str(staging / TENSORS_FILE))
+            else:
+                manifest = {
+                    'store': os.path.relpath(store.root, path),
+                    'tensors': {}
+                }
+                for key, tensor in tensors.items():
+                    manifest['tensors'][key], written = store.put_tensor(tensor)
+                    chunk_bytes += written
+                with open(staging / MANIFEST_FILE, 'w') as f:
+                    json.dump(manifest, f, separators=(',', ':'))
+            
+            # Save metadata, metrics and the non-tensor parts of the states
+            metadata = {
+                'step': self.step,
+                'epoch': self.epoch,
+                'loss': self.loss,
+                'learning_rate': self.learning_rate,
+                'metrics_history': self.metrics_history,
+                'config': self.config,
+                'timestamp': self.timestamp.isoformat(),
+                'checkpoint_reason': self.checkpoint_reason,
+                'state': state
+            }
+            
+            with open(staging / "checkpoint_metadata.json", 'w') as f:
+                json.dump(metadata, f, separators=(',', ':'))
+            
+            written = chunk_bytes + sum(f.stat().st_size for f in staging.iterdir())
+            replace_directory(staging, path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
         
         logger.info(f"Checkpoint saved to {path}")
+        return written
     
     @classmethod
     def load(cls, path: Path) -> 'CheckpointData':
-        """Load checkpoint from disk"""
-        # Load model and optimizer states
-        checkpoint = _get_torch().load(path / "model_checkpoint.pt")
-        
+        """Load checkpoint from disk (chunk manifest, safetensors, or the older torch.save format)"""
         # Load metadata
         with open(path / "checkpoint_metadata.json", 'r') as f:
             metadata = json.load(f)
         
+        # Load model and optimizer states
+        if (path / MANIFEST_FILE).exists():
+            with open(path / MANIFEST_FILE, 'r') as f:
+                manifest = json.load(f)
+            store = ChunkStore(path / manifest['store'])
+            tensors = {key: store.get_tensor(entry) for key, entry in manifest['tensors'].items()}
+            checkpoint = join_tensors(metadata['state'], tensors)
+        elif (path / TENSORS_FILE).exists():
+            from safetensors.torch import load_file
+            
+            checkpoint = join_tensors(metadata['state'], load_file(str(path / TENSORS_FILE)))
+        else:
+            checkpoint = _get_torch().load(path / "model_checkpoint.pt")
+        
         return cls(
             step=metadata['step'],
             epoch=metadata['epoch'],
@@ -215,6 +291,17 @@ class TrainingConfig:
     eval_steps: int = 500
     eval_strategy: str = "steps"
     
+    # Monitoring: metrics are recorded and sent to callbacks every logging_steps steps
+    logging_steps: int = 1
+    
+    # Scheduling: local jobs wait until their resources are free; unset
+    # GPU memory and RAM needs are estimated from the model and precision
+    priority: int = 0
+    owner: str = DEFAULT_OWNER
+    gpu_memory_mb: Optional[int] = None
+    cpu_cores: int = 1
+    ram_mb: Optional[int] = None
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
         return asdict(self)
@@ -244,6 +331,13 @@ class ArtifactInfo:
         }
 
 
+# TrainingJob fields mirrored in the TrainingRun table
+_SYNCED_JOB_FIELDS = frozenset({
+    'config', 'state', 'current_metrics', 'error_message', 'started_at', 'completed_at',
+    'paused_at', 'provider', 'provider_job_id', 'artifact_info',
+})
+
+
 @dataclass
 class TrainingJob:
     """Training job with state and metadata"""
@@ -251,7 +345,7 @@ class TrainingJob:
     config: TrainingConfig
     state: TrainingState = TrainingState.CREATED
     current_metrics: Optional[TrainingMetrics] = None
-    metrics_history: List[TrainingMetrics] = field(default_factory=list)
+    metrics_history: MetricsStore = field(default_factory=lambda: MetricsStore(TrainingMetrics))
     error_message: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.now)
     started_at: Optional[datetime] = None
@@ -266,6 +360,17 @@ class TrainingJob:
     provider_job_id: Optional[str] = None  # Job ID from the provider
     artifact_info: Optional[ArtifactInfo] = None  # Downloaded artifact information
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name in _SYNCED_JOB_FIELDS:
+            # Mark the job changed since its last database sync
+            self.__dict__['_revision'] = self.__dict__.get('_revision', 0) + 1
+    
+    @property
+    def revision(self) -> int:
+        """Counter bumped whenever a field stored in TrainingRun is assigned"""
+        return self.__dict__.get('_revision', 0)
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for API responses"""
         return {
@@ -296,8 +401,18 @@ class TrainingOrchestrator:
     def __init__(
         self,
         checkpoint_base_dir: str = "./checkpoints",
-        artifacts_base_dir: str = "./artifacts"
+        artifacts_base_dir: str = "./artifacts",
+        worker_mode: str = "thread"
     ):
+        """
+        Args:
+            checkpoint_base_dir: Directory of job checkpoints
+            artifacts_base_dir: Directory of downloaded artifacts
+            worker_mode: Where local training steps run: "thread" (a thread
+                of this process) or "process" (a child process per job)
+        """
+        if worker_mode not in WORKER_MODES:
+            raise ValueError(f"Unknown worker mode: {worker_mode}")
         self.jobs: Dict[str, TrainingJob] = {}
         self.job_queue: queue.Queue = queue.Queue()
         self.checkpoint_base_dir = Path(checkpoint_base_dir)
@@ -314,9 +429,15 @@ class TrainingOrchestrator:
         self._training_threads: Dict[str, threading.Thread] = {}
         self._stop_flags: Dict[str, threading.Event] = {}
         self._pause_flags: Dict[str, threading.Event] = {}
+        self.worker_mode = worker_mode
+        self._workers: Dict[str, TrainingWorker] = {}
         
-        # Callbacks for metrics updates
+        # Callbacks for metrics updates, run off the training thread
         self._metrics_callbacks: Dict[str, List[Callable]] = {}
+        self._callback_dispatcher = CallbackDispatcher()
+        self.simulated_step_seconds = SIMULATED_STEP_SECONDS
+        # Pure-Python iterations standing in for each simulated step's computation
+        self.simulated_step_work = 0
         
         # Notification managers per job
         self._notification_managers: Dict[str, NotificationManager] = {}
@@ -324,6 +445,12 @@ class TrainingOrchestrator:
         # Callbacks for notifications
         self._notification_callbacks: Dict[str, List[Callable]] = {}
         
+        # Checkpoints are written off the training thread
+        self._checkpoint_writer = AsyncCheckpointWriter()
+        
+        # Local jobs are admitted against the hardware profile
+        self.job_scheduler = JobScheduler(launch=self._launch_local, progress=self._completed_steps)
+        
         logger.info("TrainingOrchestrator initialized with multi-provider support")
     
     def create_job(self, config: TrainingConfig) -> TrainingJob:
@@ -341,6 +468,8 @@ class TrainingOrchestrator:
             config=config,
             state=TrainingState.CREATED
         )
+        # Sealed metrics segments are memory-mapped from the job's checkpoint directory
+        job.metrics_history.spill_dir = self.checkpoint_base_dir / config.job_id / "metrics"
         
         self.jobs[config.job_id] = job
         logger.info(f"Created training job: {config.job_id}")
@@ -457,9 +586,6 @@ class TrainingOrchestrator:
         
         # Local training
         job.provider = "local"
-        job.state = TrainingState.INITIALIZING
-        if job.started_at is None:
-            job.started_at = datetime.now()
         
         # Create control flags if they don't exist
         if job_id not in self._stop_flags:
@@ -467,6 +593,32 @@ class TrainingOrchestrator:
         if job_id not in self._pause_flags:
             self._pause_flags[job_id] = threading.Event()
         
+        # Wait for resources; the scheduler launches the job once they are free
+        config = job.config
+        job.state = TrainingState.QUEUED
+        admitted = self.job_scheduler.submit(
+            job_id,
+            estimate_resources(config),
+            priority=config.priority,
+            owner=config.owner,
+            total_steps=self._total_steps(config),
+            start_step=self._completed_steps(job_id) or 0
+        )
+        if not admitted:
+            logger.info(f"Queued local training job: {job_id}")
+    
+    def _launch_local(self, job_id: str) -> None:
+        """
+        Start the training thread of a local job admitted by the scheduler.
+        
+        Args:
+            job_id: Job identifier
+        """
+        job = self.jobs[job_id]
+        job.state = TrainingState.INITIALIZING
+        if job.started_at is None:
+            job.started_at = datetime.now()
+        
         # Start training in a separate thread
         thread = threading.Thread(
             target=self._training_loop,
@@ -478,6 +630,21 @@ class TrainingOrchestrator:
         
         logger.info(f"Started local training job: {job_id}")
     
+    def _completed_steps(self, job_id: str) -> Optional[int]:
+        """Steps a job has completed according to its latest metrics"""
+        job = self.jobs.get(job_id)
+        if job is None or job.current_metrics is None:
+            return None
+        return job.current_metrics.step + 1
+    
+    @staticmethod
+    def _total_steps(config: TrainingConfig) -> int:
+        return config.max_steps if config.max_steps else (config.num_epochs * 1000)
+    
+    def get_queue_status(self) -> Dict[str, Any]:
+        """Get admitted local jobs and the queue with estimated start times"""
+        return self.job_scheduler.get_status()
+    
     def pause_training(self, job_id: str) -> CheckpointData:
         """
         Pause a running training job and save checkpoint.
@@ -601,11 +768,15 @@ class TrainingOrchestrator:
         
         job = self.jobs[job_id]
         
-        if job.state not in [TrainingState.RUNNING, TrainingState.PAUSED, TrainingState.INITIALIZING]:
+        if job.state not in [TrainingState.RUNNING, TrainingState.PAUSED, TrainingState.INITIALIZING,
+                             TrainingState.QUEUED]:
             raise ValueError(f"Cannot stop job in state: {job.state}")
         
         logger.info(f"Stopping training job: {job_id}")
         
+        # A queued job never started; take it out of the queue
+        self.job_scheduler.cancel(job_id)
+        
         # If running on provider, cancel there
         if job.provider and job.provider != "local" and job.provider_job_id:
             loop = asyncio.new_event_loop()
@@ -739,26 +910,18 @@ class TrainingOrchestrator:
         # Download artifact
         try:
             logger.info(f"Downloading artifact for job {job_id} from {job.provider}")
-            artifact_data = await connector.fetch_artifact(job.provider_job_id)
-            
-            # Create artifact directory
-            artifact_dir = self.artifacts_base_dir / job_id
-            artifact_dir.mkdir(parents=True, exist_ok=True)
             
-            # Save artifact
-            artifact_path = artifact_dir / "adapter_model.safetensors"
-            with open(artifact_path, 'wb') as f:
-                f.write(artifact_data)
-            
-            # Calculate hash for integrity verification
-            file_hash = self._calculate_file_hash(artifact_path)
+            # Stream to disk, hashing for integrity verification on the way
+            artifact_path = self.artifacts_base_dir / job_id / "adapter_model.safetensors"
+            download = await download_to_file(connector, job.provider_job_id, artifact_path)
+            file_hash = download.sha256
             
             # Create artifact info
             artifact_info = ArtifactInfo(
                 artifact_id=f"{job_id}_artifact",
                 job_id=job_id,
                 path=artifact_path,
-                size_bytes=len(artifact_data),
+                size_bytes=download.size_bytes,
                 hash_sha256=file_hash,
                 created_at=datetime.now(),
                 metadata={
@@ -914,11 +1077,14 @@ class TrainingOrchestrator:
     def _training_loop(self, job_id: str) -> None:
         """
         Main training loop for local training (runs in separate thread).
+        In process mode the steps run in a child process supervised from
+        this thread.
         
         Args:
             job_id: Job identifier
         """
         job = self.jobs[job_id]
+        released = False
         
         try:
             job.state = TrainingState.RUNNING
@@ -940,81 +1106,44 @@ class TrainingOrchestrator:
             # Initialize training state
             start_step = checkpoint.step if checkpoint else 0
             start_epoch = checkpoint.epoch if checkpoint else 0
-            initial_loss = None
             loss_history = []
             
             # Simulate training loop
             config = job.config
-            total_steps = config.max_steps if config.max_steps else (config.num_epochs * 1000)
+            total_steps = self._total_steps(config)
             
-            previous_step = start_step
+            # Milestone checks, metrics emission and callbacks are kept off the per-step path
+            pipeline = StepPipeline(
+                job,
+                total_steps,
+                make_metrics=lambda step, epoch, loss: self._simulated_metrics(config, total_steps, step, epoch, loss),
+                start_step=start_step,
+                logging_steps=config.logging_steps,
+                notification_manager=notification_manager,
+                notify=lambda notification: self._send_notification(job_id, notification),
+                get_callbacks=lambda: self._metrics_callbacks.get(job_id),
+                dispatcher=self._callback_dispatcher
+            )
             
-            for step in range(start_step, total_steps):
-                # Check for stop signal
-                if self._stop_flags[job_id].is_set():
-                    logger.info(f"Stop signal received for job {job_id}")
-                    break
-                
-                # Check for pause signal
-                if self._pause_flags[job_id].is_set():
-                    logger.info(f"Pause signal received for job {job_id}")
-                    self._save_checkpoint(job_id, step, step // 1000, 0.5, config.learning_rate, "pause")
-                    job.state = TrainingState.PAUSED
-                    return
-                
-                # Simulate training step
-                epoch = step // 1000
-                loss = 2.0 - (step / total_steps) * 1.5  # Simulated decreasing loss
-                
-                if initial_loss is None:
-                    initial_loss = loss
-                
-                loss_history.append(loss)
-                
-                # Update metrics
-                metrics = TrainingMetrics(
-                    step=step,
-                    epoch=epoch,
-                    loss=loss,
-                    learning_rate=config.learning_rate,
-                    grad_norm=0.5,
-                    throughput=10.0,
-                    samples_per_second=40.0,
-                    elapsed_time=step * 0.1,
-                    estimated_time_remaining=(total_steps - step) * 0.1
-                )
-                
-                job.current_metrics = metrics
-                job.metrics_history.append(metrics)
-                
-                # Check for progress milestones and send notifications
-                progress_update = ProgressUpdate(
-                    current_step=step,
-                    total_steps=total_steps,
-                    previous_step=previous_step
-                )
-                
-                notification = notification_manager.get_next_notification(progress_update)
-                if notification:
-                    self._send_notification(job_id, notification)
-                
-                previous_step = step
-                
-                # Call metrics callbacks
-                if job_id in self._metrics_callbacks:
-                    for callback in self._metrics_callbacks[job_id]:
-                        try:
-                            callback(metrics)
-                        except Exception as e:
-                            logger.error(f"Error in metrics callback: {e}")
-                
-                # Save checkpoint periodically
-                if step > 0 and step % config.save_steps == 0:
-                    self._save_checkpoint(job_id, step, epoch, loss, config.learning_rate, "scheduled")
-                
-                # Simulate step delay
-                import time
-                time.sleep(0.01)
+            if self.worker_mode == "process":
+                paused_step = self._run_steps_in_worker(job_id, total_steps, start_step, pipeline, loss_history)
+            else:
+                paused_step = self._run_steps(job_id, total_steps, start_step, pipeline, loss_history)
+            
+            if paused_step is not None:
+                pipeline.flush()
+                # Resuming reads this checkpoint, so wait for it to be written
+                self._save_checkpoint(job_id, paused_step, paused_step // 1000, 0.5, config.learning_rate, "pause").result()
+                # Free the resources before the job can be resumed
+                self.job_scheduler.release(job_id)
+                released = True
+                job.state = TrainingState.PAUSED
+                return
+            initial_loss = loss_history[0] if loss_history else None
+            
+            # Callbacks see the final metrics before the run is reported complete
+            pipeline.flush()
+            self._callback_dispatcher.flush(CALLBACK_FLUSH_TIMEOUT)
             
             # Training completed - perform quality analysis
             job.state = TrainingState.COMPLETED
@@ -1064,8 +1193,142 @@ class TrainingOrchestrator:
             self._send_notification(job_id, error_notification)
         
         finally:
+            if not released:
+                self.job_scheduler.release(job_id)
             self._cleanup_job(job_id)
     
+    def _run_steps(
+        self,
+        job_id: str,
+        total_steps: int,
+        start_step: int,
+        pipeline: StepPipeline,
+        loss_history: List[float]
+    ) -> Optional[int]:
+        """
+        Run the steps of a local job on the calling thread.
+        
+        Returns:
+            The step the job paused at, or None if it finished or was stopped
+        """
+        config = self.jobs[job_id].config
+        stop_flag = self._stop_flags[job_id]
+        pause_flag = self._pause_flags[job_id]
+        step_seconds = self.simulated_step_seconds
+        step_work = self.simulated_step_work
+        
+        for step in range(start_step, total_steps):
+            # Check for stop signal
+            if stop_flag.is_set():
+                logger.info(f"Stop signal received for job {job_id}")
+                return None
+            
+            # Check for pause signal
+            if pause_flag.is_set():
+                logger.info(f"Pause signal received for job {job_id}")
+                return step
+            
+            # Simulate training step
+            epoch, loss = simulated_step(step, total_steps, step_work)
+            
+            loss_history.append(loss)
+            pipeline.record(step, epoch, loss)
+            
+            # Save checkpoint periodically
+            if step > 0 and step % config.save_steps == 0:
+                self._save_checkpoint(job_id, step, epoch, loss, config.learning_rate, "scheduled")
+            
+            # Simulate step delay
+            if step_seconds:
+                time.sleep(step_seconds)
+        return None
+    
+    def _run_steps_in_worker(
+        self,
+        job_id: str,
+        total_steps: int,
+        start_step: int,
+        pipeline: StepPipeline,
+        loss_history: List[float]
+    ) -> Optional[int]:
+        """
+        Run the steps of a local job in a child process.
+        
+        The calling thread forwards pause and stop requests over the
+        worker's pipe and records the steps the worker publishes in its
+        metrics ring, waking every WORKER_POLL_SECONDS.
+        
+        Returns:
+            The step the job paused at, or None if it finished or was stopped
+        
+        Raises:
+            RuntimeError: If the worker failed or died
+        """
+        config = self.jobs[job_id].config
+        stop_flag = self._stop_flags[job_id]
+        pause_flag = self._pause_flags[job_id]
+        worker = TrainingWorker(
+            job_id,
+            total_steps,
+            start_step=start_step,
+            step_seconds=self.simulated_step_seconds,
+            step_work=self.simulated_step_work
+        )
+        self._workers[job_id] = worker
+        requested = False
+        
+        try:
+            while True:
+                outcome = worker.wait(WORKER_POLL_SECONDS)
+                # The worker publishes every record before its outcome
+                for step, epoch, loss in worker.read():
+                    loss_history.append(loss)
+                    pipeline.record(step, epoch, loss)
+                    if step > 0 and step % config.save_steps == 0:
+                        self._save_checkpoint(job_id, step, epoch, loss, config.learning_rate, "scheduled")
+                if outcome is not None:
+                    break
+                
+                if not requested and stop_flag.is_set():
+                    logger.info(f"Stop signal received for job {job_id}")
+                    worker.request(STOP)
+                    requested = True
+                elif not requested and pause_flag.is_set():
+                    logger.info(f"Pause signal received for job {job_id}")
+                    worker.request(PAUSE)
+                    requested = True
+        finally:
+            del self._workers[job_id]
+            worker.close()
+        
+        if worker.ring.dropped:
+            logger.warning(f"Dropped {worker.ring.dropped} step records of job {job_id}")
+        kind, value = outcome
+        if kind == "failed":
+            raise RuntimeError(value)
+        return value if kind == "paused" else None
+    
+    def _simulated_metrics(
+        self,
+        config: TrainingConfig,
+        total_steps: int,
+        step: int,
+        epoch: int,
+        loss: float
+    ) -> TrainingMetrics:
+        """Metrics of a step of the simulated training loop"""
+        return TrainingMetrics(
+            step=step,
+            epoch=epoch,
+            loss=loss,
+            learning_rate=config.learning_rate,
+            grad_norm=0.5,
+            throughput=10.0,
+            samples_per_second=40.0,
+            elapsed_time=step * 0.1,
+            estimated_time_remaining=(total_steps - step) * 0.1
+        )
+    
     def _save_checkpoint(
         self,
         job_id: str,
@@ -1074,10 +1337,14 @@ class TrainingOrchestrator:
         loss: float,
         learning_rate: float,
         reason: str = "scheduled"
-    ) -> None:
+    ) -> Future:
         """
         Save a checkpoint for a training job.
         
+        Only the snapshot of the states to host memory happens on the
+        calling thread; writing and pruning old checkpoints run on the
+        background checkpoint writer.
+        
         Args:
             job_id: Job identifier
             step: Current training step
@@ -1085,12 +1352,12 @@ class TrainingOrchestrator:
             loss: Current loss value
             learning_rate: Current learning rate
             reason: Reason for checkpoint (scheduled, pause, anomaly)
+            
+        Returns:
+            Future resolving to the checkpoint directory once written
         """
         job = self.jobs[job_id]
-        
-        # Create checkpoint directory
         checkpoint_dir = self.checkpoint_base_dir / job_id / f"checkpoint-{step}"
-        checkpoint_dir.mkdir(parents=True, exist_ok=True)
         
         # In a real implementation, we would save actual model and optimizer states
         # For now, we create dummy states
@@ -1102,19 +1369,43 @@ class TrainingOrchestrator:
             model_state_dict={},  # Would be actual model.state_dict()
             optimizer_state_dict={},  # Would be actual optimizer.state_dict()
             scheduler_state_dict=None,
-            metrics_history=[m.to_dict() for m in job.metrics_history[-100:]],  # Last 100 metrics
+            metrics_history=job.metrics_history.to_dicts(-100),  # Last 100 metrics
             config=job.config.to_dict(),
             timestamp=datetime.now(),
             checkpoint_reason=reason
         )
         
-        checkpoint.save(checkpoint_dir)
-        job.checkpoint_path = checkpoint_dir
+        def on_written(path: Path) -> None:
+            job.checkpoint_path = path
+            logger.info(f"Saved checkpoint for job {job_id} at step {step} (reason: {reason})")
+            self._cleanup_old_checkpoints(job_id, job.config.save_total_limit)
         
-        logger.info(f"Saved checkpoint for job {job_id} at step {step} (reason: {reason})")
+        return self._checkpoint_writer.submit(
+            checkpoint,
+            checkpoint_dir,
+            on_complete=on_written,
+            save_options={'store': self._checkpoint_store(job_id)}
+        )
+    
+    def _checkpoint_store(self, job_id: str) -> ChunkStore:
+        """Chunk store shared by all checkpoints of a job"""
+        return ChunkStore(self.checkpoint_base_dir / job_id / "blobs")
+    
+    def get_checkpoint_stats(self) -> Dict[str, Any]:
+        """Checkpoint write throughput, training stall time and queue depth"""
+        return self._checkpoint_writer.stats()
+    
+    def flush_checkpoints(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for queued checkpoints to be written.
         
-        # Cleanup old checkpoints
-        self._cleanup_old_checkpoints(job_id, job.config.save_total_limit)
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+            
+        Returns:
+            True if every queued checkpoint was written in time
+        """
+        return self._checkpoint_writer.flush(timeout)
     
     def _cleanup_old_checkpoints(self, job_id: str, keep_latest: int) -> None:
         """
@@ -1135,11 +1426,14 @@ class TrainingOrchestrator:
             key=lambda x: int(x.name.split("-")[1])
         )
         
-        # Remove old checkpoints
+        # Remove old checkpoints, then the chunks only they referenced
         if len(checkpoints) > keep_latest:
             for checkpoint in checkpoints[:-keep_latest]:
                 shutil.rmtree(checkpoint)
                 logger.debug(f"Removed old checkpoint: {checkpoint}")
+            kept = [c / MANIFEST_FILE for c in checkpoints[-keep_latest:] if (c / MANIFEST_FILE).exists()]
+            freed = self._checkpoint_store(job_id).collect_garbage(kept)
+            logger.debug(f"Freed {freed} bytes of unreferenced checkpoint chunks for job {job_id}")
     
     def _cleanup_job(self, job_id: str) -> None:
         """
@@ -1193,10 +1487,13 @@ class TrainingOrchestrator:
         job = self.jobs[job_id]
         
         # Can only delete stopped, completed, or failed jobs
-        if job.state in [TrainingState.RUNNING, TrainingState.INITIALIZING]:
+        if job.state in [TrainingState.RUNNING, TrainingState.INITIALIZING, TrainingState.QUEUED]:
             raise ValueError(f"Cannot delete job in state: {job.state}")
         
-        # Delete checkpoints
+        # Release spilled metrics segments, then delete checkpoints once
+        # pending writes have landed
+        job.metrics_history.clear()
+        self._checkpoint_writer.flush()
         job_checkpoint_dir = self.checkpoint_base_dir / job_id
         if job_checkpoint_dir.exists():
             shutil.rmtree(job_checkpoint_dir)
@@ -0,0 +1,261 @@
+"""
+Training steps in a child process.
+
+In process mode the orchestrator runs each local job's steps in a spawned
+child process, so step computation never holds the API process's GIL and
+a crashing step cannot take the backend down. The two processes talk over
+two channels:
+
+- A pipe carries control: the parent sends pause or stop, and the child
+  answers with exactly one outcome message when it exits its loop
+  (``completed``, ``paused`` or ``stopped`` with the step it ended at, or
+  ``failed`` with the error).
+- A shared-memory ring buffer carries per-step results (step, epoch,
+  loss) as fixed-size records. The child writes a record and then bumps a
+  write counter; the parent copies every record written since its last
+  read in one slice, without pickling anything per step. Records the
+  child overwrote before the parent read them are counted as dropped.
+"""
+
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Tuple
+import logging
+import multiprocessing
+import time
+
+logger = logging.getLogger(__name__)
+
+# Where local training steps run
+WORKER_MODES = ('thread', 'process')
+
+# Records held by a metrics ring before unread ones are overwritten
+DEFAULT_RING_CAPACITY = 65536
+
+# Control commands sent to a worker
+PAUSE = "pause"
+STOP = "stop"
+
+# Bytes before the first record; the write counter sits at offset 0
+_HEADER_BYTES = 64
+
+
+def _record_dtype():
+    import numpy as np
+
+    return np.dtype([('step', '<i8'), ('epoch', '<i8'), ('loss', '<f8')])
+
+
+def simulated_step(step: int, total_steps: int, work: int = 0) -> Tuple[int, float]:
+    """
+    Compute one step of the simulated training loop.
+
+    Args:
+        step: Step number
+        total_steps: Total training steps
+        work: Iterations of pure-Python arithmetic standing in for the
+            step's computation (0 for none)
+
+    Returns:
+        Tuple of (epoch, loss)
+    """
+    if work:
+        total = 0
+        for i in range(work):
+            total += i * i
+    return step // 1000, 2.0 - (step / total_steps) * 1.5
+
+
+class MetricsRing:
+    """
+    Single-writer, single-reader ring of step records in shared memory.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, capacity: int, owner: bool):
+        import numpy as np
+
+        self.memory = memory
+        self.capacity = capacity
+        self.dropped = 0
+        self._owner = owner
+        self._read = 0
+        self._written = 0
+        self._counter = np.ndarray((1,), dtype=np.int64, buffer=memory.buf)
+        self._records = np.ndarray((capacity,), dtype=_record_dtype(), buffer=memory.buf, offset=_HEADER_BYTES)
+
+    @classmethod
+    def create(cls, capacity: int = DEFAULT_RING_CAPACITY) -> 'MetricsRing':
+        """Allocate a ring; its creator unlinks the memory on close"""
+        size = _HEADER_BYTES + capacity * _record_dtype().itemsize
+        ring = cls(shared_memory.SharedMemory(create=True, size=size), capacity, owner=True)
+        ring._counter[0] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> 'MetricsRing':
+        """Open a ring created by another process"""
+        return cls(shared_memory.SharedMemory(name=name), capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def write(self, step: int, epoch: int, loss: float) -> None:
+        """Append a record; the writer's per-step path"""
+        self._records[self._written % self.capacity] = (step, epoch, loss)
+        self._written += 1
+        self._counter[0] = self._written
+
+    def read(self) -> List[Tuple[int, int, float]]:
+        """
+        Records written since the previous read, oldest first.
+
+        Returns:
+            List of (step, epoch, loss)
+        """
+        import numpy as np
+
+        end = int(self._counter[0])
+        start = max(self._read, end - self.capacity + 1)
+        if start >= end:
+            self._read = end
+            return []
+        rows = self._records[np.arange(start, end) % self.capacity]
+
+        # Slots the writer reused while they were copied are stale; the slot
+        # of the record in progress is at most the counter value
+        first_valid = int(self._counter[0]) - self.capacity + 1
+        if first_valid > start:
+            rows = rows[first_valid - start:]
+            start = first_valid
+        self.dropped += start - self._read
+        self._read = end
+        return rows.tolist()
+
+    def close(self) -> None:
+        """Release the mapping (and the memory, for the creator)"""
+        # Views of the buffer must go before the mapping can close
+        self._counter = self._records = None
+        self.memory.close()
+        if self._owner:
+            self.memory.unlink()
+
+
+def run_worker(
+    ring_name: str,
+    capacity: int,
+    conn: Any,
+    total_steps: int,
+    start_step: int,
+    step_seconds: float,
+    step_work: int
+) -> None:
+    """
+    Child process entry point: run steps until done, paused or stopped.
+
+    Args:
+        ring_name: Shared memory name of the metrics ring
+        capacity: Records in the ring
+        conn: Child end of the control pipe
+        total_steps: Total training steps
+        start_step: First step to run
+        step_seconds: Simulated delay per step
+        step_work: Simulated computation per step (see simulated_step)
+    """
+    ring = MetricsRing.attach(ring_name, capacity)
+    try:
+        outcome: Tuple[str, Any] = ("completed", total_steps)
+        for step in range(start_step, total_steps):
+            if conn.poll():
+                command = conn.recv()
+                outcome = ("paused" if command == PAUSE else "stopped", step)
+                break
+            epoch, loss = simulated_step(step, total_steps, step_work)
+            ring.write(step, epoch, loss)
+            if step_seconds:
+                time.sleep(step_seconds)
+    except Exception as e:
+        outcome = ("failed", f"{type(e).__name__}: {e}")
+    finally:
+        ring.close()
+    conn.send(outcome)
+    conn.close()
+
+
+class TrainingWorker:
+    """
+    Parent-side handle of a child process running a job's steps.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        total_steps: int,
+        start_step: int = 0,
+        step_seconds: float = 0.0,
+        step_work: int = 0,
+        capacity: int = DEFAULT_RING_CAPACITY
+    ):
+        """
+        Args:
+            job_id: Job identifier (names the process)
+            total_steps: Total training steps
+            start_step: First step to run (after resuming)
+            step_seconds: Simulated delay per step
+            step_work: Simulated computation per step
+            capacity: Records in the metrics ring
+        """
+        # Spawn rather than fork: the API process runs threads
+        context = multiprocessing.get_context("spawn")
+        self.ring = MetricsRing.create(capacity)
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=run_worker,
+            args=(self.ring.name, capacity, child_conn, total_steps, start_step, step_seconds, step_work),
+            name=f"training-{job_id}",
+            daemon=True
+        )
+        try:
+            self.process.start()
+        except Exception:
+            self.ring.close()
+            raise
+        finally:
+            child_conn.close()
+
+    def request(self, command: str) -> None:
+        """Ask the worker to pause or stop before its next step"""
+        try:
+            self._conn.send(command)
+        except (BrokenPipeError, OSError):
+            # Already exited; its outcome message says how
+            pass
+
+    def wait(self, timeout: float) -> Optional[Tuple[str, Any]]:
+        """
+        Wait for the worker's outcome message.
+
+        Returns:
+            The outcome, or None if the worker is still running
+        """
+        if not self._conn.poll(timeout):
+            return None
+        try:
+            return self._conn.recv()
+        except EOFError:
+            # Exited without reporting: killed or crashed in native code
+            self.process.join(1)
+            return ("failed", f"Training worker exited with code {self.process.exitcode}")
+
+    def read(self) -> List[Tuple[int, int, float]]:
+        """Step records written since the previous read"""
+        return self.ring.read()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Wait for the process to exit (killing it after the timeout) and free the ring"""
+        self.process.join(timeout)
+        if self.process.is_alive():
+            logger.warning(f"Killing unresponsive training worker {self.process.name}")
+            self.process.kill()
+            self.process.join()
+        self._conn.close()
+        self.ring.close()
@@ -14,6 +14,21 @@ from backend.services.training_orchestration_service import TrainingOrchestrator
 from backend.services.multi_run_service import MultiRunManager
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_data_dir(tmp_path_factory):
+    """
+    Redirect runtime data written lazily by services (e.g. the dataset offset
+    indexes built through get_dataset_service()) away from backend/data.
+    """
+    import runtime_paths
+    
+    data_dir = tmp_path_factory.mktemp("data")
+    original = runtime_paths.get_data_dir
+    runtime_paths.get_data_dir = lambda: data_dir
+    yield data_dir
+    runtime_paths.get_data_dir = original
+
+
 @pytest.fixture(scope="function")
 def temp_dirs():
     """Create temporary directories for test artifacts"""
@@ -0,0 +1,227 @@
+"""
+Tests for streaming, resumable artifact downloads.
+
+Verifies that artifacts are streamed to disk and hashed on the way, that
+large artifacts are fetched as parallel ranges, that interrupted downloads
+resume within a download and across restarts, that servers ignoring Range
+requests are handled, and benchmarks peak memory against reading the whole
+artifact into memory.
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+# Add parent directory to path to import services and connectors
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from connectors.artifact_stream import ArtifactLocation
+from plugins.connectors.local_connector import LocalConnector
+from services import artifact_download
+from services.artifact_download import download_to_file
+
+# Size of the artifact downloaded in the memory benchmark
+BENCHMARK_ARTIFACT_MB = int(os.environ.get("PEFT_BENCHMARK_ARTIFACT_MB", "128"))
+
+
+class ArtifactServer:
+    """Serves one file with Range support; can cut connections or ignore ranges"""
+
+    def __init__(self, path: Path, ranges: bool = True):
+        self.path = path
+        self.ranges = ranges
+        self.range_headers = []
+        self.cut_after = None  # Bytes sent before dropping the next GET
+
+    async def handle(self, request):
+        if request.method == 'GET':
+            self.range_headers.append(request.headers.get('Range'))
+        if self.cut_after is not None and request.method == 'GET':
+            cut, self.cut_after = self.cut_after, None
+            response = web.StreamResponse(headers={'Content-Length': str(self.path.stat().st_size)})
+            await response.prepare(request)
+            with open(self.path, 'rb') as f:
+                await response.write(f.read(cut))
+            request.transport.close()
+            return response
+        if not self.ranges:
+            data = self.path.read_bytes()
+            return web.Response(body=data if request.method == 'GET' else None,
+                                headers={'Accept-Ranges': 'bytes', 'Content-Length': str(len(data))})
+        return web.FileResponse(self.path)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_route('*', '/artifact', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/artifact"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+class ServedConnector(LocalConnector):
+    """Connector whose artifacts are served over HTTP"""
+
+    def __init__(self, url, session):
+        super().__init__()
+        self.url = url
+        self.session = session
+        self.fetch_calls = 0
+
+    async def artifact_location(self, job_id):
+        return ArtifactLocation(self.url, self.session)
+
+    async def fetch_artifact(self, job_id):
+        self.fetch_calls += 1
+        async with self.session.get(self.url) as response:
+            return await response.read()
+
+
+@pytest.fixture
+def tmp():
+    with tempfile.TemporaryDirectory() as directory:
+        yield Path(directory)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(artifact_download, 'RETRY_BASE_SECONDS', 0)
+
+
+def make_artifact(path: Path, size: int) -> str:
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def download(server_kwargs, source, dest, **options):
+    async def scenario():
+        async with ArtifactServer(source, **server_kwargs) as server, aiohttp.ClientSession() as session:
+            connector = ServedConnector(server.url, session)
+            result = await download_to_file(connector, 'job', dest, **options)
+            return result, server.range_headers, connector.fetch_calls
+    return asyncio.run(scenario())
+
+
+def test_streamed_download_matches_source(tmp):
+    expected = make_artifact(tmp / 'source', 3 * 1024 * 1024 + 17)
+    result, ranges, fetch_calls = download({}, tmp / 'source', tmp / 'out' / 'adapter.safetensors',
+                                           chunk_size=256 * 1024)
+    assert result.sha256 == expected and result.size_bytes == 3 * 1024 * 1024 + 17
+    assert result.ranges == 1 and ranges == [None] and fetch_calls == 0
+    assert (tmp / 'out' / 'adapter.safetensors').read_bytes() == (tmp / 'source').read_bytes()
+    assert sorted(p.name for p in (tmp / 'out').iterdir()) == ['adapter.safetensors']
+
+
+def test_large_artifacts_download_as_parallel_ranges(tmp, monkeypatch):
+    monkeypatch.setattr(artifact_download, 'PARALLEL_THRESHOLD', 1024 * 1024)
+    expected = make_artifact(tmp / 'source', 4 * 1024 * 1024 + 3)
+    result, ranges, _ = download({}, tmp / 'source', tmp / 'adapter', parallel_ranges=4,
+                                 chunk_size=64 * 1024)
+    assert result.sha256 == expected and result.ranges == 4
+    assert sorted(ranges) == sorted(['bytes=0-1048576', 'bytes=1048577-2097153',
+                                     'bytes=2097154-3145730', 'bytes=3145731-4194306'])
+
+
+def test_interrupted_download_resumes_from_offset(tmp):
+    expected = make_artifact(tmp / 'source', 2 * 1024 * 1024)
+
+    async def scenario():
+        async with ArtifactServer(tmp / 'source') as server, aiohttp.ClientSession() as session:
+            server.cut_after = 700 * 1024
+            result = await download_to_file(ServedConnector(server.url, session), 'job', tmp / 'adapter',
+                                            chunk_size=64 * 1024)
+            return result, server.range_headers
+
+    result, ranges = asyncio.run(scenario())
+    assert result.sha256 == expected
+    assert ranges[0] is None and ranges[-1].startswith('bytes=') and ranges[-1] != 'bytes=0-'
+
+
+def test_download_resumes_across_restarts(tmp, monkeypatch):
+    expected = make_artifact(tmp / 'source', 2 * 1024 * 1024)
+    monkeypatch.setattr(artifact_download, 'MAX_ATTEMPTS', 1)
+
+    async def scenario():
+        async with ArtifactServer(tmp / 'source') as server, aiohttp.ClientSession() as session:
+            connector = ServedConnector(server.url, session)
+            server.cut_after = 1024 * 1024
+            with pytest.raises(RuntimeError):
+                await download_to_file(connector, 'job', tmp / 'adapter', chunk_size=64 * 1024)
+            assert (tmp / 'adapter.part').exists() and (tmp / 'adapter.part.json').exists()
+            return await download_to_file(connector, 'job', tmp / 'adapter', chunk_size=64 * 1024)
+
+    result = asyncio.run(scenario())
+    assert result.sha256 == expected and 0 < result.resumed_bytes <= 1024 * 1024
+    assert not (tmp / 'adapter.part').exists() and not (tmp / 'adapter.part.json').exists()
+
+
+def test_server_ignoring_ranges_restarts_whole(tmp, monkeypatch):
+    monkeypatch.setattr(artifact_download, 'PARALLEL_THRESHOLD', 1024 * 1024)
+    expected = make_artifact(tmp / 'source', 2 * 1024 * 1024)
+    result, ranges, _ = download({'ranges': False}, tmp / 'source', tmp / 'adapter')
+    assert result.sha256 == expected and result.ranges == 1
+    assert ranges[-1] is None
+
+
+def test_whole_artifact_connectors_still_supported(tmp):
+    """Connectors without artifact_location are written and hashed in one pass"""
+    class WholeConnector(LocalConnector):
+        async def fetch_artifact(self, job_id):
+            return b'adapter' * 1000
+
+    result = asyncio.run(download_to_file(WholeConnector(), 'job', tmp / 'adapter'))
+    assert result.sha256 == hashlib.sha256(b'adapter' * 1000).hexdigest()
+    assert (tmp / 'adapter').read_bytes() == b'adapter' * 1000
+
+
+def test_download_memory_benchmark(tmp):
+    """
+    Benchmark: peak Python memory downloading a large artifact.
+
+    The baseline is the previous path: fetch_artifact reads the whole
+    artifact into memory before it is written and hashed.
+    """
+    size = BENCHMARK_ARTIFACT_MB * 1024 * 1024
+    expected = make_artifact(tmp / 'source', size)
+
+    async def scenario():
+        async with ArtifactServer(tmp / 'source') as server, aiohttp.ClientSession() as session:
+            connector = ServedConnector(server.url, session)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            data = await connector.fetch_artifact('job')
+            whole_seconds = time.perf_counter() - started
+            _, whole_peak = tracemalloc.get_traced_memory()
+            del data
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            result = await download_to_file(connector, 'job', tmp / 'adapter')
+            streamed_seconds = time.perf_counter() - started
+            _, streamed_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return result, whole_peak, whole_seconds, streamed_peak, streamed_seconds
+
+    result, whole_peak, whole_seconds, streamed_peak, streamed_seconds = asyncio.run(scenario())
+    assert result.sha256 == expected
+    assert whole_peak >= size
+    assert streamed_peak < 32 * 1024 * 1024
+    print(f"✓ {BENCHMARK_ARTIFACT_MB} MB artifact: streamed peak {streamed_peak / 2**20:.1f} MB "
+          f"({streamed_seconds:.2f} s), whole read peak {whole_peak / 2**20:.1f} MB ({whole_seconds:.2f} s)")
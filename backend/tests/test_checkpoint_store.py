@@ -0,0 +1,135 @@
+"""
+Tests for content-addressed, deduplicated checkpoint storage.
+
+Verifies that checkpoints saved through a chunk store load back exactly,
+that unchanged tensors are not written again, that pruning old checkpoints
+frees only unreferenced chunks, and benchmarks bytes written per
+checkpoint against full safetensors checkpoints.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import torch
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.checkpoint_store import ChunkStore
+from services.training_orchestration_service import (
+    CheckpointData,
+    TrainingConfig,
+    TrainingOrchestrator
+)
+
+# Megabytes of frozen weights in the benchmark state dict
+BENCHMARK_MB = int(os.environ.get("PEFT_BENCHMARK_CHECKPOINT_MB", "64"))
+
+DTYPES = [torch.float32, torch.bfloat16, torch.float16, torch.int64, torch.bool]
+
+
+def make_checkpoint(step, model, optimizer=None):
+    return CheckpointData(
+        step=step,
+        epoch=0,
+        loss=0.5,
+        learning_rate=1e-4,
+        model_state_dict=model,
+        optimizer_state_dict=optimizer or {},
+        timestamp=datetime(2026, 1, 1)
+    )
+
+
+@given(
+    shapes=st.lists(st.lists(st.integers(0, 40), max_size=3), min_size=1, max_size=4),
+    dtype=st.sampled_from(DTYPES),
+    chunk_size=st.sampled_from([1, 7, 64, 1 << 20])
+)
+@settings(max_examples=40, deadline=None)
+def test_tensors_round_trip(shapes, dtype, chunk_size):
+    """Any dtype and shape, including empty and scalar tensors, loads back exactly"""
+    model = {f't{i}': (torch.rand(shape) * 100).to(dtype) for i, shape in enumerate(shapes)}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChunkStore(Path(tmp) / 'blobs', chunk_size=chunk_size)
+        make_checkpoint(1, model).save(Path(tmp) / 'checkpoint-1', store=store)
+        loaded = CheckpointData.load(Path(tmp) / 'checkpoint-1')
+
+    for key, tensor in model.items():
+        restored = loaded.model_state_dict[key]
+        assert restored.dtype == tensor.dtype and restored.shape == tensor.shape
+        assert torch.equal(restored, tensor)
+
+
+def test_unchanged_tensors_are_not_rewritten():
+    """Only changed chunks are written by later checkpoints"""
+    frozen = torch.randn(256, 1024)  # 1 MiB
+    adapter = torch.randn(16, 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChunkStore(Path(tmp) / 'blobs', chunk_size=64 * 1024)
+        first = make_checkpoint(1, {'frozen': frozen, 'adapter': adapter}).save(Path(tmp) / 'checkpoint-1', store=store)
+        updated = adapter + 1
+        second = make_checkpoint(2, {'frozen': frozen, 'adapter': updated}).save(Path(tmp) / 'checkpoint-2', store=store)
+
+        assert first > frozen.numel() * 4
+        assert second < adapter.numel() * 4 + 16 * 1024
+        assert torch.equal(CheckpointData.load(Path(tmp) / 'checkpoint-1').model_state_dict['adapter'], adapter)
+        assert torch.equal(CheckpointData.load(Path(tmp) / 'checkpoint-2').model_state_dict['adapter'], updated)
+
+
+def test_pruning_frees_only_unreferenced_chunks():
+    """Old checkpoints are deleted along with chunks nothing else uses"""
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator = TrainingOrchestrator(checkpoint_base_dir=tmp, artifacts_base_dir=tmp)
+        config = TrainingConfig(job_id='job', model_name='gpt2', dataset_path='d', output_dir=tmp,
+                                save_total_limit=2)
+        orchestrator.create_job(config)
+        job_dir = Path(tmp) / 'job'
+
+        frozen = torch.randn(1024)
+        store = orchestrator._checkpoint_store('job')
+        for step in (1, 2, 3):
+            make_checkpoint(step, {'frozen': frozen, 'adapter': torch.full((8,), float(step))}).save(
+                job_dir / f'checkpoint-{step}', store=store)
+        blobs_before = len(list(store.root.glob('*/*')))
+        orchestrator._cleanup_old_checkpoints('job', 2)
+
+        assert sorted(p.name for p in job_dir.iterdir()) == ['blobs', 'checkpoint-2', 'checkpoint-3']
+        assert len(list(store.root.glob('*/*'))) == blobs_before - 1
+        for step in (2, 3):
+            loaded = CheckpointData.load(job_dir / f'checkpoint-{step}')
+            assert torch.equal(loaded.model_state_dict['frozen'], frozen)
+            assert torch.equal(loaded.model_state_dict['adapter'], torch.full((8,), float(step)))
+
+
+def test_bytes_per_checkpoint_benchmark():
+    """
+    Benchmark: bytes written per checkpoint, full safetensors vs deduplicated.
+
+    The state dict holds frozen weights that never change plus LoRA adapter
+    weights and AdamW moments that change every checkpoint, as in PEFT
+    training with the full model state saved.
+    """
+    frozen = {f'base.layer{i}.weight': torch.randn(1024, 1024) for i in range(BENCHMARK_MB // 4)}
+    checkpoints = 5
+    full_bytes = []
+    delta_bytes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChunkStore(Path(tmp) / 'blobs')
+        for step in range(checkpoints):
+            adapter = {f'lora.layer{i}.weight': torch.randn(16, 1024) for i in range(BENCHMARK_MB // 4)}
+            optimizer = {'state': {k: {'exp_avg': torch.randn_like(v), 'exp_avg_sq': torch.rand_like(v)}
+                                   for k, v in adapter.items()}}
+            checkpoint = make_checkpoint(step, {**frozen, **adapter}, optimizer)
+            full_bytes.append(checkpoint.save(Path(tmp) / f'full-{step}'))
+            delta_bytes.append(checkpoint.save(Path(tmp) / f'checkpoint-{step}', store=store))
+
+    steady_full = sum(full_bytes[1:]) / (checkpoints - 1)
+    steady_delta = sum(delta_bytes[1:]) / (checkpoints - 1)
+    assert steady_delta * 10 < steady_full, \
+        f"Deduplicated checkpoints write {steady_delta:.0f} B vs {steady_full:.0f} B"
+    print(f"✓ bytes per checkpoint: full {steady_full / 1e6:.1f} MB, "
+          f"deduplicated {steady_delta / 1e6:.2f} MB (first {delta_bytes[0] / 1e6:.1f} MB)")
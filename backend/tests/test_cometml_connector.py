@@ -204,15 +204,8 @@ async def cometml_connector(mock_cometml_api):
         exp_info = connector._experiments[job_id]
         mock_cometml_api.update_experiment_status(exp_info['experiment_key'], "killed")
         
-        if job_id in connector._batch_tasks:
-            connector._batch_tasks[job_id].cancel()
-            try:
-                await connector._batch_tasks[job_id]
-            except asyncio.CancelledError:
-                pass
-            del connector._batch_tasks[job_id]
-        
         await connector._flush_metrics(job_id)
+        await connector._shipper.close(job_id)
         return True
     
     connector.cancel_job = mock_cancel_job
@@ -0,0 +1,219 @@
+"""
+Tests for MinHash/LSH near-duplicate detection in dataset quality checks.
+
+Covers recall on planted near-duplicates, agreement with exact Counter-based
+duplicate counts, the dedup export, and a benchmark against the Counter approach.
+"""
+
+import pytest
+import tempfile
+import json
+import csv
+import os
+import sys
+import time
+import random
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+# Add parent directory to path to import services directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Import directly from dataset_service to avoid loading other services with heavy dependencies
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "dataset_service",
+    os.path.join(os.path.dirname(__file__), '..', 'services', 'dataset_service.py')
+)
+dataset_service_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dataset_service_module)
+
+DatasetFormat = dataset_service_module.DatasetFormat
+NearDuplicateDetector = dataset_service_module.NearDuplicateDetector
+get_dataset_service = dataset_service_module.get_dataset_service
+
+# Samples in the benchmark corpus
+BENCHMARK_SAMPLES = int(os.environ.get("PEFT_BENCHMARK_SAMPLES", "50000"))
+
+
+def make_corpus(num_base: int, num_near: int, num_exact: int, seed: int = 0):
+    """Build distinct base texts plus planted near and exact duplicates"""
+    rng = random.Random(seed)
+    vocabulary = [
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9)))
+        for _ in range(5000)
+    ]
+    base = [' '.join(rng.choice(vocabulary) for _ in range(60)) for _ in range(num_base)]
+
+    near = []
+    for text in base[:num_near]:
+        words = text.split()
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        near.append(' '.join(words))
+
+    exact = base[num_near:num_near + num_exact]
+    return base, near, exact
+
+
+def test_detects_planted_near_duplicates():
+    """Near-duplicates are clustered with their originals, distinct texts are not"""
+    base, near, exact = make_corpus(num_base=2000, num_near=200, num_exact=100)
+    texts = base + near + exact
+
+    detector = NearDuplicateDetector()
+    try:
+        for text in texts:
+            detector.add(text)
+        report = detector.finalize()
+        duplicate = detector.duplicate_mask()
+    finally:
+        detector.close()
+
+    assert report.num_samples == len(texts)
+    assert report.exact_duplicate_samples == 100
+    assert not duplicate[:len(base)].any(), "Distinct base texts must not be clustered"
+
+    found_near = int(duplicate[len(base):len(base) + len(near)].sum())
+    assert found_near >= 0.95 * len(near), f"Recall too low: {found_near}/{len(near)}"
+    assert duplicate[len(base) + len(near):].all()
+
+    assert report.clusters
+    assert all(cluster.size >= 2 for cluster in report.clusters)
+    assert report.clusters == sorted(report.clusters, key=lambda c: c.size, reverse=True)
+
+
+def test_exact_counts_match_counter():
+    """Exact duplicate counts agree with the Counter-based statistics"""
+    rng = random.Random(3)
+    texts = [f"sample {rng.randrange(300)} of the dataset" for _ in range(1000)] + ['', '', '   ']
+
+    detector = NearDuplicateDetector(chunk_size=64)
+    try:
+        for text in texts:
+            detector.add(text)
+        report = detector.finalize()
+    finally:
+        detector.close()
+
+    non_empty = Counter(' '.join(text.lower().split()) for text in texts if text.strip())
+    assert report.exact_duplicate_samples == sum(non_empty.values()) - len(non_empty)
+    # Empty samples are reported separately and never clustered
+    assert all(1000 not in cluster.sample_indices for cluster in report.clusters)
+
+
+def test_quality_report_includes_duplicates():
+    """check_quality exposes the duplicate report in its API payload"""
+    dataset_service = get_dataset_service()
+    base, near, exact = make_corpus(num_base=200, num_near=50, num_exact=10)
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.jsonl', delete=False, encoding='utf-8') as f:
+        for text in base + near + exact:
+            f.write(json.dumps({'text': text}) + '\n')
+        temp_path = f.name
+
+    try:
+        report = dataset_service.check_quality(temp_path)
+        payload = report.to_dict()
+
+        assert payload["duplicates"]["exact_duplicate_samples"] == 10
+        assert payload["duplicates"]["near_duplicate_samples"] >= 45
+        assert any("near-duplicate" in r for r in report.recommendations)
+
+        assert dataset_service.check_quality(temp_path, detect_near_duplicates=False).duplicates is None
+    finally:
+        Path(temp_path).unlink(missing_ok=True)
+
+
+@pytest.mark.parametrize("format_type", ['jsonl', 'json', 'csv', 'txt'])
+def test_export_deduplicated(format_type):
+    """The dedup export keeps the first sample of every cluster in the same format"""
+    dataset_service = get_dataset_service()
+    base, near, exact = make_corpus(num_base=100, num_near=20, num_exact=5)
+    texts = base + near + exact
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f'data.{format_type}')
+        output = os.path.join(tmp, f'deduped.{format_type}')
+
+        if format_type == 'jsonl':
+            with open(source, 'w', encoding='utf-8') as f:
+                for text in texts:
+                    f.write(json.dumps({'text': text}) + '\n')
+        elif format_type == 'json':
+            with open(source, 'w', encoding='utf-8') as f:
+                json.dump([{'text': text} for text in texts], f)
+        elif format_type == 'csv':
+            with open(source, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['text', 'label'])
+                writer.writeheader()
+                for text in texts:
+                    writer.writerow({'text': text, 'label': 'x'})
+        else:
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(texts) + '\n')
+
+        report = dataset_service.export_deduplicated(source, output, DatasetFormat(format_type))
+
+        stats = dataset_service.analyze_statistics(output, DatasetFormat(format_type))
+        assert stats.num_samples == len(texts) - report.removable_samples
+        assert stats.duplicate_samples == 0
+        assert report.removable_samples >= 5 + 19
+
+        kept = dataset_service.generate_preview(output, DatasetFormat(format_type), num_samples=1)
+        assert kept.samples[0]['text'] == texts[0]
+
+
+def test_benchmark_against_counter():
+    """
+    Benchmark: MinHash/LSH versus the exact Counter approach.
+
+    Counter keeps every full string in memory and finds only exact copies;
+    the detector keeps fixed-size state per sample and also finds near-duplicates.
+    """
+    num_near = BENCHMARK_SAMPLES // 20
+    base, near, exact = make_corpus(
+        num_base=BENCHMARK_SAMPLES - num_near - num_near, num_near=num_near, num_exact=num_near
+    )
+    texts = base + near + exact
+    corpus_bytes = sum(len(text) for text in texts)
+
+    def counter_approach():
+        counter = Counter(text for text in list(texts))
+        return sum(count - 1 for count in counter.values() if count > 1)
+
+    def minhash_approach():
+        detector = NearDuplicateDetector()
+        try:
+            for text in texts:
+                detector.add(text)
+            return detector.finalize()
+        finally:
+            detector.close()
+
+    results = {}
+    for name, approach in (("counter", counter_approach), ("minhash", minhash_approach)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = approach()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = (result, elapsed, peak)
+
+    counter_duplicates, counter_time, counter_peak = results["counter"]
+    report, minhash_time, minhash_peak = results["minhash"]
+
+    assert counter_duplicates == num_near
+    assert report.exact_duplicate_samples == num_near
+    assert report.near_duplicate_samples >= 0.95 * num_near
+
+    # Resident memory is the chunk working set plus a few bytes per sample
+    assert minhash_peak < 64 * 1024 * 1024 + 64 * len(texts), f"Peak memory {minhash_peak} bytes"
+
+    print(
+        f"✓ {len(texts)} samples ({corpus_bytes / 1e6:.0f} MB): "
+        f"Counter {counter_time:.2f}s / {counter_peak / 1e6:.1f} MB found {counter_duplicates}; "
+        f"MinHash {minhash_time:.2f}s / {minhash_peak / 1e6:.1f} MB found "
+        f"{report.exact_duplicate_samples} exact + {report.near_duplicate_samples} near"
+    )
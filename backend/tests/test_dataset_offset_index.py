@@ -0,0 +1,280 @@
+"""
+Tests for the persistent, mmap-backed dataset offset index.
+
+Verifies that indexed previews, paging and random sampling return the same
+records as a linear read, that CSV boundaries respect quoted newlines, and
+that the on-disk index is reused until the file changes.
+"""
+
+import pytest
+import tempfile
+import json
+import csv
+import os
+import sys
+import time
+from pathlib import Path
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path to import services directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Import directly from dataset_service to avoid loading other services with heavy dependencies
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "dataset_service",
+    os.path.join(os.path.dirname(__file__), '..', 'services', 'dataset_service.py')
+)
+dataset_service_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dataset_service_module)
+
+DatasetFormat = dataset_service_module.DatasetFormat
+DatasetIndex = dataset_service_module.DatasetIndex
+DatasetService = dataset_service_module.DatasetService
+
+
+@pytest.fixture
+def index_dir():
+    """Temporary directory for offset index files"""
+    with tempfile.TemporaryDirectory(prefix="test_dataset_index_") as path:
+        yield path
+
+
+@pytest.fixture
+def dataset_dir():
+    """Temporary directory for dataset files"""
+    with tempfile.TemporaryDirectory(prefix="test_datasets_") as path:
+        yield Path(path)
+
+
+csv_text = st.text(
+    alphabet=st.characters(blacklist_categories=('Cs',), blacklist_characters='\x00\r'),
+    max_size=30
+)
+
+
+@given(rows=st.lists(st.tuples(csv_text, csv_text), min_size=1, max_size=30))
+@settings(max_examples=50, deadline=None)
+def test_csv_index_matches_dict_reader(rows):
+    """Quote-aware CSV boundaries yield the same rows as csv.DictReader"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+            writer.writerow(['text', 'label'])
+            writer.writerows(rows)
+
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            expected = [row for row in csv.DictReader(f)]
+
+        index = DatasetIndex(path, DatasetFormat.CSV, Path(tmp) / 'index')
+        try:
+            assert len(index) == len(expected)
+            assert index.read_range(0) == expected
+        finally:
+            index.close()
+
+
+def test_jsonl_and_txt_index_skip_blank_lines(dataset_dir, index_dir):
+    """Blank and whitespace-only lines are not counted as records"""
+    jsonl_path = dataset_dir / 'data.jsonl'
+    jsonl_path.write_text('{"text": "a"}\n\n   \n{"text": "b"}\r\n{"text": "c"}', encoding='utf-8')
+
+    txt_path = dataset_dir / 'data.txt'
+    txt_path.write_text('first\n\n\t\nsecond\n', encoding='utf-8')
+
+    service = DatasetService(index_dir=index_dir)
+
+    jsonl_preview = service.generate_preview(str(jsonl_path), DatasetFormat.JSONL, num_samples=10)
+    assert jsonl_preview.total_count == 3
+    assert [s['text'] for s in jsonl_preview.samples] == ['a', 'b', 'c']
+
+    txt_preview = service.generate_preview(str(txt_path), DatasetFormat.TXT, num_samples=10)
+    assert txt_preview.total_count == 2
+    assert txt_preview.samples == [{'text': 'first'}, {'text': 'second'}]
+
+
+blank_text = st.text(alphabet=' \t\r\x0b\x0c\x1c\x85\xa0\u2003\u3000', max_size=50)
+
+
+@given(lines=st.lists(st.one_of(blank_text, st.sampled_from(['a', ' b ', '\u3000c', 'd\xa0'])), max_size=20))
+@settings(max_examples=50, deadline=None)
+def test_txt_index_matches_line_strip(lines):
+    """Whitespace-only lines of any length are dropped exactly like line.strip()"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.txt')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write('\n'.join(lines))
+
+        service = DatasetService(index_dir=os.path.join(tmp, 'index'))
+        index = service.get_dataset_index(path, DatasetFormat.TXT)
+        try:
+            assert len(index) == service._count_samples(path, DatasetFormat.TXT)
+            assert index.read_range(0) == list(service._iter_samples(path, DatasetFormat.TXT))
+        finally:
+            service.close_indexes()
+
+
+def test_long_whitespace_line_is_not_a_record(dataset_dir, index_dir):
+    """A blank line longer than any fixed check length is still skipped"""
+    path = dataset_dir / 'data.jsonl'
+    path.write_text('{"text": "a"}\n' + ' ' * 40 + '\n{"text": "b"}\n', encoding='utf-8')
+
+    service = DatasetService(index_dir=index_dir)
+    preview = service.generate_preview(str(path), DatasetFormat.JSONL, num_samples=10)
+
+    assert preview.total_count == service._count_samples(str(path), DatasetFormat.JSONL) == 2
+    assert [s['text'] for s in preview.samples] == ['a', 'b']
+
+
+def test_malformed_line_does_not_empty_page(dataset_dir, index_dir):
+    """Records around a malformed JSONL line are still returned"""
+    path = dataset_dir / 'data.jsonl'
+    path.write_text('{"text": "a"}\n{ broken\n{"text": "c"}\n', encoding='utf-8')
+
+    service = DatasetService(index_dir=index_dir)
+    preview = service.generate_preview(str(path), DatasetFormat.JSONL, num_samples=10)
+
+    assert [s['text'] for s in preview.samples] == ['a', 'c']
+
+
+def test_open_indexes_are_bounded(dataset_dir, index_dir):
+    """Least recently used indexes are closed once the cache is full"""
+    limit = dataset_service_module._MAX_OPEN_INDEXES
+    paths = []
+    for i in range(limit + 2):
+        path = dataset_dir / f'data{i}.txt'
+        path.write_text(f'line {i}\n', encoding='utf-8')
+        paths.append(str(path))
+
+    service = DatasetService(index_dir=index_dir)
+    indexes = []
+    for path in paths:
+        index = service.get_dataset_index(path, DatasetFormat.TXT)
+        index.read(0)
+        indexes.append(index)
+
+    assert len(service._indexes) == limit
+    assert indexes[0]._mmap is None and indexes[0]._offsets is None
+    assert indexes[-1]._mmap is not None
+
+    # A closed index remaps its table and file when read again
+    assert indexes[0].read(0) == {'text': 'line 0'}
+    indexes[0].close()
+
+    service.close_indexes()
+    assert not service._indexes
+    assert all(index._mmap is None for index in indexes)
+
+
+def test_stale_index_files_are_pruned(dataset_dir, index_dir):
+    """Persisted indexes of deleted datasets are removed from the index dir"""
+    kept = dataset_dir / 'kept.txt'
+    kept.write_text('one\n', encoding='utf-8')
+    removed = dataset_dir / 'removed.txt'
+    removed.write_text('two\n', encoding='utf-8')
+
+    for path in (kept, removed):
+        DatasetIndex(str(path), DatasetFormat.TXT, Path(index_dir)).close()
+    removed.unlink()
+
+    DatasetService(index_dir=index_dir)._prune_index_dir(Path(index_dir))
+
+    remaining = sorted(p.suffix for p in Path(index_dir).iterdir())
+    assert remaining == ['.json', '.npy']
+    assert DatasetIndex(str(kept), DatasetFormat.TXT, Path(index_dir)).read(0) == {'text': 'one'}
+
+
+def test_paging_and_sampling(dataset_dir, index_dir):
+    """Paging returns the requested window and sampling draws distinct records"""
+    path = dataset_dir / 'data.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(1000):
+            f.write(json.dumps({'text': f'sample {i}', 'id': i}) + '\n')
+
+    service = DatasetService(index_dir=index_dir)
+
+    page = service.generate_preview(str(path), DatasetFormat.JSONL, num_samples=5, offset=990)
+    assert page.total_count == 1000
+    assert [s['id'] for s in page.samples] == [990, 991, 992, 993, 994]
+
+    tail = service.generate_preview(str(path), DatasetFormat.JSONL, num_samples=5, offset=998)
+    assert [s['id'] for s in tail.samples] == [998, 999]
+
+    sampled = service.sample_dataset(str(path), num_samples=50, format=DatasetFormat.JSONL, seed=7)
+    ids = [s['id'] for s in sampled.samples]
+    assert len(ids) == len(set(ids)) == 50
+    assert ids == [s['id'] for s in service.sample_dataset(
+        str(path), num_samples=50, format=DatasetFormat.JSONL, seed=7
+    ).samples]
+
+
+def test_index_persisted_and_invalidated(dataset_dir, index_dir):
+    """The index is reused across instances and rebuilt when the file changes"""
+    path = dataset_dir / 'data.txt'
+    path.write_text('one\ntwo\n', encoding='utf-8')
+
+    first = DatasetIndex(str(path), DatasetFormat.TXT, Path(index_dir))
+    assert len(first) == 2
+    first.close()
+
+    built = []
+    original_build = DatasetIndex._build
+
+    def tracking_build(self):
+        built.append(self.file_path)
+        return original_build(self)
+
+    DatasetIndex._build = tracking_build
+    try:
+        reopened = DatasetIndex(str(path), DatasetFormat.TXT, Path(index_dir))
+        assert built == []
+        assert reopened.read(-1) == {'text': 'two'}
+        reopened.close()
+
+        path.write_text('one\ntwo\nthree\n', encoding='utf-8')
+        assert not reopened.is_current()
+
+        rebuilt = DatasetIndex(str(path), DatasetFormat.TXT, Path(index_dir))
+        assert len(built) == 1
+        assert len(rebuilt) == 3
+        rebuilt.close()
+    finally:
+        DatasetIndex._build = original_build
+
+
+def test_json_preview_falls_back_to_streaming(dataset_dir, index_dir):
+    """JSON arrays are not indexed but still support offset previews"""
+    path = dataset_dir / 'data.json'
+    path.write_text(json.dumps([{'text': f'item {i}'} for i in range(10)]), encoding='utf-8')
+
+    service = DatasetService(index_dir=index_dir)
+    assert service.get_dataset_index(str(path), DatasetFormat.JSON) is None
+
+    preview = service.generate_preview(str(path), DatasetFormat.JSON, num_samples=3, offset=4)
+    assert preview.total_count == 10
+    assert [s['text'] for s in preview.samples] == ['item 4', 'item 5', 'item 6']
+
+
+def test_indexed_seek_benchmark(dataset_dir, index_dir):
+    """Benchmark: reading the last page is as fast as the first once indexed"""
+    path = dataset_dir / 'data.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(200000):
+            f.write(json.dumps({'text': f'sample {i} ' * 4, 'id': i}) + '\n')
+
+    service = DatasetService(index_dir=index_dir)
+
+    start = time.perf_counter()
+    service.get_dataset_index(str(path), DatasetFormat.JSONL)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(199000, 200000, 10):
+        page = service.generate_preview(str(path), DatasetFormat.JSONL, num_samples=10, offset=offset)
+    seek_time = (time.perf_counter() - start) / 100
+
+    assert page.samples[-1]['id'] == 199999
+    assert seek_time < 0.01, f"Indexed page read took {seek_time * 1000:.2f}ms"
+
+    print(f"✓ Index built in {build_time:.2f}s, page read at tail in {seek_time * 1000:.3f}ms")
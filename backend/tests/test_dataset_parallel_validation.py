@@ -0,0 +1,266 @@
+"""
+Tests for parallel, chunked dataset validation.
+
+Verifies that validating byte-range chunks in a process pool reports exactly
+what the serial validators report (including file-wide line numbers), that the
+background job exposes progress, and benchmarks speedup against core count.
+"""
+
+import pytest
+import tempfile
+import json
+import csv
+import os
+import sys
+import time
+from pathlib import Path
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.dataset_service import DatasetService, DatasetFormat
+
+# Lines in the benchmark dataset
+BENCHMARK_ROWS = int(os.environ.get("PEFT_BENCHMARK_ROWS", "400000"))
+
+# Wall-clock speedup is only asserted on explicit benchmark runs
+ASSERT_SPEEDUP = "PEFT_BENCHMARK_ROWS" in os.environ
+
+
+def as_tuples(results):
+    return [
+        (r.field, r.level, r.message, r.suggestion, r.auto_fixable, r.line_number)
+        for r in results
+    ]
+
+
+jsonl_lines = st.lists(
+    st.one_of(
+        st.builds(lambda i: json.dumps({'text': f'sample {i}'}), st.integers(0, 10**6)),
+        st.sampled_from(['', '   ', '{ broken', '[1, 2]', '"string"', '{"text": "a\\nb"}', '\r'])
+    ),
+    min_size=1,
+    max_size=60
+)
+
+
+@given(lines=jsonl_lines, chunk_bytes=st.integers(min_value=1, max_value=200))
+@settings(max_examples=25, deadline=None)
+def test_parallel_jsonl_matches_serial(lines, chunk_bytes):
+    """Chunked JSONL validation reports the same issues and line numbers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.jsonl')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write('\n'.join(lines))
+
+        service = DatasetService(index_dir=os.path.join(tmp, 'index'))
+        serial = service.validate_dataset(path, DatasetFormat.JSONL)
+        parallel = service.validate_dataset_parallel(
+            path, DatasetFormat.JSONL, max_workers=2, chunk_bytes=chunk_bytes
+        )
+
+        assert as_tuples(parallel) == as_tuples(serial)
+
+
+def test_parallel_csv_matches_serial():
+    """Chunked CSV validation honours quoted newlines and numbers rows globally"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['text', 'label'])
+            for i in range(300):
+                if i % 37 == 5:
+                    writer.writerow(['', ''])
+                elif i % 11 == 0:
+                    writer.writerow([f'multi\nline {i}', 'x'])
+                else:
+                    writer.writerow([f'row {i}', 'y'])
+            f.write('\n\n')
+
+        service = DatasetService(index_dir=os.path.join(tmp, 'index'))
+        serial = service.validate_dataset(path, DatasetFormat.CSV)
+
+        progress = []
+        parallel = service.validate_dataset_parallel(
+            path, DatasetFormat.CSV, max_workers=2, chunk_bytes=256,
+            progress_callback=lambda done, total: progress.append((done, total))
+        )
+
+        assert as_tuples(parallel) == as_tuples(serial)
+        assert [r.line_number for r in parallel if r.line_number] == [7, 44, 81]
+        assert len(progress) > 2
+        assert progress[-1][0] == progress[-1][1]
+
+
+def test_validation_job_reports_progress():
+    """The background job finishes with results and full progress"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(2000):
+                f.write('{ broken\n' if i in (10, 1500) else json.dumps({'text': f'sample {i}'}) + '\n')
+
+        service = DatasetService(index_dir=os.path.join(tmp, 'index'))
+        job = service.start_validation_job(path, DatasetFormat.JSONL, max_workers=2)
+        assert service.get_validation_job(job.job_id) is job
+
+        deadline = time.time() + 60
+        while job.status in ("pending", "running") and time.time() < deadline:
+            time.sleep(0.05)
+
+        payload = job.to_dict()
+        assert payload["status"] == "completed"
+        assert payload["progress"] == 1.0
+        assert [r["line_number"] for r in payload["results"] if r["line_number"]] == [11, 1501]
+
+
+def test_validation_api_endpoints():
+    """The /api/datasets router starts and polls validation jobs"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from services.dataset_api import router
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'text': 'hello'}) + '\n')
+
+        response = client.post("/api/datasets/validate", json={"file_path": path, "format": "jsonl"})
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            payload = client.get(f"/api/datasets/validate/{job_id}").json()
+            if payload["status"] not in ("pending", "running"):
+                break
+            time.sleep(0.05)
+        assert payload["status"] == "completed"
+
+        assert client.get("/api/datasets/validate/missing").status_code == 404
+        for max_workers in (0, -1):
+            assert client.post(
+                "/api/datasets/validate", json={"file_path": path, "max_workers": max_workers}
+            ).status_code == 422
+        assert client.post(
+            "/api/datasets/validate", json={"file_path": os.path.join(tmp, 'missing.jsonl')}
+        ).status_code == 404
+
+
+def test_worker_count_is_clamped(monkeypatch):
+    """Requested workers are capped at the CPU count and never below one"""
+    import services.dataset_service as dataset_service_module
+
+    requested = []
+
+    class RecordingExecutor(dataset_service_module.ProcessPoolExecutor):
+        def __init__(self, max_workers=None, **kwargs):
+            requested.append(max_workers)
+            super().__init__(max_workers=max_workers, **kwargs)
+
+    monkeypatch.setattr(dataset_service_module, "ProcessPoolExecutor", RecordingExecutor)
+    monkeypatch.setattr(dataset_service_module.os, "cpu_count", lambda: 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(200):
+                f.write(json.dumps({'text': f'sample {i}'}) + '\n')
+
+        service = DatasetService(index_dir=os.path.join(tmp, 'index'))
+        for max_workers in (640, -3):
+            service.validate_dataset_parallel(path, DatasetFormat.JSONL, max_workers=max_workers, chunk_bytes=64)
+
+    assert requested == [2, 1]
+
+
+def test_concurrent_validation_jobs_are_limited(monkeypatch):
+    """Jobs beyond the concurrency limit wait as pending for a free slot"""
+    import threading
+    import services.dataset_service as dataset_service_module
+
+    release = threading.Event()
+    running = []
+
+    def blocking_job(self, job, max_workers):
+        job.status = "running"
+        running.append(job.job_id)
+        release.wait(10)
+        job.status = "completed"
+
+    monkeypatch.setattr(DatasetService, "_execute_validation_job", blocking_job)
+    limit = dataset_service_module.MAX_CONCURRENT_VALIDATION_JOBS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'text': 'hello'}) + '\n')
+
+        service = DatasetService(index_dir=os.path.join(tmp, 'index'))
+        jobs = [service.start_validation_job(path, DatasetFormat.JSONL) for _ in range(limit + 2)]
+
+        deadline = time.time() + 5
+        while len(running) < limit and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert len(running) == limit
+        assert sum(job.status == "pending" for job in jobs) == 2
+
+        release.set()
+        deadline = time.time() + 5
+        while any(job.status != "completed" for job in jobs) and time.time() < deadline:
+            time.sleep(0.01)
+        assert all(job.status == "completed" for job in jobs)
+
+
+def test_parallel_validation_benchmark():
+    """
+    Benchmark: chunked validation scales with the number of cores.
+
+    With n cores the parallel validator should approach n times the serial
+    throughput. Results must always match the serial validator; the speedup
+    is only asserted when PEFT_BENCHMARK_ROWS is set, since timings are
+    unreliable on shared CI runners.
+    """
+    cores = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(BENCHMARK_ROWS):
+                f.write(json.dumps({'instruction': f'Question {i}', 'output': f'Answer {i} ' * 8}) + '\n')
+        size_mb = Path(path).stat().st_size / 1e6
+
+        service = DatasetService(index_dir=os.path.join(tmp, 'index'))
+        chunk_bytes = int(Path(path).stat().st_size / (4 * cores)) + 1
+        service.get_dataset_index(path, DatasetFormat.JSONL)
+
+        start = time.perf_counter()
+        serial = service.validate_dataset(path, DatasetFormat.JSONL)
+        serial_time = time.perf_counter() - start
+
+        timings = {}
+        for workers in sorted({1, 2, 4, cores}):
+            if workers > cores:
+                continue
+            start = time.perf_counter()
+            parallel = service.validate_dataset_parallel(
+                path, DatasetFormat.JSONL, max_workers=workers, chunk_bytes=chunk_bytes
+            )
+            timings[workers] = time.perf_counter() - start
+            assert as_tuples(parallel) == as_tuples(serial)
+
+        speedup = serial_time / timings[cores]
+        if ASSERT_SPEEDUP:
+            assert speedup > 0.6 * min(cores, 4), f"Speedup {speedup:.2f}x on {cores} cores"
+
+        print(f"✓ {BENCHMARK_ROWS} lines ({size_mb:.0f} MB): serial {serial_time:.2f}s; " + ", ".join(
+            f"{workers} workers {elapsed:.2f}s ({serial_time / elapsed:.2f}x)"
+            for workers, elapsed in timings.items()
+        ))
@@ -0,0 +1,211 @@
+"""
+Tests for the streaming, single-pass dataset analysis pipeline.
+
+Covers the incremental JSON array parser, equivalence of the streaming
+statistics with an in-memory reference, and a benchmark showing bounded
+memory and a single read of the dataset file.
+"""
+
+import pytest
+import tempfile
+import json
+import io
+import os
+import sys
+import time
+import builtins
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path to import services directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Import directly from dataset_service to avoid loading other services with heavy dependencies
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "dataset_service",
+    os.path.join(os.path.dirname(__file__), '..', 'services', 'dataset_service.py')
+)
+dataset_service_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dataset_service_module)
+
+DatasetFormat = dataset_service_module.DatasetFormat
+ValidationLevel = dataset_service_module.ValidationLevel
+JSONStructureError = dataset_service_module.JSONStructureError
+iter_json_array = dataset_service_module.iter_json_array
+get_dataset_service = dataset_service_module.get_dataset_service
+
+# Rows in the benchmark dataset; set PEFT_BENCHMARK_ROWS=5000000 for the full run
+BENCHMARK_ROWS = int(os.environ.get("PEFT_BENCHMARK_ROWS", "100000"))
+
+
+json_values = st.recursive(
+    st.none() | st.booleans() | st.integers() | st.floats(allow_nan=False) | st.text(),
+    lambda children: st.lists(children, max_size=4) | st.dictionaries(st.text(), children, max_size=4),
+    max_leaves=10
+)
+
+
+@pytest.fixture
+def temp_file():
+    """Yield a path for a temporary dataset file"""
+    with tempfile.NamedTemporaryFile(suffix='.tmp', delete=False) as f:
+        path = f.name
+    yield path
+    Path(path).unlink(missing_ok=True)
+
+
+@given(items=st.lists(json_values, max_size=20), chunk_size=st.integers(min_value=1, max_value=64))
+@settings(max_examples=100, deadline=None)
+def test_iter_json_array_matches_json_load(items, chunk_size):
+    """Incremental parsing yields the same elements as json.load for any chunk size"""
+    document = json.dumps(items, indent=1)
+    parsed = list(iter_json_array(io.StringIO(document), chunk_size=chunk_size))
+    assert parsed == json.loads(document)
+
+
+def test_iter_json_array_numbers_split_across_chunks():
+    """Numbers spanning a chunk boundary are not truncated"""
+    document = '[1234567890, 98765.4321e3, true, null]'
+    for chunk_size in range(1, len(document) + 1):
+        assert list(iter_json_array(io.StringIO(document), chunk_size=chunk_size)) == [
+            1234567890, 98765.4321e3, True, None
+        ]
+
+
+def test_iter_json_array_rejects_non_array():
+    """Valid JSON that is not an array raises JSONStructureError"""
+    with pytest.raises(JSONStructureError):
+        list(iter_json_array(io.StringIO('{"text": "hello"}')))
+
+
+@pytest.mark.parametrize("document", ['', '[', '[1,]', '[1 2]', '[1] x', '{"a": '])
+def test_iter_json_array_rejects_invalid_json(document):
+    """Malformed documents raise json.JSONDecodeError"""
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(document), chunk_size=2))
+
+
+@given(texts=st.lists(st.sampled_from(['', '   ', 'short', 'x' * 450, 'y' * 2100, 'short', 'z' * 4500]), min_size=1, max_size=50))
+@settings(max_examples=50, deadline=None)
+def test_streaming_statistics_match_reference(texts):
+    """Streaming statistics equal those computed over fully materialized samples"""
+    dataset_service = get_dataset_service()
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump([{'text': text} for text in texts], f)
+        temp_path = f.name
+
+    try:
+        stats = dataset_service.analyze_statistics(temp_path, DatasetFormat.JSON)
+
+        token_counts = [len(text) // 4 for text in texts]
+        counter = Counter(texts)
+
+        assert stats.num_samples == len(texts)
+        assert stats.total_tokens == sum(token_counts)
+        assert stats.min_tokens == min(token_counts)
+        assert stats.max_tokens == max(token_counts)
+        assert stats.empty_samples == sum(1 for text in texts if not text.strip())
+        assert stats.unique_samples == len(counter)
+        assert stats.duplicate_samples == len(texts) - len(counter)
+        assert sum(stats.token_length_distribution.values()) == len(texts)
+
+    finally:
+        Path(temp_path).unlink(missing_ok=True)
+
+
+def test_json_validation_reports_structure_and_syntax(temp_file):
+    """The streaming JSON validator reports the same errors as before"""
+    dataset_service = get_dataset_service()
+
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({'text': 'not an array'}, f)
+    results = dataset_service.validate_dataset(temp_file, DatasetFormat.JSON)
+    assert any(r.field == "structure" and r.level == ValidationLevel.ERROR for r in results)
+
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        f.write('[{"text": "ok"}, {"text": ')
+    results = dataset_service.validate_dataset(temp_file, DatasetFormat.JSON)
+    assert any("Invalid JSON syntax" in r.message for r in results)
+
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        f.write('[]')
+    results = dataset_service.validate_dataset(temp_file, DatasetFormat.JSON)
+    assert any(r.message == "JSON array is empty" for r in results)
+
+
+def test_scan_dataset_skips_invalid_jsonl_lines(temp_file):
+    """Invalid JSONL lines are reported and excluded from statistics"""
+    dataset_service = get_dataset_service()
+
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'text': 'first'}) + '\n')
+        f.write('{ broken\n')
+        f.write('[1, 2]\n')
+        f.write(json.dumps({'text': 'second'}) + '\n')
+
+    scan = dataset_service.scan_dataset(temp_file, DatasetFormat.JSONL)
+
+    assert scan.statistics.num_samples == 2
+    assert sorted(r.line_number for r in scan.issues if r.line_number) == [2, 3]
+
+
+def test_check_quality_benchmark_single_read_bounded_memory(temp_file):
+    """
+    Benchmark: a quality check streams the file once with bounded memory.
+
+    Peak traced memory must stay far below the size of the materialized samples,
+    growing only by the fixed-size digest kept per sample.
+    """
+    dataset_service = get_dataset_service()
+
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        for i in range(BENCHMARK_ROWS):
+            f.write(json.dumps({'instruction': f'Question number {i % 1000}', 'output': f'Answer {i} ' * 8}) + '\n')
+    file_size = Path(temp_file).stat().st_size
+
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) == temp_file:
+            opened.append(file)
+        return real_open(file, *args, **kwargs)
+
+    def traced_check(**kwargs):
+        opened.clear()
+        tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            report = dataset_service.check_quality(temp_file, DatasetFormat.JSONL, **kwargs)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return report, elapsed, peak
+
+    dataset_service_module.open = counting_open
+    try:
+        report, elapsed, peak = traced_check(detect_near_duplicates=False)
+        assert report.is_ready_for_training
+        assert len(opened) == 1, f"Dataset was opened {len(opened)} times"
+
+        # 8-byte digests plus sort scratch space per sample, plus a fixed buffer budget
+        assert peak < 4 * 1024 * 1024 + 24 * BENCHMARK_ROWS, f"Peak memory {peak} bytes"
+        assert peak < file_size / 4
+
+        # Near-duplicate detection rides along in the same pass, adding only
+        # fixed-size per-sample state (signatures are spilled to disk)
+        report, near_elapsed, near_peak = traced_check()
+        assert report.duplicates is not None
+        assert len(opened) == 1, f"Dataset was opened {len(opened)} times"
+        assert near_peak < 4 * 1024 * 1024 + 64 * BENCHMARK_ROWS, f"Peak memory {near_peak} bytes"
+    finally:
+        del dataset_service_module.open
+
+    print(f"✓ {BENCHMARK_ROWS} rows ({file_size / 1e6:.0f} MB) checked in {elapsed:.2f}s, "
+          f"peak {peak / 1e6:.1f} MB, opened once; with near-duplicates "
+          f"{near_elapsed:.2f}s, peak {near_peak / 1e6:.1f} MB")
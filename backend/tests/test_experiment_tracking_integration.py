@@ -573,8 +573,10 @@ class TestMetricBuffering:
                 commit=False,
             )
         
-        # Buffer should have flushed
-        assert mock_connector.log_metrics.call_count == 10
+        # Buffer should have flushed as one batch
+        assert mock_connector.log_metrics_batch.await_count == 1
+        tracker_job_id, entries = mock_connector.log_metrics_batch.await_args.args
+        assert tracker_job_id == "tracker_job_123" and [e["step"] for e in entries] == list(range(10))
         assert len(experiment_service._metric_buffer["job_123"]) == 0
     
     @pytest.mark.asyncio
@@ -608,7 +610,8 @@ class TestMetricBuffering:
         await experiment_service.finish_experiment("job_123")
         
         # Buffer should have been flushed
-        assert mock_connector.log_metrics.call_count == 5
+        assert mock_connector.log_metrics_batch.await_count == 1
+        assert len(mock_connector.log_metrics_batch.await_args.args[1]) == 5
         assert "job_123" not in experiment_service._metric_buffer
 
 
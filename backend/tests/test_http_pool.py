@@ -0,0 +1,219 @@
+"""
+Tests for the HTTP client pool shared by platform connectors.
+
+Verifies that connector sessions share pooled connections while keeping
+their own headers, that transient failures are retried with backoff only
+when it is safe, that latency and errors are recorded per connector, and
+benchmarks connections opened by many active connectors against one
+session per connector.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+# Add parent directory to path to import connectors
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from connectors import http_pool
+from connectors.http_pool import HTTPConnectionPool, LatencyHistogram
+
+# Concurrently active connectors and requests per connector in the benchmark
+BENCHMARK_CONNECTORS = int(os.environ.get("PEFT_BENCHMARK_HTTP_CONNECTORS", "12"))
+BENCHMARK_REQUESTS = int(os.environ.get("PEFT_BENCHMARK_HTTP_REQUESTS", "20"))
+
+
+class StandIn:
+    """Local HTTP API that can fail the next requests with a given status"""
+
+    def __init__(self):
+        self.failures = []
+        self.auth = []
+        self.methods = []
+
+    async def handle(self, request):
+        self.methods.append(request.method)
+        self.auth.append(request.headers.get('Authorization'))
+        if self.failures:
+            status, headers = self.failures.pop(0)
+            return web.Response(status=status, headers=headers)
+        return web.json_response({'ok': True})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_pool, 'retry_delay', lambda attempt: 0)
+
+
+def test_connector_sessions_share_connections():
+    """Sessions keep their own headers but reuse the pool's connections"""
+    async def scenario():
+        pool = HTTPConnectionPool(max_connections_per_host=4)
+        async with StandIn() as server:
+            first = pool.session('first', headers={'Authorization': 'Bearer a'})
+            second = pool.session('second', headers={'Authorization': 'Bearer b'})
+            for _ in range(10):
+                for session in (first, second):
+                    async with session.get(f"{server.url}/ping") as response:
+                        assert (await response.json()) == {'ok': True}
+            await first.close()
+            assert not second.closed
+            async with second.get(f"{server.url}/ping") as response:
+                assert (await response.json()) == {'ok': True}
+            stats = pool.get_stats()
+            await second.close()
+            await pool.close()
+            return server, stats
+
+    server, stats = asyncio.run(scenario())
+    assert server.auth.count('Bearer a') == 10 and server.auth.count('Bearer b') == 11
+    assert stats['transport']['connections_created'] == 1
+    assert stats['transport']['connections_reused'] == 20
+    assert stats['connectors']['first']['requests'] == 10
+    assert stats['connectors']['second']['statuses'] == {'2xx': 11}
+
+
+def test_transient_failures_are_retried_when_safe():
+    async def scenario():
+        pool = HTTPConnectionPool()
+        async with StandIn() as server:
+            session = pool.session('api')
+
+            # Idempotent requests retry server errors
+            server.failures = [(503, {}), (502, {})]
+            async with session.get(f"{server.url}/x") as response:
+                assert response.status == 200
+
+            # A POST may have been processed, so a 503 is returned as is
+            server.failures = [(503, {})]
+            async with session.post(f"{server.url}/x", json={}) as response:
+                assert response.status == 503
+
+            # ...but a rate limited POST was not, and is retried
+            server.failures = [(429, {'Retry-After': '0'})]
+            response = await session.post(f"{server.url}/x", json={})
+            assert response.status == 200
+            response.release()
+
+            # Retries are bounded
+            server.failures = [(500, {})] * 10
+            async with session.put(f"{server.url}/x") as response:
+                assert response.status == 500
+            server.failures = []
+
+            await session.close()
+            await pool.close()
+            return server, pool.get_stats()['connectors']['api']
+
+    server, stats = asyncio.run(scenario())
+    assert server.methods == ['GET'] * 3 + ['POST'] * 3 + ['PUT'] * 4
+    assert stats['requests'] == 10 and stats['retries'] == 6 and stats['errors'] == 8
+
+
+def test_connection_errors_retry_then_raise():
+    async def scenario():
+        pool = HTTPConnectionPool(retries=2)
+        session = pool.session('down')
+        # Nothing listens on port 9 (discard) on the test host
+        with pytest.raises(aiohttp.ClientConnectionError):
+            async with session.post("http://127.0.0.1:9/x", json={}):
+                pass
+        await session.close()
+        await pool.close()
+        return pool.get_stats()['connectors']['down']
+
+    stats = asyncio.run(scenario())
+    assert stats['requests'] == 3 and stats['retries'] == 2 and stats['statuses'] == {'exception': 3}
+
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for elapsed in [1] * 90 + [200] * 9 + [20000]:
+        histogram.record(elapsed, 200)
+    assert histogram.quantile(0.5) == 5.0
+    assert histogram.quantile(0.95) == 250.0
+    assert histogram.quantile(1.0) == float('inf')
+    assert histogram.to_dict()['histogram']['le_5ms'] == 90
+
+
+def test_performance_metrics_include_http():
+    from services.performance_service import get_performance_service, get_http_pool
+
+    service = get_performance_service()
+    assert service.http_pool is get_http_pool()
+    assert 'connectors' in service.get_all_metrics()['http']
+
+
+def test_many_connectors_benchmark():
+    """
+    Benchmark: connections opened by many connectors active at once.
+
+    Each connector polls the same host, as connectors do when tracking
+    jobs on one platform. The baseline gives every connector its own
+    ClientSession and connection pool, as connectors did before; each new
+    connection is a TCP (and, against real APIs, TLS) handshake.
+    """
+    async def run(server, make_session):
+        sessions = [make_session(i) for i in range(BENCHMARK_CONNECTORS)]
+
+        # Connectors poll on their own schedules, spread over the interval
+        interval = BENCHMARK_CONNECTORS * 0.01
+
+        async def poll(index, session):
+            await asyncio.sleep(index * interval / BENCHMARK_CONNECTORS)
+            for _ in range(BENCHMARK_REQUESTS):
+                async with session.get(f"{server.url}/api") as response:
+                    await response.read()
+                await asyncio.sleep(interval)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(poll(i, s) for i, s in enumerate(sessions)))
+        elapsed = time.perf_counter() - started
+        for session in sessions:
+            await session.close()
+        return elapsed
+
+    async def scenario():
+        async with StandIn() as server:
+            created = {'count': 0}
+
+            async def count(session, context, params):
+                created['count'] += 1
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(count)
+            separate_seconds = await run(
+                server, lambda i: aiohttp.ClientSession(headers={'Authorization': f'Bearer {i}'},
+                                                        trace_configs=[trace]))
+
+            pool = HTTPConnectionPool()
+            pooled_seconds = await run(
+                server, lambda i: pool.session(f'connector-{i}', headers={'Authorization': f'Bearer {i}'}))
+            stats = pool.get_stats()
+            await pool.close()
+            return created['count'], separate_seconds, stats, pooled_seconds
+
+    separate, separate_seconds, stats, pooled_seconds = asyncio.run(scenario())
+    pooled = stats['transport']['connections_created']
+    assert separate == BENCHMARK_CONNECTORS
+    assert pooled < separate
+    assert sum(c['requests'] for c in stats['connectors'].values()) == BENCHMARK_CONNECTORS * BENCHMARK_REQUESTS
+    print(f"✓ {BENCHMARK_CONNECTORS} connectors: shared pool opened {pooled} connections "
+          f"({pooled_seconds:.2f} s), separate sessions opened {separate} ({separate_seconds:.2f} s)")
@@ -0,0 +1,230 @@
+"""
+Tests for resource-aware scheduling of local training jobs.
+
+Verifies that admitted jobs never hold more than the simulated machine's
+capacity, that the queue follows priority then submission order (fifo) or
+the owners' dominant shares (fair) without letting small jobs overtake the
+head, that oversized jobs run alone and GPU memory falls back to RAM on a
+CPU-only machine, that start time estimates follow the expected finish
+times, that the orchestrator queues and launches local jobs through the
+scheduler, and benchmarks estimating start times for a long queue.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.job_scheduler import (
+    JobScheduler,
+    ResourceRequest,
+    estimate_resources,
+    model_parameters,
+    simulated_profile,
+)
+from services.training_orchestration_service import TrainingConfig, TrainingState
+
+# Queued jobs in the start time estimate benchmark
+BENCHMARK_QUEUED_JOBS = int(os.environ.get("PEFT_BENCHMARK_QUEUED_JOBS", "500"))
+
+
+def make_scheduler(policy='fifo', progress=None, **profile):
+    launched = []
+    scheduler = JobScheduler(launch=launched.append, profile_provider=lambda: simulated_profile(**profile),
+                             policy=policy, progress=progress, margin=1.0)
+    return scheduler, launched
+
+
+def config(job_id, model_name="gpt2", **kwargs):
+    return TrainingConfig(job_id=job_id, model_name=model_name, dataset_path="/d", output_dir=f"/o/{job_id}",
+                          **kwargs)
+
+
+requests = st.builds(
+    ResourceRequest,
+    gpu_memory_mb=st.integers(min_value=0, max_value=30000),
+    cpu_cores=st.integers(min_value=0, max_value=10),
+    ram_mb=st.integers(min_value=0, max_value=70000)
+)
+
+
+@given(
+    jobs=st.lists(st.tuples(requests, st.integers(min_value=0, max_value=2)), min_size=1, max_size=25),
+    releases=st.lists(st.integers(min_value=0, max_value=24), max_size=25),
+    policy=st.sampled_from(['fifo', 'fair'])
+)
+@settings(max_examples=100, deadline=None)
+def test_admitted_jobs_fit_the_capacity(jobs, releases, policy):
+    scheduler, launched = make_scheduler(policy, gpu_memory_mb=[24000, 16000], cpu_cores=8, ram_mb=65536)
+    capacity = scheduler.capacity()
+
+    def check():
+        placements = [job.placement for job in scheduler._running.values()]
+        if len(placements) > 1:
+            for gpu_id, memory in enumerate(capacity.gpu_memory_mb):
+                assert sum(p.gpu_memory_mb for p in placements if p.gpu_id == gpu_id) <= memory
+            assert sum(p.cpu_cores for p in placements) <= capacity.cpu_cores
+            assert sum(p.ram_mb for p in placements) <= capacity.ram_mb
+        assert set(launched) == set(scheduler._running) | released_ids
+
+    released_ids = set()
+    for index, (request, priority) in enumerate(jobs):
+        scheduler.submit(f"job-{index}", request, priority=priority, owner=f"owner-{index % 3}")
+        check()
+    for index in releases:
+        if f"job-{index}" in scheduler._running:
+            released_ids.add(f"job-{index}")
+            scheduler.release(f"job-{index}")
+        check()
+    # The machine is never left idle while jobs wait
+    assert scheduler._running or not scheduler._queued
+
+
+def test_fifo_admits_by_priority_and_never_lets_small_jobs_overtake():
+    scheduler, launched = make_scheduler(gpu_memory_mb=[24000], cpu_cores=8, ram_mb=65536)
+    assert scheduler.submit("a", ResourceRequest(gpu_memory_mb=16000))
+    assert not scheduler.submit("big", ResourceRequest(gpu_memory_mb=16000))
+    assert not scheduler.submit("small", ResourceRequest(gpu_memory_mb=4000))
+    assert not scheduler.submit("urgent", ResourceRequest(gpu_memory_mb=16000), priority=1)
+    # "small" fits now but would delay the queue head
+    assert launched == ["a"]
+
+    scheduler.release("a")
+    assert launched == ["a", "urgent"]
+    scheduler.release("urgent")
+    assert launched == ["a", "urgent", "big", "small"]
+    assert scheduler.cancel("missing") is False
+
+
+def test_fair_share_prefers_the_owner_holding_the_least():
+    scheduler, launched = make_scheduler('fair', gpu_memory_mb=[24000], cpu_cores=8, ram_mb=65536)
+    for index in range(4):
+        scheduler.submit(f"alice-{index}", ResourceRequest(gpu_memory_mb=12000), owner="alice")
+    scheduler.submit("bob-0", ResourceRequest(gpu_memory_mb=12000), owner="bob")
+    assert launched == ["alice-0", "alice-1"]
+
+    scheduler.release("alice-0")
+    assert launched[-1] == "bob-0"
+    scheduler.release("alice-1")
+    assert launched[-1] == "alice-2"
+
+    fifo, fifo_launched = make_scheduler('fifo', gpu_memory_mb=[24000], cpu_cores=8, ram_mb=65536)
+    for index in range(4):
+        fifo.submit(f"alice-{index}", ResourceRequest(gpu_memory_mb=12000), owner="alice")
+    fifo.submit("bob-0", ResourceRequest(gpu_memory_mb=12000), owner="bob")
+    fifo.release("alice-0")
+    assert fifo_launched[-1] == "alice-2"
+
+
+def test_gpu_placement_oversized_jobs_and_cpu_only_machines():
+    scheduler, launched = make_scheduler(gpu_memory_mb=[24000, 16000], cpu_cores=8, ram_mb=65536)
+    scheduler.submit("fits-small-gpu", ResourceRequest(gpu_memory_mb=12000))
+    scheduler.submit("needs-large-gpu", ResourceRequest(gpu_memory_mb=20000))
+    assert scheduler._running["fits-small-gpu"].placement.gpu_id == 1
+    assert scheduler._running["needs-large-gpu"].placement.gpu_id == 0
+
+    # Too large for the machine: waits until it can run alone
+    scheduler.submit("huge", ResourceRequest(gpu_memory_mb=80000))
+    scheduler.release("fits-small-gpu")
+    assert "huge" not in launched
+    scheduler.release("needs-large-gpu")
+    assert launched[-1] == "huge"
+
+    cpu_only, cpu_launched = make_scheduler(cpu_cores=4, ram_mb=12000)
+    cpu_only.submit("a", ResourceRequest(gpu_memory_mb=6000, ram_mb=2000))
+    cpu_only.submit("b", ResourceRequest(gpu_memory_mb=6000, ram_mb=2000))
+    placement = cpu_only._running["a"].placement
+    assert placement.gpu_id is None and placement.gpu_memory_mb == 0 and placement.ram_mb == 8000
+    assert cpu_launched == ["a"]
+
+
+def test_estimated_resources_follow_model_size_and_precision():
+    assert model_parameters("meta-llama/Llama-2-7b-hf") == 7_000_000_000
+    assert model_parameters("Qwen/Qwen2.5-0.5B-Instruct") == 500_000_000
+    assert model_parameters("facebook/opt-350m") == 350_000_000
+    assert model_parameters("gpt2") == 124_000_000
+
+    small = estimate_resources(config("s"))
+    large = estimate_resources(config("l", model_name="mistralai/Mistral-7B-v0.1"))
+    quantized = estimate_resources(config("q", model_name="mistralai/Mistral-7B-v0.1", quantization="4bit"))
+    assert small.gpu_memory_mb < quantized.gpu_memory_mb < large.gpu_memory_mb
+    assert small.ram_mb < large.ram_mb
+
+    declared = estimate_resources(config("d", gpu_memory_mb=5000, cpu_cores=4, ram_mb=3000))
+    assert declared == ResourceRequest(gpu_memory_mb=5000, cpu_cores=4, ram_mb=3000)
+
+
+def test_start_time_estimates_follow_expected_finish_times():
+    steps = {"a": 50, "b": 0}
+    scheduler, launched = make_scheduler(progress=steps.get, gpu_memory_mb=[24000], cpu_cores=8, ram_mb=65536)
+    scheduler.submit("a", ResourceRequest(gpu_memory_mb=24000), total_steps=100)
+    scheduler.submit("b", ResourceRequest(gpu_memory_mb=24000), total_steps=200)
+    scheduler.submit("c", ResourceRequest(gpu_memory_mb=24000), total_steps=100)
+    # "a" ran 50 of 100 steps in one second
+    scheduler._running["a"].admitted_at = time.monotonic() - 1.0
+
+    starts = scheduler.estimate_start_times()
+    assert starts["b"] == pytest.approx(1.0, rel=0.05)
+    assert starts["c"] == pytest.approx(1.0 + 200 * 0.02, rel=0.05)
+
+    status = scheduler.get_status()
+    assert [job['job_id'] for job in status['running']] == ["a"]
+    assert [(job['job_id'], job['position']) for job in status['queued']] == [("b", 0), ("c", 1)]
+    assert status['capacity'] == {'gpu_memory_mb': (24000,), 'cpu_cores': 8, 'ram_mb': 65536}
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_orchestrator_queues_local_jobs_until_resources_free(orchestrator):
+    orchestrator.job_scheduler.profile_provider = lambda: simulated_profile(gpu_memory_mb=[24000])
+    first = orchestrator.create_job(config("first", max_steps=100_000, gpu_memory_mb=16000))
+    second = orchestrator.create_job(config("second", max_steps=20, gpu_memory_mb=16000))
+    third = orchestrator.create_job(config("third", max_steps=20, gpu_memory_mb=16000))
+
+    orchestrator.start_training("first")
+    orchestrator.start_training("second")
+    orchestrator.start_training("third")
+    assert wait_for(lambda: first.state == TrainingState.RUNNING)
+    assert second.state == TrainingState.QUEUED and third.state == TrainingState.QUEUED
+    queue = orchestrator.get_queue_status()['queued']
+    assert [job['job_id'] for job in queue] == ["second", "third"]
+    assert queue[0]['eta_seconds'] is not None
+
+    # Stopping a queued job takes it out of the queue
+    orchestrator.stop_training("third")
+    assert third.state == TrainingState.STOPPED
+    assert not orchestrator.job_scheduler.is_queued("third")
+
+    # Freeing the GPU launches the next job
+    orchestrator.stop_training("first")
+    assert wait_for(lambda: second.state == TrainingState.COMPLETED)
+    assert third.state == TrainingState.STOPPED
+    assert orchestrator.get_queue_status()['running'] == []
+
+
+def test_start_time_estimate_benchmark():
+    """
+    Benchmark: estimating start times for a long queue replays the policy
+    against every expected finish time and must stay interactive.
+    """
+    for policy in ('fifo', 'fair'):
+        scheduler, _ = make_scheduler(policy, gpu_memory_mb=[24000, 24000], cpu_cores=16, ram_mb=131072)
+        for index in range(BENCHMARK_QUEUED_JOBS):
+            scheduler.submit(f"job-{index}", ResourceRequest(gpu_memory_mb=8000 + 4000 * (index % 3)),
+                             priority=index % 2, owner=f"owner-{index % 5}", total_steps=100 + index)
+        started = time.perf_counter()
+        starts = scheduler.estimate_start_times()
+        seconds = time.perf_counter() - started
+        assert len(starts) == len(scheduler._queued)
+        assert seconds < 5.0
+        print(f"✓ {policy}: start times for {len(starts)} queued jobs in {seconds * 1000:.1f} ms")
@@ -0,0 +1,195 @@
+"""
+Tests for the preset and configuration library search index.
+
+Verifies that indexed listings match the previous scan-every-file
+semantics (substring search, any-of tags, newest first), that the index
+follows saves, updates, imports and deletes as well as files changed
+behind its back, pagination, and benchmarks listing 10k presets from the
+index against parsing every file.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.configuration_management_service import ConfigurationManagementService
+from services.preset_service import ConfigurationPreset, PresetService
+from services.training_config_service import ComputeProvider, TrainingConfiguration
+
+# Presets in the listing benchmark
+BENCHMARK_PRESETS = int(os.environ.get("PEFT_BENCHMARK_PRESETS", "10000"))
+
+TAGS = ['chatbot', 'code', 'qa', 'creative']
+
+
+@pytest.fixture
+def tmp():
+    with tempfile.TemporaryDirectory() as directory:
+        yield Path(directory)
+
+
+def make_preset(preset_id: str, name: str = "Preset", description: str = "", tags=None,
+                updated_at: str = "2024-01-01T00:00:00") -> ConfigurationPreset:
+    return ConfigurationPreset(
+        id=preset_id, name=name, description=description, created_at=updated_at,
+        updated_at=updated_at, tags=tags or [], model_name="gpt2", lora_r=8, lora_alpha=16,
+        lora_dropout=0.1, target_modules=["q_proj"], learning_rate=2e-4, batch_size=4,
+        gradient_accumulation=1, epochs=1,
+    )
+
+
+def write_preset_file(directory: Path, preset: ConfigurationPreset) -> None:
+    """Write a preset file directly, as another process or a user would"""
+    (directory / f"{preset.id}.json").write_text(json.dumps(preset.dict()))
+
+
+def scan_presets(directory: Path, search=None, tags=None):
+    """The previous list_presets: parse every file and filter in Python"""
+    presets = []
+    for preset_file in directory.glob("*.json"):
+        preset = ConfigurationPreset(**json.loads(preset_file.read_text()))
+        if search and (search.lower() not in preset.name.lower()
+                       and search.lower() not in preset.description.lower()):
+            continue
+        if tags and not any(tag in preset.tags for tag in tags):
+            continue
+        presets.append(preset)
+    presets.sort(key=lambda p: p.updated_at, reverse=True)
+    return presets
+
+
+text = st.text(alphabet='abcABC "*-_%é', max_size=12)
+
+
+@given(
+    entries=st.lists(
+        st.tuples(text, text, st.lists(st.sampled_from(TAGS), max_size=3, unique=True),
+                  st.integers(min_value=0, max_value=59)),
+        max_size=25
+    ),
+    search=st.one_of(st.none(), text),
+    tags=st.one_of(st.none(), st.lists(st.sampled_from(TAGS), max_size=2))
+)
+@settings(max_examples=60, deadline=None)
+def test_listing_matches_scanning_every_file(entries, search, tags):
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        for i, (name, description, preset_tags, second) in enumerate(entries):
+            write_preset_file(directory, make_preset(
+                f"p{i}", name, description, preset_tags, updated_at=f"2024-01-01T00:00:{second:02d}"))
+
+        listed = PresetService(presets_dir=directory).list_presets(search=search, tags=tags)
+        expected = scan_presets(directory, search, tags)
+        assert sorted(p.id for p in listed) == sorted(p.id for p in expected)
+        assert [p.updated_at for p in listed] == [p.updated_at for p in expected]
+
+
+def test_index_follows_service_writes(tmp):
+    service = PresetService(presets_dir=tmp)
+    service.save_preset(make_preset("a", "Llama chat", tags=["chatbot"]))
+    service.save_preset(make_preset("b", "Code helper", tags=["code"]))
+    assert [p.id for p in service.list_presets(search="chat")] == ["a"]
+
+    service.update_preset("a", {"name": "Summariser", "tags": ["qa"]})
+    assert service.list_presets(search="chat") == []
+    assert [p.id for p in service.list_presets(tags=["qa"])] == ["a"]
+
+    imported = service.import_preset(service.export_preset("b"), new_id="c")
+    assert [p.id for p in service.list_presets(search="helper")] == ["c", "b"]
+    assert imported.id == "c"
+
+    assert service.delete_preset("b") and not service.delete_preset("b")
+    assert [p.id for p in service.list_presets(search="helper")] == ["c"]
+
+
+def test_index_picks_up_files_changed_elsewhere(tmp):
+    service = PresetService(presets_dir=tmp)
+    service.save_preset(make_preset("a", "Alpha"))
+    assert len(service.list_presets()) == 1
+
+    write_preset_file(tmp, make_preset("b", "Beta"))
+    (tmp / "broken.json").write_text("{not json")
+    (tmp / "invalid.json").write_text(json.dumps({"id": "invalid"}))
+    assert sorted(p.id for p in service.list_presets()) == ["a", "b"]
+
+    (tmp / "a.json").unlink()
+    assert [p.id for p in service.list_presets()] == ["b"]
+
+    # In-place edits are found when the index is next opened
+    write_preset_file(tmp, make_preset("b", "Gamma", updated_at="2024-01-01T00:00:01"))
+    assert [p.name for p in PresetService(presets_dir=tmp).list_presets()] == ["Gamma"]
+
+
+def test_pagination(tmp):
+    service = PresetService(presets_dir=tmp)
+    for i in range(10):
+        write_preset_file(tmp, make_preset(f"p{i}", tags=["code" if i % 2 else "qa"],
+                                           updated_at=f"2024-01-01T00:00:{i:02d}"))
+
+    assert [p.id for p in service.list_presets(limit=3)] == ["p9", "p8", "p7"]
+    assert [p.id for p in service.list_presets(limit=3, offset=8)] == ["p1", "p0"]
+    assert [p.id for p in service.list_presets(tags=["code"], limit=2, offset=1)] == ["p7", "p5"]
+    assert service.count_presets(tags=["code"]) == 5 and service.count_presets() == 10
+
+
+def test_configuration_library_listing(tmp):
+    service = ConfigurationManagementService(library_path=tmp)
+    config = TrainingConfiguration(provider=ComputeProvider.LOCAL, model_name="gpt2", dataset_path="data.jsonl")
+    first = service.save_to_library(config, "Llama LoRA", "Chat tuning", tags=["chatbot"])
+    second = service.save_to_library(config, "Mistral QLoRA", "Code tuning", tags=["code"])
+
+    assert [m.id for m in service.list_library_configurations(search_query="tuning")] == [second, first]
+    assert [m.id for m in service.list_library_configurations(tags=["chatbot", "qa"])] == [first]
+
+    service.update_metadata(first, description="Summaries", tags=["qa"])
+    assert [m.id for m in service.list_library_configurations(search_query="summ")] == [first]
+    assert [m.tags for m in service.list_library_configurations(tags=["qa"])] == [["qa"]]
+
+    assert service.delete_from_library(second)
+    assert [m.id for m in service.list_library_configurations()] == [first]
+    assert service.count_library_configurations(search_query="mistral") == 0
+
+
+def test_preset_listing_benchmark(tmp):
+    """
+    Benchmark: searching, tag-filtering and paging 10k presets from the
+    index against the previous path, which parsed every preset file and
+    built a model for each on every call.
+    """
+    for i in range(BENCHMARK_PRESETS):
+        write_preset_file(tmp, make_preset(
+            f"preset-{i}", f"Preset {i}", f"Tuned for task {i % 97}", [TAGS[i % len(TAGS)]],
+            updated_at=f"2024-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}"))
+
+    started = time.perf_counter()
+    scanned = scan_presets(tmp, search="task 42", tags=["code"])
+    scan_seconds = time.perf_counter() - started
+
+    service = PresetService(presets_dir=tmp)
+    started = time.perf_counter()
+    service._index.refresh()
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    listed = service.list_presets(search="task 42", tags=["code"])
+    search_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    page = service.list_presets(limit=50, offset=100)
+    page_seconds = time.perf_counter() - started
+
+    assert [p.id for p in listed] == [p.id for p in scanned]
+    assert len(page) == min(50, max(0, BENCHMARK_PRESETS - 100))
+    assert search_seconds < scan_seconds
+    print(f"✓ {BENCHMARK_PRESETS} presets: indexed search {search_seconds * 1000:.1f} ms, "
+          f"page {page_seconds * 1000:.1f} ms, scanning every file {scan_seconds * 1000:.1f} ms "
+          f"(one-off index build {build_seconds * 1000:.1f} ms)")
@@ -0,0 +1,151 @@
+"""
+Tests for multi-resolution downsampling of metrics histories.
+
+Verifies that downsampled series stay within the requested point count,
+only contain real (step, value) pairs, keep the extremes of the queried
+range, respect step ranges, and that the resolution tiers keep query work
+bounded for long runs.
+"""
+
+import pytest
+import os
+import sys
+import time
+import numpy as np
+from datetime import datetime
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.metrics_store import MetricsStore
+from services.metrics_downsampling import lttb_indices, TIER_FACTORS
+from services.training_orchestration_service import TrainingMetrics
+from services.monitoring_service import MonitoringService
+
+# Rows in the long-run benchmark
+BENCHMARK_STEPS = int(os.environ.get("PEFT_BENCHMARK_STEPS", "200000"))
+
+
+def build_store(losses, segment_size=16384, val_every=3):
+    store = MetricsStore(TrainingMetrics, segment_size=segment_size)
+    for step, loss in enumerate(losses):
+        store.append(TrainingMetrics(
+            step=step * 2,
+            epoch=0,
+            loss=loss,
+            learning_rate=1e-4,
+            val_loss=loss if step % val_every == 0 else None,
+            timestamp=datetime(2026, 1, 1)
+        ))
+    return store
+
+
+@given(
+    losses=st.lists(st.floats(-1e6, 1e6), min_size=1, max_size=2500),
+    max_points=st.integers(2, 60),
+    bounds=st.tuples(st.integers(0, 5000), st.integers(0, 5000)),
+    segment_size=st.sampled_from([7, 64, 16384])
+)
+@settings(max_examples=60, deadline=None)
+def test_minmax_keeps_range_extremes(losses, max_points, bounds, segment_size):
+    """Min-max series are bounded, in range and contain the range min and max"""
+    store = build_store(losses, segment_size)
+    start_step, end_step = min(bounds), max(bounds)
+
+    steps, values = store.downsample('loss', start_step, end_step, max_points=max_points)
+
+    in_range = [(s * 2, v) for s, v in enumerate(losses) if start_step <= s * 2 <= end_step]
+    assert len(steps) <= max_points
+    assert list(steps) == sorted(steps)
+    assert set(zip(steps.tolist(), values.tolist())) <= set(in_range)
+    if in_range:
+        in_values = [v for _, v in in_range]
+        assert min(in_values) in values and max(in_values) in values
+    else:
+        assert len(steps) == 0
+
+
+@given(
+    losses=st.lists(st.floats(-1e3, 1e3), min_size=1, max_size=3000),
+    max_points=st.integers(3, 80)
+)
+@settings(max_examples=40, deadline=None)
+def test_lttb_keeps_endpoints(losses, max_points):
+    """LTTB series are bounded and keep the first and last row"""
+    store = build_store(losses)
+
+    steps, values = store.downsample('loss', max_points=max_points, method='lttb')
+
+    assert len(steps) <= max_points
+    assert steps[0] == 0 and steps[-1] == (len(losses) - 1) * 2
+    assert values[0] == losses[0] and values[-1] == losses[-1]
+
+
+def test_lttb_keeps_spike():
+    """A single spike in a flat series survives LTTB"""
+    y = np.zeros(10000)
+    y[6789] = 5.0
+    picks = lttb_indices(np.arange(10000), y, 100)
+    assert 6789 in picks
+    assert len(picks) <= 100
+
+
+def test_optional_values_and_validation():
+    """Missing optional values are skipped and bad arguments are rejected"""
+    store = build_store([float(i) for i in range(100)], val_every=10)
+
+    steps, values = store.downsample('val_loss', max_points=1000)
+    assert steps.tolist() == list(range(0, 200, 20))
+    assert not np.isnan(values).any()
+
+    with pytest.raises(KeyError):
+        store.downsample('gpu_utilization')
+    with pytest.raises(ValueError):
+        store.downsample('loss', method='mean')
+    with pytest.raises(ValueError):
+        store.downsample('loss', max_points=1)
+
+    store.clear()
+    assert len(store.downsample('loss')[0]) == 0
+
+
+def test_monitoring_series():
+    """MonitoringService serves bounded step/value series"""
+    service = MonitoringService()
+    service.start_monitoring('job')
+    for step in range(500):
+        service.record_metrics('job', step, 0, 1.0 / (step + 1), 1e-4, throughput=2.0, samples_per_second=8.0)
+
+    series = service.get_metric_series('job', ['loss', 'learning_rate'], start_step=100, max_points=50)
+    assert set(series) == {'loss', 'learning_rate'}
+    assert 0 < len(series['loss']) <= 50
+    assert series['loss'][0] == {'step': 100, 'value': 1.0 / 101}
+    assert service.get_metric_series('missing', ['loss']) == {'loss': []}
+
+
+def test_long_run_query_is_bounded():
+    """
+    Benchmark: downsampling a long run touches a bounded number of rows.
+
+    The tiers keep the candidate set proportional to max_points, so a
+    query over the whole run costs about the same as over a short one.
+    """
+    rng = np.random.default_rng(0)
+    losses = np.cumsum(rng.normal(size=BENCHMARK_STEPS)).tolist()
+    store = build_store(losses)
+    counts = store._tiers.bucket_counts()
+    assert counts == [BENCHMARK_STEPS // factor for factor in TIER_FACTORS]
+
+    candidates = store._tiers.candidate_rows('loss', 0, BENCHMARK_STEPS, 1000, counts)
+    # Two extremes per bucket, plus finer buckets at the ragged range edges
+    assert len(candidates) <= 2 * 4 * 1000 + 100 * len(TIER_FACTORS)
+
+    started = time.perf_counter()
+    steps, values = store.downsample('loss', max_points=1000)
+    elapsed = time.perf_counter() - started
+
+    assert len(steps) <= 1000
+    assert min(losses) in values and max(losses) in values
+    print(f"✓ {BENCHMARK_STEPS} steps: {len(candidates)} candidate rows, "
+          f"{len(steps)} points in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,196 @@
+"""
+Tests for the push-based WebSocket metrics hub.
+
+Verifies delta encoding, coalescing of slow subscribers, thread-safe
+publishing from training threads, and load-tests fan-out to many
+concurrent WebSocket clients over a real server.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import pytest
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.metrics_hub import MetricsHub, stream_subscription
+from services.training_orchestration_service import TrainingMetrics
+
+# Concurrent sockets and updates in the load test
+LOAD_SOCKETS = int(os.environ.get("PEFT_BENCHMARK_SOCKETS", "500"))
+LOAD_UPDATES = int(os.environ.get("PEFT_BENCHMARK_UPDATES", "20"))
+
+
+async def drain(subscription):
+    frames = []
+    while subscription.pending:
+        frames.append(json.loads(await subscription.next_frame()))
+    return frames
+
+
+def test_delta_frames_carry_changed_fields():
+    """Delta subscribers get one full frame, then only changed fields"""
+    async def scenario():
+        hub = MetricsHub()
+        full = hub.subscribe('job')
+        delta = hub.subscribe('job', delta=True)
+        hub.publish('job', {'step': 1, 'loss': 2.0, 'lr': 1e-4})
+        hub.publish('job', {'step': 2, 'loss': 1.5, 'lr': 1e-4})
+        hub.publish('job', {'step': 3, 'loss': 1.5, 'lr': 1e-4})
+        return await drain(full), await drain(delta)
+
+    full, delta = asyncio.run(scenario())
+    assert [f['type'] for f in full] == ['metrics'] * 3
+    assert full[-1] == {'type': 'metrics', 'seq': 2, 'data': {'step': 3, 'loss': 1.5, 'lr': 1e-4}}
+    assert delta[0]['type'] == 'metrics'
+    assert delta[1] == {'type': 'metrics_delta', 'seq': 1, 'data': {'step': 2, 'loss': 1.5}}
+    assert delta[2] == {'type': 'metrics_delta', 'seq': 2, 'data': {'step': 3}}
+
+
+def test_slow_subscriber_is_coalesced():
+    """A subscriber that never reads stays bounded and resyncs with a full frame"""
+    async def scenario():
+        hub = MetricsHub(max_queue=4)
+        slow = hub.subscribe('job', delta=True)
+        fast = hub.subscribe('job', delta=True)
+        received = []
+        for step in range(100):
+            hub.publish('job', {'step': step, 'loss': 1.0})
+            received.extend(await drain(fast))
+            assert slow.pending <= 4
+        return hub, slow, received, await drain(slow)
+
+    hub, slow, received, pending = asyncio.run(scenario())
+    assert [f['seq'] for f in received] == list(range(100))
+    assert slow.dropped > 0 and hub.stats()['dropped_frames'] == slow.dropped
+    # Every delta in the backlog follows a full snapshot
+    assert pending[0]['type'] == 'metrics'
+    assert [f['seq'] for f in pending] == list(range(100 - len(pending), 100))
+
+
+def test_late_subscriber_and_unknown_encoding():
+    """New subscribers start from the latest update; bad encodings are rejected"""
+    async def scenario():
+        hub = MetricsHub()
+        hub.subscribe('job')
+        hub.publish('job', {'step': 7})
+        late = hub.subscribe('job', delta=True)
+        with pytest.raises(ValueError):
+            hub.subscribe('job', encoding='xml')
+        return await drain(late)
+
+    assert asyncio.run(scenario()) == [{'type': 'metrics', 'seq': 0, 'data': {'step': 7}}]
+
+
+def test_publisher_callback_from_training_thread():
+    """Orchestrator-style callbacks on another thread reach subscribers"""
+    async def scenario():
+        hub = MetricsHub()
+        subscription = hub.subscribe('job')
+        callbacks = {}
+        hub.attach('job', lambda job_id, callback: callbacks.setdefault(job_id, []).append(callback))
+        hub.attach('job', lambda job_id, callback: callbacks.setdefault(job_id, []).append(callback))
+        assert len(callbacks['job']) == 1
+
+        metrics = TrainingMetrics(step=5, epoch=0, loss=0.5, learning_rate=1e-4)
+        thread = threading.Thread(target=callbacks['job'][0], args=(metrics,))
+        thread.start()
+        frame = await asyncio.wait_for(subscription.next_frame(), timeout=5)
+        thread.join()
+        return json.loads(frame)
+
+    frame = asyncio.run(scenario())
+    assert frame['data']['step'] == 5 and frame['data']['loss'] == 0.5
+
+
+# Load-test clients run in their own interpreter so they do not share the
+# server's GIL; prints one receive latency per message as JSON
+CLIENT_SCRIPT = """
+import asyncio, json, sys, time
+import websockets
+
+url, sockets, updates = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+
+async def client(latencies):
+    async with websockets.connect(url, max_queue=None) as ws:
+        while True:
+            message = json.loads(await ws.recv())
+            latencies.append(time.time() - message['data']['sent'])
+            if message['data']['step'] == updates - 1:
+                return
+
+async def main():
+    latencies = []
+    await asyncio.wait_for(asyncio.gather(*(client(latencies) for _ in range(sockets))), timeout=120)
+    print(json.dumps(latencies))
+
+asyncio.run(main())
+"""
+
+
+def test_fan_out_load():
+    """
+    Load test: one publisher thread pushing to many concurrent WebSockets.
+
+    Each update carries its publish time; every client must receive every
+    update, and step-to-client latency stays far below the previous
+    2 second polling interval.
+    """
+    import subprocess
+    import uvicorn
+    from fastapi import FastAPI, WebSocket
+
+    hub = MetricsHub()
+    app = FastAPI()
+
+    @app.websocket("/ws/{job_id}")
+    async def endpoint(websocket: WebSocket, job_id: str):
+        await websocket.accept()
+        subscription = hub.subscribe(job_id)
+        try:
+            await stream_subscription(websocket, subscription)
+        except Exception:
+            pass
+        finally:
+            hub.unsubscribe(subscription)
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level='warning', ws='websockets', backlog=4096))
+    server_thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    clients = subprocess.Popen(
+        [sys.executable, '-c', CLIENT_SCRIPT, f'ws://127.0.0.1:{port}/ws/job', str(LOAD_SOCKETS), str(LOAD_UPDATES)],
+        stdout=subprocess.PIPE, text=True
+    )
+    try:
+        deadline = time.time() + 60
+        while hub.stats()['subscribers'] < LOAD_SOCKETS and time.time() < deadline:
+            time.sleep(0.01)
+        for step in range(LOAD_UPDATES):
+            hub.publish('job', {'step': step, 'loss': 1.0 / (step + 1), 'sent': time.time()})
+            time.sleep(0.1)
+        output, _ = clients.communicate(timeout=120)
+    finally:
+        clients.kill()
+        server.should_exit = True
+        server_thread.join(timeout=10)
+
+    latencies = sorted(json.loads(output))
+    assert len(latencies) == LOAD_SOCKETS * LOAD_UPDATES
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95)]
+    assert p50 < 0.5, f"median step-to-client latency {p50 * 1000:.0f} ms"
+    print(f"✓ {LOAD_SOCKETS} sockets x {LOAD_UPDATES} updates: "
+          f"p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
@@ -0,0 +1,167 @@
+"""
+Tests for the columnar training metrics store.
+
+Verifies that rows read back from the store match the appended metrics
+dataclasses (including optional values, per-GPU lists and timestamps), that
+sealed segments spilled to disk stay readable, and benchmarks memory per
+step against a list of dataclasses.
+"""
+
+import pytest
+import tempfile
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.metrics_store import MetricsStore
+from services.training_orchestration_service import TrainingMetrics
+from services.monitoring_service import MonitoringService, TrainingMetrics as MonitoringMetrics
+
+# Steps in the memory benchmark
+BENCHMARK_STEPS = int(os.environ.get("PEFT_BENCHMARK_STEPS", "100000"))
+
+
+def make_metrics(step: int, gpus: int = 2) -> TrainingMetrics:
+    return TrainingMetrics(
+        step=step,
+        epoch=step // 1000,
+        loss=2.0 - step * 1e-5,
+        learning_rate=2e-4,
+        grad_norm=0.5,
+        throughput=10.0,
+        samples_per_second=40.0,
+        gpu_utilization=[50.0 + i for i in range(gpus)],
+        gpu_memory_used=[8000.0 + i for i in range(gpus)],
+        gpu_temperature=[70.0 + i for i in range(gpus)],
+        val_loss=1.5 if step % 10 == 0 else None,
+        timestamp=datetime(2026, 1, 1) + timedelta(microseconds=step * 1234567)
+    )
+
+
+metrics_strategy = st.builds(
+    TrainingMetrics,
+    step=st.integers(0, 10**9),
+    epoch=st.integers(0, 1000),
+    loss=st.floats(allow_nan=False),
+    learning_rate=st.floats(0, 1),
+    grad_norm=st.floats(0, 100),
+    gpu_utilization=st.lists(st.sampled_from([0.0, 12.5, 99.0]), max_size=8),
+    val_loss=st.one_of(st.none(), st.floats(0, 10)),
+    timestamp=st.datetimes(min_value=datetime(2000, 1, 1), max_value=datetime(2100, 1, 1))
+)
+
+
+@given(rows=st.lists(metrics_strategy, max_size=40), segment_size=st.integers(1, 16))
+@settings(max_examples=50, deadline=None)
+def test_rows_round_trip(rows, segment_size):
+    """Every appended dataclass reads back with identical fields"""
+    store = MetricsStore(TrainingMetrics, segment_size=segment_size)
+    store.extend(rows)
+
+    assert len(store) == len(rows)
+    assert [row.to_dict() for row in store] == [m.to_dict() for m in rows]
+    assert store.to_dicts() == [m.to_dict() for m in rows]
+    if rows:
+        assert store[-1].materialize() == rows[-1]
+        assert store[-3:][-1].step == rows[-1].step
+
+
+def test_columns_and_optional_values():
+    """Columns come back as arrays with NaN for missing optional values"""
+    store = MetricsStore(TrainingMetrics, segment_size=4)
+    for step in range(10):
+        store.append(make_metrics(step, gpus=1 if step < 5 else 3))
+
+    assert store.column('step').tolist() == list(range(10))
+    assert store.column('loss', -2).tolist() == [2.0 - 8e-5, 2.0 - 9e-5]
+    val_loss = store.column('val_loss')
+    assert val_loss[0] == 1.5 and all(v != v for v in val_loss[1:])
+
+    gpu = store.column('gpu_utilization')
+    assert gpu.shape == (10, 3)
+    assert store[0].gpu_utilization == [50.0]
+    assert store[9].gpu_utilization == [50.0, 51.0, 52.0]
+
+    with pytest.raises(KeyError):
+        store.column('missing')
+    with pytest.raises(AttributeError):
+        store[0].missing
+
+
+def test_spilled_segments_are_memory_mapped():
+    """Sealed segments move to disk and are removed when the store is cleared"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetricsStore(TrainingMetrics, segment_size=64, spill_dir=tmp)
+        rows = [make_metrics(step) for step in range(200)]
+        store.extend(rows)
+
+        assert any(Path(tmp).iterdir())
+        # Only the active segment stays in memory
+        assert store.nbytes < 64 * 200
+        assert store.to_dicts(60, 140) == [m.to_dict() for m in rows[60:140]]
+
+        store.clear()
+        assert len(store) == 0
+        assert not any(Path(tmp).iterdir())
+
+
+def test_monitoring_service_uses_store():
+    """MonitoringService history keeps its string timestamps and API shape"""
+    service = MonitoringService()
+    service.start_monitoring('job')
+    for step in range(5):
+        service.record_metrics('job', step, 0, 1.0 / (step + 1), 1e-4, throughput=2.0, samples_per_second=8.0)
+
+    latest = service.get_latest_metrics('job')
+    assert latest.step == 4
+    assert isinstance(latest.timestamp, str)
+    assert [m['step'] for m in service.get_metrics_dicts('job', limit=2)] == [3, 4]
+    assert service.get_metrics_history('job', limit=2)[-1].loss == 0.2
+    assert service.estimate_time_remaining('job', 4, 10) == 3.0
+    assert isinstance(service.metrics_history['job'], MetricsStore)
+    assert service.metrics_history['job'].row_type is MonitoringMetrics
+
+
+def test_memory_per_step_benchmark():
+    """
+    Benchmark: memory per step against a list of TrainingMetrics dataclasses.
+
+    With sealed segments spilled to disk (the orchestrator's configuration)
+    the resident cost drops by more than an order of magnitude; fully in
+    memory the columns still take a fraction of the dataclass size.
+    """
+    def traced_bytes_per_step(build):
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            history = build()
+            used = tracemalloc.get_traced_memory()[0] - baseline
+        finally:
+            tracemalloc.stop()
+        del history
+        return used / BENCHMARK_STEPS
+
+    def build_store(spill_dir=None):
+        store = MetricsStore(TrainingMetrics, spill_dir=spill_dir)
+        for step in range(BENCHMARK_STEPS):
+            store.append(make_metrics(step))
+        return store
+
+    per_step_list = traced_bytes_per_step(lambda: [make_metrics(step) for step in range(BENCHMARK_STEPS)])
+    per_step_store = traced_bytes_per_step(build_store)
+    with tempfile.TemporaryDirectory() as tmp:
+        per_step_spilled = traced_bytes_per_step(lambda: build_store(tmp))
+
+    assert per_step_spilled * 10 < per_step_list, \
+        f"Spilled store uses {per_step_spilled:.0f} B/step vs {per_step_list:.0f} B/step for dataclasses"
+    assert per_step_store * 4 < per_step_list, \
+        f"Store uses {per_step_store:.0f} B/step vs {per_step_list:.0f} B/step for dataclasses"
+
+    print(f"✓ {BENCHMARK_STEPS} steps: dataclasses {per_step_list:.0f} B/step, "
+          f"columnar {per_step_store:.0f} B/step, spilled {per_step_spilled:.0f} B/step")
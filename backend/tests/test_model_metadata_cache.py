@@ -0,0 +1,214 @@
+"""
+Tests for the shared two-tier model metadata cache.
+
+Verifies that the in-memory tier stays bounded, that entries are loaded
+from SQLite on first use rather than at startup, per-entry TTLs,
+stale-while-revalidate refreshes, offline fallbacks to stale entries and
+full-text search of cached metadata, and benchmarks cache startup against
+loading one JSON file per model.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+from hypothesis import given, settings, strategies as st
+
+# Add parent directory to path to import connectors
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from connectors.metadata_cache import MetadataCache
+from plugins.connectors.huggingface_connector import HuggingFaceConnector, ModelCache, ModelMetadata
+
+# Cached models in the startup benchmark
+BENCHMARK_ENTRIES = int(os.environ.get("PEFT_BENCHMARK_CACHE_ENTRIES", "5000"))
+
+
+@dataclass
+class Model:
+    name: str
+    family: str
+    size: int = 0
+
+
+@pytest.fixture
+def tmp():
+    with tempfile.TemporaryDirectory() as directory:
+        yield Path(directory)
+
+
+def make_cache(path: Path, **options) -> MetadataCache:
+    return MetadataCache(
+        "test",
+        decode=lambda data: Model(**data),
+        encode=asdict,
+        search_text=lambda m: f"{m.name} {m.family}",
+        db_path=path / "metadata.db",
+        **options
+    )
+
+
+def hf_metadata(model_id: str, tags=None) -> ModelMetadata:
+    return ModelMetadata(
+        model_id=model_id, author=model_id.split("/")[0], downloads=1, likes=0,
+        tags=tags or [], pipeline_tag="text-generation", library_name="transformers",
+        license="mit", model_size=0, created_at="", last_modified="", siblings=[],
+    )
+
+
+@given(names=st.lists(st.text(alphabet="abcdefgh", min_size=1, max_size=6), min_size=1, max_size=40, unique=True),
+       max_entries=st.integers(min_value=1, max_value=8))
+@settings(max_examples=30, deadline=None)
+def test_memory_tier_is_bounded_and_store_keeps_everything(names, max_entries):
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(Path(directory), max_entries=max_entries)
+        for name in names:
+            cache.put(name, Model(name, "llama"))
+        assert len(cache._cache) <= max_entries
+        assert all(cache.get(name) == Model(name, "llama") for name in names)
+        assert len(cache._cache) <= max_entries
+        assert sorted(m.name for m in cache.values()) == sorted(names)
+
+
+def test_entries_load_lazily_from_the_store(tmp):
+    cache = make_cache(tmp)
+    for i in range(100):
+        cache.put(f"model-{i}", Model(f"model-{i}", "mistral"))
+
+    reopened = make_cache(tmp)
+    assert len(reopened._cache) == 0
+    assert reopened.get("model-42") == Model("model-42", "mistral")
+    assert list(reopened._cache) == ["model-42"]
+
+
+def test_per_entry_ttl(tmp):
+    cache = make_cache(tmp)
+    cache.put("short", Model("short", "llama"), ttl_hours=0)
+    cache.put("long", Model("long", "llama"), ttl_hours=1)
+    cache.put("old", Model("old", "llama"), cached_at=datetime.now() - timedelta(hours=30))
+
+    assert cache.get("short") is None and cache.get("long") is not None
+    assert cache.get("old") is None and cache.get("old", ttl_hours=48) is not None
+    # Expired entries stay available for offline use until purged
+    assert cache.get_stale("short") == Model("short", "llama")
+    assert cache.purge_expired() == 2 and cache.get_stale("short") is None
+
+
+def test_stale_entries_are_served_while_refreshing(tmp):
+    cache = make_cache(tmp)
+    cache.put("m", Model("m", "old"), cached_at=datetime.now() - timedelta(hours=25))
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        await asyncio.sleep(0.01)
+        return Model("m", "new")
+
+    async def scenario():
+        first = await cache.get_or_fetch("m", fetch)
+        second = await cache.get_or_fetch("m", fetch)  # Refresh already in flight
+        await asyncio.sleep(0.05)
+        third = await cache.get_or_fetch("m", fetch)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first.family == "old" and second.family == "old" and third.family == "new"
+    assert len(fetches) == 1
+
+
+def test_offline_fetch_falls_back_to_stale_entry(tmp):
+    cache = make_cache(tmp)
+    cache.put("m", Model("m", "llama"), cached_at=datetime.now() - timedelta(days=30))
+
+    async def offline():
+        raise aiohttp.ClientConnectionError("offline")
+
+    async def missing():
+        return None
+
+    assert asyncio.run(cache.get_or_fetch("m", offline)) == Model("m", "llama")
+    assert asyncio.run(cache.get_or_fetch("other", missing)) is None
+    with pytest.raises(aiohttp.ClientConnectionError):
+        asyncio.run(cache.get_or_fetch("other", offline))
+
+
+def test_full_text_search_ranks_cached_entries(tmp):
+    cache = make_cache(tmp)
+    cache.put("meta-llama/Llama-2-7b-hf", Model("meta-llama/Llama-2-7b-hf", "llama"))
+    cache.put("mistralai/Mistral-7B-v0.1", Model("mistralai/Mistral-7B-v0.1", "mistral"))
+    cache.put("tiiuae/falcon-7b", Model("tiiuae/falcon-7b", "falcon"))
+
+    assert [m.name for m in cache.search("llama 7b")] == ["meta-llama/Llama-2-7b-hf"]
+    assert {m.name for m in cache.search("7b")} == {
+        "meta-llama/Llama-2-7b-hf", "mistralai/Mistral-7B-v0.1", "tiiuae/falcon-7b"}
+    assert [m.name for m in cache.search("mistr")] == ["mistralai/Mistral-7B-v0.1"]
+    assert cache.search('"; DROP TABLE model_metadata; --') == []
+
+
+def test_namespaces_share_the_store_without_mixing(tmp):
+    huggingface = ModelCache(tmp)
+    other = make_cache(tmp)
+    other.put("x", Model("x", "llama"))
+    huggingface.set(hf_metadata("meta-llama/Llama-2-7b-hf"))
+
+    assert [m.model_id for m in huggingface.search("llama")] == ["meta-llama/Llama-2-7b-hf"]
+    assert [m.name for m in other.search("llama")] == ["x"]
+
+
+def test_connector_searches_cache_when_offline(tmp):
+    connector = HuggingFaceConnector(cache_dir=tmp)
+    connector._cache.set(hf_metadata("meta-llama/Llama-2-7b-hf", tags=["llama"]))
+    connector._cache.set(hf_metadata("tiiuae/falcon-7b", tags=["falcon"]))
+    connector._connected = True
+    connector._session = MagicMock()
+    connector._session.get.side_effect = aiohttp.ClientConnectionError("offline")
+
+    results = asyncio.run(connector.search_models(query="llama"))
+    assert [m.model_id for m in results] == ["meta-llama/Llama-2-7b-hf"]
+
+
+def test_cache_startup_benchmark(tmp):
+    """
+    Benchmark: opening a cache holding many models and reading one.
+
+    The baseline is the previous startup path, which globbed and parsed one
+    JSON file per cached model before serving anything.
+    """
+    json_dir = tmp / "json"
+    json_dir.mkdir()
+    cache = ModelCache(tmp / "sqlite")
+    for i in range(BENCHMARK_ENTRIES):
+        metadata = hf_metadata(f"author/model-{i}", tags=["llama", f"tag-{i}"])
+        (json_dir / f"{i}.json").write_text(json.dumps(metadata.to_dict()))
+        cache.set(metadata)
+
+    started = time.perf_counter()
+    loaded = {}
+    for cache_file in json_dir.glob("*.json"):
+        metadata = ModelMetadata.from_dict(json.loads(cache_file.read_text()))
+        loaded[metadata.model_id] = metadata
+    assert loaded["author/model-7"].model_id == "author/model-7"
+    glob_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reopened = ModelCache(tmp / "sqlite")
+    assert reopened.get("author/model-7").model_id == "author/model-7"
+    lazy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = reopened.search("tag 7")
+    search_seconds = time.perf_counter() - started
+    assert results
+
+    assert lazy_seconds < glob_seconds
+    print(f"✓ {BENCHMARK_ENTRIES} cached models: lazy open + get {lazy_seconds * 1000:.1f} ms, "
+          f"JSON glob load {glob_seconds * 1000:.1f} ms, offline search {search_seconds * 1000:.1f} ms")
@@ -0,0 +1,181 @@
+"""
+Tests for syncing orchestrator jobs into TrainingRun in bulk.
+
+Verifies that one upsert inserts new runs and updates changed ones while
+skipping unchanged jobs, that an existing run keeps its creation fields,
+that run statistics match counting runs one query at a time and take a
+constant number of queries, and benchmarks the stats endpoint's database
+work against syncing and counting job by job.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+import pytest
+from hypothesis import HealthCheck, given, settings, strategies as st
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import Base, TrainingRun
+from services.multi_run_service import MultiRunManager, RunStatus
+from services.training_orchestration_service import TrainingConfig, TrainingMetrics, TrainingState
+
+# Jobs in the stats benchmark
+BENCHMARK_RUNS = int(os.environ.get("PEFT_BENCHMARK_RUNS", "2000"))
+
+STATES = list(TrainingState)
+PROVIDERS = [None, "local", "runpod", "lambda"]
+
+
+class StatementCounter:
+    """Counts statements sent to the database"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+
+def add_job(orchestrator, job_id, state=TrainingState.RUNNING, provider=None, step=None):
+    job = orchestrator.create_job(TrainingConfig(
+        job_id=job_id, model_name="gpt2", dataset_path="/data/d", output_dir=f"/out/{job_id}", max_steps=100
+    ))
+    job.state = state
+    job.provider = provider
+    if step is not None:
+        job.current_metrics = TrainingMetrics(step=step, epoch=0, loss=1.0 / (step + 1), learning_rate=1e-4)
+    return job
+
+
+def old_stats(db):
+    """Stats counted as before: active runs loaded, then a count per status"""
+    active = db.query(TrainingRun).filter(
+        TrainingRun.status.in_([RunStatus.RUNNING.value, RunStatus.PAUSED.value])
+    ).all()
+    providers = {}
+    for run in active:
+        if run.provider:
+            providers[run.provider] = providers.get(run.provider, 0) + 1
+    return {
+        'total_active': len(active),
+        'running': sum(1 for r in active if r.status == RunStatus.RUNNING.value),
+        'paused': sum(1 for r in active if r.status == RunStatus.PAUSED.value),
+        'total_completed': db.query(TrainingRun).filter(TrainingRun.status == RunStatus.COMPLETED.value).count(),
+        'total_failed': db.query(TrainingRun).filter(TrainingRun.status == RunStatus.FAILED.value).count(),
+        'active_providers': providers,
+    }
+
+
+def test_bulk_sync_upserts_only_changed_jobs(orchestrator, multi_run_manager, db_session):
+    counter = StatementCounter(db_session.get_bind())
+    jobs = [add_job(orchestrator, f"job-{i}", step=i) for i in range(50)]
+
+    counter.reset()
+    assert multi_run_manager.sync_runs_to_database(jobs, db_session) == 50
+    assert counter.count == 1
+    assert db_session.query(TrainingRun).count() == 50
+
+    counter.reset()
+    assert multi_run_manager.sync_runs_to_database(jobs, db_session) == 0
+    assert counter.count == 0
+
+    jobs[3].state = TrainingState.COMPLETED
+    jobs[3].completed_at = datetime(2024, 1, 2)
+    jobs[7].current_metrics = TrainingMetrics(step=70, epoch=1, loss=0.5, learning_rate=1e-4,
+                                              gpu_utilization=[50.0, 70.0])
+    assert multi_run_manager.sync_runs_to_database(jobs, db_session) == 2
+
+    db_session.expire_all()
+    run = db_session.query(TrainingRun).filter(TrainingRun.job_id == "job-3").one()
+    assert run.status == "completed" and run.completed_at == datetime(2024, 1, 2)
+    run = db_session.query(TrainingRun).filter(TrainingRun.job_id == "job-7").one()
+    assert (run.current_step, run.current_epoch, run.gpu_utilization, run.total_steps) == (70, 1, 60.0, 100)
+
+
+def test_existing_run_keeps_its_creation_fields(orchestrator, multi_run_manager, db_session):
+    job = add_job(orchestrator, "job", provider="runpod")
+    multi_run_manager.sync_run_to_database(job, db_session)
+    started_at = db_session.query(TrainingRun).one().started_at
+
+    job.provider = "lambda"
+    job.provider_job_id = "remote-1"
+    assert multi_run_manager.sync_runs_to_database([job], db_session) == 1
+    # Synced singly and in bulk alike: no second write for the same revision
+    assert multi_run_manager.sync_runs_to_database([job], db_session) == 0
+
+    db_session.expire_all()
+    run = db_session.query(TrainingRun).one()
+    assert (run.provider, run.provider_job_id, run.started_at) == ("runpod", "remote-1", started_at)
+
+
+@given(jobs=st.lists(st.tuples(st.sampled_from(STATES), st.sampled_from(PROVIDERS)), max_size=30))
+@settings(max_examples=30, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+def test_stats_match_counting_per_status(jobs, temp_dirs):
+    from services.training_orchestration_service import TrainingOrchestrator
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    orchestrator = TrainingOrchestrator(temp_dirs['checkpoint_dir'], temp_dirs['artifacts_dir'])
+    for i, (state, provider) in enumerate(jobs):
+        add_job(orchestrator, f"job-{i}", state, provider)
+    manager = MultiRunManager(orchestrator=orchestrator)
+
+    counter = StatementCounter(engine)
+    stats = manager.get_concurrent_stats(db).to_dict()
+    assert counter.count <= 2
+    assert stats == old_stats(db)
+    db.close()
+    engine.dispose()
+
+
+def test_stats_benchmark(orchestrator, db_session):
+    """
+    Benchmark: /api/runs/stats database work with many jobs, bulk upsert and
+    one aggregate against a sync query per job and a count per status.
+    """
+    for i in range(BENCHMARK_RUNS):
+        add_job(orchestrator, f"job-{i}", STATES[i % len(STATES)], PROVIDERS[i % len(PROVIDERS)], step=i)
+    jobs = orchestrator.list_jobs()
+    counter = StatementCounter(db_session.get_bind())
+
+    started = time.perf_counter()
+    per_job = MultiRunManager(orchestrator=orchestrator)
+    for job in jobs:
+        per_job.sync_run_to_database(job, db_session)
+    expected = old_stats(db_session)
+    per_job_seconds = time.perf_counter() - started
+    per_job_statements = counter.count
+
+    # Every job changes between polls, so the bulk path has as much to write
+    for job in jobs:
+        job.current_metrics = TrainingMetrics(step=job.current_metrics.step + 1, epoch=0, loss=0.1,
+                                              learning_rate=1e-4)
+    bulk = MultiRunManager(orchestrator=orchestrator)
+    counter.reset()
+    started = time.perf_counter()
+    stats = bulk.get_concurrent_stats(db_session).to_dict()
+    bulk_seconds = time.perf_counter() - started
+    bulk_statements = counter.count
+
+    counter.reset()
+    started = time.perf_counter()
+    bulk.get_concurrent_stats(db_session)
+    unchanged_seconds = time.perf_counter() - started
+
+    assert stats == expected
+    assert bulk_statements == 2 and counter.count == 1
+    assert bulk_seconds < per_job_seconds
+    print(f"✓ {BENCHMARK_RUNS} jobs: bulk stats {bulk_seconds * 1000:.0f} ms ({bulk_statements} statements), "
+          f"unchanged {unchanged_seconds * 1000:.1f} ms (1 statement), per job "
+          f"{per_job_seconds * 1000:.0f} ms ({per_job_statements} statements)")
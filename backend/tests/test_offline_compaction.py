@@ -0,0 +1,144 @@
+"""
+Tests for coalescing and compaction of queued offline operations.
+
+Verifies that replaying a compacted queue leaves the remote side in the
+same state as replaying every operation, that operations in progress are
+never folded into, and that saved network calls are reported and persist
+across restarts.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.offline_compaction import CANCELLED, MERGED, QUEUED, QueuedOperation, fold
+from services.offline_queue_service import OfflineQueueManager, OperationStatus, OperationType
+
+
+@pytest.fixture
+def db_url():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield f"sqlite:///{os.path.join(tmp, 'queue.db')}"
+
+
+class Remote:
+    """Stand-in for the remote side: entities and metric logs per resource"""
+
+    def __init__(self):
+        self.entities = {}
+        self.metrics = {}
+        self.calls = 0
+
+    async def execute(self, operation_type, payload):
+        self.calls += 1
+        self.apply(operation_type, payload)
+        return True
+
+    def apply(self, operation_type, payload):
+        key = payload['run_id']
+        fields = {k: v for k, v in payload.items() if k not in ('action', 'run_id', 'metrics')}
+        if operation_type == OperationType.METRIC_LOG:
+            self.metrics.setdefault(key, []).extend(payload['metrics'])
+        elif payload['action'] == 'create':
+            self.entities[key] = fields
+        elif payload['action'] == 'update':
+            self.entities.setdefault(key, {}).update(fields)
+        else:
+            self.entities.pop(key, None)
+
+
+operation_strategy = st.one_of(
+    st.tuples(
+        st.just(OperationType.EXPERIMENT_SYNC),
+        st.fixed_dictionaries({
+            'action': st.sampled_from(['create', 'update', 'delete']),
+            'run_id': st.sampled_from(['r1', 'r2']),
+            'name': st.text(max_size=3),
+        }, optional={'lr': st.integers(0, 3)})
+    ),
+    st.tuples(
+        st.just(OperationType.METRIC_LOG),
+        st.fixed_dictionaries({
+            'run_id': st.sampled_from(['r1', 'r2']),
+            'metrics': st.lists(st.integers(0, 100), min_size=1, max_size=3),
+        })
+    )
+)
+
+
+@given(operations=st.lists(operation_strategy, max_size=25), coalesce=st.booleans())
+@settings(max_examples=60, deadline=None)
+def test_compacted_replay_matches_full_replay(operations, coalesce):
+    """Compacting at enqueue time or before sync never changes the remote result"""
+    expected = Remote()
+    for operation_type, payload in operations:
+        expected.apply(operation_type, payload)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = OfflineQueueManager(db_url=f"sqlite:///{os.path.join(tmp, 'queue.db')}")
+        for operation_type, payload in operations:
+            manager.enqueue(operation_type, payload, coalesce=coalesce)
+        remote = Remote()
+        results = asyncio.run(manager.sync_all(remote.execute))
+        stats = manager.get_queue_stats()
+        manager.close()
+
+    assert remote.entities == expected.entities
+    assert remote.metrics == expected.metrics
+    assert results['failed'] == 0
+    assert remote.calls + stats['network_calls_saved'] == len(operations)
+
+
+def test_fold_outcomes():
+    create = QueuedOperation('experiment_sync', {'action': 'create', 'run_id': 'r', 'a': 1}, id=1)
+    pending = [create]
+
+    outcome, removed, saved = fold(pending, QueuedOperation('experiment_sync', {'action': 'update', 'run_id': 'r', 'b': 2}, 5), 'metric_log')
+    assert (outcome, removed, saved) == (MERGED, [], 1)
+    assert create.payload == {'action': 'create', 'run_id': 'r', 'a': 1, 'b': 2} and create.priority == 5
+
+    # A different operation type is a barrier
+    outcome, _, _ = fold(pending, QueuedOperation('model_push', {'action': 'update', 'run_id': 'r'}), 'metric_log')
+    assert outcome == QUEUED and len(pending) == 2
+    outcome, removed, saved = fold(pending, QueuedOperation('experiment_sync', {'action': 'delete', 'run_id': 'r'}), 'metric_log')
+    assert outcome == QUEUED and removed == [] and saved == 0
+
+    pending = [create]
+    outcome, removed, saved = fold(pending, QueuedOperation('experiment_sync', {'action': 'delete', 'run_id': 'r'}), 'metric_log')
+    assert (outcome, removed, saved, pending) == (CANCELLED, [create], 2, [])
+
+
+def test_in_progress_operations_are_not_folded(db_url):
+    manager = OfflineQueueManager(db_url=db_url)
+    first = manager.enqueue(OperationType.METRIC_LOG, {'run_id': 'r', 'metrics': [1]})
+    manager.update_status(first, OperationStatus.IN_PROGRESS)
+    second = manager.enqueue(OperationType.METRIC_LOG, {'run_id': 'r', 'metrics': [2]})
+    third = manager.enqueue(OperationType.METRIC_LOG, {'run_id': 'r', 'metrics': [3]})
+
+    assert second != first and third == second
+    assert manager.get_operation(first)['payload'] == '{"run_id": "r", "metrics": [1]}'
+    assert manager.get_operation(second)['payload'] == '{"run_id": "r", "metrics": [2, 3]}'
+    manager.close()
+
+
+def test_network_calls_saved_persist(db_url):
+    manager = OfflineQueueManager(db_url=db_url)
+    for step in range(10):
+        manager.enqueue(OperationType.METRIC_LOG, {'run_id': 'r', 'metrics': [step]})
+    manager.enqueue(OperationType.API_CALL, {'action': 'create', 'resource': 'preset:1'})
+    manager.enqueue(OperationType.API_CALL, {'action': 'update', 'resource': 'preset:1'})
+    manager.enqueue(OperationType.API_CALL, {'action': 'delete', 'resource': 'preset:1'})
+    manager.close()
+
+    manager = OfflineQueueManager(db_url=db_url)
+    stats = manager.get_queue_stats()
+    assert stats['pending'] == 1
+    assert stats['coalesced'] == 10 and stats['cancelled'] == 2 and stats['network_calls_saved'] == 12
+    manager.close()
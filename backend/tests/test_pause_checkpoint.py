@@ -98,7 +98,7 @@ def test_pause_saves_checkpoint(config):
             # Verify checkpoint was saved to disk
             assert job.checkpoint_path is not None, "Job should have checkpoint path"
             assert job.checkpoint_path.exists(), "Checkpoint directory should exist"
-            assert (job.checkpoint_path / "model_checkpoint.pt").exists(), "Model checkpoint file should exist"
+            assert (job.checkpoint_path / "manifest.json").exists(), "Model checkpoint manifest should exist"
             assert (job.checkpoint_path / "checkpoint_metadata.json").exists(), "Metadata file should exist"
             
             # Verify job is in paused state
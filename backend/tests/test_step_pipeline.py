@@ -0,0 +1,266 @@
+"""
+Tests for the training step loop's bookkeeping pipeline.
+
+Verifies that precomputed milestone steps and the pipeline send the same
+progress notifications as checking progress on every step, that metrics
+are emitted at the configured cadence (always including the last step),
+that the Do Not Disturb status is cached and refreshed in the background,
+that callbacks run off-thread through a bounded queue, and benchmarks the
+per-step bookkeeping overhead of the simulated loop against the previous
+per-step path.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import notification_service
+from services.notification_service import (
+    DoNotDisturbMonitor,
+    NotificationManager,
+    ProgressUpdate,
+    check_progress_milestone,
+    milestone_steps,
+)
+from services.step_pipeline import CallbackDispatcher, StepPipeline
+from services.training_orchestration_service import TrainingConfig, TrainingMetrics, TrainingState
+
+# Steps in the bookkeeping benchmark
+BENCHMARK_STEPS = int(os.environ.get("PEFT_BENCHMARK_STEPS", "20000"))
+
+
+@pytest.fixture(autouse=True)
+def dnd_off(monkeypatch):
+    """Deterministic Do Not Disturb status, without shelling out"""
+    monkeypatch.setattr(notification_service, "_dnd_monitor", DoNotDisturbMonitor(check=lambda: False))
+
+
+class FakeJob:
+    def __init__(self):
+        self.current_metrics = None
+        self.metrics_history = []
+
+
+def make_metrics(step, epoch, loss):
+    return TrainingMetrics(step=step, epoch=epoch, loss=loss, learning_rate=1e-4)
+
+
+def per_step_notifications(total_steps, start_step):
+    """Milestones sent by the previous loop, which checked progress on every step"""
+    manager = NotificationManager()
+    sent = []
+    previous_step = start_step
+    for step in range(start_step, total_steps):
+        notification = manager.get_next_notification(ProgressUpdate(step, total_steps, previous_step))
+        if notification:
+            sent.append((step, notification.milestone))
+        previous_step = step
+    return sent
+
+
+@given(total_steps=st.integers(min_value=0, max_value=5000))
+@settings(max_examples=200, deadline=None)
+def test_milestone_steps_are_first_steps_reaching_each_milestone(total_steps):
+    steps = milestone_steps(total_steps)
+    if total_steps == 0:
+        assert steps == []
+        return
+    def progress(step):
+        return (step / total_steps) * 100
+
+    for step, milestone in zip(steps, notification_service.PROGRESS_MILESTONES):
+        # Several milestones share a step when there are fewer steps than milestones
+        assert progress(step - 1) < milestone <= progress(step)
+        assert check_progress_milestone(ProgressUpdate(step, total_steps, step - 1)) is not None
+
+
+@given(total_steps=st.integers(min_value=0, max_value=400), data=st.data())
+@settings(max_examples=100, deadline=None)
+def test_pipeline_sends_the_notifications_of_per_step_checks(total_steps, data):
+    start_step = data.draw(st.integers(min_value=0, max_value=total_steps))
+    sent = []
+    current = [None]
+    pipeline = StepPipeline(
+        FakeJob(), total_steps, make_metrics, start_step=start_step, notification_manager=NotificationManager(),
+        notify=lambda notification: sent.append((current[0], notification.milestone))
+    )
+    for step in range(start_step, total_steps):
+        current[0] = step
+        pipeline.record(step, 0, 1.0)
+
+    assert sent == per_step_notifications(total_steps, start_step)
+
+
+@given(
+    total_steps=st.integers(min_value=0, max_value=200),
+    start_step=st.integers(min_value=0, max_value=50),
+    logging_steps=st.integers(min_value=0, max_value=25),
+    stop_at=st.one_of(st.none(), st.integers(min_value=0, max_value=200))
+)
+@settings(max_examples=100, deadline=None)
+def test_metrics_are_emitted_at_the_cadence_and_for_the_last_step(total_steps, start_step, logging_steps, stop_at):
+    job = FakeJob()
+    received = []
+    pipeline = StepPipeline(job, total_steps, make_metrics, start_step=start_step, logging_steps=logging_steps,
+                            get_callbacks=lambda: [received.append])
+    steps = list(range(start_step, total_steps if stop_at is None else min(total_steps, stop_at)))
+    for step in steps:
+        pipeline.record(step, step // 1000, 2.0 - step / 1000)
+    pipeline.flush()
+
+    expected = steps[::max(1, logging_steps)]
+    if steps and expected[-1] != steps[-1]:
+        expected.append(steps[-1])
+    assert [m.step for m in job.metrics_history] == expected
+    assert [m.step for m in received] == expected
+    assert job.current_metrics is (job.metrics_history[-1] if expected else None)
+
+
+def test_dnd_status_is_cached_and_refreshed_in_the_background():
+    calls = []
+    status = [True]
+    release = threading.Event()
+
+    def check():
+        calls.append(threading.current_thread().name)
+        if len(calls) > 1:
+            release.wait(5)
+        return status[0]
+
+    monitor = DoNotDisturbMonitor(refresh_seconds=60, check=check)
+    assert monitor.is_enabled() is True
+    assert monitor.is_enabled() is True
+    assert calls == [threading.current_thread().name]
+
+    # A stale reading is returned at once while a refresh runs elsewhere
+    monitor.refresh_seconds = 0
+    status[0] = False
+    time.sleep(0.01)
+    assert monitor.is_enabled() is True
+    assert monitor.is_enabled() is True
+    release.set()
+    deadline = time.monotonic() + 5
+    while monitor.is_enabled() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert monitor.is_enabled() is False
+    assert calls[1] == "dnd-refresh"
+
+
+def test_dispatcher_runs_callbacks_off_thread_and_drops_oldest_when_full():
+    entered = threading.Event()
+    gate = threading.Event()
+    seen = []
+
+    def slow(value):
+        entered.set()
+        gate.wait(5)
+        seen.append((value, threading.current_thread().name))
+
+    def failing(value):
+        raise RuntimeError("callback failed")
+
+    dispatcher = CallbackDispatcher(max_pending=3)
+    dispatcher.submit([slow, failing], 0)
+    assert entered.wait(5)
+    started = time.perf_counter()
+    for value in range(1, 10):
+        dispatcher.submit([slow, failing], value)
+    assert time.perf_counter() - started < 1
+
+    gate.set()
+    assert dispatcher.flush(5)
+    values = [value for value, _ in seen]
+    # The first value was already being dispatched; the newest three survived
+    assert values == [0, 7, 8, 9]
+    assert {name for _, name in seen} == {"metrics-callbacks"}
+    stats = dispatcher.stats()
+    assert (stats['dispatched'], stats['dropped'], stats['errors'], stats['pending']) == (4, 6, 4, 0)
+    dispatcher.shutdown(5)
+
+
+def test_training_loop_emits_and_dispatches_metrics(orchestrator):
+    job = orchestrator.create_job(TrainingConfig(
+        job_id="job", model_name="gpt2", dataset_path="/data/d", output_dir="/out/job",
+        max_steps=205, save_steps=10_000, logging_steps=10
+    ))
+    received = []
+    notifications = []
+    orchestrator.register_metrics_callback("job", received.append)
+    orchestrator.register_notification_callback("job", notifications.append)
+    orchestrator.simulated_step_seconds = 0
+    orchestrator._stop_flags["job"] = threading.Event()
+    orchestrator._pause_flags["job"] = threading.Event()
+
+    orchestrator._training_loop("job")
+
+    assert job.state == TrainingState.COMPLETED
+    expected = list(range(0, 205, 10)) + [204]
+    assert [m.step for m in received] == expected
+    assert job.current_metrics.step == 204 and len(job.metrics_history) == len(expected)
+    assert [n.milestone for n in notifications] == [25, 50, 75, 100]
+
+
+def legacy_loop(job, manager, callbacks, config, total_steps):
+    """Per-step bookkeeping of the previous loop"""
+    previous_step = 0
+    for step in range(total_steps):
+        epoch = step // 1000
+        loss = 2.0 - (step / total_steps) * 1.5
+        metrics = TrainingMetrics(
+            step=step, epoch=epoch, loss=loss, learning_rate=config.learning_rate, grad_norm=0.5,
+            throughput=10.0, samples_per_second=40.0, elapsed_time=step * 0.1,
+            estimated_time_remaining=(total_steps - step) * 0.1
+        )
+        job.current_metrics = metrics
+        job.metrics_history.append(metrics)
+        notification = manager.get_next_notification(ProgressUpdate(
+            current_step=step, total_steps=total_steps, previous_step=previous_step
+        ))
+        previous_step = step
+        for callback in callbacks:
+            callback(metrics)
+
+
+def test_step_bookkeeping_benchmark(orchestrator):
+    """
+    Benchmark: per-step bookkeeping of the simulated loop (no step delay)
+    with a callback serializing metrics as the metrics hub does, against
+    the previous path that built metrics, checked milestones and ran
+    callbacks synchronously on every step.
+    """
+    def publish(metrics):
+        metrics.to_dict()
+
+    config = TrainingConfig(job_id="legacy", model_name="gpt2", dataset_path="/d", output_dir="/o",
+                            max_steps=BENCHMARK_STEPS, save_steps=10 * BENCHMARK_STEPS)
+    legacy_job = orchestrator.create_job(config)
+    started = time.perf_counter()
+    legacy_loop(legacy_job, NotificationManager(), [publish], config, BENCHMARK_STEPS)
+    legacy_us = (time.perf_counter() - started) / BENCHMARK_STEPS * 1e6
+
+    orchestrator.simulated_step_seconds = 0
+    per_step_us = {}
+    for logging_steps in (1, 10):
+        job_id = f"pipeline-{logging_steps}"
+        orchestrator.create_job(TrainingConfig(
+            job_id=job_id, model_name="gpt2", dataset_path="/d", output_dir="/o",
+            max_steps=BENCHMARK_STEPS, save_steps=10 * BENCHMARK_STEPS, logging_steps=logging_steps
+        ))
+        orchestrator.register_metrics_callback(job_id, publish)
+        orchestrator._stop_flags[job_id] = threading.Event()
+        orchestrator._pause_flags[job_id] = threading.Event()
+        started = time.perf_counter()
+        orchestrator._training_loop(job_id)
+        per_step_us[logging_steps] = (time.perf_counter() - started) / BENCHMARK_STEPS * 1e6
+        assert orchestrator.jobs[job_id].current_metrics.step == BENCHMARK_STEPS - 1
+
+    assert per_step_us[10] < legacy_us
+    print(f"✓ {BENCHMARK_STEPS} simulated steps, per-step bookkeeping: every step {per_step_us[1]:.1f} µs, "
+          f"every 10 steps {per_step_us[10]:.1f} µs, previous path {legacy_us:.1f} µs")
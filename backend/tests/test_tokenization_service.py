@@ -0,0 +1,164 @@
+"""
+Tests for tokenizer-backed token counting in dataset statistics.
+
+Uses a small word-level tokenizer saved to a temporary directory, so counts
+are known exactly and no model download is needed.
+"""
+
+import pytest
+import tempfile
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.dataset_service import DatasetService, DatasetFormat
+from services.tokenization_service import TokenizationService, TokenCounter
+
+pytest.importorskip("tokenizers")
+transformers = pytest.importorskip("transformers")
+
+
+@pytest.fixture(scope="module")
+def word_tokenizer():
+    """Path to a whitespace word-level tokenizer: one token per word"""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    tokenizer = Tokenizer(models.WordLevel(vocab={"[UNK]": 0, "hello": 1}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+
+    with tempfile.TemporaryDirectory(prefix="test_tokenizer_") as path:
+        transformers.PreTrainedTokenizerFast(
+            tokenizer_object=tokenizer, unk_token="[UNK]"
+        ).save_pretrained(path)
+        yield path
+
+
+@pytest.fixture
+def workspace():
+    """Temporary directory for datasets, indexes and the token length cache"""
+    with tempfile.TemporaryDirectory(prefix="test_tokenization_") as path:
+        yield Path(path)
+
+
+def write_jsonl(path: Path, texts):
+    with open(path, 'w', encoding='utf-8') as f:
+        for text in texts:
+            f.write(json.dumps({'text': text}) + '\n')
+
+
+def make_service(workspace: Path, **kwargs) -> DatasetService:
+    tokenization = TokenizationService(cache_dir=str(workspace / 'cache'), **kwargs)
+    return DatasetService(index_dir=str(workspace / 'index'), tokenization_service=tokenization)
+
+
+def test_statistics_use_tokenizer_counts(workspace, word_tokenizer):
+    """Token figures come from the tokenizer; the heuristic is reported alongside"""
+    texts = ['a' * 40, 'one two three', 'x ' * 1500, 'word']
+    path = workspace / 'data.jsonl'
+    write_jsonl(path, texts)
+
+    service = make_service(workspace, max_workers=1)
+    stats = service.analyze_statistics(str(path), DatasetFormat.JSONL, tokenizer_name=word_tokenizer)
+
+    word_counts = [len(text.split()) for text in texts]
+    assert stats.token_count_method == "tokenizer"
+    assert stats.tokenizer_name == word_tokenizer
+    assert stats.total_tokens == sum(word_counts)
+    assert stats.min_tokens == 1
+    assert stats.max_tokens == 1500
+    assert stats.token_length_distribution == {"0-100": 3, "100-500": 0, "500-1000": 0, "1000+": 1}
+
+    assert stats.estimated_total_tokens == sum(len(text) // 4 for text in texts)
+    assert stats.estimated_max_tokens == max(len(text) // 4 for text in texts)
+    assert stats.to_dict()["estimated_total_tokens"] == stats.estimated_total_tokens
+
+
+def test_token_lengths_are_cached(workspace, word_tokenizer, monkeypatch):
+    """Repeat analyses of an unchanged file skip tokenization"""
+    path = workspace / 'data.jsonl'
+    write_jsonl(path, [f'sample {i} ' * (i % 7 + 1) for i in range(500)])
+
+    service = make_service(workspace, max_workers=1, batch_size=64)
+    first = service.analyze_statistics(str(path), DatasetFormat.JSONL, tokenizer_name=word_tokenizer)
+    assert list((workspace / 'cache').glob('*.npy'))
+
+    submitted = []
+    original_submit = TokenCounter._submit
+
+    def tracking_submit(self):
+        submitted.append(len(self._pending))
+        return original_submit(self)
+
+    monkeypatch.setattr(TokenCounter, '_submit', tracking_submit)
+
+    second = service.analyze_statistics(str(path), DatasetFormat.JSONL, tokenizer_name=word_tokenizer)
+    assert submitted == []
+    assert second == first
+
+    # Changing the file invalidates the cached lengths
+    write_jsonl(path, ['changed text'] * 10)
+    third = service.analyze_statistics(str(path), DatasetFormat.JSONL, tokenizer_name=word_tokenizer)
+    assert submitted
+    assert third.total_tokens == 20
+
+
+def test_process_pool_matches_in_process(workspace, word_tokenizer):
+    """Batches counted across worker processes come back in sample order"""
+    texts = [' '.join(['w'] * (i % 53)) for i in range(3000)]
+
+    pooled = TokenizationService(cache_dir=str(workspace), max_workers=2, batch_size=128)
+    try:
+        lengths = pooled.count_tokens(texts, word_tokenizer)
+    finally:
+        pooled.shutdown()
+
+    assert lengths.tolist() == [i % 53 for i in range(3000)]
+    assert lengths.tolist() == TokenizationService(max_workers=1).count_tokens(texts, word_tokenizer).tolist()
+
+
+def test_missing_tokenizer_falls_back_to_heuristic(workspace):
+    """An unloadable tokenizer keeps the character estimate and says so"""
+    path = workspace / 'data.jsonl'
+    write_jsonl(path, ['some sample text for training'] * 20)
+    missing = str(workspace / 'no-such-tokenizer')
+
+    service = make_service(workspace, max_workers=1)
+    stats = service.analyze_statistics(str(path), DatasetFormat.JSONL, tokenizer_name=missing)
+
+    assert stats.token_count_method == "heuristic"
+    assert stats.total_tokens == stats.estimated_total_tokens == 20 * (len('some sample text for training') // 4)
+
+    report = service.check_quality(str(path), DatasetFormat.JSONL, tokenizer_name=missing)
+    assert any("Could not load tokenizer" in r for r in report.recommendations)
+
+
+def test_failed_tokenizer_is_retried_after_timeout(workspace, word_tokenizer, monkeypatch):
+    """A tokenizer that failed is skipped for a while, then tried again"""
+    import services.tokenization_service as tokenization_module
+
+    service = TokenizationService(cache_dir=str(workspace), max_workers=1)
+    service.mark_unavailable(word_tokenizer, OSError("connection reset"))
+    assert service.count_tokens(['one two'], word_tokenizer) is None
+
+    monkeypatch.setattr(tokenization_module, "UNAVAILABLE_RETRY_SECONDS", 0)
+    service.mark_unavailable(word_tokenizer, OSError("connection reset"))
+    assert service.count_tokens(['one two'], word_tokenizer).tolist() == [2]
+
+
+def test_load_error_in_worker_is_reported(workspace):
+    """Pool workers report why the tokenizer could not be loaded"""
+    missing = str(workspace / 'no-such-tokenizer')
+    pooled = TokenizationService(cache_dir=str(workspace), max_workers=2, batch_size=4)
+    try:
+        counter = pooled.token_counter(missing)
+        for text in ['a b'] * 8:
+            counter.add(text)
+        assert counter.finalize() is None
+        assert "Could not load tokenizer" in str(counter._error)
+        assert not pooled.is_available(missing)
+    finally:
+        pooled.shutdown()
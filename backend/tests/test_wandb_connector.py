@@ -168,15 +168,8 @@ async def wandb_connector(mock_wandb_api):
         run_info = connector._runs[job_id]
         mock_wandb_api.update_run_state(run_info['wandb_id'], "killed")
         
-        if job_id in connector._batch_tasks:
-            connector._batch_tasks[job_id].cancel()
-            try:
-                await connector._batch_tasks[job_id]
-            except asyncio.CancelledError:
-                pass
-            del connector._batch_tasks[job_id]
-        
         await connector._flush_metrics(job_id)
+        await connector._shipper.close(job_id)
         return True
     
     connector.cancel_job = mock_cancel_job